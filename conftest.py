@@ -6,6 +6,8 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent))
 from datetime import datetime
 
+pytest_plugins = ["tools.deep_plugin"]
+
 # Copied from numpy code by way of https://stackoverflow.com/a/63775093/1539989 and altered.
 # Add git version / branch info to header
 
@@ -1,12 +1,13 @@
 from pathlib import Path
 import pandas as pd
-from . import integration
+from model import integration
 from model import advanced_controls as ac
 from model import aez
 from model import dd
 from model import vma
 from model import world_land
 from solution import factory
+from integrations.integration_base import Pipeline, Step, solution_dependency
 
 
 standard_land_allocation_types = list(world_land.AEZ_ALLOCATION_MAP.keys()) + ["Add-On Solutions"]
@@ -55,7 +56,7 @@ class AEZ_Land_Integration:
             self.solution_list = [ _map_scenario_to_module(scenario) for scenario in self.scenario_list ]
         else:
             self.solution_list = factory.all_solutions_category(ac.SOLUTION_CATEGORY.LAND)
-            self.scenario_list = [ factory.solution_pds_type(x, "PDS2") for x in self.solution_list ]
+            self.scenario_list = [ factory.load_scenario(x, "PDS2") for x in self.solution_list ]
         
         
         self.world_land_availability = world_land.World_TMR_AEZ_Map(series_name="2020")
@@ -81,6 +82,22 @@ class AEZ_Land_Integration:
 
 
 
+land_integration_state = AEZ_Land_Integration()
+
+def pipeline():
+    """Return the integration as a Pipeline, which skips steps that are unchanged since the last run."""
+    return Pipeline("land", land_integration_state, [
+        Step(land_step1, outputs=["all_solution_allocations"], depends=[world_land.datadir, land_solutions_dependency])
+    ])
+
+def land_solutions_dependency():
+    return [ solution_dependency(soln)() for soln in factory.all_solutions_category(ac.SOLUTION_CATEGORY.LAND) ]
+
+def land_step1():
+    """Step one collates the current adoptions of the land solutions"""
+    land_integration_state.assemble_current_status()
+
+
 def _map_scenario_to_module(scenario):
     """Given a scenario, return the common module name (e.g. 'afforestation') of the solution"""
     fullmodule = scenario.__module__
@@ -0,0 +1,241 @@
+"""Columnar storage for integration audit logs.
+
+The audit log (see integration_base.start_audit) keeps a copy of every intermediate result of an
+integration.  Kept in memory, that grows without limit over long or repeated integrations.  An
+AuditStore instead streams each entry to an append-only Arrow IPC file, one file per run, and keeps
+only an index (log name, item title) -> file offset in memory, plus an optional small ring buffer of
+the most recent entries.  Entries are read back lazily from a memory map, and runs may be compared
+with each other.
+
+Each entry is stored as one record batch in "long" form: one row per cell, with the row and column
+labels as json and the value as float64 (or as text, for non-numeric cells).  The shape, column labels,
+Series name and index and column dtypes needed to rebuild the original DataFrame or Series are kept
+in the index, which is also written alongside the data as a json-lines file, so earlier runs can be
+re-opened.  Labels must be strings, numbers, booleans or None (or tuples of them, for a MultiIndex),
+in an Index of one of those types: append raises TypeError for any other.
+"""
+
+import collections
+import datetime
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+_schema = pa.schema([('row', pa.string()), ('column', pa.string()),
+                     ('value', pa.float64()), ('text', pa.string())])
+
+
+class AuditStore:
+
+    def __init__(self, directory, run=None, buffer_size=16):
+        """Store audit entries in directory, under the name run (by default, a timestamp).
+        Up to buffer_size of the most recent entries are also kept in memory."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.run = run or datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.buffer_size = buffer_size
+        self.buffer = collections.OrderedDict()
+        self._index = {}
+        self._sink = None
+        self._writer = None
+        self._maps = {}
+
+    # Writing
+
+    def _open(self):
+        if self._writer is None:
+            datafile = self.directory/f"{self.run}.arrow"
+            if datafile.is_file():
+                raise ValueError(f"Audit run {self.run} already exists in {self.directory}")
+            self._sink = pa.OSFile(str(datafile), 'wb')
+            self._writer = pa.ipc.new_stream(self._sink, _schema)
+            self._indexfile = open(self.directory/f"{self.run}.index.jsonl", 'w', encoding='utf-8')
+
+    def append(self, log, title, value):
+        """Add value (a DataFrame, Series or None) to the store as item title of the named log."""
+        self._open()
+        entry = {'log': log, 'title': title, 'offset': None}
+        if value is not None:
+            frame = value.to_frame() if isinstance(value, pd.Series) else value
+            entry.update({
+                'kind': 'series' if isinstance(value, pd.Series) else 'frame',
+                'name': _label(value.name) if isinstance(value, pd.Series) else None,
+                'index': _axis(frame.index),
+                'columns': dict(_axis(frame.columns), labels=[_label(c) for c in frame.columns]),
+                'rows': len(frame.index)})
+            entry['offset'] = self._sink.tell()
+            self._writer.write_batch(_to_batch(frame))
+            self._sink.flush()
+        self._indexfile.write(json.dumps(entry) + "\n")
+        self._indexfile.flush()
+        self._index.setdefault(self.run, {})[(log, title)] = entry
+
+        if self.buffer_size:
+            self.buffer[(log, title)] = None if value is None else value.copy()
+            self.buffer.move_to_end((log, title))
+            while len(self.buffer) > self.buffer_size:
+                self.buffer.popitem(last=False)
+
+    def reset(self, log):
+        """Forget all the items of log in the current run (their data remains in the file)."""
+        self._open()
+        self._indexfile.write(json.dumps({'log': log, 'reset': True}) + "\n")
+        self._indexfile.flush()
+        index = self._index.setdefault(self.run, {})
+        for k in [k for k in index.keys() if k[0] == log]:
+            del index[k]
+        for k in [k for k in self.buffer.keys() if k[0] == log]:
+            del self.buffer[k]
+
+    def close(self):
+        """Finish writing the current run."""
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._indexfile.close()
+            self._writer = None
+        for m in self._maps.values():
+            m.close()
+        self._maps = {}
+
+    # Reading
+
+    def runs(self):
+        """Return the names of all the runs in the store, oldest first."""
+        return sorted(f.name[:-len(".index.jsonl")] for f in self.directory.glob("*.index.jsonl"))
+
+    def index(self, run=None):
+        """Return the index of run (default: the current run): a dict of (log, title) -> entry."""
+        run = run or self.run
+        if run not in self._index:
+            indexfile = self.directory/f"{run}.index.jsonl"
+            index = {}
+            for line in indexfile.read_text(encoding='utf-8').splitlines():
+                e = json.loads(line)
+                if e.get('reset'):
+                    index = { k : v for (k, v) in index.items() if k[0] != e['log'] }
+                else:
+                    index[(e['log'], e['title'])] = e
+            self._index[run] = index
+        return self._index[run]
+
+    def titles(self, log=None, run=None):
+        """Return the (log, title) pairs of run, restricted to log if it is given."""
+        if run in (None, self.run) and self.run not in self._index:
+            return []
+        return [ k for k in self.index(run).keys() if log is None or k[0] == log ]
+
+    def get(self, log, title, run=None):
+        """Return the stored value of item title in log.  Raises KeyError if there is no such item."""
+        run = run or self.run
+        if run == self.run and (log, title) in self.buffer:
+            value = self.buffer[(log, title)]
+            return None if value is None else value.copy()
+        entry = self.index(run)[(log, title)]
+        if entry['offset'] is None:
+            return None
+        if run not in self._maps:
+            self._maps[run] = pa.memory_map(str(self.directory/f"{run}.arrow"))
+        source = self._maps[run]
+        source.seek(entry['offset'])
+        message = pa.ipc.read_message(source)
+        while message.type != 'record batch':
+            message = pa.ipc.read_message(source)
+        return _from_batch(pa.ipc.read_record_batch(message, _schema), entry)
+
+    def diff(self, run_a, run_b, log=None, atol=1e-6):
+        """Compare the items of two runs.  Returns a DataFrame indexed by (log, title) with columns
+        'in_a', 'in_b', 'same_shape' and 'max_abs_diff' (NaN if the items can not be compared),
+        and 'changed', which is True if the items differ by more than atol or are missing from one run."""
+        keys_a = self.titles(log, run_a)
+        keys_b = self.titles(log, run_b)
+        keys = keys_a + [k for k in keys_b if k not in keys_a]
+        rows = []
+        for k in keys:
+            row = {'in_a': k in keys_a, 'in_b': k in keys_b, 'same_shape': False, 'max_abs_diff': np.nan}
+            if row['in_a'] and row['in_b']:
+                a = self.get(*k, run=run_a)
+                b = self.get(*k, run=run_b)
+                if a is None or b is None:
+                    row['same_shape'] = a is None and b is None
+                    row['max_abs_diff'] = 0.0 if row['same_shape'] else np.nan
+                elif a.shape == b.shape:
+                    row['same_shape'] = True
+                    delta = np.abs(_numeric(a) - _numeric(b))
+                    both_nan = np.isnan(_numeric(a)) & np.isnan(_numeric(b))
+                    row['max_abs_diff'] = float(np.nanmax(np.where(both_nan, 0.0, delta))) if delta.size else 0.0
+            rows.append(row)
+        result = pd.DataFrame(rows, index=pd.MultiIndex.from_tuples(keys, names=['log', 'title']),
+                              columns=['in_a', 'in_b', 'same_shape', 'max_abs_diff'])
+        result['changed'] = ~(result['max_abs_diff'] <= atol)
+        return result
+
+
+def _numeric(value):
+    return pd.DataFrame(value).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _label(label):
+    """Return label as a json value, or raise TypeError if it can not be stored."""
+    if isinstance(label, tuple):
+        return [_label(v) for v in label]
+    if isinstance(label, np.generic):
+        label = label.item()
+    if label is None or isinstance(label, (str, int, float, bool)):
+        return label
+    raise TypeError(f"Audit store can not store label {label!r} of type {type(label).__name__}")
+
+
+def _axis(index):
+    """Return the names and dtypes of the levels of index, or raise TypeError if it can not be stored."""
+    dtypes = [level.dtype for level in index.levels] if isinstance(index, pd.MultiIndex) else [index.dtype]
+    for dtype in dtypes:
+        if not (pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype) or
+                pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)) or \
+                isinstance(dtype, pd.CategoricalDtype):
+            raise TypeError(f"Audit store can not store labels of dtype {dtype}")
+    return {'names': list(index.names), 'dtypes': [str(d) for d in dtypes]}
+
+
+def _from_labels(labels, axis):
+    """Return the Index (or MultiIndex) of labels (json values), with the names and dtypes of axis."""
+    if len(axis['dtypes']) == 1:
+        return pd.Index(labels, dtype=axis['dtypes'][0], name=axis['names'][0], tupleize_cols=False)
+    levels = list(zip(*labels)) if len(labels) else [[]] * len(axis['dtypes'])
+    return pd.MultiIndex.from_arrays([ pd.Index(list(level), dtype=dtype)
+                                       for (level, dtype) in zip(levels, axis['dtypes']) ], names=axis['names'])
+
+
+def _name(label):
+    return tuple(_name(v) for v in label) if isinstance(label, list) else label
+
+
+def _to_batch(frame):
+    nrows, ncols = frame.shape
+    values = frame.to_numpy()
+    rows = np.repeat(np.array([json.dumps(_label(r)) for r in frame.index], dtype=object), ncols)
+    columns = np.tile(np.array([json.dumps(_label(c)) for c in frame.columns], dtype=object), nrows)
+    flat = values.reshape(-1)
+    numeric = pd.to_numeric(pd.Series(flat, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    is_text = np.array([not (isinstance(v, (int, float, np.number)) or v is None) for v in flat], dtype=bool)
+    text = np.where(is_text, flat.astype(str), None)
+    return pa.record_batch([pa.array(rows, pa.string()), pa.array(columns, pa.string()),
+                            pa.array(np.where(is_text, np.nan, numeric), pa.float64()),
+                            pa.array(text, pa.string())], schema=_schema)
+
+
+def _from_batch(batch, entry):
+    nrows, ncols = entry['rows'], len(entry['columns']['labels'])
+    values = batch.column('value').to_numpy(zero_copy_only=False)
+    if batch.column('text').null_count < len(batch):
+        text = np.array(batch.column('text').to_pylist(), dtype=object)
+        values = np.where(pd.isna(text), values.astype(object), text)
+    rows = batch.column('row').to_pylist()[::ncols] if ncols else []
+    index = _from_labels([_name(json.loads(r)) for r in rows], entry['index'])
+    columns = _from_labels([_name(c) for c in entry['columns']['labels']], entry['columns'])
+    frame = pd.DataFrame(values.reshape(nrows, ncols), index=index, columns=columns)
+    if entry['kind'] == 'series':
+        return frame.iloc[:, 0].rename(_name(entry['name']))
+    return frame
@@ -1,25 +1,28 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import pandas as pd
 from model import integration
-from integration_base import *
+from .integration_base import *
 
 THISDIR = Path(__file__).parent
 DATADIR = THISDIR/"data"/"building"
 
+def _read_tam(filename):
+    return pd.read_csv(DATADIR/filename, index_col="year", squeeze=False)
+
 @dataclass
 class building_integration_state:
     # This data class holds global variables that are shared between steps.  Embedding it in a class
     # enables us to avoid having to declare 'global' anytime we want to change something.
 
-    cooking_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"cooking_global_tam.csv", index_col="year", squeeze=False)
-    floor_area_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"floor_area_global_tam.csv", index_col="year", squeeze=False)
-    households_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"households_global_tam.csv", index_col="year", squeeze=False)
-    lighting_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"lighting_global_tam.csv", index_col="year", squeeze=False)
-    roof_area_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"roof_area_global_tam.csv", index_col="year", squeeze=False)
-    space_cooling_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"space_cooling_global_tam.csv", index_col="year", squeeze=False)
-    space_heating_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"space_heating_global_tam.csv", index_col="year", squeeze=False)
-    water_heating_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"water_heating_global_tam.csv", index_col="year", squeeze=False)
+    cooking_global_tam : pd.DataFrame = field(default_factory=lambda: _read_tam("cooking_global_tam.csv"))
+    floor_area_global_tam : pd.DataFrame = field(default_factory=lambda: _read_tam("floor_area_global_tam.csv"))
+    households_global_tam : pd.DataFrame = field(default_factory=lambda: _read_tam("households_global_tam.csv"))
+    lighting_global_tam : pd.DataFrame = field(default_factory=lambda: _read_tam("lighting_global_tam.csv"))
+    roof_area_global_tam : pd.DataFrame = field(default_factory=lambda: _read_tam("roof_area_global_tam.csv"))
+    space_cooling_global_tam : pd.DataFrame = field(default_factory=lambda: _read_tam("space_cooling_global_tam.csv"))
+    space_heating_global_tam : pd.DataFrame = field(default_factory=lambda: _read_tam("space_heating_global_tam.csv"))
+    water_heating_global_tam : pd.DataFrame = field(default_factory=lambda: _read_tam("water_heating_global_tam.csv"))
 
 data_state = building_integration_state()
 
@@ -27,6 +30,14 @@ def integrate():
     """Perform all steps of the integration together."""
     pass
 
+def pipeline():
+    """Return the integration as a Pipeline, which skips steps that are unchanged since the last run."""
+    steps = [insulation_integration, roofs_integration, high_performance_glass_integration, led_integration,
+             dynamic_glass_integration, building_automation_integration, smart_thermostat_integration,
+             heat_pumps_integration, district_heating_integration, cooking_biogas_integration,
+             clean_stoves_integration, low_flow_fixtures_integration, solar_hw_integration]
+    return Pipeline("building", data_state, [ Step(step, depends=[DATADIR]) for step in steps ])
+
 def insulation_integration():
     """Step 1 in integration chain. Calculate the total energy saved and split
     saved energy into cooling and heating usage. Result does not affect other
@@ -1,4 +1,5 @@
 import pandas as pd
+from dataclasses import dataclass
 from pathlib import Path
 from model import vma
 from solution.factory import solution_path
@@ -17,6 +18,15 @@ audit = start_audit("elc")
 # It is never read or modified by this code.  Enables debugging and analysis by users.
 
 
+@dataclass
+class elc_integration_state:
+    # This data class holds global variables that are shared between steps.
+
+    emissions_factors : dict = None
+    adoptions : dict = None
+
+es = elc_integration_state()
+
 # The energy solutions.  If any new energy solutions are added, be sure to add them to the list below.
 
 conventional_plus_hydro = ["coal", "natural gas", "large hydro", "oil products"]
@@ -55,8 +65,26 @@ def get_emissions_factors():
 
 
 def gather_adoptions():
-    """Gather adoptions for all sources, including conventional sources"""
+    """Return the adoptions of the energy solutions (not of the conventional sources), as a dictionary by solution"""
+    return load_solutions_adoptions(energy_solutions)
 
-    adoptions = {
 
-    }
+# ########################################################################################################################
+#                                              CALCULATION
+
+def pipeline():
+    """Return the integration as a Pipeline, which skips steps that are unchanged since the last run."""
+    return Pipeline("elc", es, [
+        Step(elc_step1, outputs=["emissions_factors"],
+             depends=[DATADIR] + [solution_dependency(soln) for soln in energy_solutions]),
+        Step(elc_step2, outputs=["adoptions"],
+             depends=[solution_dependency(soln) for soln in energy_solutions])
+    ])
+
+def elc_step1():
+    """Step one collects the emissions factors of all energy sources"""
+    es.emissions_factors = get_emissions_factors()
+
+def elc_step2():
+    """Step two collects the adoptions of the energy solutions"""
+    es.adoptions = gather_adoptions()
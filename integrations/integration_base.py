@@ -1,9 +1,20 @@
 """Code shared by all integrations."""
 
 import os
+import copy
+import hashlib
+import inspect
+import multiprocessing
+import pickle
+import sys
+import typing
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from model import integration
 from solution import factory
+from integrations.audit_store import AuditStore
 from pathlib import Path
 
 # #######################################################################################################
@@ -18,14 +29,25 @@ testmode = False
 """If True, integration will try to load data from testmode snapshots first, and only use live data 
 if testmode snapshots are unavailable. This mode is intended for testing against original Excel."""
 
-def integration_start(settestmode=False):
+def integration_start(settestmode=False, in_memory=False):
+    """Start an integration.  If in_memory is True, updated scenarios and data are kept in memory
+    instead of being written to disk, so that all the steps of an integration may be run in one process.
+    Use integration_save() to write them to disk when done."""
     os.environ["DDINTEGRATE"] = integration_suffix
     global testmode
     testmode = settestmode
+    if in_memory:
+        integration.overlay_start()
+
+def integration_save():
+    """Write the results of an in-memory integration to disk, as integration versions of the files."""
+    integration.overlay_flush()
 
 def integration_clean():
+    # discard any in-memory integration results, and
     # remove any integration files in solution/, data/ and this directories
     # we have our own version of this code so it can operate even if there's no current integration...
+    integration.overlay_stop()
     root = Path(__file__).parents[1]
     for f in (root/'solution').glob(f'**/*_{integration_suffix}.*'):
         f.unlink()
@@ -56,18 +78,44 @@ scenario_names = { s : standard_scenarios.copy() for s in factory.all_solutions(
 testdir = Path(__file__).parent/"testmodedata"
 rootdir = Path(__file__).parents[1]
 
+def _load_adoption_and_tam(solution_name, scenario_name):
+    """Return the World pds adoption and pds tam (None for solutions without a tam) of one scenario."""
+    sc = factory.load_scenario(solution_name, scenario_name, adoption_only=True)
+    tm = getattr(sc, 'tm', None)
+    return (sc.ht.soln_pds_funits_adopted()['World'], tm.pds_tam_per_region()['World'] if tm else None)
+
+def load_scenario_data(pairs, max_workers=None) -> dict :
+    """Load the World pds adoption and tam for a list of (solution_name, scenario_name) pairs.
+    Scenarios are only constructed as far as their adoptions, and are loaded concurrently in a process pool.
+    Returns a dictionary of (solution_name, scenario_name) -> (adoption, tam)."""
+    pairs = list(dict.fromkeys(pairs))
+    # Worker processes only see an in-memory integration if they are forked from this one.
+    serial = integration.overlay_active() and multiprocessing.get_start_method() != 'fork'
+    if serial or len(pairs) <= 1 or max_workers == 1:
+        return { pair : _load_adoption_and_tam(*pair) for pair in pairs }
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = { pair : executor.submit(_load_adoption_and_tam, *pair) for pair in pairs }
+        return { pair : f.result() for (pair, f) in futures.items() }
+
+def load_solutions_adoptions(solution_names) -> dict :
+    """Return the adoptions of several solutions, loaded concurrently.
+    Returns a dictionary of solution_name -> Year x (PDS1,PDS2,PDS3) dataframe."""
+    result = {}
+    if testmode: # look for saved snapshots
+        for solution_name in solution_names:
+            filename = testdir/f"{integration_name}_{solution_name}_adoption.csv"
+            if filename.is_file():
+                result[solution_name] = pd.read_csv(filename, index_col="Year")
+    pending = [ soln for soln in solution_names if soln not in result ]
+    data = load_scenario_data([ (soln, scen) for soln in pending for scen in scenario_names[soln][:3] ])
+    for soln in pending:
+        result[soln] = pd.DataFrame({ pds : data[(soln, scen)][0] for (pds, scen) in zip(standard_scenarios, scenario_names[soln]) })
+    return result
+
 def load_solution_adoptions(solution_name) -> pd.DataFrame :
     """Return the adoption of solution in three scenarios, labeled PDS1, PDS2 and PDS3.
     Returns Year x (PDS1,PDS2,PDS3) dataframe."""
-    if testmode: # look for a saved snapshot
-        filename = testdir/f"{integration_name}_{solution_name}_adoption.csv"
-        if filename.is_file():
-            return pd.read_csv(filename, index_col="Year")
-    # else
-    pds1 = factory.load_scenario(solution_name, scenario_names[solution_name][0]).ht.soln_pds_funits_adopted()['World']
-    pds2 = factory.load_scenario(solution_name, scenario_names[solution_name][1]).ht.soln_pds_funits_adopted()['World']
-    pds3 = factory.load_scenario(solution_name, scenario_names[solution_name][2]).ht.soln_pds_funits_adopted()['World']
-    return pd.DataFrame({"PDS1": pds1, "PDS2": pds2, "PDS3": pds3})
+    return load_solutions_adoptions([solution_name])[solution_name]
 
 
 def load_solution_tam(solution_name) -> pd.Series:
@@ -77,7 +125,7 @@ def load_solution_tam(solution_name) -> pd.Series:
         if filename.is_file():
             return pd.read_csv(filename, index_col="Year")['World']
     # else
-    return factory.load_scenario(solution_name, scenario_names[solution_name][0]).tm.pds_tam_per_region()['World']
+    return _load_adoption_and_tam(solution_name, scenario_names[solution_name][0])[1]
 
 
 def load_solution_file(solution_name, file_relative_name):
@@ -106,14 +154,43 @@ def load_testmode_snapshot(snapshot_name):
 integration_name = None
 auditlog = {}
 
+audit_store = None
+"""If set (see use_audit_store), audit logs are streamed to this AuditStore instead of kept in auditlog."""
+
+def use_audit_store(directory, buffer_size=16, run=None):
+    """Stream audit logs to files in directory, keeping only the buffer_size most recent items in memory.
+    If directory is None, go back to keeping audit logs in memory.  Returns the AuditStore, which can
+    also be used to retrieve items of earlier runs, and compare runs with AuditStore.diff()"""
+    global audit_store
+    if audit_store is not None:
+        audit_store.close()
+    audit_store = AuditStore(directory, run=run, buffer_size=buffer_size) if directory else None
+    return audit_store
+
 def start_audit(name):
     global integration_name
     integration_name = name
     auditlog[name] = {}
+    if audit_store is not None:
+        audit_store.reset(name)
     def audit(result_name, result):
-        auditlog[name][result_name] = result.copy()
+        if audit_store is not None:
+            audit_store.append(name, result_name, result)
+        else:
+            auditlog[name][result_name] = result.copy()
     return audit
 
+def _audit_items(lname=None):
+    """Yield (logname, title, value) for the items in the audit log, loading values lazily from the audit store."""
+    if audit_store is not None:
+        for (logname, title) in audit_store.titles(lname):
+            yield (logname, title, lambda k=(logname, title): audit_store.get(*k))
+    else:
+        for logname in auditlog.keys():
+            if lname is None or lname == logname:
+                for (title, value) in auditlog[logname].items():
+                    yield (logname, title, lambda v=value: v)
+
 def _shortform(item):
     vals = item.iloc[0] if isinstance(item, pd.DataFrame) else item
     sz = min(len(vals),5)
@@ -121,25 +198,148 @@ def _shortform(item):
 
 
 def show_log(name=None):
-    for logname in auditlog.keys():
-        if name is None or name == logname:
+    current = None
+    for (logname, title, value) in _audit_items(name):
+        if logname != current:
+            current = logname
             print("-----------------------")
             print(logname)
-            for (title, value) in auditlog[logname].items():
-                if value is None:
-                    print(f"{title:>30}: empty")
-                else:
-                    print(f"{title:>30}: {_shortform(value)}")
+        value = value()
+        if value is None:
+            print(f"{title:>30}: empty")
+        else:
+            print(f"{title:>30}: {_shortform(value)}")
 
 def get_logitem(itemname, lname=None):
-    for logname in auditlog.keys():
-        if lname is None or lname == logname:
-            for (title, value) in auditlog[logname].items():
-                if title.startswith(itemname):
-                    return value
+    for (_, title, value) in _audit_items(lname):
+        if title.startswith(itemname):
+            return value()
     return None
 
 
+# #######################################################################################################
+#
+# Pipelines
+#
+# A pipeline runs the steps of an integration in order.  Each step declares the state fields it reads
+# (inputs) and sets (outputs), as well as any other data it depends on.  The outputs of each step are
+# saved under a hash of the step code, its inputs and its dependencies, so when a pipeline is re-run,
+# steps whose hash is unchanged are skipped and their saved outputs are used instead.  The step code
+# is the source of the step's whole module and of this one (so that changes to the helpers the step
+# calls, and to module constants, are seen), and code_version.  Changes to the model itself (model/)
+# are not detected: run the pipeline with force=True (--force) after them, or increase code_version.
+
+pipeline_cachedir = Path(__file__).parent/".pipeline_cache"
+"""Where pipelines save the outputs of their steps."""
+
+code_version = 1
+"""Part of the key of every step: increase it to discard all the saved outputs of the pipelines."""
+
+@dataclass
+class Step:
+    func: typing.Callable
+    """The step function.  It is called with no arguments, and works on the pipeline state."""
+    inputs: list = field(default_factory=list)
+    """Names of the state fields the step reads."""
+    outputs: list = field(default_factory=list)
+    """Names of the state fields the step sets."""
+    depends: list = field(default_factory=list)
+    """Other things the step depends on: files or directories, values, or functions returning either."""
+    cache: bool = True
+    """If False, the step is always run (for steps with side effects, such as updating scenarios)."""
+
+    @property
+    def name(self):
+        return self.func.__name__
+
+
+def _content_hash(item, h):
+    """Update hashlib object h with the content of item"""
+    if callable(item) and not isinstance(item, type):
+        item = item()
+    if isinstance(item, (list, tuple)):
+        for x in item:
+            _content_hash(x, h)
+    elif isinstance(item, Path):
+        if item.is_dir():
+            for f in sorted(item.rglob('*')):
+                if f.is_file() and '__pycache__' not in f.parts:
+                    st = f.stat()
+                    h.update(f"{f.relative_to(item)}:{st.st_size}:{st.st_mtime_ns}".encode('utf-8'))
+        elif item.is_file():
+            h.update(item.read_bytes())
+        else:
+            h.update(str(item).encode('utf-8'))
+    elif isinstance(item, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(item, index=True).to_numpy().tobytes())
+        h.update(repr(list(item.columns) if isinstance(item, pd.DataFrame) else item.name).encode('utf-8'))
+    else:
+        h.update(pickle.dumps(item))
+
+
+class Pipeline:
+    """The steps of one integration, run over a shared state object (such as waste_integration_state)."""
+
+    def __init__(self, name, state, steps, cachedir=None):
+        self.name = name
+        self.state = state
+        self.steps = steps
+        self.cachedir = Path(cachedir or pipeline_cachedir)/name
+
+    def step_key(self, step, values):
+        """Return the content hash for step, given the current values of the state fields."""
+        h = hashlib.sha256()
+        h.update(str(code_version).encode('utf-8'))
+        h.update(inspect.getsource(step.func).encode('utf-8'))
+        for module in (inspect.getmodule(step.func), sys.modules[__name__]):
+            if module is not None:
+                h.update(inspect.getsource(module).encode('utf-8'))
+        for i in step.inputs:
+            h.update(i.encode('utf-8'))
+            _content_hash(values.get(i), h)
+        _content_hash(step.depends, h)
+        return h.hexdigest()[:20]
+
+    def run(self, force=False):
+        """Run all the steps, skipping any whose saved outputs are still valid (unless force is True).
+        Returns a dictionary of all the step outputs, which are also set on the state."""
+        self.cachedir.mkdir(parents=True, exist_ok=True)
+        values = {}
+        for step in self.steps:
+            key = self.step_key(step, values)
+            cachefile = self.cachedir/f"{step.name}-{key}.pkl"
+            if step.cache and not force and cachefile.is_file():
+                outputs = pickle.loads(cachefile.read_bytes())
+                print(f"{self.name}: {step.name} unchanged, skipped")
+            else:
+                for i in step.inputs:
+                    # steps may modify their inputs in place, so give them copies
+                    setattr(self.state, i, copy.deepcopy(values.get(i)))
+                step.func()
+                outputs = { o : getattr(self.state, o) for o in step.outputs }
+                if step.cache:
+                    for old in self.cachedir.glob(f"{step.name}-*.pkl"):
+                        old.unlink()
+                    cachefile.write_bytes(pickle.dumps(outputs))
+            for (o, value) in outputs.items():
+                setattr(self.state, o, value)
+            values.update(outputs)
+        return values
+
+    def clean(self):
+        """Remove the saved outputs of this pipeline."""
+        for f in self.cachedir.glob("*.pkl"):
+            f.unlink()
+
+
+def solution_dependency(solution_name):
+    """Return a Step dependency that changes when the solution code or data changes (including in-memory
+    integration updates), or when different scenarios or testmode are chosen for it."""
+    soln_dir = rootdir/"solution"/solution_name
+    return lambda: (testmode, scenario_names.get(solution_name), soln_dir,
+                    sorted(integration.overlay_contents(soln_dir).items()))
+
+
 # #######################################################################################################
 #
 # Utilities
@@ -1 +1,71 @@
-"""Run any or all integrations, from end to end."""
+"""Run any or all integrations, from end to end.
+
+Each integration is run as a Pipeline (see integration_base), so steps whose code, inputs and
+data are unchanged since the last run are skipped.  Changes to the model code (model/) are not
+detected: use --force after them.  Independent integrations run concurrently,
+each in its own process.
+
+The integrations are run as integration_base.integration_suffix (see integration_base.integration_start):
+the scenarios and data files they update are written as the integration versions of the files (named
+with the suffix), never over the originals, or kept in memory and discarded with --in-memory.  Use
+integration_base.integration_clean() to remove the integration versions.
+
+From the command line:
+    python -m integrations.integration_master [--force] [--in-memory] [waste building elc land]
+"""
+
+import argparse
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from integrations import integration_base
+from model import integration
+
+integrations = {
+    'waste': 'integrations.waste_integration',
+    'building': 'integrations.building_integration',
+    'elc': 'integrations.elc_integration',
+    'land': 'integrations.aez_land_integration',
+}
+"""The integrations known to the master, mapped to the module implementing them.
+Each module provides a pipeline() function returning its Pipeline."""
+
+
+def pipeline(name):
+    """Return the Pipeline for the named integration."""
+    return importlib.import_module(integrations[name]).pipeline()
+
+
+def run(name, force=False, in_memory=False):
+    """Run the named integration, and return the outputs of all its steps.  The integration is
+    started for the run (with its files kept in memory, and discarded, if in_memory), and the
+    process is returned to its previous integration afterwards."""
+    previous = os.environ.get("DDINTEGRATE")
+    integration_base.integration_start(in_memory=in_memory)
+    try:
+        return pipeline(name).run(force=force)
+    finally:
+        if in_memory:
+            integration.overlay_stop()
+        if previous is None:
+            os.environ.pop("DDINTEGRATE", None)
+        else:
+            os.environ["DDINTEGRATE"] = previous
+
+
+def run_all(names=None, force=False, in_memory=False, max_workers=None):
+    """Run the named integrations (default: all of them) concurrently, each in a separate process.
+    Returns a dictionary of integration name to the outputs of that integration."""
+    names = names or list(integrations.keys())
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = { name : executor.submit(run, name, force, in_memory) for name in names }
+        return { name : f.result() for (name, f) in futures.items() }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run integrations, skipping unchanged steps.")
+    parser.add_argument('names', nargs='*', help=f"integrations to run, from {list(integrations.keys())} (default: all)")
+    parser.add_argument('--force', action='store_true', help="run all steps, even if unchanged (needed after changes to model/)")
+    parser.add_argument('--in-memory', action='store_true', help="keep the updated files in memory, and discard them")
+    args = parser.parse_args()
+    run_all(args.names, force=args.force, in_memory=args.in_memory)
@@ -3,6 +3,7 @@ from pathlib import Path
 import pandas as pd
 import numpy as np
 from integrations import integration_base
+from solution import factory
 
 @pytest.fixture
 def with_testmode():
@@ -27,6 +28,47 @@ def test_audit():
     fn = integration_base.start_audit("testaudit")
     assert integration_base.get_logitem("my stuff") is None, "log starts empty"
 
+def test_audit_store(tmp_path):
+    store = integration_base.use_audit_store(tmp_path, buffer_size=1, run="run1")
+    try:
+        fn = integration_base.start_audit("testaudit")
+        frame = pd.DataFrame({'World': [1.0, 2.0], 'OECD90': [3.0, np.nan]}, index=pd.Index([2014, 2015], name='Year'))
+        fn("frame", frame)
+        fn("series", frame['World'])
+        assert list(store.buffer.keys()) == [("testaudit", "series")], "only the latest item is kept in memory"
+        pd.testing.assert_frame_equal(integration_base.get_logitem("frame"), frame)
+        pd.testing.assert_series_equal(integration_base.get_logitem("series", "testaudit"), frame['World'])
+        assert integration_base.auditlog["testaudit"] == {}, "nothing is kept in the in-memory log"
+
+        store = integration_base.use_audit_store(tmp_path, run="run2")
+        fn = integration_base.start_audit("testaudit")
+        assert integration_base.get_logitem("frame") is None, "log starts empty"
+        fn("frame", frame * 2)
+        diff = store.diff("run1", "run2")
+        assert diff.loc[("testaudit", "frame"), "max_abs_diff"] == pytest.approx(3.0)
+        assert diff.loc[("testaudit", "series"), "changed"]
+        assert store.runs() == ["run1", "run2"]
+    finally:
+        integration_base.use_audit_store(None)
+
+
+def test_audit_store_labels(tmp_path):
+    store = integration_base.use_audit_store(tmp_path, buffer_size=0)
+    try:
+        fn = integration_base.start_audit("testaudit")
+        columns = pd.MultiIndex.from_tuples([("World", 1), ("World", 2), ("EU", 1)], names=["region", "n"])
+        frame = pd.DataFrame(np.arange(6.0).reshape(2, 3), index=pd.Index([2014.0, 2014.5], name="Year"),
+                             columns=columns)
+        fn("frame", frame)
+        fn("series", pd.Series(["a", "b"], index=pd.Index([1, 2], dtype=object), name=("World", 1)))
+        pd.testing.assert_frame_equal(integration_base.get_logitem("frame"), frame)
+        pd.testing.assert_series_equal(integration_base.get_logitem("series"),
+                                       pd.Series(["a", "b"], index=pd.Index([1, 2], dtype=object), name=("World", 1)))
+        with pytest.raises(TypeError):
+            fn("dates", pd.Series([1.0], index=pd.DatetimeIndex(["2020-01-01"])))
+    finally:
+        integration_base.use_audit_store(None)
+
 
 def test_load_adoption_live():
     a = integration_base.load_solution_adoptions("afforestation")
@@ -108,4 +150,79 @@ def test_demand_adjustment_with_negatives():
     assert (result==expected).all(axis=None), "expected {expected}, got {result}"
 
   
-    
\ No newline at end of file
+    
+
+class _State:
+    def __init__(self):
+        self.a = None
+        self.b = None
+        self.calls = []
+
+_state = _State()
+_offset = {'value': 1}
+
+def _step_a():
+    _state.calls.append('a')
+    _state.a = pd.Series([1.0, 2.0, 3.0])
+
+def _step_b():
+    _state.calls.append('b')
+    _state.a += 100   # modifies its input in place
+    _state.b = _state.a * 2 + _offset['value']
+
+def _pipeline(tmp_path):
+    return integration_base.Pipeline("test", _state, [
+        integration_base.Step(_step_a, outputs=['a']),
+        integration_base.Step(_step_b, inputs=['a'], outputs=['a', 'b'], depends=[lambda: _offset['value']])
+    ], cachedir=tmp_path)
+
+def test_pipeline_skips_unchanged_steps(tmp_path):
+    _state.calls = []
+    _offset['value'] = 1
+    result = _pipeline(tmp_path).run()
+    assert _state.calls == ['a', 'b']
+    assert list(result['b']) == [203.0, 205.0, 207.0]
+
+    _state.b = None
+    result = _pipeline(tmp_path).run()
+    assert _state.calls == ['a', 'b'], "no steps re-run"
+    assert list(_state.b) == [203.0, 205.0, 207.0], "state restored from saved outputs"
+
+    _offset['value'] = 2
+    result = _pipeline(tmp_path).run()
+    assert _state.calls == ['a', 'b', 'b'], "only the step whose dependency changed is re-run"
+    assert list(result['b']) == [204.0, 206.0, 208.0]
+
+    _pipeline(tmp_path).run(force=True)
+    assert _state.calls == ['a', 'b', 'b', 'a', 'b']
+
+
+def test_load_solutions_adoptions():
+    result = integration_base.load_solutions_adoptions(["afforestation", "composting"])
+    for soln in ["afforestation", "composting"]:
+        full = factory.load_scenario(soln, "PDS2").ht.soln_pds_funits_adopted()['World']
+        pd.testing.assert_series_equal(result[soln]["PDS2"], full, check_names=False)
+
+def test_load_solution_tam():
+    tam = integration_base.load_solution_tam("composting")
+    expected = factory.load_scenario("composting", "PDS1").tm.pds_tam_per_region()['World']
+    pd.testing.assert_series_equal(tam, expected)
+    assert integration_base._load_adoption_and_tam("afforestation", "PDS1")[1] is None
+
+def test_step_key_code(tmp_path, monkeypatch):
+    import importlib
+    import sys
+    module = tmp_path / "pipeline_steps_example.py"
+    monkeypatch.syspath_prepend(str(tmp_path))
+    def key(helper):
+        module.write_text(f"def helper():\n    return {helper}\n\ndef step():\n    return helper()\n")
+        sys.modules.pop("pipeline_steps_example", None)
+        importlib.invalidate_caches()
+        m = importlib.import_module("pipeline_steps_example")
+        step = integration_base.Step(m.step)
+        return integration_base.Pipeline("test", _state, [step], cachedir=tmp_path).step_key(step, {})
+    first = key(1)
+    assert key(1) == first
+    assert key(2) != first, "a change to a helper of the step changes its key"
+    monkeypatch.setattr(integration_base, 'code_version', integration_base.code_version + 1)
+    assert key(1) != first
@@ -0,0 +1,32 @@
+import os
+from pathlib import Path
+from integrations import integration_base
+from integrations import integration_master
+from model import integration
+
+root = Path(__file__).parents[2]
+
+
+def _files():
+    """The size and modification time of every file an integration may write."""
+    return { p : (p.stat().st_size, p.stat().st_mtime_ns)
+             for d in ('solution', 'data', 'integrations') for p in (root / d).rglob('*')
+             if p.is_file() and '__pycache__' not in p.parts }
+
+
+def test_run_in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(integration_base, 'pipeline_cachedir', tmp_path)
+    monkeypatch.delenv('DDINTEGRATE', raising=False)
+    written = []
+    overlay_stop = integration.overlay_stop
+    def stop(flush=False):
+        written.extend(integration.overlay_contents(root / 'solution' / 'composting'))
+        overlay_stop(flush)
+    monkeypatch.setattr(integration, 'overlay_stop', stop)
+    before = _files()
+    integration_master.run('waste', in_memory=True)
+    assert 'DDINTEGRATE' not in os.environ
+    assert not integration.overlay_active()
+    assert _files() == before, "nothing is written to the working tree"
+    assert written and all(Path(w).stem.endswith('_' + integration_base.integration_suffix) for w in written), \
+        "the updated scenarios are kept as integration versions of the files"
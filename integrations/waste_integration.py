@@ -70,6 +70,31 @@ def integrate():
     ws_step7()
 
 
+def pipeline():
+    """Return the integration as a Pipeline, which skips steps that are unchanged since the last run."""
+    return Pipeline("waste", ws, [
+        Step(ws_step1, outputs=["waste_tam", "organic_msw", "recyclable_msw", "remainder_msw"],
+             depends=[DATADIR]),
+        Step(ws_step2, inputs=["organic_msw", "recyclable_msw"], outputs=["organic_msw", "recyclable_msw"],
+             depends=[DATADIR, solution_dependency("bioplastic")]),
+        Step(ws_step3, inputs=["organic_msw", "recyclable_msw"],
+             outputs=["compost_adoption", "organic_msw", "recycling_adoption", "recyclable_msw"],
+             depends=[solution_dependency("composting"), solution_dependency("hcrecycling")]),
+        Step(ws_step4, inputs=["remainder_msw"], outputs=["paper_adoption", "paper_consumption", "remainder_msw"],
+             depends=[DATADIR, solution_dependency("recycledpaper")]),
+        Step(ws_step5, inputs=["organic_msw", "recyclable_msw", "remainder_msw"],
+             outputs=["total_waste_msw", "organic_proportion", "recyclable_proportion", "remainder_proportion",
+                      "effective_lhv", "waste_to_energy_adoption"],
+             depends=[solution_dependency("wastetoenergy")]),
+        Step(ws_step6, inputs=["total_waste_msw", "organic_proportion", "recyclable_proportion", "remainder_proportion"],
+             outputs=["landfill_methane_adoption", "effective_doc"],
+             depends=[solution_dependency("landfillmethane")]),
+        # step 7 updates the scenarios, so always run it.
+        Step(ws_step7, inputs=["compost_adoption", "recycling_adoption", "effective_lhv", "effective_doc"],
+             cache=False)
+    ])
+
+
 def ws_step1():
     """Step one of the integration divides the waste stream into organic, recyclable and remainder categories"""
     # Start with the global amount of waste
@@ -122,14 +147,15 @@ def ws_step3():
     """Step three adjusts the adoptions of composting and recycling to reflect availability of feedstock, 
     and subtracts those uses from their respective waste streams."""
 
-    ws.compost_adoption = load_solution_adoptions("composting")
+    adoptions = load_solutions_adoptions(["composting", "hcrecycling"])
+    ws.compost_adoption = adoptions["composting"]
     audit("base compost adoption", ws.compost_adoption)
     ws.compost_adoption = demand_adjustment("compost adoption", ws.compost_adoption, ws.organic_msw)
     audit("adjusted compost adoption", ws.compost_adoption) # Excel Compost!E
     ws.organic_msw -= ws.compost_adoption
     audit("organics msw less compost", ws.organic_msw) # Excel Table 22 column 2
 
-    ws.recycling_adoption = load_solution_adoptions("hcrecycling")
+    ws.recycling_adoption = adoptions["hcrecycling"]
     audit("base recycling adoption", ws.recycling_adoption)
     ws.recycling_adoption = demand_adjustment("recycling adjustment", ws.recycling_adoption, ws.recyclable_msw)
     audit("adjusted recycling adoption", ws.recycling_adoption) # Excel H&C Recycling!E
@@ -266,8 +292,8 @@ def ws_step7():
     # of the WTE model, but that sheet does not exist.  I haven't yet found where in the system it is used
     # but for now, I am saving them to a data file in the data directory as if we used them somewhere.
     lhvfile = integration.integration_alt_file(DATADIR/"waste_to_energy_lhv.csv")
-    ws.effective_lhv.to_csv(lhvfile)
+    integration.write_csv(ws.effective_lhv, lhvfile)
 
     print("updating landfill methane DOC values")
     docfile = integration.integration_alt_file(DATADIR/"waste_to_energy_doc.csv")
-    ws.effective_doc.to_csv(docfile)
\ No newline at end of file
+    integration.write_csv(ws.effective_doc, docfile)
\ No newline at end of file
@@ -1,11 +1,12 @@
 """Adoption Data module."""
 
-from functools import lru_cache
 import pathlib
 import re
 
 from model import interpolation
+from model import datafiles
 from model import dd
+from model.concurrency import shared_cache
 from model.metaclass_cache import MetaclassCache
 import numpy as np
 import pandas as pd
@@ -41,8 +42,16 @@ def make_adoption_config(adoption_config_array=None, overrides=None) -> pd.DataF
 class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
     """Implements Adoption Data module."""
 
+    @staticmethod
+    def cache_key_args(ac, *args, **kwargs):
+        """Instances depend only on the prognostication fields of ac (see MetaclassCache), so
+        scenarios which differ in other fields share them."""
+        if ac is not None:
+            ac = (ac.soln_pds_adoption_prognostication_source, ac.soln_pds_adoption_prognostication_growth)
+        return ((ac,) + args, kwargs)
+
     def __init__(self, ac, data_sources, adconfig, main_includes_regional=None,
-                 groups_include_hundred_percent=True):
+                 groups_include_hundred_percent=True, world_only=False):
         """Arguments:
              ac: advanced_controls.py
              data_sources: a dict() of group names which contain dicts of data source names.
@@ -61,12 +70,17 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
             Quirks parameters:
                 groups_include_hundred_percent.  Some models included the 100% / maximum case as
                 a group when computing S.D., others (Electricity Generation) do not.  Defaults to True
+
+             world_only: compute only the World column of adoption_data_per_region and
+               adoption_trend_per_region, leaving the other regions NaN.  Ignored if
+               main_includes_regional, as the World adoption then depends on the regional ones.
         """
         self.ac = ac
         self.data_sources = data_sources
         self.adconfig = adconfig
         self.main_includes_regional = main_includes_regional
         self.groups_include_hundred_percent = groups_include_hundred_percent
+        self.world_only = world_only
         self._populate_adoption_data()
 
 
@@ -93,7 +107,7 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
                 else:
                     sources = value
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
+                    df = datafiles.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
                             skip_blank_lines=True, comment='#')
                     for region in dd.REGIONS:
                         df_per_region[region].loc[:, name] = df.loc[:, region]
@@ -193,7 +207,7 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
         return self.data_sources.get(key, self.data_sources)
 
 
-    @lru_cache()
+    @shared_cache()
     def adoption_data(self, region):
         """Return adoption data for the given solution in the 'World' region.
            World: SolarPVUtil 'Adoption Data'!B45:R94
@@ -210,7 +224,7 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
         return self._adoption_data[region]
 
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def adoption_data_main_with_regional(self):
         """Return adoption data for the 'World' region with regional data added in.
@@ -229,7 +243,7 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
         return adoption
 
 
-    @lru_cache()
+    @shared_cache()
     def adoption_min_max_sd(self, region):
         """Return the min, max, and standard deviation for the adoption data in the 'World' region.
            World: SolarPVUtil 'Adoption Data'!X45:Z94
@@ -262,7 +276,7 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
         return result
 
 
-    @lru_cache()
+    @shared_cache()
     def adoption_low_med_high(self, region):
         """Return the selected data sources as Medium, and N stddev away as Low and High.
            World: SolarPVUtil 'Adoption Data'!AB45:AD94
@@ -296,7 +310,7 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
         return result
 
 
-    @lru_cache()
+    @shared_cache()
     def adoption_trend(self, region, trend=None):
         """Adoption prediction via one of several interpolation algorithms in the region.
 
@@ -348,19 +362,25 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
         result.name = 'adoption_trend_' + self._name_to_identifier(region) + '_' + str(trend).lower()
         return result
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def adoption_is_single_source(self):
         """Whether the source data selected is one source or multiple."""
         return not interpolation.is_group_name(data_sources=self.data_sources,
                                                name=self.ac.soln_pds_adoption_prognostication_source)
 
+    def _computed_regions(self):
+        """The regions computed in the per-region tables."""
+        if self.world_only and not self.main_includes_regional:
+            return dd.REGIONS[:1]
+        return dd.REGIONS
+
     def _set_adoption_one_region(self, result, region, adoption_trend, adoption_low_med_high):
         result[region] = adoption_trend.loc[:, 'adoption']
         first_year = result.index[0]
         result.loc[first_year, region] = adoption_low_med_high.loc[first_year, 'Medium']
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def adoption_data_per_region(self):
         """Return a dataframe of adoption data, one column per region."""
@@ -371,17 +391,25 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
             df = pd.DataFrame(np.nan, columns=dd.REGIONS, index=tmp.index)
         else:
             df = pd.DataFrame(columns=dd.REGIONS)
+            computed = self._computed_regions()
             for region in df.columns:
+                if region not in computed:
+                    df.loc[:, region] = np.nan
+                    continue
                 df.loc[:, region] = self.adoption_low_med_high(region)[growth]
         df.name = 'adoption_data_per_region'
         return df
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def adoption_trend_per_region(self):
         """Return a dataframe of adoption trends, one column per region."""
         df = pd.DataFrame(columns=dd.REGIONS)
+        computed = self._computed_regions()
         for region in df.columns:
+            if region not in computed:
+                df[region] = np.nan
+                continue
             adoption_trend = self.adoption_trend(region=region)
             adoption_low_med_high = self.adoption_low_med_high(region=region)
             self._set_adoption_one_region(result=df, region=region, adoption_trend=adoption_trend,
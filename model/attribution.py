@@ -0,0 +1,146 @@
+"""Attribution of the temperature reduction of a portfolio of solutions to its solutions and sectors.
+
+Each CO2Calcs runs FaIR on the Drawdown CO2-eq baseline less the reductions of its solution
+(FaIR_CFT_Drawdown_co2eq).  For a portfolio, the reduction in temperature of the baseline less the
+reductions of all its solutions is shared out between them (and between their sectors, the groups
+of solutions given by sectors) by one of the rules:
+    marginal: the reduction lost by leaving out the solution (or sector), all others included.
+    cumulative: the reduction gained by adding the solution to those before it, in order (by
+      default, of decreasing total reductions), as limbo/tools/play_whole_field.py does by sector.
+      The contributions add up to the total reduction.
+    shapley: the Shapley value, approximated by the mean of the reduction of the solution alone
+      and its marginal reduction.  That is exact when the interactions between the solutions are
+      pairwise, as they nearly are for reductions which are small relative to the baseline.
+
+    reductions = scenario_reductions({name: factory.load_scenario(name) for name in names})
+    sectors = {name: factory.load_scenario(name).ac.solution_category.name for name in names}
+    result = attribute(reductions, sectors=sectors, rule='shapley')
+    result.solutions.loc[2050]        # the temperature reduction due to each solution in 2050
+
+Each rule needs the temperature of a number of combinations of the solutions which grows with the
+number of solutions (and sectors), not with the number of their combinations: at most twice the
+number of solutions and sectors, plus two.  The emissions of all of them are run as one batch: in
+emulated FaIR mode (see model.fair_emulator), the responses of all the combinations are computed
+at once by Emulator.batch; in exact mode, FaIR is run for each, in a pool of max_workers processes
+if given.  The emulator is linear, so in emulated mode the three rules agree.  Its error bound is
+for the reductions of one solution; the reductions of a portfolio are larger, and so are its errors
+(2% of the total reduction, for six of the larger solutions).
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import model.co2calcs
+import model.fair_emulator
+import model.fairutil
+
+rules = ('marginal', 'cumulative', 'shapley')
+
+Attribution = namedtuple('Attribution', ['solutions', 'sectors', 'total'])
+Attribution.__doc__ = """The results of attribute(), each indexed by year (those of the baseline):
+     solutions: DataFrame of the reduction in temperature (K) due to each solution.
+     sectors: DataFrame of the reduction in temperature due to each sector (None if no sectors).
+     total: Series of the reduction in temperature due to all of the solutions."""
+
+
+def scenario_reductions(scenarios):
+    """Return the emissions reductions (GtC per year) of scenarios (a dict of name : Scenario), as a
+    DataFrame with a column per name, as FaIR_CFT_Drawdown_co2eq subtracts them from the baseline."""
+    columns = {}
+    for (name, s) in scenarios.items():
+        reduced = pd.Series(0.0, index=pd.Index([], dtype=int), dtype='float64')
+        for (table, column) in ((s.c2.co2eq_mmt_reduced(), 'World'), (s.c2.co2_sequestered_global(), 'All')):
+            if table is not None:
+                reduced = reduced.add(table[column] / 1000.0 / model.co2calcs.C_TO_CO2EQ, fill_value=0.0)
+        reduced.index = reduced.index.astype(int)
+        columns[name] = reduced
+    return pd.DataFrame(columns).fillna(0.0)
+
+
+def _exact_temperature(emissions):
+    (_, _, T) = model.co2calcs.fair_scm(emissions, False, **model.fairutil.fair_scm_kwargs())
+    return T
+
+
+def temperatures(emissions, max_workers=None):
+    """Return the temperature (T of FaIR_CFT_Drawdown_co2eq) for each of emissions (an array of
+    runs x years of the baseline, in GtC), as an array of runs x years, in the current FaIR mode."""
+    emissions = np.asarray(emissions, dtype=np.float64)
+    if model.fair_emulator.emulating():
+        (_, _, T) = model.fair_emulator.emulator('co2eq').batch(emissions)
+        return T
+    if max_workers is None or max_workers <= 1 or len(emissions) < 2:
+        return np.array([ _exact_temperature(e) for e in emissions ])
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return np.array(list(executor.map(_exact_temperature, emissions,
+                                          chunksize=-(-len(emissions) // max_workers))))
+
+
+def _players(reductions, names, order):
+    """Return names in order: those in order first, then the others by decreasing total reductions."""
+    totals = reductions.sum(axis=0)
+    first = [ n for n in (order or []) if n in names ]
+    rest = sorted((n for n in names if n not in first), key=lambda n: (-totals[n], n))
+    return first + rest
+
+
+def attribute(reductions, sectors=None, rule='marginal', order=None, max_workers=None):
+    """Return the Attribution of the temperature reduction of the solutions by rule.
+         reductions: DataFrame of the emissions reductions of each solution (see scenario_reductions).
+         sectors: dict of solution name : sector name (default: no attribution to sectors).
+         rule: one of rules.
+         order: for the cumulative rule, a list of solutions and sectors to take first, in order.
+         max_workers: for exact FaIR runs, the number of processes to run them in.
+    """
+    if rule not in rules:
+        raise ValueError(f"Unknown attribution rule {rule}, should be one of {rules}")
+    baseline = model.fairutil.baseline_emissions()
+    solutions = list(reductions.columns)
+    # a row of reductions per solution, in the years of the baseline
+    values = reductions.reindex(baseline.index, fill_value=0.0).fillna(0.0).to_numpy().T
+
+    groups = { s : [s] for s in solutions }
+    if sectors is not None:
+        missing = [ s for s in solutions if s not in sectors ]
+        if missing:
+            raise ValueError(f"No sector for solutions {missing}")
+        sector_names = list(dict.fromkeys(sectors[s] for s in solutions))
+        sector_groups = { sector : [ s for s in solutions if sectors[s] == sector ] for sector in sector_names }
+        sector_totals = pd.DataFrame({ k : reductions[v].sum(axis=1) for (k, v) in sector_groups.items() })
+        levels = [ (groups, reductions), (sector_groups, sector_totals) ]
+    else:
+        levels = [ (groups, reductions) ]
+
+    # the combinations needed, as the sets of solutions included, and for each player (solution or
+    # sector) the pairs of combinations (without, with) whose difference in temperature is averaged
+    combinations = {}
+    def combination(included):
+        return combinations.setdefault(frozenset(included), len(combinations))
+    everything = combination(solutions)
+    nothing = combination([])
+    plans = []
+    for (members, totals) in levels:
+        plan = {}
+        if rule == 'cumulative':
+            (included, previous) = ([], nothing)
+            for p in _players(totals, list(members), order):
+                included = included + members[p]
+                plan[p] = [(previous, combination(included))]
+                previous = plan[p][0][1]
+        else:
+            for p in members:
+                plan[p] = [(combination([ s for s in solutions if s not in members[p] ]), everything)]
+                if rule == 'shapley':
+                    plan[p].append((nothing, combination(members[p])))
+        plans.append(plan)
+
+    included = np.zeros((len(combinations), len(solutions)))
+    for (key, i) in combinations.items():
+        included[i, [ solutions.index(s) for s in key ]] = 1.0
+    T = temperatures(baseline.to_numpy()[np.newaxis, :] - included @ values, max_workers=max_workers)
+
+    tables = [ pd.DataFrame({ p : np.mean([ T[a] - T[b] for (a, b) in pairs ], axis=0)
+                              for (p, pairs) in plan.items() }, index=baseline.index) for plan in plans ]
+    total = pd.Series(T[nothing] - T[everything], index=baseline.index)
+    return Attribution(tables[0], tables[1] if sectors is not None else None, total)
@@ -0,0 +1,275 @@
+"""Batched evaluation of a number of scenarios of one solution.
+
+The scenarios of a solution usually share their TAM sources, adoption sources and VMAs, and differ
+in a handful of advanced controls.  A ScenarioBatch constructs them together, so that the shared
+inputs are read once (TAM forecast data is shared between the scenarios, and the adoption data,
+custom adoptions and AEZ objects are already shared by constructor arguments), and then works on
+their results with a leading scenario axis: any output can be stacked into an array of
+scenario x year x region, and the key results (including the operating cost breakouts they need) are
+computed for all the scenarios at once.
+
+    batch = ScenarioBatch('solarpvutil')
+    batch.key_results()                                  # a row of key results per scenario
+    batch.stack('ht.soln_pds_funits_adopted').values     # array of scenario x year x region
+
+The key results are computed by the functions below from Stacks of the scenarios' outputs.
+Scenario's key result methods call the same functions with a single scenario, so that each key
+result has one definition.
+"""
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from model import dd
+from model import operatingcost
+from model import tam
+from model.advanced_controls import AdvancedControls
+from solution import factory
+
+Stack = namedtuple('Stack', ['values', 'scenarios', 'years', 'regions'])
+Stack.__doc__ = """An output of each scenario of a batch: values is an array of scenario x year x
+region, with NaN where a scenario's output has no value.  A Series output has a single region,
+labelled with the name of the Series."""
+
+
+def stack_frames(frames, scenarios=None):
+    """Return frames (a DataFrame or Series per scenario) as a Stack, over the union of their years
+    and regions."""
+    frames = [ df.to_frame() if isinstance(df, pd.Series) else df for df in frames ]
+    years = frames[0].index
+    regions = frames[0].columns
+    for df in frames[1:]:
+        years = years.union(df.index) if not years.equals(df.index) else years
+        regions = regions.append(df.columns.difference(regions, sort=False))
+    values = np.stack([ df.reindex(index=years, columns=regions).to_numpy(dtype='float')
+                        for df in frames ])
+    return Stack(values, list(scenarios or range(len(frames))), years, regions)
+
+
+def _column(st, region):
+    return 0 if region is None else st.regions.get_loc(region)
+
+
+def value_at(st, years, region):
+    """The value of st at each scenario's year (years is one year per scenario) in region (None
+    for a Series)."""
+    rows = st.years.get_indexer(years)
+    if (rows < 0).any():
+        raise KeyError(f"Years {sorted(set(np.asarray(years)[rows < 0]))} not in the table")
+    return st.values[np.arange(len(st.values)), rows, _column(st, region)]
+
+
+def total(st, start, end, region):
+    """The sum of st over the years from start to end (one each per scenario) in region (None for a
+    Series), skipping missing values.  A start or end of None means from the first year, or to the
+    last."""
+    years = st.years.to_numpy()[None, :]
+    mask = np.ones(st.values.shape[:2], dtype=bool)
+    if start is not None:
+        mask &= years >= np.asarray(start)[:, None]
+    if end is not None:
+        mask &= years <= np.asarray(end)[:, None]
+    values = st.values[:, :, _column(st, region)]
+    return np.where(mask & ~np.isnan(values), values, 0.0).sum(axis=1)
+
+
+# #######################################################################################################
+#
+# Key results.  Each takes the scenarios' outputs (Stacks), and their advanced controls and the
+# years as arrays of one value per scenario.
+
+def has_lifetimes(soln_lifetime_replacement, conv_lifetime_replacement):
+    """Whether each scenario has costs: the key results have none without both lifetimes."""
+    return (np.asarray(soln_lifetime_replacement, dtype='float') != 0.0) & \
+           (np.asarray(conv_lifetime_replacement, dtype='float') != 0.0)
+
+
+def adoption_unit_increase(pds_funits, ref_funits, years, region):
+    return value_at(pds_funits, years, region) - value_at(ref_funits, years, region)
+
+
+def implementation_unit_adoption_increase(pds_funits, ref_funits, avg_annual_use, years, region):
+    use = np.asarray(avg_annual_use, dtype='float')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = (value_at(pds_funits, years, region) / use - value_at(ref_funits, years, region) / use)
+    return np.where(use == 0.0, 0.0, result)
+
+
+def marginal_first_cost(soln_pds_first_cost, soln_ref_first_cost, conv_ref_first_cost, end, lifetimes):
+    """From the annual world first costs (fc.*_annual_world_first_cost) up to end."""
+    result = (total(soln_pds_first_cost, None, end, None) - total(soln_ref_first_cost, None, end, None) -
+              total(conv_ref_first_cost, None, end, None)) / 1e9
+    return np.where(lifetimes, result, 0.0)
+
+
+def net_operating_savings(soln_breakouts, conv_breakouts, start, end, lifetimes):
+    """From the operating cost breakouts (arrays of scenario x year x year, see
+    operatingcost.annual_breakout_array) of soln_pds and conv_ref."""
+    core = np.arange(dd.CORE_START_YEAR, soln_breakouts.shape[1] + dd.CORE_START_YEAR) <= dd.CORE_END_YEAR
+    # as OperatingCost.soln_pds_cumulative_operating_cost and conv_ref_cumulative_operating_cost
+    soln = soln_breakouts.sum(axis=2).cumsum(axis=1)
+    conv = conv_breakouts[:, core, :].sum(axis=2).cumsum(axis=1)
+    def at(cumulative, years):
+        return cumulative[np.arange(len(cumulative)), np.asarray(years).astype(int) - dd.CORE_START_YEAR]
+    result = ((at(conv, end) - at(conv, start)) - (at(soln, end) - at(soln, start))) / 1e9
+    return np.where(lifetimes, result, 0.0)
+
+
+def lifetime_operating_savings(soln_breakouts, conv_breakouts, lifetimes):
+    # as OperatingCost.soln_marginal_operating_cost_savings
+    savings = conv_breakouts.sum(axis=2) - soln_breakouts.sum(axis=2)
+    return np.where(lifetimes, savings.sum(axis=1) / 1e9, 0.0)
+
+
+def cumulative_emissions_reduced(co2eq_mmt_reduced, start, end, region):
+    return total(co2eq_mmt_reduced, start, end, region) / 1e3
+
+
+def total_additional_co2eq_sequestered(co2_sequestered_global, end):
+    # farmlandrestoration starts in year 2021 in Advanced Control excel
+    # Not sure if this is a bug or intended. Excel also says it should start at 2020
+    return total(co2_sequestered_global, np.full(len(np.asarray(end)), 2021), end, 'All') / 1000
+
+
+# #######################################################################################################
+#
+# Batches
+
+class ScenarioBatch:
+    """The scenarios of solution, evaluated together.
+       scenarios: a list of scenario names and/or AdvancedControls (default: all the scenarios of
+         the solution).
+       world_only: construct the scenarios with Scenario.world_only, when only World results (such
+         as the key results) are needed.
+    """
+
+    def __init__(self, solution, scenarios=None, world_only=False):
+        self.solution = solution
+        if scenarios is None:
+            scenarios = factory.list_scenarios(solution)
+        names = [ s.name if isinstance(s, AdvancedControls) else s for s in scenarios ]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Scenarios of a batch must have distinct names: {names}")
+        with tam.shared_forecast_data():
+            self.scenarios = { name : factory.load_scenario(solution, s, world_only=world_only) for (name, s) in zip(names, scenarios) }
+        self.names = names
+        self._stacks = {}
+
+
+    def __len__(self):
+        return len(self.names)
+
+
+    def __getitem__(self, name):
+        return self.scenarios[name]
+
+
+    def _data(self, table):
+        (attr, _, method) = table.rpartition('.')
+        for s in self.scenarios.values():
+            obj = getattr(s, attr) if attr else s
+            yield getattr(obj, method)()
+
+
+    def stack(self, table):
+        """Return the output table (named 'attribute.method', e.g. 'c2.co2eq_mmt_reduced') of every
+        scenario, as a Stack."""
+        if table not in self._stacks:
+            self._stacks[table] = stack_frames(list(self._data(table)), self.names)
+        return self._stacks[table]
+
+
+    def _ac(self, name):
+        return np.array([ getattr(s.ac, name) for s in self.scenarios.values() ], dtype='float')
+
+
+    # Operating costs
+
+    def _annual_breakouts(self, which):
+        """Return the operating cost breakouts ('soln_pds' or 'conv_ref', see
+        OperatingCost.soln_pds_annual_breakout) of all the scenarios, as an array of scenario x year
+        x year, computed together by operatingcost.annual_breakout_array.  Scenarios without
+        lifetimes (for which the key results do not use operating costs) get 0s."""
+        key = f"oc.{which}_annual_breakout[batch]"
+        if key in self._stacks:
+            return self._stacks[key]
+        ocs = [ s.oc for s in self.scenarios.values() ]
+        included = self._has_lifetimes()
+        args = [ getattr(oc, f"{which}_annual_breakout_args")() if inc else None
+                 for (oc, inc) in zip(ocs, included) ]
+        first_year = dd.CORE_START_YEAR
+        result = np.zeros((len(ocs), 2139 + 1 - first_year, dd.CORE_END_YEAR + 1 - first_year))
+        # the breakout runs to each scenario's report_end_year; the scenarios with the same one go together
+        end_years = np.array([ oc.ac.report_end_year for oc in ocs ])
+        for end_year in np.unique(end_years[included]):
+            group = np.flatnonzero((end_years == end_year) & included)
+            years = list(range(first_year, end_year + 1))
+            def column(name):
+                return [ args[i][name] for i in group ]
+            result[group] = operatingcost.annual_breakout_array(
+                    np.stack([ args[i]['new_funits_per_year'].loc[years].to_numpy(dtype='float') for i in group ]),
+                    np.stack([ args[i]['new_annual_iunits_reqd'].loc[years].to_numpy(dtype='float') for i in group ]),
+                    column('lifetime_replacement'), column('var_oper_cost_per_funit'),
+                    column('fuel_cost_per_funit'), column('fixed_oper_cost_per_iunit'), int(end_year),
+                    [ ocs[i].ac.has_var_costs for i in group ],
+                    [ ocs[i].conversion_factor_vom for i in group ],
+                    [ ocs[i].conversion_factor_fom for i in group ])
+        self._stacks[key] = result
+        return result
+
+
+    # Key results (see the functions of the same names)
+
+    def _has_lifetimes(self):
+        return has_lifetimes(self._ac('soln_lifetime_replacement'), self._ac('conv_lifetime_replacement'))
+
+
+    def _years(self, year, default):
+        return self._ac(default).astype(int) if year is None else np.full(len(self), year)
+
+
+    def adoption_unit_increase(self, year=None, region='World'):
+        return adoption_unit_increase(self.stack('ht.soln_pds_funits_adopted'),
+                self.stack('ht.soln_ref_funits_adopted'), self._years(year, 'report_end_year'), region)
+
+
+    def implementation_unit_adoption_increase(self, year=2050, region='World'):
+        return implementation_unit_adoption_increase(self.stack('ht.soln_pds_funits_adopted'),
+                self.stack('ht.soln_ref_funits_adopted'), self._ac('soln_avg_annual_use'),
+                np.full(len(self), year), region)
+
+
+    def marginal_first_cost(self, year=None):
+        return marginal_first_cost(self.stack('fc.soln_pds_annual_world_first_cost'),
+                self.stack('fc.soln_ref_annual_world_first_cost'),
+                self.stack('fc.conv_ref_annual_world_first_cost'),
+                self._years(year, 'report_end_year'), self._has_lifetimes())
+
+
+    def net_operating_savings(self, start_year=None, end_year=None):
+        return net_operating_savings(self._annual_breakouts('soln_pds'), self._annual_breakouts('conv_ref'),
+                self._years(start_year, 'report_start_year'), self._years(end_year, 'report_end_year'),
+                self._has_lifetimes())
+
+
+    def lifetime_operating_savings(self):
+        return lifetime_operating_savings(self._annual_breakouts('soln_pds'),
+                self._annual_breakouts('conv_ref'), self._has_lifetimes())
+
+
+    def cumulative_emissions_reduced(self, start_year=None, end_year=None, region='World'):
+        return cumulative_emissions_reduced(self.stack('c2.co2eq_mmt_reduced'),
+                self._years(start_year, 'report_start_year'), self._years(end_year, 'report_end_year'), region)
+
+
+    def total_additional_co2eq_sequestered(self, end_year=None):
+        return total_additional_co2eq_sequestered(self.stack('c2.co2_sequestered_global'),
+                self._years(end_year, 'report_end_year'))
+
+
+    def key_results(self):
+        """Return the key results (as Scenario.get_key_results) of all the scenarios, as a DataFrame
+        with a row per scenario."""
+        methods = type(next(iter(self.scenarios.values()))).key_result_methods
+        return pd.DataFrame({ key : getattr(self, method)() for (key, method) in methods.items() },
+                            index=pd.Index(self.names, name='scenario'))
@@ -10,6 +10,7 @@ import pandas as pd
 from model.data_handler import DataHandler
 from model.decorators import data_func
 from model import emissionsfactors
+from model import multigas
 
 
 
@@ -111,23 +112,21 @@ class CH4Calcs(DataHandler):
             ch4_tons = self.avoided_direct_emissions_ch4_land()
         else:
             ch4_tons = self.ch4_tons_reduced()
-        col_years = np.arange(2015, 2061)
-        index_years = ch4_tons.index.values
-        deltas = index_years.reshape(-1, 1) - col_years.reshape(1, -1) + 1
-        vals = np.exp( - deltas / 12) * ch4_tons.loc[col_years, "World"].values.reshape(1, -1)
-        vals[deltas < 1] = 0 # Overwrite values for negative deltas
-        total = vals.sum(axis=1).reshape(-1, 1)
-        ppb = total / (16.04 * 1.8 * 10 ** 5)
-        ppb_calculator = pd.DataFrame(np.concatenate([ppb, total, vals], axis=1),
-                                    columns=["PPB", "Total"] + list(col_years),
-                                    index=ch4_tons.index.copy(),
-                                    dtype=np.float64
-                                    )
+        ppb_calculator = _ppb_calculator(ch4_tons)
         ppb_calculator.name = "ch4_ppb_calculator_avoided_or_reduced"
         return ppb_calculator
 
 
-    
+    @lru_cache()
+    def ch4_ppb_emissions(self):
+        """The World CH4 reductions, in tons of CO2-eq, modeled as pulses by ch4_ppb_calculator."""
+        if self.soln_pds_direct_ch4_co2_emissions_saved is not None:
+            ch4_tons = self.avoided_direct_emissions_ch4_co2eq_land()
+        else:
+            ch4_tons = self.ch4_co2eq_tons_reduced()
+        return ch4_tons["World"]
+
+
     @lru_cache()
     def ch4_ppb_calculator(self):
         """Parts Per Billion reduction calculator for CH4 using CO2eq.
@@ -135,22 +134,16 @@ class CH4Calcs(DataHandler):
             in the atmosphere. This way is incorrect since the equation taken from Myhrvald and Caldeira (2012) 
             assumes metric tons are converted to ppb, NOT CO2eq tons of methane (like it is done here).
         """
-        if self.soln_pds_direct_ch4_co2_emissions_saved is not None:
-            ch4_tons = self.avoided_direct_emissions_ch4_co2eq_land()
-        else:
-            ch4_tons = self.ch4_co2eq_tons_reduced()
-        col_years = np.arange(2015, 2061)
-        index_years = ch4_tons.index.values
-        deltas = index_years.reshape(-1, 1) - col_years.reshape(1, -1) + 1
-        vals = np.exp( - deltas / 12) * ch4_tons.loc[col_years, "World"].values.reshape(1, -1)
-        vals[deltas < 1] = 0 # Overwrite values for negative deltas
-        total = vals.sum(axis=1).reshape(-1, 1)
-        ppb = total / (16.04 * 1.8 * 10 ** 5)
-        ppb_calculator = pd.DataFrame(np.concatenate([ppb, total, vals], axis=1),
-                                    columns=["PPB", "Total"] + list(col_years),
-                                    index=ch4_tons.index.copy(),
-                                    dtype=np.float64
-                                    )
+        ppb_calculator = _ppb_calculator(self.ch4_ppb_emissions().to_frame())
         ppb_calculator.name = "ch4_ppb_calculator_co2eq"
         return ppb_calculator
-   
\ No newline at end of file
+
+
+def _ppb_calculator(ch4_tons):
+    """The pulses of the World column of ch4_tons remaining in each year, their total and PPB."""
+    vals = multigas.pulses('CH4', ch4_tons["World"].to_numpy(), ch4_tons.index.values)
+    total = multigas.totals('CH4', vals).reshape(-1, 1)
+    ppb = total / multigas.per_unit['CH4']
+    return pd.DataFrame(np.concatenate([ppb, total, vals], axis=1),
+                        columns=["PPB", "Total"] + list(multigas.pulse_years),
+                        index=ch4_tons.index.copy(), dtype=np.float64)
@@ -5,7 +5,6 @@ Computes reductions for CO2 and total GHGs in CO2-equivalent emissions.
 
 from functools import lru_cache, wraps
 import hashlib
-import math
 #from numba import jit
 import json
 from io import StringIO
@@ -16,7 +15,10 @@ import numpy as np
 import pandas as pd
 import model.advanced_controls
 import model.dd
+import model.fair_emulator
 import model.fairutil
+import model.multigas
+from model.concurrency import shared_cache
 
 from model.data_handler import DataHandler
 from model.decorators import data_func
@@ -35,7 +37,7 @@ class NumpyEncoder(json.JSONEncoder):
 ###########----############----############----############----############
 # CO2-EQ CALCULATIONS AND PRIOR USE OF FAIR
 
-@lru_cache
+@shared_cache
 def fair_scm_cached(json_input: str):
     input = json.loads(json_input)
     values = np.array(input['values'])
@@ -47,6 +49,13 @@ def fair_scm_cached(json_input: str):
             kwargs[k] = input['kwargs'][k]
     return fair.forward.fair_scm(emissions=values, useMultigas=input['useMultigas'], **kwargs)
 
+def fair_scm_rcp(emissions, rcp):
+    """Return fair.forward.fair_scm(emissions=emissions) for emissions changed from those of rcp (a
+       key of model.fair_emulator.rcps), or its emulation in emulated mode (see model.fair_emulator)."""
+    if model.fair_emulator.emulating():
+        return model.fair_emulator.emulator(rcp)(emissions)
+    return fair.forward.fair_scm(emissions=emissions)
+
 def fair_scm(values, useMultigas, **kwargs):
     key = json.dumps({
         'values': values,
@@ -55,42 +64,17 @@ def fair_scm(values, useMultigas, **kwargs):
     }, cls=NumpyEncoder)
     return fair_scm_cached(key)
 
-@lru_cache
-def co2_ppm_calculator_cached(
-    co2_vals,
-    solution_category,
-    report_start_year,
-    ):
-
+@shared_cache
+def co2_ppm_calculator_cached(co2_vals):
     co2_vals = pd.read_csv(StringIO(co2_vals), index_col=0, squeeze=True, float_precision='round_trip')
-
-    columns = ['PPM', 'Total'] + list(range(2015, 2061))
-    ppm_calculator = pd.DataFrame(0, columns=columns, index=co2_vals.index.copy(),
-                                      dtype=np.float64)
-    ppm_calculator.index = ppm_calculator.index.astype(int)
-    ppm_calculator.index.name = 'Year'
-    first_year = ppm_calculator.first_valid_index()
-    last_year = ppm_calculator.last_valid_index()
-    for year in ppm_calculator.index:
-        if (year < report_start_year and
-                solution_category != model.advanced_controls.SOLUTION_CATEGORY.LAND):
-            # On RRS xls models this skips the calc but on LAND the calc is done anyway
-            # Note that this affects the values for all years and should probably NOT be
-            # skipped (i.e. LAND is the correct implementation)
-            # see: https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
-            continue
-        b = co2_vals[year]
-        for delta in range(1, last_year - first_year + 2):
-            if (year + delta - 1) > last_year:
-                break
-            val = 0.217
-            val += 0.259 * math.exp(-delta / 172.9)
-            val += 0.338 * math.exp(-delta / 18.51)
-            val += 0.186 * math.exp(-delta / 1.186)
-            ppm_calculator.loc[year + delta - 1, year] = b * val
-    ppm_calculator.loc[:, 'Total'] = ppm_calculator.sum(axis=1)
-    for year in ppm_calculator.index:
-        ppm_calculator.at[year, 'PPM'] = ppm_calculator.at[year, 'Total'] / (44.01 * 1.8 * 100)
+    index = co2_vals.index.astype(int)
+    index.name = 'Year'
+    values = model.multigas.pulses('CO2', co2_vals.to_numpy(), index)
+    total = model.multigas.totals('CO2', values).reshape(-1, 1)
+    ppm = total / model.multigas.per_unit['CO2']
+    ppm_calculator = pd.DataFrame(np.concatenate([ppm, total, values], axis=1),
+                                  columns=['PPM', 'Total'] + list(range(2015, 2061)),
+                                  index=index, dtype=np.float64)
     ppm_calculator.name = 'co2_ppm_calculator'
     return ppm_calculator
 
@@ -399,6 +383,28 @@ class CO2Calcs(DataHandler):
         return df
 
 
+    @lru_cache()
+    def co2_ppm_emissions(self):
+        """The World reductions in CO2 (or CO2-eq), in MMT, modeled as pulses by co2_ppm_calculator."""
+        if self.ac.emissions_use_co2eq:
+            co2_vals = self.co2eq_mmt_reduced()['World']
+        else:
+            co2_vals = self.co2_mmt_reduced()['World']
+
+        if (self.ac.solution_category == model.advanced_controls.SOLUTION_CATEGORY.LAND or
+                self.ac.solution_category == model.advanced_controls.SOLUTION_CATEGORY.OCEAN):
+            co2_vals = self.co2_sequestered_global()['All'] + self.co2eq_mmt_reduced()['World']
+            assert self.ac.emissions_use_co2eq, 'Land/ocean models must use CO2 eq'
+
+        if self.ac.solution_category != model.advanced_controls.SOLUTION_CATEGORY.LAND:
+            # On RRS xls models the calc is skipped for years before the report start year, but on
+            # LAND the calc is done anyway.  Note that this affects the values for all years and
+            # should probably NOT be skipped (i.e. LAND is the correct implementation)
+            # see: https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
+            co2_vals = co2_vals.mask(co2_vals.index.astype(int) < self.ac.report_start_year, 0.0)
+        return co2_vals
+
+
     @lru_cache()
     @data_func
     def co2_ppm_calculator(self):
@@ -417,17 +423,7 @@ class CO2Calcs(DataHandler):
            Conservation Agriculture 'CO2 Calcs'!A172:AW218 (Land)
         """
 
-        if self.ac.emissions_use_co2eq:
-            co2_vals = self.co2eq_mmt_reduced()['World']
-        else:
-            co2_vals = self.co2_mmt_reduced()['World']
-
-        if (self.ac.solution_category == model.advanced_controls.SOLUTION_CATEGORY.LAND or
-                self.ac.solution_category == model.advanced_controls.SOLUTION_CATEGORY.OCEAN):
-            co2_vals = self.co2_sequestered_global()['All'] + self.co2eq_mmt_reduced()['World']
-            assert self.ac.emissions_use_co2eq, 'Land/ocean models must use CO2 eq'
-
-        return co2_ppm_calculator_cached(co2_vals.to_csv(), self.ac.solution_category, self.ac.report_start_year)
+        return co2_ppm_calculator_cached(self.co2_ppm_emissions().to_csv())
 
     @lru_cache()
     @data_func
@@ -442,11 +438,11 @@ class CO2Calcs(DataHandler):
                 index=co2_ppm_calculator.index.copy(), dtype=np.float64)
         ppm_calculator.index = ppm_calculator.index.astype(int)
         ppm_calculator["CO2 PPM"] = co2_ppm_calculator["PPM"]
-        ppm_calculator["CO2 RF"] = ppm_calculator["CO2 PPM"].apply(co2_rf)
+        ppm_calculator["CO2 RF"] = model.multigas.co2_forcing(ppm_calculator["CO2 PPM"])
         ppm_calculator["CH4 PPB"] = self.ch4_ppb_calculator["PPB"]
-        ppm_calculator["CH4 RF"] = ppm_calculator["CH4 PPB"].apply(ch4_rf)
+        ppm_calculator["CH4 RF"] = model.multigas.ch4_forcing(ppm_calculator["CH4 PPB"])
         s = ppm_calculator["CO2 RF"] + ppm_calculator["CH4 RF"]
-        ppm_calculator["CO2-eq PPM"] = s.apply(co2eq_ppm)
+        ppm_calculator["CO2-eq PPM"] = model.multigas.co2eq_ppm(s)
         return ppm_calculator
 
 
@@ -684,8 +680,11 @@ class CO2Calcs(DataHandler):
             gtonsC = (co2_sequestered_global['All'] / 1000.0) / C_TO_CO2EQ
             emissions = emissions.subtract(other=gtonsC, fill_value=0.0)
 
-        kwargs = model.fairutil.fair_scm_kwargs()
-        (C, F, T) = fair_scm(emissions.values, False, **kwargs)
+        if model.fair_emulator.emulating():
+            (C, F, T) = model.fair_emulator.emulator('co2eq')(emissions.values)
+        else:
+            kwargs = model.fairutil.fair_scm_kwargs()
+            (C, F, T) = fair_scm(emissions.values, False, **kwargs)
         result = pd.DataFrame({'C': C , 'F': F, 'T': T}, index=emissions.index)
         result.name = 'FaIR_CFT_Drawdown_co2eq'
         return result
@@ -928,7 +927,7 @@ class CO2Calcs(DataHandler):
         # Call on the solution emission reductions
         annual_reductions = self.ghg_emissions_reductions_global_annual()
         # Call on the RCP scenario
-        rcpemissions = rcp3pd.Emissions.emissions
+        rcpemissions = rcp3pd.Emissions.emissions.copy()
         rcpemissionsnew = pd.DataFrame(rcpemissions, index = range(1765,2501),
                                        columns=['Year','FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
                                                 'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
@@ -955,7 +954,7 @@ class CO2Calcs(DataHandler):
         rcpemissionsnew.iloc[249:296,4] = a2
         
         emissionsnew = rcpemissionsnew.to_numpy()
-        (C,F,T) = fair.forward.fair_scm(emissions=emissionsnew)
+        (C,F,T) = fair_scm_rcp(emissionsnew, 'rcp3')
         result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp3pd.Emissions.year)
         result1.index.name="Year"
         result1.name = 'FaIR_CFT_Drawdown_conc_rcp3'
@@ -986,7 +985,7 @@ class CO2Calcs(DataHandler):
         # Call on the solution emission reductions
         annual_reductions = self.ghg_emissions_reductions_global_annual()
         # Call on the RCP scenario
-        rcpemissions = rcp45.Emissions.emissions
+        rcpemissions = rcp45.Emissions.emissions.copy()
         rcpemissionsnew = pd.DataFrame(rcpemissions, index = range(1765,2501),
                                        columns=['Year','FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
                                                 'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
@@ -1013,7 +1012,7 @@ class CO2Calcs(DataHandler):
         rcpemissionsnew.iloc[249:296,4] = a2
         
         emissionsnew = rcpemissionsnew.to_numpy()
-        (C,F,T) = fair.forward.fair_scm(emissions=emissionsnew)
+        (C,F,T) = fair_scm_rcp(emissionsnew, 'rcp45')
         result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp45.Emissions.year)
         result1.index.name="Year"
         result1.name = 'FaIR_CFT_Drawdown_conc_rcp45'
@@ -1044,7 +1043,7 @@ class CO2Calcs(DataHandler):
         # Call on the solution emission reductions
         annual_reductions = self.ghg_emissions_reductions_global_annual()
         # Call on the RCP scenario
-        rcpemissions = rcp6.Emissions.emissions
+        rcpemissions = rcp6.Emissions.emissions.copy()
         rcpemissionsnew = pd.DataFrame(rcpemissions, index = range(1765,2501),
                                        columns=['Year','FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
                                                 'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
@@ -1071,7 +1070,7 @@ class CO2Calcs(DataHandler):
         rcpemissionsnew.iloc[249:296,4] = a2
         
         emissionsnew = rcpemissionsnew.to_numpy()
-        (C,F,T) = fair.forward.fair_scm(emissions=emissionsnew)
+        (C,F,T) = fair_scm_rcp(emissionsnew, 'rcp6')
         result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp6.Emissions.year)
         result1.index.name="Year"
         result1.name = 'FaIR_CFT_Drawdown_conc_rcp6'
@@ -1102,7 +1101,7 @@ class CO2Calcs(DataHandler):
         # Call on the solution emission reductions
         annual_reductions = self.ghg_emissions_reductions_global_annual()
         # Call on the RCP scenario
-        rcpemissions = rcp85.Emissions.emissions
+        rcpemissions = rcp85.Emissions.emissions.copy()
         rcpemissionsnew = pd.DataFrame(rcpemissions, index = range(1765,2501),
                                        columns=['Year','FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
                                                 'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
@@ -1129,7 +1128,7 @@ class CO2Calcs(DataHandler):
         rcpemissionsnew.iloc[249:296,4] = a2
         
         emissionsnew = rcpemissionsnew.to_numpy()
-        (C,F,T) = fair.forward.fair_scm(emissions=emissionsnew)
+        (C,F,T) = fair_scm_rcp(emissionsnew, 'rcp85')
         result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp85.Emissions.year)
         result1.index.name="Year"
         result1.name = 'FaIR_CFT_Drawdown_conc_rcp85'
@@ -1140,39 +1139,3 @@ class CO2Calcs(DataHandler):
         result3.index.name="Year"
         result3.name = 'FaIR_CFT_Drawdown_temp_rcp85' 
         return result1, result2, result3, rcpemissionsnew
-
-
-###########----############----############----############----############
-## PRIOR RADIATIVE FORCING EQUATIONS USED FOR CO2-EQ CALCULATIONS
-
-
-# The following formulae come from the SolarPVUtil Excel implementation of 27Aug18.
-# There was no explanation of where they came from or what they really mean.
-
-#@jit
-def co2_rf(x):
-    original_co2 = 400
-    return 5.35 * math.log((original_co2 + x) / original_co2)
-
-
-#@jit
-def f(M, N):
-    return 0.47 * math.log(
-        1 + 2.01 * 10 ** -5 * (M * N) ** 0.75 + 5.31 * 10 ** -15 * M * (M * N) ** 1.52)
-
-
-#@jit
-def ch4_rf(x):
-    original_ch4 = 1800
-    original_n2o = 320
-    indirect_ch4_forcing_scalar = 0.97 / 0.641
-    old_M = original_ch4
-    new_M = original_ch4 + x
-    N = original_n2o
-    return (indirect_ch4_forcing_scalar * 0.036 * (new_M ** 0.5 - old_M ** 0.5) -
-            f(new_M, N) + f(old_M, N))
-
-#@jit
-def co2eq_ppm(x):
-    original_co2 = 400
-    return (original_co2 * math.exp(x / 5.35)) - original_co2
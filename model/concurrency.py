@@ -0,0 +1,90 @@
+"""Support for evaluating scenarios in several threads at once.
+
+Model objects that are shared between scenarios (the TAM, AdoptionData, CustomAdoption and TLA
+objects, shared through metaclass_cache) and the module-level caches of the model are used by every
+thread that evaluates a scenario.  Their caches use shared_cache rather than functools.lru_cache:
+    - each result is computed once (single-flight): a thread that asks for a result that another
+      thread is computing waits for it rather than computing it again, and
+    - cached results are made read-only (see freeze), so one caller cannot change the result seen by
+      another: modifying one in place raises ValueError (make a copy first).
+
+    @shared_cache()
+    @data_func
+    def forecast_data_global(self): ...
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+
+class KeyedLocks:
+    """A lock per key, created when first needed and discarded when no thread holds or waits for it.
+    The locks are reentrant, so a thread may hold the lock for a key while asking for it again.
+
+        with locks.hold(key): ...
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}     # key : [lock, number of threads holding or waiting for it]
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.RLock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locks)
+
+
+def freeze(data):
+    """Make the values of data (a DataFrame, Series or numpy array, or a tuple or list of them)
+    read-only, and return it.  Other objects are returned unchanged."""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        for arr in data._mgr.arrays:
+            if isinstance(arr, np.ndarray):
+                arr.flags.writeable = False
+    elif isinstance(data, np.ndarray):
+        data.flags.writeable = False
+    elif isinstance(data, (tuple, list)):
+        for item in data:
+            freeze(item)
+    return data
+
+
+def shared_cache(maxsize=128):
+    """A replacement for functools.lru_cache for caches shared between threads: the result for each
+    set of arguments is computed by one thread only, and is made read-only.  As with lru_cache, the
+    arguments must be hashable, and the decorated function has cache_info and cache_clear.  May be
+    used as @shared_cache or @shared_cache(maxsize)."""
+    if callable(maxsize):
+        return shared_cache()(maxsize)
+
+    def decorator(function):
+        locks = KeyedLocks()
+        cached = functools.lru_cache(maxsize)(lambda *args, **kwargs: freeze(function(*args, **kwargs)))
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with locks.hold((args, tuple(sorted(kwargs.items()))) if kwargs else args):
+                return cached(*args, **kwargs)
+
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
@@ -1,7 +1,10 @@
 """ Custom PDS/REF Adoption module """
 
-from functools import lru_cache
+from contextlib import contextmanager
+import threading
+from model.concurrency import shared_cache
 from model.metaclass_cache import MetaclassCache
+from model import datafiles
 import model.dd as dd
 import pandas as pd
 import numpy as np
@@ -115,11 +118,26 @@ class CustomAdoption(object, metaclass=MetaclassCache):
             self.scenarios[name] = {'df': df, 'include': include, 'bug_no_limit': bug_no_limit,
                     'data_basis': data_basis}
         self.soln_adoption_custom_name = soln_adoption_custom_name
+        self._adjusted = False
+        self._adjusting_lock = threading.Lock()
+
+    @contextmanager
+    def adjusting(self):
+        """For the manual adjustments that some solutions make to the data of the scenarios:
+              with self.pds_ca.adjusting() as ca_scenarios:
+                  for s in ca_scenarios.values():
+                      s['df'].loc[2014, 'World'] = ...
+           The object is shared by all the Scenarios constructed with the same arguments (which
+           determine the adjustments), so the adjustments are made the first time only, by one
+           thread while any others wait; after that, ca_scenarios is empty."""
+        with self._adjusting_lock:
+            yield {} if self._adjusted else self.scenarios
+            self._adjusted = True
 
 
     def _read_csv(self, filename):
         """Read in a CSV file from filename."""
-        df = pd.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
+        df = datafiles.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
                          skip_blank_lines=True, comment='#', dtype=np.float64)
         df.index = df.index.astype(int)
         df.index.name = 'Year'
@@ -270,7 +288,7 @@ class CustomAdoption(object, metaclass=MetaclassCache):
             low_df.loc[idx:, :] = low_df.loc[idx:, :].combine(self.total_adoption_limit, np.minimum)
         return avg_df, high_df, low_df
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def adoption_data_per_region(self):
         """ Return a dataframe of adoption data, one column per region. """
@@ -291,7 +309,7 @@ class CustomAdoption(object, metaclass=MetaclassCache):
         result.name = 'adoption_data_per_region'
         return result
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def adoption_trend_per_region(self):
         """
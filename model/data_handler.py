@@ -24,15 +24,19 @@ class DataHandler:
             if hasattr(func, 'data_func'):
                 data = func()
                 if data is not None and (isinstance(data, pd.DataFrame) or isinstance(data, pd.Series)):
-                    data_keys = data.keys()
-                    for l in data.keys():
-                        if limit_regions and 'World' in data_keys and l not in regions:
-                            del data[l]
-                        else:
-                            if isinstance(l, np.int64):
-                                label = str(l)
-                                data[label] = data[l]
-                                del data[l]
+                    # data may be a cached result: select and relabel into a new object, never in place.
+                    all_keys = list(data.keys())
+                    data_keys = all_keys
+                    if limit_regions and 'World' in data_keys:
+                        data_keys = [l for l in data_keys if l in regions]
+                    int_keys = [l for l in data_keys if isinstance(l, np.int64)]
+                    if int_keys:
+                        data_keys = [l for l in data_keys if not isinstance(l, np.int64)] + int_keys
+                    if data_keys != all_keys:
+                        data = data[data_keys]
+                    if int_keys:
+                        labels = {l: str(l) for l in int_keys}
+                        data = data.rename(columns=labels) if isinstance(data, pd.DataFrame) else data.rename(index=labels)
                     outputs[k] = clean_nan(data)
                 else:
                     outputs[k] = data
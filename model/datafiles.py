@@ -0,0 +1,79 @@
+"""A process-wide read-through cache of the static data files read by the model.
+
+Every TAM, AdoptionData and CustomAdoption object reads its source CSV files, every UnitAdoption the
+population and GDP data, and every CO2Calcs the baseline emissions; in a run over many solutions and
+scenarios the same files would be read and parsed again and again.  read_csv reads each file once:
+the parsed result is kept, keyed by the file's resolved path, modification time and size (so a file
+changed on disk is read again) and the parsing options.
+
+The cached data is shared by every caller, so its arrays are made read-only: each caller gets its own
+shallow copy, on which the index or name may be set, and whose values may be used in calculations,
+but not modified in place (which raises ValueError: make a copy first).
+
+Files in the in-memory integration overlay (see model.integration) are not cached.
+
+    from model import datafiles
+    df = datafiles.read_csv(filename, index_col=0)
+    datafiles.stats()     # {'hits': ..., 'misses': ..., 'files': ..., 'bytes': ...}
+"""
+
+import os
+import threading
+from pathlib import Path
+import pandas as pd
+from model import integration
+from model.concurrency import KeyedLocks, freeze
+
+_cache = {}      # (path, options) : (mtime_ns, size, data, nbytes)
+_hits = 0
+_misses = 0
+_lock = threading.Lock()
+_reading = KeyedLocks()
+
+
+def _options_key(kwargs):
+    return tuple(sorted((k, repr(v)) for (k, v) in kwargs.items()))
+
+
+def _nbytes(data):
+    return int(data.memory_usage(index=True, deep=True).sum() if isinstance(data, pd.DataFrame)
+               else data.memory_usage(index=True, deep=True))
+
+
+def read_csv(filename, **kwargs):
+    """Return pd.read_csv(filename, **kwargs), reading the file only the first time (and again if it
+    changes).  The result's values are read-only."""
+    global _hits, _misses
+    source = integration.data_source(filename)
+    if not isinstance(source, (str, os.PathLike)):
+        return pd.read_csv(source, **kwargs)  # from the integration overlay
+    path = Path(filename).resolve()
+    st = path.stat()
+    key = (str(path), _options_key(kwargs))
+    with _reading.hold(key):   # only one thread reads a file
+        with _lock:
+            entry = _cache.get(key)
+            if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                _hits += 1
+                return entry[2].copy(deep=False)
+        data = freeze(pd.read_csv(path, **kwargs))
+        with _lock:
+            _misses += 1
+            _cache[key] = (st.st_mtime_ns, st.st_size, data, _nbytes(data))
+    return data.copy(deep=False)
+
+
+def stats():
+    """Return a dict of the number of cache hits and misses, the number of files held and the
+    number of bytes of data they hold."""
+    with _lock:
+        return {'hits': _hits, 'misses': _misses, 'files': len({k[0] for k in _cache}),
+                'bytes': sum(entry[3] for entry in _cache.values())}
+
+
+def clear():
+    """Empty the cache and reset its statistics."""
+    global _hits, _misses
+    with _lock:
+        _cache.clear()
+        _hits = _misses = 0
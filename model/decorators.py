@@ -1,6 +1,11 @@
 """
 Set of decorators for model data presentation
 """
+
+data_funcs = []
+"""Every function decorated with @data_func (used by model.profiling to find them)."""
+
 def data_func(method):
     method.data_func = True
+    data_funcs.append(method)
     return method
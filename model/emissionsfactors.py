@@ -6,6 +6,7 @@ and other factors relating to emissions and pollutants.
 
 from functools import lru_cache
 import enum
+import numpy as np
 import pandas as pd
 
 
@@ -109,46 +110,14 @@ class ElectricityGenOnGrid(DataHandler):
 
            'Emissions Factors'!A11:K57
         """
-        result = pd.DataFrame(index=list(range(2015, 2061)),
-                              columns=["World", "OECD90", "Eastern Europe", "Asia (Sans Japan)",
-                                       "Middle East and Africa", "Latin America", "China", "India",
-                                       "EU", "USA"])
-        result.index.name = "Year"
-        if self.ac.emissions_grid_source == GRID_SOURCE.IPCC:
-            grid = _world_ipcc
-        elif self.ac.emissions_grid_source == GRID_SOURCE.META and self.grid_emissions_version == 1:
-            grid = _world_meta_1
-        elif self.ac.emissions_grid_source == GRID_SOURCE.META and self.grid_emissions_version == 2:
-            grid = _world_meta_2
-        elif self.ac.emissions_grid_source == GRID_SOURCE.META and self.grid_emissions_version == 3:
-            grid = _world_meta_3
-        elif self.ac.emissions_grid_source == GRID_SOURCE.META and self.grid_emissions_version == 4:
-            grid = _world_meta_4
-        else:
-            raise ValueError(f"Invalid self.ac.emissions_grid_source {self.ac.emissions_grid_source}")
-
-        if self.ac.emissions_grid_range == GRID_RANGE.HIGH:
-            result.loc[:, "World"] = grid.loc[:, "high"].values
-        elif self.ac.emissions_grid_range == GRID_RANGE.LOW:
-            result.loc[:, "World"] = grid.loc[:, "low"].values
-        elif self.ac.emissions_grid_range == GRID_RANGE.MEAN:
-            result.loc[:, "World"] = grid.loc[:, "medium"].values
-        else:
-            raise ValueError(f"Invalid ac.emissions_grid_range {self.ac.emissions_grid_range}")
-
-        # Generation mixes from the AMPERE/MESSAGE WG3 BAU scenario, direct and
-        # indirect emission factors by fuel from the IPCC WG3 Annex III Table A.III.2
-        # https://www.ipcc.ch/pdf/assessment-report/ar5/wg3/ipcc_wg3_ar5_annex-iii.pdf
-        result.loc[:, "OECD90"] = 0.454068989
-        result.loc[:, "Eastern Europe"] = 0.724747956
-        result.loc[:, "Asia (Sans Japan)"] = 0.457658947
-        result.loc[:, "Middle East and Africa"] = 0.282243907
-        result.loc[:, "Latin America"] = 0.564394712
-        result.loc[:, "China"] = 0.535962403
-        result.loc[:, "India"] = 0.787832379
-        result.loc[:, "EU"] = 0.360629290
-        result.loc[:, "USA"] = 0.665071666
-        return result
+        return grid_CO2eq_per_KWh(self.ac.emissions_grid_source, self.ac.emissions_grid_range,
+                                  self.grid_emissions_version)
+
+
+    def conv_ref_grid_CO2eq_per_KWh_all_ranges(self):
+        """conv_ref_grid_CO2eq_per_KWh for each of the GRID_RANGEs, as a dict of GRID_RANGE
+           to DataFrame, for the grid source and version of this solution."""
+        return grid_CO2eq_per_KWh_all_ranges(self.ac.emissions_grid_source, self.grid_emissions_version)
 
 
     @lru_cache()
@@ -158,22 +127,79 @@ class ElectricityGenOnGrid(DataHandler):
            factors by fuel from the IPCC WG3 Annex III Table A.III.2.
            "Emissions Factors"!A66:K112
         """
-        result = pd.DataFrame(index=list(range(2015, 2061)),
-                              columns=["World", "OECD90", "Eastern Europe", "Asia (Sans Japan)",
-                                       "Middle East and Africa", "Latin America", "China", "India",
-                                       "EU", "USA"])
-        result.index.name = "Year"
-        result.loc[:, "World"] = 0.484512031078339
-        result.loc[:, "OECD90"] = 0.392126590013504
-        result.loc[:, "Eastern Europe"] = 0.659977316856384
-        result.loc[:, "Asia (Sans Japan)"] = 0.385555833578110
-        result.loc[:, "Middle East and Africa"] = 0.185499981045723
-        result.loc[:, "Latin America"] = 0.491537630558014
-        result.loc[:, "China"] = 0.474730312824249
-        result.loc[:, "India"] = 0.725081980228424
-        result.loc[:, "EU"] = 0.297016531229019
-        result.loc[:, "USA"] = 0.594563066959381
-        return result
+        return _grid_frame(_grid_CO2_array())
+
+
+# The grid factor tables do not depend on anything but the grid source, range and version, so
+# they are computed once, as read-only float64 arrays shared by all ElectricityGenOnGrid objects.
+# Each caller gets its own DataFrame wrapping the shared array.
+
+_grid_years = pd.Index(list(range(2015, 2061)), name="Year")
+_grid_regions = ["World", "OECD90", "Eastern Europe", "Asia (Sans Japan)", "Middle East and Africa",
+                 "Latin America", "China", "India", "EU", "USA"]
+
+# Generation mixes from the AMPERE/MESSAGE WG3 BAU scenario, direct and
+# indirect emission factors by fuel from the IPCC WG3 Annex III Table A.III.2
+# https://www.ipcc.ch/pdf/assessment-report/ar5/wg3/ipcc_wg3_ar5_annex-iii.pdf
+# (regions other than World)
+_regional_CO2eq_per_KWh = [0.454068989, 0.724747956, 0.457658947, 0.282243907, 0.564394712,
+                           0.535962403, 0.787832379, 0.360629290, 0.665071666]
+
+# "Emissions Factors"!A66:K112, all regions
+_regional_CO2_per_KWh = [0.484512031078339, 0.392126590013504, 0.659977316856384, 0.385555833578110,
+                         0.185499981045723, 0.491537630558014, 0.474730312824249, 0.725081980228424,
+                         0.297016531229019, 0.594563066959381]
+
+_grid_range_columns = {GRID_RANGE.MEAN: "medium", GRID_RANGE.HIGH: "high", GRID_RANGE.LOW: "low"}
+
+
+def _grid_frame(values):
+    return pd.DataFrame(values, index=_grid_years, columns=_grid_regions, copy=False)
+
+
+def _world_grid(grid_source, grid_emissions_version):
+    if grid_source == GRID_SOURCE.IPCC:
+        return _world_ipcc
+    elif grid_source == GRID_SOURCE.META and grid_emissions_version in _world_meta:
+        return _world_meta[grid_emissions_version]
+    raise ValueError(f"Invalid emissions_grid_source {grid_source} (version {grid_emissions_version})")
+
+
+@lru_cache()
+def _grid_CO2eq_array(grid_source, grid_emissions_version):
+    """Read-only array of shape (GRID_RANGE, year, region) of grid emissions factors."""
+    grid = _world_grid(grid_source, grid_emissions_version)
+    values = np.empty((len(GRID_RANGE), len(_grid_years), len(_grid_regions)), dtype=np.float64)
+    values[:, :, 1:] = _regional_CO2eq_per_KWh
+    for (i, grid_range) in enumerate(GRID_RANGE):
+        values[i, :, 0] = grid[_grid_range_columns[grid_range]].to_numpy(dtype=np.float64)
+    values.flags.writeable = False
+    return values
+
+
+@lru_cache()
+def _grid_CO2_array():
+    values = np.tile(np.array(_regional_CO2_per_KWh, dtype=np.float64), (len(_grid_years), 1))
+    values.flags.writeable = False
+    return values
+
+
+def grid_CO2eq_per_KWh(grid_source, grid_range, grid_emissions_version=1):
+    """Grid emission factors (kg CO2-eq per kwh) for a GRID_SOURCE, GRID_RANGE and grid emissions version.
+       The DataFrame returned shares its (read-only) data with all other callers.
+       'Emissions Factors'!A11:K57
+    """
+    if grid_range not in _grid_range_columns:
+        raise ValueError(f"Invalid ac.emissions_grid_range {grid_range}")
+    values = _grid_CO2eq_array(grid_source, grid_emissions_version)
+    return _grid_frame(values[list(GRID_RANGE).index(grid_range)])
+
+
+def grid_CO2eq_per_KWh_all_ranges(grid_source, grid_emissions_version=1):
+    """grid_CO2eq_per_KWh for all GRID_RANGEs at once, as a dict of GRID_RANGE to DataFrame.
+       Useful for sweeps over emissions_grid_range, which share the same underlying tables."""
+    values = _grid_CO2eq_array(grid_source, grid_emissions_version)
+    return { grid_range : _grid_frame(values[i]) for (i, grid_range) in enumerate(GRID_RANGE) }
 
 
 # "Emissions Factors"!A290:D336
@@ -403,3 +429,5 @@ _world_meta_4 = pd.DataFrame([
     [2059, 0.488802412899276, 0.694303820554168, 0.336115235542782],
     [2060, 0.486771979815374, 0.692237263896700, 0.334367289134159]],
     columns=['Year', 'medium', 'high', 'low'])
+
+_world_meta = {1: _world_meta_1, 2: _world_meta_2, 3: _world_meta_3, 4: _world_meta_4}
@@ -0,0 +1,225 @@
+"""Streaming export of the data function outputs of a scenario.
+
+DataHandler.to_json returns every output as a (cleaned copy of a) DataFrame, so exporting a whole
+scenario holds all of them in memory at once, and then again as text.  The writers here instead
+compute one output at a time and write it out a chunk of rows at a time, cleaning non-finite values
+(to 0, as to_json does) and filtering regions as they go, so memory use is bounded by the chunk size
+rather than the size of the scenario.  The cached outputs themselves are never modified.
+
+Two formats are supported:
+  * JSON lines: one line per output, {"table", "columns", "index", "data"} for tables (a Series is
+    written as a single column named after the Series), or {"table", "value"} for other values.
+    Numbers in tables are written to 15 significant digits.
+  * Arrow IPC stream: numeric values only, in long form with columns table, row, column and value.
+
+Outputs are named 'attribute.method' (e.g. 'c2.co2_mmt_reduced') for a scenario, or 'method' for a
+single stage object; outputs which are tuples of tables (like the FaIR results) are named
+'method[0]', 'method[1]', ...  The tables argument of the writers selects outputs by either name.
+Only the selected outputs are computed.
+"""
+
+import json
+import math
+import numbers
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Scenario attributes which may hold objects with data functions, in model order.
+stage_attributes = ['tm', 'tla_per_region', 'c_tla', 'ae', 'ad', 'pds_ca', 'ref_ca', 'sc', 'ht', 'ef',
+                    'ua', 'fc', 'oc', 'c4', 'n2o', 'c2']
+
+
+def _data_funcs(obj):
+    return [ name for name in dir(obj) if hasattr(getattr(type(obj), name, None), 'data_func') ]
+
+
+def _selected(names, tables):
+    return tables is None or any(name in tables for name in names)
+
+
+def iter_tables(obj, tables=None, on_error=None):
+    """Yield (name, data) for each data function output of obj (a scenario, or a single stage object
+    such as a CO2Calcs), computing only those selected by tables (a collection of names; default all).
+    If on_error is given, a data function which raises is skipped, after calling on_error(name, exception)."""
+    if _data_funcs(obj):
+        sources = [ (None, obj) ]
+    else:
+        sources = [ (attr, getattr(obj, attr, None)) for attr in stage_attributes ]
+    for (attr, stage) in sources:
+        if stage is None:
+            continue
+        for method in _data_funcs(stage):
+            name = f"{attr}.{method}" if attr else method
+            if not _selected([name, method], tables):
+                continue
+            try:
+                data = getattr(stage, method)()
+            except Exception as e:  # pylint: disable=broad-except
+                # re-raised unless the caller asked to skip failing outputs
+                if on_error is None:
+                    raise
+                on_error(name, e)
+                continue
+            if isinstance(data, tuple) and data and all(isinstance(d, (pd.DataFrame, pd.Series)) for d in data):
+                for (i, d) in enumerate(data):
+                    yield (f"{name}[{i}]", d)
+            else:
+                yield (name, data)
+
+
+def region_positions(keys, regions):
+    """Return the positions of keys to keep when limiting to regions (as DataHandler.to_json does, keys
+    are only filtered if they include 'World')."""
+    if regions is None or 'World' not in keys:
+        return np.arange(len(keys))
+    return np.array([ i for (i, key) in enumerate(keys) if key in regions ], dtype=np.int64)
+
+
+def _label(x):
+    if isinstance(x, (bool, np.bool_)):
+        return bool(x)
+    if isinstance(x, numbers.Integral):
+        return int(x)
+    if isinstance(x, numbers.Real):
+        return None if math.isnan(x) else float(x)
+    if x is None or isinstance(x, str):
+        return x
+    return str(x)
+
+
+def _clean_value(x):
+    """A JSON-able value, with non-finite numbers replaced by 0."""
+    if isinstance(x, numbers.Real) and not isinstance(x, (bool, np.bool_)):
+        return _label(x) if math.isfinite(x) else 0
+    if x is None or (not isinstance(x, (str, list, tuple, dict)) and pd.isna(x)):
+        return 0
+    return _label(x)
+
+
+_clean_values = np.frompyfunc(_clean_value, 1, 1)
+
+
+def _chunks(data, positions, chunk_rows):
+    """Yield the values of data (a DataFrame or Series) a chunk of rows at a time, as arrays (2-d for
+    a DataFrame, 1-d for a Series) with non-finite numbers replaced by 0.  Numeric chunks are float or
+    int arrays; others are object arrays of JSON-able values.  data is not copied beyond one chunk."""
+    if isinstance(data, pd.Series) and len(positions) != len(data):
+        data = data.iloc[positions]
+    for start in range(0, len(data), chunk_rows):
+        chunk = data.iloc[start:start + chunk_rows]
+        if isinstance(chunk, pd.DataFrame):
+            if len(positions) != chunk.shape[1]:
+                chunk = chunk.iloc[:, positions]
+            kinds = {dt.kind for dt in chunk.dtypes}
+        else:
+            kinds = {chunk.dtype.kind}
+        if kinds <= {'f'}:
+            values = chunk.to_numpy(dtype=np.float64)
+            yield np.where(np.isfinite(values), values, 0.0)
+        elif kinds <= {'i', 'u'}:
+            yield chunk.to_numpy()
+        else:
+            yield _clean_values(chunk.to_numpy(dtype=object))
+
+
+def _write_table(f, name, data, regions, chunk_rows):
+    if isinstance(data, pd.DataFrame):
+        positions = region_positions(data.columns, regions)
+        columns = [ _label(c) for c in data.columns[positions] ]
+        index = data.index
+    else:
+        positions = region_positions(data.index, regions)
+        columns = [ _label(data.name) ]
+        index = data.index[positions]
+    labels = index.tolist() if index.dtype.kind in 'iu' else [_label(i) for i in index]
+    f.write('{"table": ' + json.dumps(name) + ', "columns": ' + json.dumps(columns) +
+            ', "index": ' + json.dumps(labels) + ', "data": [')
+    first = True
+    for values in _chunks(data, positions, chunk_rows):
+        if values.size:
+            values = values.reshape(len(values), -1)
+            if values.dtype == object:
+                text = json.dumps(values.tolist())
+            else:
+                # pandas' json encoder is several times faster than the json module's for numbers
+                text = pd.DataFrame(values, copy=False).to_json(orient='values', double_precision=15)
+            f.write(('' if first else ', ') + text[1:-1])
+            first = False
+    f.write(']}\n')
+
+
+def write_jsonl(obj, f, tables=None, regions=None, chunk_rows=256):
+    """Write the data function outputs of obj (a scenario or stage object) to the text file f as JSON
+    lines (see the module documentation).  tables selects the outputs to write (default all), and
+    regions the region columns of regional tables (default all).  Returns the number of outputs written."""
+    count = 0
+    for (name, data) in iter_tables(obj, tables):
+        if isinstance(data, (pd.DataFrame, pd.Series)):
+            _write_table(f, name, data, regions, chunk_rows)
+        else:
+            value = _clean_value(data) if isinstance(data, numbers.Real) else data
+            f.write(json.dumps({'table': name, 'value': value}, default=_clean_value) + '\n')
+        count += 1
+    return count
+
+
+arrow_columns = ['table', 'row', 'column', 'value']
+
+
+def long_form(name, data, regions=None, chunk_rows=4096):
+    """Yield dicts of arrays (see arrow_columns) holding the numeric values of data in long form."""
+    if isinstance(data, (bool, np.bool_, numbers.Real)):
+        yield {'table': [name], 'row': [None], 'column': [None], 'value': [_clean_value(float(data))]}
+        return
+    if not isinstance(data, (pd.DataFrame, pd.Series)):
+        return
+    if isinstance(data, pd.DataFrame):
+        positions = region_positions(data.columns, regions)
+        columns = np.array([ str(c) for c in data.columns[positions] ], dtype=object)
+        index = data.index
+    else:
+        positions = region_positions(data.index, regions)
+        columns = np.array([ str(data.name) ], dtype=object)
+        index = data.index[positions]
+    start = 0
+    for values in _chunks(data, positions, chunk_rows):
+        labels = np.array([ str(i) for i in index[start:start + len(values)] ], dtype=object)
+        start += len(values)
+        values = values.ravel()
+        if values.dtype == object:
+            values = pd.to_numeric(pd.Series(values).replace({True: 1.0, False: 0.0}), errors='coerce').to_numpy(dtype=np.float64)
+        else:
+            values = values.astype(np.float64, copy=False)
+        keep = ~np.isnan(values)
+        yield {'table': np.full(len(values), name, dtype=object)[keep],
+               'row': np.repeat(labels, len(columns))[keep],
+               'column': np.tile(columns, len(labels))[keep],
+               'value': values[keep]}
+
+
+def write_arrow(obj, sink, tables=None, regions=None, chunk_rows=4096):
+    """Write the numeric data function outputs of obj (a scenario or stage object) to sink (a filename
+    or writable binary file) as an Arrow IPC stream in long form (see the module documentation).
+    tables and regions are as for write_jsonl.  Returns the number of outputs written."""
+    import pyarrow as pa
+    schema = pa.schema([('table', pa.string()), ('row', pa.string()), ('column', pa.string()),
+                        ('value', pa.float64())])
+    count = 0
+    with pa.ipc.new_stream(str(sink) if isinstance(sink, Path) else sink, schema) as writer:
+        for (name, data) in iter_tables(obj, tables):
+            for arrays in long_form(name, data, regions, chunk_rows):
+                if len(arrays['value']):
+                    writer.write_batch(pa.record_batch([arrays[c] for c in arrow_columns], schema=schema))
+            count += 1
+    return count
+
+
+def export(obj, filename, tables=None, regions=None):
+    """Export the data function outputs of obj to filename, as Arrow IPC if it ends in '.arrow',
+    otherwise as JSON lines.  Returns the number of outputs written."""
+    filename = Path(filename)
+    if filename.suffix == '.arrow':
+        return write_arrow(obj, filename, tables=tables, regions=regions)
+    with open(filename, 'w', encoding='utf-8') as f:
+        return write_jsonl(obj, f, tables=tables, regions=regions)
@@ -0,0 +1,199 @@
+"""A linearized emulator of the FaIR runs of CO2Calcs.
+
+Each CO2Calcs runs the FaIR simple climate model over 1765-2500 for its solution: once in CO2-only
+mode, on the Drawdown CO2-eq baseline less the solution's reductions (FaIR_CFT_Drawdown_co2eq), and
+once in multi-gas mode on each of the four RCPs less the solution's CO2, CH4 and N2O reductions
+(FaIR_CFT_Drawdown_RCP*).  The solutions change the emissions of the years 2014-2060 only, by a small
+amount relative to the baseline, so the results are close to linear in the change: for each baseline
+the emulator computes once (per process) the response of every output (concentrations, forcings and
+temperature) to a pulse of emissions of each changed gas, and a scenario's results are then the
+baseline results plus the sum of the responses to the changes in each year.
+
+The response to a pulse depends a little on the year of the pulse (the carbon cycle and the forcing
+change along the baseline), so it is computed for pulses in each of anchor_years, and interpolated
+linearly for the years between.  That takes 6 FaIR runs for the CO2-eq baseline and 18 for each RCP.
+
+Error bound: over the PDS2 scenarios of all the solutions, the difference between emulated and exact
+results is less than 2% of the solution's effect (the largest difference between its exact results
+and the baseline's) for the concentrations, the CO2, CH4, N2O and total forcings and the temperature,
+which is within 1e-3 degrees; the small forcing of the other gases is within 6% of its (tiny)
+change.  This is checked by test_fair_emulator.test_all_solutions.  Emissions which change other
+years or other gases than those emulated, or which are not finite, are always run exactly.
+Emulator.batch emulates the results of many emissions at once.
+
+The mode is exact (FaIR is always run) unless emulated mode is selected, for the whole process with
+the environment variable DDFAIR=emulated, or for the current context (thread or task) with
+    with fair_emulator.mode('emulated'):
+        s.c2.FaIR_CFT_Drawdown_RCP45()
+Results already computed (and cached) by a CO2Calcs are not recomputed when the mode changes.
+"""
+
+import contextvars
+import os
+from contextlib import contextmanager
+import fair
+from fair.RCPs import rcp3pd, rcp45, rcp6, rcp85
+import numpy as np
+import model.fairutil
+from model.concurrency import shared_cache
+
+modes = ('exact', 'emulated')
+first_year = 1765
+years = range(2014, 2061)
+"""The years in which solutions change emissions."""
+anchor_years = [2014, 2024, 2034, 2044, 2054, 2060]
+"""The years of the pulses whose responses are computed."""
+
+rcps = {'rcp3': rcp3pd, 'rcp45': rcp45, 'rcp6': rcp6, 'rcp85': rcp85}
+
+# The emissions changed by solutions, and the size of the pulse used for each: for the CO2-eq
+# baseline (a single column), GtC; for the RCPs, columns FossilCO2 (GtC), CH4 (Mt) and N2O (Mt).
+_co2eq_pulses = {None: -0.5}
+_rcp_pulses = {1: -0.5, 3: -10.0, 4: -0.5}
+
+_mode = contextvars.ContextVar('fair_mode', default=None)
+
+
+def current_mode():
+    """Return 'exact' or 'emulated'."""
+    result = _mode.get() or os.environ.get('DDFAIR') or 'exact'
+    if result not in modes:
+        raise ValueError(f"Unknown FaIR mode {result}, should be one of {modes}")
+    return result
+
+
+def emulating():
+    return current_mode() == 'emulated'
+
+
+@contextmanager
+def mode(name):
+    """Use FaIR mode name ('exact' or 'emulated') within this context."""
+    if name not in modes:
+        raise ValueError(f"Unknown FaIR mode {name}, should be one of {modes}")
+    token = _mode.set(name)
+    try:
+        yield
+    finally:
+        _mode.reset(token)
+
+
+class Emulator:
+    """The linearized response of run (a function of emissions returning a tuple of arrays) around
+    baseline emissions, to changes in the pulses columns (a dict of column : pulse size; column None
+    for 1-d emissions) of the rows of years."""
+
+    def __init__(self, run, emissions, pulses):
+        self.run = run
+        self.emissions = np.array(emissions, dtype=np.float64)
+        self.emissions.flags.writeable = False
+        self.pulses = pulses
+        self.outputs = tuple(np.asarray(o, dtype=np.float64) for o in run(self.emissions))
+        n = len(self.emissions)
+        self.rows = np.array([y - first_year for y in years])
+        anchors = [y - first_year for y in anchor_years]
+        # for each row, the anchor pulses (as positions in anchors) to interpolate between, and the weight of the second
+        self._hi = np.clip(np.searchsorted(anchors, self.rows), 1, len(anchors) - 1)
+        self._weight = (self.rows - np.array(anchors)[self._hi - 1]) / np.diff(anchors)[self._hi - 1]
+        # kernels[column][output]: array of anchor x lag x ..., the response at each lag after a unit pulse
+        self.kernels = {}
+        for (column, size) in pulses.items():
+            responses = [ [] for _ in self.outputs ]
+            for row in anchors:
+                e = self.emissions.copy()
+                if column is None:
+                    e[row] += size
+                else:
+                    e[row, column] += size
+                for (i, (out, base)) in enumerate(zip(run(e), self.outputs)):
+                    response = (np.asarray(out) - base)[row:] / size
+                    pad = [(0, n - len(response))] + [(0, 0)] * (response.ndim - 1)
+                    responses[i].append(np.pad(response, pad, mode='edge'))
+            self.kernels[column] = [ np.stack(r) for r in responses ]
+        self._response_arrays = {}
+
+    def _changes(self, emissions):
+        """Return the change in emissions from the baseline in each of the pulse columns, as a dict of
+        column : change in each of self.rows, or None if other emissions are changed."""
+        emissions = np.asarray(emissions, dtype=np.float64)
+        if emissions.shape != self.emissions.shape:
+            return None
+        delta = emissions - self.emissions
+        if not np.isfinite(delta).all():
+            return None
+        outside = np.ones(delta.shape, dtype=bool)
+        if delta.ndim == 1:
+            outside[self.rows] = False
+        else:
+            outside[np.ix_(self.rows, [c for c in self.pulses])] = False
+        if delta[outside].any():
+            return None
+        return { c : (delta[self.rows] if c is None else delta[self.rows, c]) for c in self.pulses }
+
+    def __call__(self, emissions):
+        """Return the emulated results of run(emissions), or the results of run if emissions differ
+        from the baseline outside the emulated columns and rows."""
+        changes = self._changes(emissions)
+        if changes is None:
+            return self.run(emissions)
+        results = [ base.copy() for base in self.outputs ]
+        n = len(self.emissions)
+        for (column, change) in changes.items():
+            for (row, d, hi, w) in zip(self.rows, change, self._hi, self._weight):
+                if d == 0.0:
+                    continue
+                for (result, kernel) in zip(results, self.kernels[column]):
+                    result[row:] += d * ((1.0 - w) * kernel[hi - 1, :n - row] + w * kernel[hi, :n - row])
+        return tuple(results)
+
+    def _responses(self, column):
+        """Return, for each output, the response to a unit change in column in each of self.rows, as
+        an array of row x year x ... (the interpolated kernels, shifted to the row)."""
+        responses = self._response_arrays.get(column)
+        if responses is None:
+            # computed when first needed (they are large for the RCPs); two threads may both compute them
+            n = len(self.emissions)
+            responses = []
+            for kernel in self.kernels[column]:
+                r = np.zeros((len(self.rows),) + kernel.shape[1:])
+                for (j, (row, hi, w)) in enumerate(zip(self.rows, self._hi, self._weight)):
+                    r[j, row:] = (1.0 - w) * kernel[hi - 1, :n - row] + w * kernel[hi, :n - row]
+                responses.append(r)
+            self._response_arrays[column] = responses
+        return responses
+
+    def batch(self, emissions):
+        """Return the results of each of emissions (an array of runs x the shape of the baseline
+        emissions), as a tuple of arrays with a leading axis of runs.  The responses of all the runs
+        that can be emulated are summed at once, and the others are run."""
+        emissions = np.asarray(emissions, dtype=np.float64)
+        results = [ np.repeat(base[np.newaxis], len(emissions), axis=0) for base in self.outputs ]
+        changes = [ self._changes(e) for e in emissions ]
+        emulated = [ i for (i, c) in enumerate(changes) if c is not None ]
+        for (i, c) in enumerate(changes):
+            if c is None:
+                for (result, out) in zip(results, self.run(emissions[i])):
+                    result[i] = out
+        if emulated:
+            for column in self.pulses:
+                deltas = np.array([ changes[i][column] for i in emulated ])
+                for (result, response) in zip(results, self._responses(column)):
+                    result[emulated] += np.tensordot(deltas, response, axes=1)
+        return tuple(results)
+
+
+def _co2eq_run(emissions):
+    return fair.forward.fair_scm(emissions=emissions, useMultigas=False, **model.fairutil.fair_scm_kwargs())
+
+
+def _rcp_run(emissions):
+    return fair.forward.fair_scm(emissions=emissions)
+
+
+@shared_cache()
+def emulator(baseline):
+    """Return the Emulator of baseline: 'co2eq' (the Drawdown CO2-eq baseline, run in CO2-only mode) or
+    one of rcps (run in multi-gas mode)."""
+    if baseline == 'co2eq':
+        return Emulator(_co2eq_run, model.fairutil.baseline_emissions().values, _co2eq_pulses)
+    return Emulator(_rcp_run, rcps[baseline].Emissions.emissions, _rcp_pulses)
@@ -9,6 +9,8 @@ import fair.RCPs.rcp60
 import fair.RCPs.rcp85
 import numpy as np
 import pandas as pd
+from model import datafiles
+from model.concurrency import shared_cache
 
 
 topdir = pathlib.Path(__file__).parents[1]
@@ -65,6 +67,7 @@ ghg = {
 }
 
 
+@shared_cache()
 def baseline_emissions():
     """Return emissions to use as a baseline for Drawdown solutions."""
     rcp = pd.DataFrame(fair.RCPs.rcp45.Emissions.emissions.copy(), columns=ghg.keys(),
@@ -118,7 +121,7 @@ def baseline_emissions():
             ) / CO2_MULT)
     baseline.index = baseline.index.astype(int)
     baseline.index.name = 'Year'
-    ddCO2 = pd.read_csv(str(baselineCO2_path), header=0, index_col=0, skipinitialspace=True,
+    ddCO2 = datafiles.read_csv(baselineCO2_path, header=0, index_col=0, skipinitialspace=True,
             skip_blank_lines=True, comment='#', squeeze=True)
     ddCO2.index = ddCO2.index.astype(int)
     baseline.update(ddCO2 / CO2_MULT)
@@ -130,7 +130,7 @@ class FirstCost(DataHandler):
         # The model postulates that conventional technologies decrease
         # in cost only slowly, and never increase in cost. We walk back
         # through the array comparing each year to the previous year.
-        step2 = step1.rolling(2).apply(lambda x: min(x[0], x[1]), raw=True)
+        step2 = np.minimum(step1.shift(1), step1)
         first = step1.first_valid_index()
         step2.loc[first] = step1.loc[first]  # no min() for first item
 
@@ -9,6 +9,7 @@ from functools import lru_cache
 import pandas as pd
 import numpy as np
 import model.dd as dd
+from model.decorators import data_func
 
 
 class HelperTables:
@@ -129,6 +130,7 @@ class HelperTables:
 
 
     @lru_cache()
+    @data_func
     def soln_ref_funits_adopted(self, suppress_override=False):
         """Cumulative Adoption in funits, interpolated between two ref_datapoints.
 
@@ -220,6 +222,7 @@ class HelperTables:
         return adoption
 
     @lru_cache()
+    @data_func
     def soln_pds_funits_adopted(self, suppress_override=False):
         """Cumulative Adoption in funits in the PDS.
 
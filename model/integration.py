@@ -3,21 +3,86 @@
 # we first attempt to use the integration version of a thing, and fall back to the regular
 # thing instead.  This way we can update data, and share updated data, before committing
 # to a final result.
+#
+# The integration versions of files may either be written to disk (the default), or kept in
+# an in-memory overlay (see overlay_start below).  With the overlay, a multi-step integration
+# can run end-to-end in a single python process: readers consult the overlay before the disk,
+# and any cached model objects built from an overwritten file are evicted.
+#
+# The integration in process is normally the one named by the DDINTEGRATE environment variable,
+# which applies to the whole process (and to the worker processes it starts).  Code running in
+# the context of mode(...) instead uses the Integration given there, which applies only to that
+# context: other threads may meanwhile evaluate scenarios outside the integration, or in another.
 
 import os
+import io
+import fnmatch
+import contextvars
+from contextlib import contextmanager
 from pathlib import Path
+from model import metaclass_cache
+
+
+class Integration:
+    """An integration in process.
+         suffix: the suffix of the names of the integration versions of things (None for the
+           process-wide integration: the value of the DDINTEGRATE environment variable, if set).
+         in_memory: if True, the integration versions of files are kept in memory, in overlay.
+    """
+
+    def __init__(self, suffix=None, in_memory=False):
+        self._suffix = suffix
+        self.overlay = {} if in_memory else None
+        """A dict mapping normalized file paths to file contents (text) while the integration's
+        files are kept in memory; None otherwise."""
+
+    @property
+    def suffix(self):
+        return os.environ.get("DDINTEGRATE") if self._suffix is None else self._suffix
+
+
+_process_integration = Integration()
+_context = contextvars.ContextVar('integration', default=None)
+
+
+def current():
+    """Return the Integration of the current context (that of mode(...), if running within it,
+    otherwise the process-wide integration)."""
+    return _context.get() or _process_integration
+
+
+@contextmanager
+def mode(suffix, in_memory=False):
+    """Run the code within this context as part of integration suffix, without affecting other threads
+    or the environment.  If in_memory, the integration's files are kept in memory (and discarded at
+    the end of the context, unless overlay_flush is called).  Model objects constructed within the
+    context are cached apart from all others, and are evicted at its end.
+
+        with integration.mode('myint', in_memory=True) as i:
+            ...
+    """
+    i = Integration(suffix, in_memory=in_memory)
+    token = _context.set(i)
+    scope_token = metaclass_cache.scope.set(i)
+    try:
+        yield i
+    finally:
+        metaclass_cache.scope.reset(scope_token)
+        _context.reset(token)
+        metaclass_cache.evict_scope(i)
 
 
 def integration_alt_file(filename):
     """If we are doing an integration, return the integration version of this file name.
     If we are not doing an integration, returns the filename unchanged."""
     filename = Path(filename)
-    if "DDINTEGRATE" in os.environ:
-        if filename.stem.endswith("_" + os.environ["DDINTEGRATE"]):
+    suffix = current().suffix
+    if suffix:
+        if filename.stem.endswith("_" + suffix):
             # it's already there, return as is
             return filename
         # else add it.
-        return filename.with_stem(filename.stem + "_" + os.environ["DDINTEGRATE"])
+        return filename.with_stem(filename.stem + "_" + suffix)
     # not an integration, don't make an alternate.
     return filename
 
@@ -25,22 +90,143 @@ def integration_alt_file(filename):
 def integration_alt_name(name):
     """If we are doing an integration, return the integration version of this  name.
     If we are not doing an integration, returns the name unchanged."""
-    if "DDINTEGRATE" in os.environ and not (name.endswith("_" + os.environ["DDINTEGRATE"])):
-        return name + "_" + os.environ["DDINTEGRATE"]
+    suffix = current().suffix
+    if suffix and not (name.endswith("_" + suffix)):
+        return name + "_" + suffix
     return name
 
 
 def integration_clean():
     """Remove any integration files for the currently operating integration"""
-    if "DDINTEGRATE" in os.environ:  
-        integration_suffix = os["DDINTEGRATE"]  
+    overlay_stop()
+    integration_suffix = current().suffix
+    if integration_suffix:
         # We restrict our search to certain folders because using '**' on the git
         # directory takes a ___long___ time
         root = Path(__file__).parents[1]
-        for f in (root/['solution']).glob(f'**/*_{integration_suffix}.*'):
+        for f in (root/'solution').glob(f'**/*_{integration_suffix}.*'):
             f.unlink()
         for f in (root/'data').glob(f'**/*_{integration_suffix}.*'):
             f.unlink()
         for f in (root/'integrations').glob(f'**/*_{integration_suffix}.*'):
             f.unlink()
 
+
+# #######################################################################################################
+#
+# In-memory overlay
+
+def _overlay():
+    """The overlay of the current integration: a dict mapping normalized file paths to file contents
+    (text) when its files are kept in memory, None otherwise."""
+    return current().overlay
+
+
+def _key(filename):
+    return os.path.normpath(os.path.abspath(str(filename)))
+
+
+def overlay_start():
+    """Start keeping integration files in memory instead of writing them to disk.
+    Has no effect if the overlay is already running."""
+    i = current()
+    if i.overlay is None:
+        i.overlay = {}
+
+
+def overlay_active():
+    """Return True if integration files are currently kept in memory."""
+    return _overlay() is not None
+
+
+def overlay_stop(flush=False):
+    """Stop the in-memory overlay, discarding its contents (or first writing them to disk, if flush is True).
+    Cached model objects built from overlay files are evicted."""
+    i = current()
+    if i.overlay is None:
+        return
+    if flush:
+        overlay_flush()
+    keys = list(i.overlay.keys())
+    i.overlay = None
+    for k in keys:
+        _invalidate(k)
+
+
+def overlay_flush():
+    """Write all the files in the overlay to disk.  The overlay itself is left unchanged."""
+    for (k, text) in (_overlay() or {}).items():
+        Path(k).parent.mkdir(parents=True, exist_ok=True)
+        Path(k).write_text(text, encoding='utf-8')
+
+
+def overlay_files(directory, pattern='*'):
+    """Return the paths of the overlay files in directory that match the glob pattern."""
+    overlay = _overlay()
+    if overlay is None:
+        return []
+    d = _key(directory)
+    return [Path(k) for k in overlay.keys() if os.path.dirname(k) == d and fnmatch.fnmatch(os.path.basename(k), pattern)]
+
+
+def overlay_contents(directory):
+    """Return a dict of path to text for all the overlay files anywhere within directory."""
+    overlay = _overlay()
+    if overlay is None:
+        return {}
+    d = _key(directory) + os.sep
+    return { k : text for (k, text) in overlay.items() if k.startswith(d) }
+
+
+def _invalidate(key):
+    """Evict any cached model objects that were constructed from the file with this key."""
+    def references(item):
+        if isinstance(item, (str, Path)):
+            return os.path.isabs(str(item)) and _key(item) == key
+        if isinstance(item, dict):
+            return any(references(v) for v in item.values())
+        if isinstance(item, (list, tuple)):
+            return any(references(v) for v in item)
+        return False
+    metaclass_cache.evict(lambda args, kwargs: references(args) or references(kwargs))
+
+
+# Readers and writers.  Model code that reads or writes a file which may be updated by an integration
+# should use these instead of accessing the disk directly.
+
+def file_exists(filename):
+    """Return True if filename exists in the overlay or on disk."""
+    overlay = _overlay()
+    return (overlay is not None and _key(filename) in overlay) or Path(filename).is_file()
+
+
+def read_text(filename):
+    """Return the contents of filename, from the overlay if present there, otherwise from disk."""
+    overlay = _overlay()
+    if overlay is not None and _key(filename) in overlay:
+        return overlay[_key(filename)]
+    return Path(filename).read_text(encoding='utf-8')
+
+
+def write_text(filename, text):
+    """Write text to filename, in the overlay if it is running, otherwise on disk."""
+    overlay = _overlay()
+    if overlay is None:
+        Path(filename).write_text(text, encoding='utf-8')
+    else:
+        overlay[_key(filename)] = text
+    _invalidate(_key(filename))
+
+
+def write_csv(df, filename):
+    """Write a dataframe as csv to filename, in the overlay if it is running, otherwise on disk."""
+    write_text(filename, df.to_csv())
+
+
+def data_source(filename):
+    """Return an argument suitable for pd.read_csv: an in-memory buffer if filename is in the
+    overlay, otherwise filename itself."""
+    overlay = _overlay()
+    if overlay is not None and _key(filename) in overlay:
+        return io.StringIO(overlay[_key(filename)])
+    return filename
@@ -5,10 +5,30 @@ Passing in the same arguments will return the same object, shared by all callers
 This is especially useful for objects with expensive methods which are decorated
 @lru_cache, like TAM.py. Sharing a single object means when any of them have warmed
 the cache, all solutions benefit.
+
+The cache may be used by several threads at once: an object is constructed by one thread only, and
+any other thread asking for it meanwhile waits for it.
+
+A class may define a static method cache_key_args(*args, **kwargs), returning the (args, kwargs) to
+key its instances by in place of the constructor arguments, when it depends on only part of some of
+them (as AdoptionData does on its AdvancedControls).
+
+Objects constructed while scope is set (as it is within model.integration.mode) are cached apart
+from all others, so that objects built from one integration's files are not seen outside it.
 """
 
+import contextvars
+import threading
 import pandas as pd
 import json
+from model.concurrency import KeyedLocks
+
+_lock = threading.Lock()
+_constructing = KeyedLocks()
+_scopes = {}    # key : scope, of the objects constructed in a scope
+
+scope = contextvars.ContextVar('metaclass_cache_scope', default=None)
+"""A hashable object identifying the cache scope of the current context, or None."""
 
 # pylint is confused by the __call__ syntax
 # pylint: disable=no-value-for-parameter
@@ -16,6 +36,7 @@ import json
 class MetaclassCache(type):
 
     cache = {}
+    cache_args = {}
 
     def hash_item(self, item):
         if isinstance(item, pd.DataFrame) or isinstance(item, pd.Series):
@@ -42,15 +63,61 @@ class MetaclassCache(type):
 
 
     def __call__(self, *args, **kwargs):
+        (key_args, key_kwargs) = (self.cache_key_args(*args, **kwargs) if hasattr(self, 'cache_key_args')
+                                  else (args, kwargs))
         key = self.hash_item(self)
-        for arg in args:
+        for arg in key_args:
             key = (key << 64) ^ self.hash_item(arg)
-        for arg in sorted(kwargs.keys()):
+        for arg in sorted(key_kwargs.keys()):
             key = (key << 64) ^ self.hash_item(arg)
-            key = (key << 64) ^ self.hash_item(kwargs[arg])
+            key = (key << 64) ^ self.hash_item(key_kwargs[arg])
+        current_scope = scope.get()
+        if current_scope is not None:
+            key = (key << 64) ^ hash(current_scope)
         try:
             return self.cache[key]
         except KeyError:
-            instance = type.__call__(self, *args, **kwargs)
-            self.cache[key] = instance
-            return instance
+            pass
+        with _constructing.hold(key):
+            try:
+                return self.cache[key]
+            except KeyError:
+                instance = type.__call__(self, *args, **kwargs)
+                with _lock:
+                    self.cache[key] = instance
+                    self.cache_args[key] = (args, kwargs)
+                    if current_scope is not None:
+                        _scopes[key] = current_scope
+                return instance
+
+
+def evict(predicate):
+    """Remove cached instances (of any class) whose constructor arguments match.
+    predicate is called as predicate(args, kwargs) for each cached instance.
+    Returns the number of instances removed."""
+    with _lock:
+        keys = [k for (k, (args, kwargs)) in MetaclassCache.cache_args.items() if predicate(args, kwargs)]
+        for k in keys:
+            MetaclassCache.cache.pop(k, None)
+            MetaclassCache.cache_args.pop(k, None)
+            _scopes.pop(k, None)
+    return len(keys)
+
+
+def evict_scope(s):
+    """Remove the cached instances constructed in scope s.  Returns the number of instances removed."""
+    with _lock:
+        keys = [k for (k, v) in _scopes.items() if v is s]
+        for k in keys:
+            MetaclassCache.cache.pop(k, None)
+            MetaclassCache.cache_args.pop(k, None)
+            del _scopes[k]
+    return len(keys)
+
+
+def clear():
+    """Remove all cached instances (of any class)."""
+    with _lock:
+        MetaclassCache.cache.clear()
+        MetaclassCache.cache_args.clear()
+        _scopes.clear()
@@ -0,0 +1,167 @@
+"""Atmospheric concentrations and radiative forcing of the emissions reductions of several gases
+and solutions at once.
+
+The model's simplified atmospheric calculations treat each year's reduction of a gas in 2015-2060 as
+a discrete avoided pulse, decaying with the lifetime function of the gas from Myhrvald and Caldeira
+(2012).  The pulses remaining in each year are summed and converted to a concentration (from the
+molar mass of the gas and the moles of atmosphere), and the concentrations of CO2 and CH4 to
+radiative forcing and to the CO2 concentration of the same total forcing, 'CO2-eq PPM'.  These are
+the tables CO2Calcs.co2_ppm_calculator, CH4Calcs.ch4_ppb_calculator and
+CO2Calcs.co2eq_ppm_calculator, which compute them with the functions here, one solution at a time;
+calculate() does all of it for an array of emissions of gas x solution x year at once:
+
+    result = multigas.calculate(emissions, years)     # emissions[0]: CO2, emissions[1]: CH4
+    result.concentrations      # gas x solution x year: CO2 PPM, CH4 PPB
+    result.forcing             # gas x solution x year: CO2 RF, CH4 RF
+    result.co2eq_ppm           # solution x year
+
+and scenario_emissions() stacks the emissions of Scenarios in the form calculate() takes.
+
+The model has no concentration calculation for N2O (its reductions only go to FaIR, in megatons), so
+the gases are CO2 and CH4.
+"""
+
+from collections import namedtuple
+import math
+import numpy as np
+import pandas as pd
+
+gases = ('CO2', 'CH4')
+pulse_years = np.arange(2015, 2061)
+"""The years whose reductions are modeled as pulses."""
+
+original_co2 = 400
+original_ch4 = 1800
+original_n2o = 320
+
+Result = namedtuple('Result', ['pulses', 'totals', 'concentrations', 'forcing', 'co2eq_ppm'])
+Result.__doc__ = """The results of calculate(), for the gases x solutions x years given to it:
+     pulses: gas x solution x year x pulse year, the part of the pulse of each of pulse_years
+       remaining in each year.
+     totals: gas x solution x year, the sum of the pulses remaining.
+     concentrations: gas x solution x year, PPM of CO2 and PPB of CH4.
+     forcing: gas x solution x year, radiative forcing in watts per square meter.
+     co2eq_ppm: solution x year, the PPM of CO2 with the total forcing."""
+
+
+def _co2_remaining(delta):
+    val = 0.217
+    val += 0.259 * math.exp(-delta / 172.9)
+    val += 0.338 * math.exp(-delta / 18.51)
+    val += 0.186 * math.exp(-delta / 1.186)
+    return val
+
+
+def remaining(gas, deltas):
+    """The fraction of a pulse of gas remaining deltas years after the year before it (so that
+       deltas of 1 is the year of the pulse), for an integer array of deltas >= 1."""
+    if gas == 'CO2':
+        deltas = np.asarray(deltas)
+        lookup = np.array([ _co2_remaining(delta) for delta in range(deltas.max(initial=0) + 1) ])
+        return lookup[deltas]
+    if gas == 'CH4':
+        return np.exp(-deltas / 12)
+    raise ValueError(f"Unknown gas {gas}, should be one of {gases}")
+
+
+# Amounts of each gas (MMT of CO2, tons of CH4) per unit of concentration.
+per_unit = {
+    'CO2': 44.01 * 1.8 * 100,
+    'CH4': 16.04 * 1.8 * 10 ** 5,
+}
+
+
+def pulses(gas, emissions, years):
+    """Return the pulses of gas remaining in years (array of year x pulse year, or with the leading
+       axes of emissions), for emissions (array of ... x year) in years."""
+    years = np.asarray(years)
+    emissions = np.asarray(emissions, dtype=np.float64)
+    (rows, cols) = (np.searchsorted(years, pulse_years), np.isin(pulse_years, years))
+    # the emissions of each pulse year (0 for those not in years)
+    amounts = np.zeros(emissions.shape[:-1] + (len(pulse_years),))
+    amounts[..., cols] = emissions[..., rows[cols]]
+    deltas = years.reshape(-1, 1) - pulse_years.reshape(1, -1) + 1
+    values = remaining(gas, np.maximum(deltas, 1)) * amounts[..., np.newaxis, :]
+    values[..., deltas < 1] = 0
+    return values
+
+
+def totals(gas, pulses):
+    """Return the sum of pulses (array of ... x pulse year) of gas remaining in each year.
+
+       The sums are in the order the tables of the gas have always used, so that they match to the
+       last bit: pairwise over the pulse years, after two zeros for CO2 (the PPM and Total columns of
+       its table, which were still 0 when its rows were summed)."""
+    if gas == 'CO2':
+        pad = [(0, 0)] * (pulses.ndim - 1) + [(2, 0)]
+        return np.pad(pulses, pad).sum(axis=-1)
+    return pulses.sum(axis=-1)
+
+
+def _elementwise(f, nin=1):
+    """f, a function of floats from math, as a function of arrays (or Series) broadcast together.
+       numpy's own vectorized log, exp and power can differ from the C library's in the last bit,
+       which the cancellation in ch4_forcing magnifies; the tables have always used math's."""
+    ufunc = np.frompyfunc(f, nin, 1)
+    def apply(*args):
+        result = ufunc(*args)
+        return result.astype(np.float64) if hasattr(result, 'astype') else float(result)
+    return apply
+
+_log = _elementwise(math.log)
+_exp = _elementwise(math.exp)
+_pow = _elementwise(math.pow, 2)
+
+
+# The following formulae come from the SolarPVUtil Excel implementation of 27Aug18.
+# There was no explanation of where they came from or what they really mean.
+
+def co2_forcing(ppm):
+    """Radiative forcing of ppm of CO2 added to original_co2."""
+    return 5.35 * _log((original_co2 + ppm) / original_co2)
+
+
+def _overlap(M, N):
+    return 0.47 * _log(
+        1 + 2.01 * 10 ** -5 * _pow(M * N, 0.75) + 5.31 * 10 ** -15 * M * _pow(M * N, 1.52))
+
+
+def ch4_forcing(ppb):
+    """Radiative forcing of ppb of CH4 added to original_ch4, including its indirect forcing."""
+    indirect_ch4_forcing_scalar = 0.97 / 0.641
+    old_M = original_ch4
+    new_M = original_ch4 + ppb
+    N = original_n2o
+    return (indirect_ch4_forcing_scalar * 0.036 * (_pow(new_M, 0.5) - old_M ** 0.5) -
+            _overlap(new_M, N) + _overlap(old_M, N))
+
+
+def co2eq_ppm(forcing):
+    """The ppm of CO2, added to original_co2, with radiative forcing."""
+    return (original_co2 * _exp(forcing / 5.35)) - original_co2
+
+
+def calculate(emissions, years):
+    """Return the Result for emissions (array of gas x solution x year: MMT of CO2 or CO2-eq, and
+       tons of CH4 or CH4 CO2-eq) in years."""
+    emissions = np.asarray(emissions, dtype=np.float64)
+    if len(emissions) != len(gases):
+        raise ValueError(f"emissions must have a first axis of {gases}")
+    p = np.stack([ pulses(gas, e, years) for (gas, e) in zip(gases, emissions) ])
+    t = np.stack([ totals(gas, values) for (gas, values) in zip(gases, p) ])
+    concentrations = np.stack([ total / per_unit[gas] for (gas, total) in zip(gases, t) ])
+    forcing = np.stack([co2_forcing(concentrations[0]), ch4_forcing(concentrations[1])])
+    return Result(p, t, concentrations, forcing, co2eq_ppm(forcing[0] + forcing[1]))
+
+
+def scenario_emissions(scenarios):
+    """Return (emissions, years) for calculate() from the World emissions reductions of each of
+       scenarios, as used by their co2_ppm_calculator and ch4_ppb_calculator."""
+    series = [ (s.c2.co2_ppm_emissions(), s.c4.ch4_ppb_emissions()) for s in scenarios ]
+    years = pd.Index([], dtype=int)
+    for pair in series:
+        for e in pair:
+            years = years.union(e.index.astype(int))
+    emissions = np.array([ [ e.reindex(years, fill_value=0.0).to_numpy(dtype=np.float64) for e in pair ]
+                           for pair in series ])
+    return (emissions.swapaxes(0, 1), years.to_numpy())
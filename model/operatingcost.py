@@ -7,6 +7,7 @@ from io import StringIO
 
 import model.dd as dd
 from model.advanced_controls import SOLUTION_CATEGORY
+from model.concurrency import shared_cache
 import numpy as np
 import numpy_financial
 import pandas as pd
@@ -16,7 +17,70 @@ import model
 from model.data_handler import DataHandler
 from model.decorators import data_func
 
-@lru_cache
+def annual_breakout_array(new_funits_per_year, new_annual_iunits_reqd, lifetime_replacement,
+                           var_oper_cost_per_funit, fuel_cost_per_funit, fixed_oper_cost_per_iunit,
+                           report_end_year, has_var_costs, conversion_factor_vom, conversion_factor_fom):
+    """Breakout of operating cost per year for a number of scenarios at once.
+       new_funits_per_year and new_annual_iunits_reqd are arrays (scenario x year) for the years
+       CORE_START_YEAR:report_end_year; the other arguments are arrays (or scalars) with one value
+       per scenario.  Returns an array (scenario x row x column), where rows are the years
+       CORE_START_YEAR:2139 and columns the years CORE_START_YEAR:CORE_END_YEAR, as in annual_breakout.
+    """
+    first_year = dd.CORE_START_YEAR
+    last_year = report_end_year
+    last_column = dd.CORE_END_YEAR
+    last_row = 2139
+    new_funits_per_year = np.atleast_2d(np.asarray(new_funits_per_year, dtype='float'))
+    new_annual_iunits_reqd = np.atleast_2d(np.asarray(new_annual_iunits_reqd, dtype='float'))
+    nscenarios = new_funits_per_year.shape[0]
+    (lifetime_replacement, var_oper_cost_per_funit, fuel_cost_per_funit, fixed_oper_cost_per_iunit,
+            has_var_costs, conversion_factor_vom, conversion_factor_fom) = [
+        list(x) if np.ndim(x) else [x] * nscenarios for x in (lifetime_replacement,
+            var_oper_cost_per_funit, fuel_cost_per_funit, fixed_oper_cost_per_iunit, has_var_costs,
+            conversion_factor_vom, conversion_factor_fom)]
+    nrows = last_row + 1 - first_year
+    years = np.arange(first_year, last_year + 1)
+    breakout = np.zeros((nscenarios, nrows, last_column + 1 - first_year))
+
+    # if there are no operating costs the scenario gets a table of 0s
+    active = np.array([ bool(h) or bool(f) for (h, f) in zip(has_var_costs, fixed_oper_cost_per_iunit) ])
+    if not active.any():
+        return breakout
+    assert all(lr != 0 for (lr, a) in zip(lifetime_replacement, active) if a), \
+            'Cannot have a lifetime replacement of 0 and non-zero operating costs'
+    cost = np.array([ (v + f if h else 0) if a else 0 for (v, f, h, a) in
+                      zip(var_oper_cost_per_funit, fuel_cost_per_funit, has_var_costs, active) ], dtype='float')
+    fixed = np.array([ f if a else 0 for (f, a) in zip(fixed_oper_cost_per_iunit, active) ], dtype='float')
+    vom = np.array(conversion_factor_vom, dtype='float')
+    fom = np.array(conversion_factor_fom, dtype='float')
+
+    # within the years of interest, assume replacement of worn out equipment.  Lifetimes are
+    # extended by repeated addition, exactly as the spreadsheet does.
+    lifetime = np.zeros((nscenarios, len(years)))
+    for s in np.flatnonzero(active):
+        for (i, year) in enumerate(years):
+            value = lifetime_replacement[s]
+            while math.ceil(value) < (last_year + 1 - year):
+                value += lifetime_replacement[s]
+            lifetime[s, i] = value
+
+    total = new_funits_per_year * cost[:, None] * vom[:, None]
+    total += new_annual_iunits_reqd * fixed[:, None] * fom[:, None]
+
+    # for each year, add in operating costs for equipment purchased in that starting year through
+    # the year where it wears out.  The remaining lifetime k years on is lifetime - k, which is exact
+    # (and equal to decrementing by 1 k times) while it is at least 1.
+    k = np.arange(nrows)
+    for (i, year) in enumerate(years):
+        remaining_lifetime = np.clip(lifetime[:, i, None] - k[None, :nrows - i], 0, 1)
+        with np.errstate(invalid='ignore'):
+            val = total[:, i, None] * remaining_lifetime
+        val = np.where(np.abs(val) > 0.01, val, 0.0)
+        breakout[:, i:, year - first_year] = np.where(active[:, None], val, 0.0)
+    return breakout
+
+
+@shared_cache
 def annual_breakout(
     new_funits_per_year, 
     new_annual_iunits_reqd,
@@ -28,52 +92,33 @@ def annual_breakout(
     has_var_costs,
     conversion_factor_vom,
     conversion_factor_fom):
-
+    """Breakout of operating cost per year, including replacements.
+        Supplies calculations for:
+        SolarPVUtil 'Operating Cost'!B262:AV386 for soln_pds
+        SolarPVUtil 'Operating Cost'!B399:AV523 for conv_ref
+    """
     # index_col = year
     # squeeze -> pd.Dataframe to pd.Series
     # round_trip retains float precision
     new_funits_per_year = pd.read_csv(StringIO(new_funits_per_year), index_col=0, squeeze=True, float_precision='round_trip')
     new_annual_iunits_reqd = pd.read_csv(StringIO(new_annual_iunits_reqd), index_col=0,  squeeze=True, float_precision='round_trip')
 
-    """Breakout of operating cost per year, including replacements.
-        Supplies calculations for:
-        SolarPVUtil 'Operating Cost'!B262:AV386 for soln_pds
-        SolarPVUtil 'Operating Cost'!B399:AV523 for conv_ref
-    """
     first_year = dd.CORE_START_YEAR
-    last_year = report_end_year
-    last_column = dd.CORE_END_YEAR
     last_row = 2139
-    breakout = pd.DataFrame(0, index=np.arange(first_year, last_row + 1),
-                            columns=np.arange(first_year, last_column + 1), dtype='float')
+    years = list(range(first_year, report_end_year + 1))
+    if has_var_costs or fixed_oper_cost_per_iunit:
+        values = annual_breakout_array(
+            new_funits_per_year.loc[years].to_numpy(dtype='float')[None, :],
+            new_annual_iunits_reqd.loc[years].to_numpy(dtype='float')[None, :],
+            lifetime_replacement, var_oper_cost_per_funit, fuel_cost_per_funit,
+            fixed_oper_cost_per_iunit, report_end_year, has_var_costs, conversion_factor_vom,
+            conversion_factor_fom)[0]
+    else:
+        values = 0
+    breakout = pd.DataFrame(values, index=np.arange(first_year, last_row + 1),
+                            columns=np.arange(first_year, dd.CORE_END_YEAR + 1), dtype='float')
     breakout.index.name = 'Year'
     breakout.index = breakout.index.astype(int)
-
-    # if there are no operating costs we return a table of 0s
-    if not has_var_costs and not fixed_oper_cost_per_iunit:
-        return breakout
-
-    for year in range(first_year, last_year + 1):
-        # within the years of interest, assume replacement of worn out equipment.
-        lifetime = lifetime_replacement
-        assert lifetime_replacement != 0, 'Cannot have a lifetime replacement of 0 and non-zero operating costs'
-        while math.ceil(lifetime) < (last_year + 1 - year):
-            lifetime += lifetime_replacement
-
-        cost = var_oper_cost_per_funit + fuel_cost_per_funit if has_var_costs else 0
-        total = new_funits_per_year.loc[year] * cost * conversion_factor_vom
-        cost = fixed_oper_cost_per_iunit
-        total += new_annual_iunits_reqd.loc[year] * cost * conversion_factor_fom
-
-        # for each year, add in operating costs for equipment purchased in that
-        # starting year through the year where it wears out.
-        for row in range(year, last_row + 1):
-            remaining_lifetime = np.clip(lifetime, 0, 1)
-            val = total * remaining_lifetime
-            breakout.loc[row, year] = val if math.fabs(val) > 0.01 else 0.0
-            lifetime -= 1
-            if lifetime <= 0:
-                break
     return breakout
 
 class OperatingCost(DataHandler):
@@ -228,6 +273,13 @@ class OperatingCost(DataHandler):
            Fixed and Variable costs that are constant or changing over time are included.
            SolarPVUtil 'Operating Cost'!B262:AV386
         """
+        result = self._annual_breakout(**self.soln_pds_annual_breakout_args())
+        result.name = 'soln_pds_annual_breakout'
+        return result
+
+
+    def soln_pds_annual_breakout_args(self):
+        """The arguments of the operating cost breakout for Solution-PDS (see annual_breakout)."""
         if (self.ac.solution_category == SOLUTION_CATEGORY.LAND or
                 self.ac.solution_category == SOLUTION_CATEGORY.OCEAN):
             new_land_units_per_year = self.soln_pds_new_funits_per_year().loc[:, 'World']
@@ -236,16 +288,12 @@ class OperatingCost(DataHandler):
         else:
             new_funits_per_year = self.soln_pds_new_funits_per_year().loc[:, 'World']
             new_annual_iunits_reqd = self.soln_pds_new_annual_iunits_reqd().loc[:, 'World']
-
-        result = self._annual_breakout(
-            new_funits_per_year=new_funits_per_year,
-            new_annual_iunits_reqd=new_annual_iunits_reqd,
-            lifetime_replacement=self.ac.soln_lifetime_replacement,
-            var_oper_cost_per_funit=self.ac.soln_var_oper_cost_per_funit,
-            fuel_cost_per_funit=self.ac.soln_fuel_cost_per_funit,
-            fixed_oper_cost_per_iunit=self.ac.soln_fixed_oper_cost_per_iunit)
-        result.name = 'soln_pds_annual_breakout'
-        return result
+        return dict(new_funits_per_year=new_funits_per_year,
+                    new_annual_iunits_reqd=new_annual_iunits_reqd,
+                    lifetime_replacement=self.ac.soln_lifetime_replacement,
+                    var_oper_cost_per_funit=self.ac.soln_var_oper_cost_per_funit,
+                    fuel_cost_per_funit=self.ac.soln_fuel_cost_per_funit,
+                    fixed_oper_cost_per_iunit=self.ac.soln_fixed_oper_cost_per_iunit)
 
 
     @lru_cache()
@@ -274,6 +322,13 @@ class OperatingCost(DataHandler):
            Fixed and Variable costs that are constant or changing over time are included.
            SolarPVUtil 'Operating Cost'!B399:AV523
         """
+        result = self._annual_breakout(**self.conv_ref_annual_breakout_args())
+        result.name = 'conv_ref_annual_breakout'
+        return result
+
+
+    def conv_ref_annual_breakout_args(self):
+        """The arguments of the operating cost breakout for Conventional-REF (see annual_breakout)."""
         if (self.ac.solution_category == SOLUTION_CATEGORY.LAND or
                 self.ac.solution_category == SOLUTION_CATEGORY.OCEAN):
             new_land_units_per_year = self.soln_pds_new_funits_per_year().loc[:, 'World']
@@ -282,16 +337,12 @@ class OperatingCost(DataHandler):
         else:
             new_funits_per_year = self.soln_pds_new_funits_per_year().loc[:, 'World']
             new_annual_iunits_reqd = self.conv_ref_new_annual_iunits_reqd().loc[:, 'World']
-
-        result = self._annual_breakout(
-            new_funits_per_year=new_funits_per_year,
-            new_annual_iunits_reqd=new_annual_iunits_reqd,
-            lifetime_replacement=self.ac.soln_lifetime_replacement,
-            var_oper_cost_per_funit=self.ac.conv_var_oper_cost_per_funit,
-            fuel_cost_per_funit=self.ac.conv_fuel_cost_per_funit,
-            fixed_oper_cost_per_iunit=self.ac.conv_fixed_oper_cost_per_iunit)
-        result.name = 'conv_ref_annual_breakout'
-        return result
+        return dict(new_funits_per_year=new_funits_per_year,
+                    new_annual_iunits_reqd=new_annual_iunits_reqd,
+                    lifetime_replacement=self.ac.soln_lifetime_replacement,
+                    var_oper_cost_per_funit=self.ac.conv_var_oper_cost_per_funit,
+                    fuel_cost_per_funit=self.ac.conv_fuel_cost_per_funit,
+                    fixed_oper_cost_per_iunit=self.ac.conv_fixed_oper_cost_per_iunit)
 
 
     @lru_cache()
@@ -393,10 +444,7 @@ class OperatingCost(DataHandler):
         last_year = max(dd.CORE_END_YEAR,
                 dd.CORE_START_YEAR + self.ac.soln_lifetime_replacement_rounded)
         last_row = 2139
-        result = pd.Series(0, index=np.arange(first_year, last_row+ 1), dtype='float')
-        result.index.name = 'Year'
-        result.index = result.index.astype(int)
-        result.name = 'soln_vs_conv_single_iunit_cashflow'
+        values = np.zeros(last_row + 1 - first_year)
 
         soln_lifetime = self.ac.soln_lifetime_replacement
         if self.ac.soln_avg_annual_use is not None and self.ac.conv_avg_annual_use is not None:
@@ -440,14 +488,17 @@ class OperatingCost(DataHandler):
             # account for a partial year at the end of the lifetime.
             cost *= min(1, soln_lifetime)
             if self.ac.conv_lifetime_replacement is None or self.ac.conv_lifetime_replacement == 0:
-                result[year] = np.nan
+                values[year - first_year] = np.nan
             elif math.fabs(cost) < 0.01:
-                result[year] = 0.0
+                values[year - first_year] = 0.0
             else:
-                result[year] = cost
+                values[year - first_year] = cost
 
             soln_lifetime -= 1
 
+        result = pd.Series(values, index=np.arange(first_year, last_row + 1, dtype=int),
+                           name='soln_vs_conv_single_iunit_cashflow')
+        result.index.name = 'Year'
         return result
 
 
@@ -504,10 +555,7 @@ class OperatingCost(DataHandler):
         last_year = max(dd.CORE_END_YEAR,
                 dd.CORE_START_YEAR + self.ac.soln_lifetime_replacement_rounded)
         last_row = 2139
-        result = pd.Series(0, index=np.arange(first_year, last_row + 1), dtype='float')
-        result.index.name = 'Year'
-        result.index = result.index.astype(int)
-        result.name = 'soln_only_single_iunit_cashflow'
+        values = np.zeros(last_row + 1 - first_year)
 
         soln_lifetime = self.ac.soln_lifetime_replacement
         if self.ac.soln_avg_annual_use is not None and self.ac.conv_avg_annual_use is not None:
@@ -537,9 +585,12 @@ class OperatingCost(DataHandler):
 
             # account for a partial year at the end of the lifetime.
             cost *= min(1, soln_lifetime)
-            result[year] = cost if math.fabs(cost) > 0.01 else 0.0
+            values[year - first_year] = cost if math.fabs(cost) > 0.01 else 0.0
 
             soln_lifetime -= 1
+        result = pd.Series(values, index=np.arange(first_year, last_row + 1, dtype=int),
+                           name='soln_only_single_iunit_cashflow')
+        result.index.name = 'Year'
         return result
 
 
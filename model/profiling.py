@@ -0,0 +1,301 @@
+"""Opt-in profiling of scenario construction and data functions.
+
+    from model import profiling
+    with profiling.profile() as prof:
+        s = factory.load_scenario('solarpvutil')
+        s.c2.to_json()
+    print(prof.report())
+    prof.write_trace('solarpvutil.trace.json')
+
+While a profile is active, every @data_func method records its wall time, call count, cache hits
+and misses, and the size of its output, per (solution, method).  Scenario construction is recorded
+too: the whole of each Scenario.__init__, and the phases within it, each phase ending when one of the
+stage attributes (tm, ad, ht, ua, ...) is set.  The trace file is in the Chrome trace event format,
+which chrome://tracing, Perfetto (ui.perfetto.dev) and speedscope display as a flame graph.
+
+When no profile is active nothing is wrapped at all (neither the data functions, nor the __init__
+and __setattr__ of the scenarios), so there is no overhead.
+"""
+
+import functools
+import importlib
+import json
+import os
+import pkgutil
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+import model
+from model import decorators
+
+_active = None
+_lock = threading.Lock()
+
+# Scenario attributes whose setting ends a phase of scenario construction, and whose values are
+# attributed to the scenario's solution when their data functions are called later.
+phase_attributes = ['ac', 'tm', 'tla_per_region', 'c_tla', 'ae', 'ad', 'pds_ca', 'ref_ca', 'sc', 'ht',
+                    'ef', 'ua', 'fc', 'oc', 'c4', 'n2o', 'c2']
+
+
+def _nbytes(data):
+    """Return the (shallow) size in bytes of a data function's output."""
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(index=True, deep=False).sum())
+    if isinstance(data, pd.Series):
+        return int(data.memory_usage(index=True, deep=False))
+    if isinstance(data, np.ndarray):
+        return int(data.nbytes)
+    if isinstance(data, (tuple, list)):
+        return sum(_nbytes(x) for x in data)
+    return sys.getsizeof(data)
+
+
+def _import_model_modules():
+    """Import all the model modules, so that all data functions are defined before they are wrapped."""
+    for m in pkgutil.iter_modules(model.__path__):
+        if m.name != 'tests':
+            importlib.import_module('model.' + m.name)
+
+
+def _owner_class(func):
+    """Return the class that defines the method func, or None."""
+    owner = sys.modules.get(func.__module__)
+    (path, _, name) = func.__qualname__.rpartition('.')
+    if not path or '<locals>' in path:
+        return None
+    for part in path.split('.'):
+        owner = getattr(owner, part, None)
+    return owner if isinstance(owner, type) else None
+
+
+class _Stats:
+    __slots__ = ['calls', 'hits', 'misses', 'seconds', 'self_seconds', 'bytes']
+
+    def __init__(self):
+        self.calls = self.hits = self.misses = 0
+        self.seconds = self.self_seconds = 0.0
+        self.bytes = None
+
+
+class Profile:
+    """The results of profiling: see profile()."""
+
+    def __init__(self):
+        self.stats = {}       # (solution, name) : _Stats
+        self.events = []      # complete trace events
+        self._owners = {}     # id(stage object) : (stage object, solution)
+        self._patched = []
+        self._local = threading.local()
+        self._t0 = time.perf_counter()
+
+    # Recording
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []   # [solution, start, time spent in children]
+        return self._local.stack
+
+    def _solution_of(self, obj):
+        """Return the solution that obj (a stage object) belongs to, or '' if unknown."""
+        stack = self._stack()
+        if stack and stack[-1][0]:
+            return stack[-1][0]
+        owner = self._owners.get(id(obj))
+        return owner[1] if owner is not None and owner[0] is obj else ''
+
+    def _record(self, solution, name, start, end, children, hit=None, nbytes=None, category='data_func'):
+        with _lock:
+            s = self.stats.get((solution, name))
+            if s is None:
+                s = self.stats[(solution, name)] = _Stats()
+            s.calls += 1
+            s.seconds += end - start
+            s.self_seconds += end - start - children
+            if hit is not None:
+                if hit:
+                    s.hits += 1
+                else:
+                    s.misses += 1
+            if nbytes is not None:
+                s.bytes = nbytes
+        if not hit:
+            args = {'solution': solution}
+            if nbytes is not None:
+                args['bytes'] = nbytes
+            self.events.append({'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(),
+                                'tid': threading.get_ident(), 'ts': (start - self._t0) * 1e6,
+                                'dur': (end - start) * 1e6, 'args': args})
+
+    def _call(self, name, method, cache_info, obj, args, kwargs):
+        solution = self._solution_of(obj)
+        stack = self._stack()
+        misses = cache_info().misses if cache_info else None
+        frame = [solution, time.perf_counter(), 0.0]
+        stack.append(frame)
+        try:
+            result = method(obj, *args, **kwargs)
+        finally:
+            stack.pop()
+            end = time.perf_counter()
+            if stack:
+                stack[-1][2] += end - frame[1]
+        hit = cache_info().misses == misses if cache_info else False
+        self._record(solution, name, frame[1], end, frame[2], hit=hit,
+                     nbytes=None if hit else _nbytes(result))
+        return result
+
+    def _wrap(self, name, method):
+        cache_info = getattr(method, 'cache_info', None)
+        @functools.wraps(method)
+        def wrapper(obj, *args, **kwargs):
+            return self._call(name, method, cache_info, obj, args, kwargs)
+        return wrapper
+
+    def _scenario_init(self, scenario, init, args, kwargs):
+        solution = getattr(scenario, 'module_name', None) or type(scenario).__module__
+        stack = self._stack()
+        frame = [solution, time.perf_counter(), 0.0]
+        frame.append(frame[1])   # start of the current phase
+        frame.append(0.0)        # time spent in children during the current phase
+        stack.append(frame)
+        try:
+            return init(scenario, *args, **kwargs)
+        finally:
+            stack.pop()
+            end = time.perf_counter()
+            if stack:
+                stack[-1][2] += end - frame[1]
+            self._record(solution, 'Scenario.__init__', frame[1], end, frame[2], category='scenario')
+
+    def _scenario_setattr(self, scenario, name, value):
+        if name not in phase_attributes:
+            return
+        solution = getattr(scenario, 'module_name', None) or type(scenario).__module__
+        if value is not None:
+            self._owners[id(value)] = (value, solution)
+        stack = self._stack()
+        if stack and len(stack[-1]) == 5 and stack[-1][0] == solution:
+            frame = stack[-1]
+            now = time.perf_counter()
+            self._record(solution, f"init:{name}", frame[3], now, frame[2] - frame[4], category='scenario')
+            frame[3] = now
+            frame[4] = frame[2]
+
+    # Patching
+
+    def _patch(self, cls, name, value):
+        """Set attribute name of cls to value, until _uninstall."""
+        self._patched.append((cls, name, vars(cls).get(name)))
+        setattr(cls, name, value)
+
+    def _patch_init(self, cls):
+        init = vars(cls).get('__init__')
+        if init is None or any(c is cls and n == '__init__' for (c, n, _) in self._patched):
+            return
+        @functools.wraps(init)
+        def wrapper(scenario, *args, **kwargs):
+            return self._scenario_init(scenario, init, args, kwargs)
+        self._patch(cls, '__init__', wrapper)
+
+    def _install_scenario_hooks(self):
+        """Wrap the __init__ of every Scenario class (including those defined while the profile is
+        active), and note the setting of the attributes of scenarios."""
+        from model.scenario import Scenario
+        todo = [Scenario]
+        while todo:
+            cls = todo.pop()
+            self._patch_init(cls)
+            todo.extend(cls.__subclasses__())
+        profile = self
+        def init_subclass(cls, **kwargs):
+            super(Scenario, cls).__init_subclass__(**kwargs)
+            profile._patch_init(cls)
+        def setattr_hook(scenario, name, value):
+            object.__setattr__(scenario, name, value)
+            profile._scenario_setattr(scenario, name, value)
+        self._patch(Scenario, '__init_subclass__', classmethod(init_subclass))
+        self._patch(Scenario, '__setattr__', setattr_hook)
+
+    def _install(self):
+        _import_model_modules()
+        self._install_scenario_hooks()
+        for func in decorators.data_funcs:
+            cls = _owner_class(func)
+            name = func.__name__
+            if cls is None or not getattr(vars(cls).get(name), 'data_func', False):
+                continue
+            if any(c is cls and n == name for (c, n, _) in self._patched):
+                continue
+            method = vars(cls)[name]
+            self._patched.append((cls, name, method))
+            setattr(cls, name, self._wrap(f"{cls.__name__}.{name}", method))
+
+    def _uninstall(self):
+        for (cls, name, method) in reversed(self._patched):
+            if method is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, method)
+        self._patched = []
+        self._owners = {}
+
+    # Results
+
+    def to_frame(self):
+        """Return the statistics as a DataFrame with one row per (solution, name), where name is a
+        data function ('Class.method'), a Scenario construction ('Scenario.__init__') or a phase of
+        it ('init:<attribute>').  Columns are calls, hits, misses, seconds (inclusive), self_seconds
+        (exclusive of nested data functions and constructions) and bytes (size of the latest output).
+        Data functions that are not cached count every call as a miss."""
+        rows = [ {'solution': solution, 'name': name, 'calls': s.calls, 'hits': s.hits,
+                  'misses': s.misses, 'seconds': s.seconds, 'self_seconds': s.self_seconds,
+                  'bytes': s.bytes} for ((solution, name), s) in self.stats.items() ]
+        columns = ['solution', 'name', 'calls', 'hits', 'misses', 'seconds', 'self_seconds', 'bytes']
+        return pd.DataFrame(rows, columns=columns).set_index(['solution', 'name'])
+
+    def report(self, top=30, sort='self_seconds'):
+        """Return a text report of the top entries, by sort column."""
+        df = self.to_frame().sort_values(sort, ascending=False)
+        if top:
+            df = df.head(top)
+        with pd.option_context('display.max_rows', None, 'display.width', 200,
+                               'display.max_colwidth', 60):
+            return df.to_string(float_format=lambda x: f"{x:.4f}")
+
+    def trace(self):
+        """Return the profile as a dict in the Chrome trace event format."""
+        return {'traceEvents': sorted(self.events, key=lambda e: e['ts']), 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, filename):
+        """Write the profile in the Chrome trace event format to filename."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(), f)
+
+
+class profile:
+    """Context manager which profiles the data functions and scenario constructions run within it,
+    returning a Profile.  Only one profile may be active at a time."""
+
+    def __init__(self):
+        self.result = Profile()
+
+    def __enter__(self):
+        global _active
+        with _lock:
+            if _active is not None:
+                raise RuntimeError("A profile is already active")
+            _active = self.result
+        try:
+            self.result._install()
+        except BaseException:
+            self.__exit__()
+            raise
+        return self.result
+
+    def __exit__(self, *args):
+        global _active
+        self.result._uninstall()
+        _active = None
+
@@ -0,0 +1,145 @@
+"""A compact year x region table of float64 values.
+
+Model methods compute their tables year by year and region by region.  Doing that on a DataFrame
+costs an index lookup (and often a copy) for every cell, so the recurrences in the model (new units
+including replacements, degraded land, ...) work on a RegionSeries instead: a contiguous float64
+array of years x regions, with fixed axes.  Arithmetic between RegionSeries is done directly on the
+arrays, without aligning indexes, and so requires identical axes.  Conversion to and from pandas
+happens at the boundary, in from_frame and to_frame, which keep the original index and columns.
+
+    rs = RegionSeries.from_frame(df)
+    rs['World']                  # the values for a region (a view)
+    rs.row(2050)                 # the values for a year (a view)
+    (rs * 2 - rs).to_frame()     # a DataFrame with the index and columns of df
+"""
+
+import numpy as np
+import pandas as pd
+from model import dd
+
+
+class RegionSeries:
+    """A table of float64 values, years x regions.
+         values: a 2-d array-like of years x regions (converted to float64).
+         years: the year labels (a pandas Index or array-like).
+         regions: the region labels (default: dd.REGIONS).
+    """
+    __slots__ = ('values', 'years', 'regions')
+
+    def __init__(self, values, years, regions=None):
+        self.values = np.array(values, dtype=np.float64, ndmin=2)
+        self.years = years if isinstance(years, pd.Index) else pd.Index(years)
+        regions = dd.REGIONS if regions is None else regions
+        self.regions = regions if isinstance(regions, pd.Index) else pd.Index(regions)
+        if self.values.shape != (len(self.years), len(self.regions)):
+            raise ValueError(f"values of shape {self.values.shape} do not match "
+                             f"{len(self.years)} years x {len(self.regions)} regions")
+
+    @classmethod
+    def from_frame(cls, df):
+        """Return a RegionSeries with a copy of the values of DataFrame df."""
+        return cls(df.to_numpy(dtype=np.float64, copy=True), df.index, df.columns)
+
+    @classmethod
+    def zeros(cls, years, regions=None):
+        regions = dd.REGIONS if regions is None else regions
+        return cls(np.zeros((len(years), len(regions))), years, regions)
+
+    def to_frame(self, name=None):
+        """Return the values as a DataFrame indexed by years with a column per region.  The
+        DataFrame shares its values with this RegionSeries."""
+        df = pd.DataFrame(self.values, index=self.years, columns=self.regions, copy=False)
+        if name is not None:
+            df.name = name
+        return df
+
+    def copy(self):
+        return RegionSeries(self.values.copy(), self.years, self.regions)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __len__(self):
+        return len(self.years)
+
+    def __repr__(self):
+        return f"RegionSeries({len(self.years)} years x {len(self.regions)} regions)\n{self.to_frame()!r}"
+
+    # Access
+
+    def position(self, year):
+        """Return the row of year, or None if year is not one of the years."""
+        if year not in self.years:
+            return None
+        return self.years.get_loc(year)
+
+    def row(self, year):
+        """Return the values for year (a view)."""
+        return self.values[self.years.get_loc(year)]
+
+    def __getitem__(self, region):
+        """Return the values for region (a view)."""
+        return self.values[:, self.regions.get_loc(region)]
+
+    def __setitem__(self, region, values):
+        self.values[:, self.regions.get_loc(region)] = values
+
+    # Arithmetic
+
+    def same_axes(self, other):
+        return ((self.years is other.years or self.years.equals(other.years)) and
+                (self.regions is other.regions or self.regions.equals(other.regions)))
+
+    def _operand(self, other):
+        if isinstance(other, RegionSeries):
+            if not self.same_axes(other):
+                raise ValueError("RegionSeries have different years or regions")
+            return other.values
+        if isinstance(other, (pd.DataFrame, pd.Series)):
+            raise TypeError("convert pandas objects with RegionSeries.from_frame first")
+        return other
+
+    def _new(self, values):
+        return RegionSeries(values, self.years, self.regions)
+
+    def __add__(self, other):
+        return self._new(self.values + self._operand(other))
+
+    def __radd__(self, other):
+        return self._new(self._operand(other) + self.values)
+
+    def __sub__(self, other):
+        return self._new(self.values - self._operand(other))
+
+    def __rsub__(self, other):
+        return self._new(self._operand(other) - self.values)
+
+    def __mul__(self, other):
+        return self._new(self.values * self._operand(other))
+
+    def __rmul__(self, other):
+        return self._new(self._operand(other) * self.values)
+
+    def __truediv__(self, other):
+        return self._new(self.values / self._operand(other))
+
+    def __rtruediv__(self, other):
+        return self._new(self._operand(other) / self.values)
+
+    def __neg__(self):
+        return self._new(-self.values)
+
+    def cumsum(self):
+        """Return the cumulative sum over years (NaN propagates, as DataFrame.cumsum(skipna=False))."""
+        return self._new(np.cumsum(self.values, axis=0))
+
+    def shift(self, years, fill_value=np.nan):
+        """Return the values moved later by years rows (earlier, if negative), as DataFrame.shift."""
+        result = np.full_like(self.values, fill_value)
+        n = len(self.years)
+        if years >= 0:
+            result[years:] = self.values[:max(n - years, 0)]
+        else:
+            result[:years] = self.values[-years:]
+        return self._new(result)
@@ -5,6 +5,9 @@ import pandas as pd
 import warnings
 import numbers
 from pathlib import Path
+import numpy as np
+from model import batch
+from model import dd
 from model import integration
 from model import adoptiondata
 from model import advanced_controls
@@ -43,6 +46,8 @@ class Scenario:
     """The name of the solution module (e.g. 'hcrecycling')"""
     scenario: str
     """The name of the scenario """
+    vmas: dict = None
+    """The solution's VMAs, as a dict of title : VMA (used to load its advanced controls)"""
 
     ac: advanced_controls.AdvancedControls = None
     """The parameters that define this scenario"""
@@ -62,6 +67,41 @@ class Scenario:
     
     # Initialization
 
+    _adoption_only = False
+    """True if only the adoptions are constructed: every solution's __init__ returns right after
+    setting ht, if this is set (see adoption_only)."""
+    _world_only = False
+
+    @classmethod
+    def adoption_only(cls, scenario_name_or_ac=None):
+        """Construct a scenario only as far as its adoptions: the tam (or land allocation) and HelperTables
+        are set, but unit adoption, costs and emissions are not computed.  This is much faster than
+        constructing the full scenario, for uses (such as integrations) that only need adoptions."""
+        obj = cls.__new__(cls)
+        obj._adoption_only = True
+        obj.__init__(scenario_name_or_ac)
+        return obj
+
+    @classmethod
+    def world_only(cls, scenario_name_or_ac=None):
+        """Construct a scenario which computes only what the World results need, for uses (such as
+        get_key_results) which read only the World columns.  The TAM and adoption data trends of the
+        other regions, which are most of the work of constructing a scenario, are not computed, and
+        the regional columns of results are NaN (or 0) rather than correct.  Where the World results
+        depend on the regional ones (regional adoption data, or a World TAM or adoption which
+        includes the regions) everything is computed as usual."""
+        obj = cls.__new__(cls)
+        obj._world_only = True
+        obj.__init__(scenario_name_or_ac)
+        return obj
+
+    def _world_only_args(self):
+        """Keyword arguments to pass to TAM and AdoptionData to compute only the World region, if this
+        is a world_only scenario and its World results do not depend on regional adoptions."""
+        if not self._world_only or self.ac.soln_pds_adoption_regional_data or self.ac.soln_ref_adoption_regional_data:
+            return {}
+        return {'world_only': True}
+
     def initialize_ac(self, scenario_name_or_ac, scenario_list, default_scenario_name):
         """Initialize the advanced controls object for this scenario based on the various cases.
         The first argument may be an instantiated advanced controls argument, or a string naming
@@ -73,6 +113,7 @@ class Scenario:
             self.ac = scenario_name_or_ac
         else:
             self.scenario = scenario_name_or_ac or default_scenario_name
+            scenario_list = {**scenario_list, **self.overlay_scenarios()}
             alt_scenario = integration.integration_alt_name(self.scenario)
             if alt_scenario in scenario_list:
                 self.scenario = alt_scenario
@@ -157,7 +198,8 @@ class Scenario:
                 data_sources = self._pds_ad_sources,
                 adconfig = adconfig,
                 main_includes_regional = self._pds_ad_settings['main_includes_regional'],
-                groups_include_hundred_percent = self._pds_ad_settings['groups_include_hundred_percent']
+                groups_include_hundred_percent = self._pds_ad_settings['groups_include_hundred_percent'],
+                **self._world_only_args()
             )
         # else PASS
         # for now, classes are responsible for initializing s-curves themselves.
@@ -170,47 +212,58 @@ class Scenario:
     
     # Common top-level functionality
     # Key Results
+    # Each is computed by the function of the same name in model.batch, for a batch of this one scenario.
+
+    key_result_methods = {}
+    """The key results of get_key_results, as a dict of key : the method which computes it."""
+
+    def get_key_results(self):
+        return { key : getattr(self, method)() for (key, method) in self.key_result_methods.items() }
+
+    def _lifetimes(self):
+        return batch.has_lifetimes([self.ac.soln_lifetime_replacement], [self.ac.conv_lifetime_replacement])
+
+    def _annual_breakouts(self):
+        """The operating cost breakouts of soln_pds and conv_ref, as arrays of 1 x year x year (0s if
+        there are no lifetimes, as the key results use no operating costs then)."""
+        if not self._lifetimes()[0]:
+            zeros = np.zeros((1, 2139 + 1 - dd.CORE_START_YEAR, dd.CORE_END_YEAR + 1 - dd.CORE_START_YEAR))
+            return (zeros, zeros)
+        return (self.oc.soln_pds_annual_breakout().to_numpy(dtype='float')[None],
+                self.oc.conv_ref_annual_breakout().to_numpy(dtype='float')[None])
+
     def adoption_unit_increase(self, year=None, region='World'):
         if year is None:
             year = self.ac.report_end_year
-        return (self.ht.soln_pds_funits_adopted().loc[year][region]  - 
-                self.ht.soln_ref_funits_adopted().loc[year][region])
+        return float(batch.adoption_unit_increase(batch.stack_frames([self.ht.soln_pds_funits_adopted()]),
+                batch.stack_frames([self.ht.soln_ref_funits_adopted()]), [year], region)[0])
 
     def marginal_first_cost(self, year=None):
         if year is None:
             year = self.ac.report_end_year
-        if self.ac.soln_lifetime_replacement == 0.0 or self.ac.conv_lifetime_replacement == 0.0:
-            return 0.0
-        return (self.fc.soln_pds_annual_world_first_cost().loc[:year].sum()-
-            self.fc.soln_ref_annual_world_first_cost().loc[:year].sum()-
-            self.fc.conv_ref_annual_world_first_cost().loc[:year].sum()
-            ) / 1e9
+        return float(batch.marginal_first_cost(batch.stack_frames([self.fc.soln_pds_annual_world_first_cost()]),
+                batch.stack_frames([self.fc.soln_ref_annual_world_first_cost()]),
+                batch.stack_frames([self.fc.conv_ref_annual_world_first_cost()]), [year], self._lifetimes())[0])
 
     def net_operating_savings(self, start_year=None, end_year=None):
         if start_year is None:
             start_year = self.ac.report_start_year
         if end_year is None:
             end_year = self.ac.report_end_year
-        if self.ac.soln_lifetime_replacement == 0.0 or self.ac.conv_lifetime_replacement == 0.0:
-            return 0.0
-        return (
-            (self.oc.conv_ref_cumulative_operating_cost().loc[end_year] -
-            self.oc.conv_ref_cumulative_operating_cost().loc[start_year]) -
-            (self.oc.soln_pds_cumulative_operating_cost().loc[end_year]  -
-            self.oc.soln_pds_cumulative_operating_cost().loc[start_year])
-            ) / 1e9
+        (soln, conv) = self._annual_breakouts()
+        return float(batch.net_operating_savings(soln, conv, [start_year], [end_year], self._lifetimes())[0])
 
     def lifetime_operating_savings(self):
-        if self.ac.soln_lifetime_replacement == 0.0 or self.ac.conv_lifetime_replacement == 0.0:
-            return 0.0
-        return self.oc.soln_marginal_operating_cost_savings().sum() / 1e9
+        (soln, conv) = self._annual_breakouts()
+        return float(batch.lifetime_operating_savings(soln, conv, self._lifetimes())[0])
 
     def cumulative_emissions_reduced(self, start_year=None, end_year=None, region='World'):
         if start_year is None:
             start_year = self.ac.report_start_year
         if end_year is None:
             end_year = self.ac.report_end_year
-        return self.c2.co2eq_mmt_reduced().loc[start_year:end_year, region].sum() / 1e3
+        return float(batch.cumulative_emissions_reduced(batch.stack_frames([self.c2.co2eq_mmt_reduced()]),
+                [start_year], [end_year], region)[0])
 
     # Integration support.  This is limited and hacky at this time.
 
@@ -219,10 +272,22 @@ class Scenario:
         return Path(__file__).parents[1]/"solution"/cls.module_name
         
     @classmethod
-    def _pds_ca_lookup(cls, name):
+    def overlay_scenarios(cls):
+        """Return the scenarios that an in-memory integration has added for this solution, as a dict
+        of name to AdvancedControls.  Scenarios written to disk are loaded with the solution module instead."""
+        result = {}
+        if integration.overlay_active() and getattr(cls, 'module_name', None):
+            for f in integration.overlay_files(cls.scenario_path()/"ac", '*.json'):
+                a = advanced_controls.ac_from_dict(json.loads(integration.read_text(f)), cls.vmas, f)
+                result[a.name] = a
+        return result
+
+    @classmethod
+    def _pds_ca_lookup(cls, name, sources=None):
         """Return the filename associated with a specific custom adoption, if we know it"""
-        if cls._pds_ca_sources:
-            for x in cls._pds_ca_sources:
+        sources = sources or cls._pds_ca_sources
+        if sources:
+            for x in sources:
                 if x['name'] == name:
                     return x['filename'] if 'filename' in x else None
         return None
@@ -236,8 +301,10 @@ class Scenario:
                 warnings.warn(f"Updating adoption has no affect on {cls.module_name} solution, since it does not implement file-based custom adoptions")
                 return
 
-            # get the existing scenario ac
+            # get the existing scenario ac, and the existing custom adoption sources
             oldac : advanced_controls.AdvancedControls = factory.load_scenario(cls.module_name, scenario_name).ac 
+            sources_file = ca_pds_dir/"ca_pds_sources.json"
+            sources = load_sources(sources_file, 'filename') if sources_file.is_file() else []
 
             # define new adoption name and data file
             new_adoption_name = None
@@ -247,22 +314,21 @@ class Scenario:
                 # Look up the adoption in _pds_ca.  If it is there, we'll use a modified version
                 # of the adoption and filenames.  This fails for adoptions that don't have files, or
                 # for adoptions of the form "Average of all..."
-                old_file_name = cls._pds_ca_lookup(old_adoption_name)
+                old_file_name = cls._pds_ca_lookup(old_adoption_name, sources)
                 if old_file_name:
                     new_adoption_name = integration.integration_alt_name(old_adoption_name)
                     new_file_name = integration.integration_alt_file(old_file_name)
             if not new_adoption_name:
                 # just generate one
                 new_adoption_name = integration.integration_alt_name(f"new updated adoption {i}")
-                new_file_name = integration.integration_alt_file(f"new_updated_adoption_{i}")
+                new_file_name = integration.integration_alt_file(f"new_updated_adoption_{i}.csv")
             
             # Write or overwrite the data file
             colname = newadoptions.columns[i]
             new_data = newadoptions[[colname]].rename(columns={colname: "World"})
-            new_data.to_csv(ca_pds_dir/new_file_name, encoding="utf-8")
+            integration.write_csv(new_data, ca_pds_dir/new_file_name)
 
             # update or add this source to the custom adoption directory 
-            sources = cls._pds_ca_sources or []
             for x in sources:
                 if x['name'] == new_adoption_name: # update it
                     x['filename'] = new_file_name
@@ -289,7 +355,7 @@ class Scenario:
             ac_data['name'] = new_scenario_name
             ac_data['soln_pds_adoption_basis'] = 'Fully Customized PDS'
             ac_data['soln_pds_adoption_custom_name'] = new_adoption_name
-            (cls.scenario_path()/"ac"/new_scenario_file).write_text(json.dumps(ac_data,indent=2), encoding="utf-8") 
+            integration.write_text(cls.scenario_path()/"ac"/new_scenario_file, json.dumps(ac_data,indent=2))
 
 
 class RRSScenario(Scenario):
@@ -352,24 +418,24 @@ class RRSScenario(Scenario):
             tamconfig=tamconfig, 
             tam_ref_data_sources = ref_data_sources,
             tam_pds_data_sources = pds_data_sources,
+            **self._world_only_args(),
             **args)
         
     def adoption_limit(self):
         return self.tm.pds_tam_per_region()
 
-    def get_key_results(self):
-        return {'implementation_unit_adoption_increase': self.implementation_unit_adoption_increase(),
-                'functional_unit_adoption_increase': self.adoption_unit_increase(),
-                'marginal_first_cost': self.marginal_first_cost(),
-                'net_operating_savings': self.net_operating_savings(),
-                'lifetime_operating_savings': self.lifetime_operating_savings(),
-                'cumulative_emissions_reduced': self.cumulative_emissions_reduced()}
+    key_result_methods = {'implementation_unit_adoption_increase': 'implementation_unit_adoption_increase',
+                          'functional_unit_adoption_increase': 'adoption_unit_increase',
+                          'marginal_first_cost': 'marginal_first_cost',
+                          'net_operating_savings': 'net_operating_savings',
+                          'lifetime_operating_savings': 'lifetime_operating_savings',
+                          'cumulative_emissions_reduced': 'cumulative_emissions_reduced'}
 
     def implementation_unit_adoption_increase(self, year=2050, region='World'):
-        if self.ac.soln_avg_annual_use == 0.0:
-            return 0.0
-        return (self.ht.soln_pds_funits_adopted().loc[year][region] / self.ac.soln_avg_annual_use - 
-            self.ht.soln_ref_funits_adopted().loc[year][region] / self.ac.soln_avg_annual_use)
+        return float(batch.implementation_unit_adoption_increase(
+                batch.stack_frames([self.ht.soln_pds_funits_adopted()]),
+                batch.stack_frames([self.ht.soln_ref_funits_adopted()]),
+                [self.ac.soln_avg_annual_use], [year], region)[0])
 
     def functional_unit_adoption_increase(self, year=2050, region='World'):
         return (self.ht.soln_pds_funits_adopted().loc[year] - 
@@ -385,21 +451,18 @@ class LandScenario(Scenario):
     def adoption_limit(self):
         return self.tla_per_region
 
-    def get_key_results(self):
-        return {'adoption_unit_increase': self.adoption_unit_increase(),
-                'marginal_first_cost': self.marginal_first_cost(),
-                'net_operating_savings': self.net_operating_savings(),
-                'lifetime_operating_savings': self.lifetime_operating_savings(),
-                'cumulative_emissions_reduced': self.cumulative_emissions_reduced(),
-                'total_additional_co2eq_sequestered': self.total_additional_co2eq_sequestered()}
+    key_result_methods = {'adoption_unit_increase': 'adoption_unit_increase',
+                          'marginal_first_cost': 'marginal_first_cost',
+                          'net_operating_savings': 'net_operating_savings',
+                          'lifetime_operating_savings': 'lifetime_operating_savings',
+                          'cumulative_emissions_reduced': 'cumulative_emissions_reduced',
+                          'total_additional_co2eq_sequestered': 'total_additional_co2eq_sequestered'}
 
     def total_additional_co2eq_sequestered(self, end_year=None):
-        # farmlandrestoration starts in year 2021 in Advanced Control excel
-        # Not sure if this is a bug or intended. Excel also says it should start at 2020
         if end_year is None:
             end_year = self.ac.report_end_year
-
-        return (self.c2.co2_sequestered_global().loc[2021:end_year,'All'] / 1000).sum()
+        return float(batch.total_additional_co2eq_sequestered(
+                batch.stack_frames([self.c2.co2_sequestered_global()]), [end_year])[0])
 
 
     
@@ -409,7 +472,7 @@ def load_sources(jsonfile, fieldname='filename'):
     field name '*' is given, then _any_ string-valued dictionary value is replaced.
 
     Now with added super-powers: detects if we are doing an integration, and if so, checks for the integration
-    version of the same json file."""
+    version of the same json file (in the in-memory overlay or on disk)."""
 
     def rootstruct(struct, rootdir, fieldname):
         if isinstance(struct, list):
@@ -427,10 +490,10 @@ def load_sources(jsonfile, fieldname='filename'):
     # if we are supposed to use an alternate version, and that version exists, use it.
     jsonfile = Path(jsonfile).resolve()
     alternatejsonfile = integration.integration_alt_file(jsonfile)
-    if alternatejsonfile.is_file():
+    if integration.file_exists(alternatejsonfile):
         jsonfile = alternatejsonfile
 
-    struct = json.loads( jsonfile.read_text(encoding='utf-8') )
+    struct = json.loads( integration.read_text(jsonfile) )
     rootstruct(struct, jsonfile.parent, fieldname)
     return struct
 
@@ -463,8 +526,9 @@ def write_sources(struct, solution_path, source_type):
     fieldname = 'filename' if source_type in ['ca_pds','ca_ref'] else '*'
     cleaned = clean(struct, fieldname)
     thedir = solution_path/dirs[source_type]
-    thedir.mkdir(exist_ok=True)
+    if not integration.overlay_active():
+        thedir.mkdir(exist_ok=True)
     filename = integration.integration_alt_file(filenames[source_type])
-    (thedir/filename).write_text( json.dumps(cleaned, indent=2), encoding='utf-8')
+    integration.write_text(thedir/filename, json.dumps(cleaned, indent=2))
 
 
@@ -0,0 +1,124 @@
+"""One-at-a-time sensitivity of a scenario's key results to its inputs backed by VMAs.
+
+Many AdvancedControls fields take their value from a VMA (their metadata lists the titles of the
+VMAs, and a value of 'mean', 'high' or 'low' is looked up by AdvancedControls._substitute_vma).  For
+each such field of a scenario with data in its VMA, the scenario is evaluated with the field set to
+the low and to the high of the VMA in turn, all else unchanged, and the key results compared with
+those of the scenario itself:
+
+    table = sensitivity.tornado('solarpvutil', 'PDS2', results=['net_operating_savings'])
+
+The variants are evaluated as a ScenarioBatch of World-only scenarios: they share the TAM, adoption
+data and custom adoption objects of the scenario (none of which depend on these fields), so only
+the stages downstream of them are computed for each variant.  With max_workers, the variants are
+split into batches evaluated in parallel by a pool of processes.
+"""
+
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from model import advanced_controls
+from model.batch import ScenarioBatch
+from solution import factory
+
+stats = ('low', 'high')
+
+
+def vma_fields(ac):
+    """Return a dict of field name : VMA title for the fields of ac which are set and backed by a VMA
+    (of ac.vmas) whose low and high are known."""
+    result = {}
+    if not ac.vmas:
+        return result
+    for field in dataclasses.fields(ac):
+        titles = field.metadata.get('vma_titles')
+        value = getattr(ac, field.name)
+        if not titles or value is None or isinstance(value, (bool, str)):
+            continue
+        # the VMA used is the first with a mean, as in AdvancedControls._substitute_vma
+        for title in titles:
+            v = ac.vmas.get(title, None)
+            if v and not pd.isna(v.avg_high_low(key='mean')):
+                if not any(pd.isna(v.avg_high_low(key=stat)) for stat in stats):
+                    result[field.name] = title
+                break
+    return result
+
+
+def variant_name(field, stat):
+    return f"{field}={stat}"
+
+
+def variants(ac, fields):
+    """Return a dict of name : the dict of values (as AdvancedControls.as_dict) of ac with one of
+    fields set to the low or high of its VMA, for each of fields and stats."""
+    base = ac.as_dict()
+    result = {}
+    for field in fields:
+        regional = isinstance(getattr(ac, field), pd.Series)
+        for stat in stats:
+            name = variant_name(field, stat)
+            result[name] = dict(base, name=name, **{field: f"{stat} per region" if regional else stat})
+    return result
+
+
+def _key_results(solution, scenario, values):
+    """The key results of the scenario (as given to factory.load_scenario) and of the variants with
+    values (a dict of name : dict of values, see variants), as a DataFrame with a row per name."""
+    ac = factory.load_scenario(solution, scenario, world_only=True).ac
+    acs = [ac] + [ advanced_controls.ac_from_dict(v, ac.vmas) for v in values.values() ]
+    batch = ScenarioBatch(solution, acs, world_only=True)
+    return batch.key_results()
+
+
+def tornado(solution, scenario=None, results=None, fields=None, max_workers=None):
+    """Return the tornado table of scenario (as given to factory.load_scenario) of solution.
+         results: the key results to report (default: all of them).
+         fields: the fields to vary (default: all those of vma_fields).
+         max_workers: if more than 1, evaluate the variants in that many processes.
+
+       The table has a row per result and field, the fields of each result ranked by swing (the
+       absolute difference between the result with the low and the high value), and columns:
+         vma: the title of the VMA of the field.
+         input_base, input_low, input_high: the value of the field in the scenario, and the low and
+           high of its VMA.
+         base, low, high: the result of the scenario, and with the low and high value.
+         swing: abs(high - low).
+    """
+    ac = factory.load_scenario(solution, scenario, world_only=True).ac
+    available = vma_fields(ac)
+    if fields is None:
+        fields = list(available)
+    unknown = [ f for f in fields if f not in available ]
+    if unknown:
+        raise ValueError(f"Fields without VMA low and high values in {solution}: {unknown}")
+    values = variants(ac, fields)
+
+    if max_workers is None or max_workers <= 1 or len(values) < 2:
+        key_results = _key_results(solution, ac, values)
+    else:
+        names = list(values)
+        chunks = [ { n : values[n] for n in part } for part in np.array_split(names, max_workers) if len(part) ]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            frames = list(executor.map(_key_results, [solution] * len(chunks), [ac.as_dict()] * len(chunks), chunks))
+        key_results = pd.concat([frames[0].iloc[[0]]] + [ f.iloc[1:] for f in frames ])
+    base = key_results.iloc[0]
+    if results is None:
+        results = list(key_results.columns)
+
+    rows = []
+    for result in results:
+        for field in fields:
+            (low, high) = [ key_results.loc[variant_name(field, stat), result] for stat in stats ]
+            vma = ac.vmas[available[field]]
+            rows.append({'result': result, 'field': field, 'vma': available[field],
+                         'input_base': getattr(ac, field),
+                         'input_low': vma.avg_high_low(key='low'), 'input_high': vma.avg_high_low(key='high'),
+                         'base': base[result], 'low': low, 'high': high, 'swing': abs(high - low)})
+    table = pd.DataFrame(rows, columns=['result', 'field', 'vma', 'input_base', 'input_low', 'input_high',
+                                        'base', 'low', 'high', 'swing'])
+    order = {r: i for (i, r) in enumerate(results)}
+    table = table.sort_values(['result', 'swing'], key=lambda c: c.map(order) if c.name == 'result' else -c,
+                              kind='stable')
+    return table.set_index(['result', 'field'])
@@ -1,12 +1,16 @@
 """Total Addressable Market module."""
 
-from functools import lru_cache
+from contextlib import contextmanager
+import contextvars
+import json
 import pathlib
 import re
 
 from model import dd
+from model.concurrency import shared_cache
 from model.metaclass_cache import MetaclassCache
 from model import interpolation
+from model import datafiles
 import numpy as np
 import pandas as pd
 
@@ -25,6 +29,36 @@ default_tam_config_array =  [
         ['low_sd_mult'] + [1.0] * 11,
         ['high_sd_mult'] + [1.0] * 11
     ]
+
+# While forecast data is being shared (see shared_forecast_data), the forecast data read by each
+# TAM, keyed by its data sources.  A context variable, so that each thread has its own.
+_shared_forecast_data = contextvars.ContextVar('shared_forecast_data', default=None)
+
+
+@contextmanager
+def shared_forecast_data():
+    """Within this context, TAMs with the same data sources share their forecast data rather than
+    each reading the data files, as the scenarios of a solution usually do.  The forecast data is
+    never modified, so sharing it is safe; it is not kept beyond the context so that changes to the
+    data files are seen."""
+    token = _shared_forecast_data.set({}) if _shared_forecast_data.get() is None else None
+    try:
+        yield
+    finally:
+        if token is not None:
+            _shared_forecast_data.reset(token)
+
+
+def _frame_from_columns(columns):
+    """Return a DataFrame of columns (a dict of Series), indexed like the first of them: the same
+    as adding the columns one at a time to an empty DataFrame."""
+    if not columns:
+        return pd.DataFrame()
+    index = next(iter(columns.values())).index
+    return pd.DataFrame({ name : (series if series.index.equals(index) else series.reindex(index))
+                          for (name, series) in columns.items() }, index=index)
+
+
 def make_tam_config(tam_config_array=None, overrides=None) -> pd.DataFrame:
     """Create a tam configuration.
     Overrides, if provided, should be in the form of a list of tuples
@@ -46,7 +80,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
     """Total Addressable Market module."""
 
     def __init__(self, tamconfig, tam_ref_data_sources, tam_pds_data_sources,
-                 main_includes_regional=None, interpolation_overrides=None):
+                 main_includes_regional=None, interpolation_overrides=None, world_only=False):
         """TAM module.
 
            Arguments
@@ -71,12 +105,16 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
            interpolation_override: a dictionary mapping regions to files with stored interpolations.  This is 
              used to finesse cases of numerical instability by storing the result of the existing Excel interpolation.
 
+           world_only: compute only the World (and PDS World) columns of ref_tam_per_region and
+             pds_tam_per_region, leaving the other regions NaN.  Ignored if main_includes_regional,
+             as the World TAM then depends on the regional ones.
         """
         self.tamconfig = tamconfig
         self.tam_ref_data_sources = tam_ref_data_sources
         self.tam_pds_data_sources = tam_pds_data_sources
         self.main_includes_regional = main_includes_regional
         self.interpolation_overrides = interpolation_overrides or {}
+        self.world_only = world_only
         self._populate_forecast_data()
 
 
@@ -91,13 +129,24 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
 
     def _populate_forecast_data(self):
         """Read data files in self.tam_*_data_sources to populate forecast data."""
-        df_per_region = {}
+        shared = _shared_forecast_data.get()
+        if shared is not None:
+            key = json.dumps([self.tam_ref_data_sources, self.tam_pds_data_sources], sort_keys=True, default=str)
+            if key not in shared:
+                shared[key] = self._read_forecast_data()
+            self._forecast_data = shared[key]
+        else:
+            self._forecast_data = self._read_forecast_data()
+
+
+    def _read_forecast_data(self):
+        # the columns of each region's table are collected first and the tables made at the end,
+        # as adding columns one at a time to a DataFrame is slow.
+        columns_per_region = {}
         main_region = dd.REGIONS[0]
         main_region_pds = 'PDS ' + main_region
         for region in dd.REGIONS + [main_region_pds]:
-            df = pd.DataFrame()
-            df.name = 'forecast_data_' + self._name_to_identifier(region)
-            df_per_region[region] = df
+            columns_per_region[region] = {}
 
         for (groupname, group) in self.tam_ref_data_sources.items():
             regions = dd.REGIONS if not groupname.startswith("Region: ") else [groupname.replace("Region: ", "")]
@@ -105,10 +154,10 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
                 sources = {name: value} if self._is_path(value) else value
 
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
+                    df = datafiles.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
                             skip_blank_lines=True, comment='#').reindex(columns=regions)
                     for region in regions:
-                        df_per_region[region][name] = df[region]
+                        columns_per_region[region][name] = df[region]
 
         for (groupname, group) in self.tam_pds_data_sources.items():
             # At this time, PDS TAM does not have regional data.
@@ -118,11 +167,17 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
                 sources = {name: value} if self._is_path(value) else value
 
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
-                            skip_blank_lines=True, comment='#', usecols=["Year", main_region])
-                    df_per_region[main_region_pds][name] = df[main_region]
+                    # read as for the REF sources above, so that a file used for both is parsed once
+                    df = datafiles.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
+                            skip_blank_lines=True, comment='#')
+                    columns_per_region[main_region_pds][name] = df[main_region]
 
-        self._forecast_data = df_per_region
+        df_per_region = {}
+        for (region, columns) in columns_per_region.items():
+            df = _frame_from_columns(columns)
+            df.name = 'forecast_data_' + self._name_to_identifier(region)
+            df_per_region[region] = df
+        return df_per_region
 
 
     def _min_max_sd(self, forecast, tamconfig, data_sources, region):
@@ -265,7 +320,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
         return regional_sum
 
 
-    @lru_cache()
+    @shared_cache()
     def forecast_data(self, region):
         """
           World: SolarPVUtil 'TAM Data'!B45:Q94
@@ -282,7 +337,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
         return self._forecast_data[region]
 
 
-    @lru_cache()
+    @shared_cache()
     def forecast_min_max_sd(self, region):
         """
           World: SolarPVUtil 'TAM Data'!V45:Y94
@@ -350,7 +405,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
         return result
 
 
-    @lru_cache()
+    @shared_cache()
     def forecast_low_med_high(self, region):
         """
           OECD90: SolarPVUtil 'TAM Data'!AA163:AC212
@@ -389,7 +444,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
         return result
 
 
-    @lru_cache()
+    @shared_cache()
     def forecast_trend(self, region, trend=None):
         """Forecast for a region via one of several interpolation algorithms.
 
@@ -436,7 +491,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
 
         # #BAD EXCEL Remove this condition when we aren't trying to match Excel.
         if region in self.interpolation_overrides:
-            result = pd.read_csv(self.interpolation_overrides[region], index_col='Year' )
+            result = datafiles.read_csv(self.interpolation_overrides[region], index_col='Year')
         else:
             main_region = dd.REGIONS[0]
             if main_region in region and 'PDS' in region:
@@ -454,6 +509,13 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
         return result
 
 
+    def _computed_regions(self):
+        """The regions computed in the per-region tables."""
+        if self.world_only and not self.main_includes_regional:
+            return dd.REGIONS[:1]
+        return dd.REGIONS
+
+
     def _set_tam_one_region(self, result, region, forecast_trend, forecast_low_med_high):
         """Set a single column in ref_tam_per_region."""
         result[region] = forecast_trend.loc[:, 'adoption']
@@ -461,7 +523,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
         result.loc[first_year, region] = forecast_low_med_high.loc[first_year, 'Medium']
 
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def ref_tam_per_region(self):
         """Compiles the TAM for each of the major regions into a single dataframe.
@@ -471,14 +533,18 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
            SolarPVUtil 'Unit Adoption Calculations'!A16:K63
         """
         result = pd.DataFrame(columns=dd.REGIONS)
+        computed = self._computed_regions()
         for region in result.columns:
+            if region not in computed:
+                result[region] = np.nan
+                continue
             self._set_tam_one_region(result=result, region=region,
                     forecast_trend=self.forecast_trend(region),
                     forecast_low_med_high=self.forecast_low_med_high(region))
         result.name = "ref_tam_per_region"
         return result
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def pds_tam_per_region(self):
         """Compiles the PDS TAM for each of the major regions into a single dataframe.
@@ -491,8 +557,11 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
            SolarPVUtil 'Unit Adoption Calculations'!A68:K115
         """
         result = pd.DataFrame(columns=dd.REGIONS)
+        computed = self._computed_regions()
         for idx, region in enumerate(result.columns):
-            if idx == 0:
+            if region not in computed:
+                result[region] = np.nan
+            elif idx == 0:
                 region_pds = 'PDS ' + region
                 result[region] = self.forecast_trend(region_pds).loc[:, 'adoption']
                 lmh = self.forecast_low_med_high(region)
@@ -130,6 +130,19 @@ def test_CSP_World():
     assert result.loc[2060, 'adoption'] == pytest.approx(4079.461034)
 
 
+def test_adoption_per_region_world_only():
+    ac = advanced_controls.AdvancedControls(soln_pds_adoption_prognostication_source='ALL SOURCES',
+            soln_pds_adoption_prognostication_growth='Medium',
+            soln_pds_adoption_prognostication_trend='3rd Poly')
+    ad = adoptiondata.AdoptionData(ac=ac, data_sources=g_data_sources, adconfig=g_adconfig)
+    wo = adoptiondata.AdoptionData(ac=ac, data_sources=g_data_sources, adconfig=g_adconfig, world_only=True)
+    for (result, expected) in ((wo.adoption_data_per_region(), ad.adoption_data_per_region()),
+                               (wo.adoption_trend_per_region(), ad.adoption_trend_per_region())):
+        assert list(result.columns) == list(expected.columns)
+        pd.testing.assert_series_equal(result['World'], expected['World'])
+        assert result.drop(columns='World').isna().all().all()
+
+
 def test_adoption_min_max_sd():
     s = 'Greenpeace AER'
     ac = advanced_controls.AdvancedControls(soln_pds_adoption_prognostication_source=s)
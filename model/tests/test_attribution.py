@@ -0,0 +1,66 @@
+"""Tests for attribution.py."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from model import attribution
+from model import fair_emulator
+from model import fairutil
+from solution import factory
+
+
+def _reductions():
+    years = pd.RangeIndex(2020, 2051)
+    ramp = np.linspace(0.0, 1.0, len(years))
+    return pd.DataFrame({'a': 1.0 * ramp, 'b': 0.5 * ramp, 'c': 0.2 * ramp[::-1]}, index=years)
+
+
+def _temperature(reductions):
+    baseline = fairutil.baseline_emissions()
+    emissions = baseline - reductions.sum(axis=1).reindex(baseline.index, fill_value=0.0)
+    return pd.Series(attribution.temperatures([emissions.to_numpy()])[0], index=baseline.index)
+
+
+def test_scenario_reductions():
+    s = factory.load_scenario('solarpvutil')
+    result = attribution.attribute(attribution.scenario_reductions({'solarpvutil': s}))
+    expected = s.c2.FaIR_CFT_baseline_co2eq()['T'] - s.c2.FaIR_CFT_Drawdown_co2eq()['T']
+    np.testing.assert_allclose(result.total.to_numpy(), expected.to_numpy(), atol=1e-12)
+    np.testing.assert_allclose(result.solutions['solarpvutil'].to_numpy(), expected.to_numpy(), atol=1e-12)
+
+
+def test_rules():
+    reductions = _reductions()
+    sectors = {'a': 'X', 'b': 'X', 'c': 'Y'}
+    base = _temperature(reductions.iloc[:, :0])
+    total = base - _temperature(reductions)
+
+    marginal = attribution.attribute(reductions, sectors=sectors, rule='marginal')
+    pd.testing.assert_series_equal(marginal.total, total)
+    without_a = _temperature(reductions[['b', 'c']])
+    np.testing.assert_allclose(marginal.solutions['a'], without_a - (base - total), atol=1e-12)
+    np.testing.assert_allclose(marginal.sectors['Y'], marginal.solutions['c'], atol=1e-12)
+
+    cumulative = attribution.attribute(reductions, sectors=sectors, rule='cumulative', order=['Y', 'b'])
+    assert list(cumulative.solutions.columns) == ['b', 'a', 'c']
+    assert list(cumulative.sectors.columns) == ['Y', 'X']
+    np.testing.assert_allclose(cumulative.solutions.sum(axis=1), total, atol=1e-12)
+    np.testing.assert_allclose(cumulative.sectors.sum(axis=1), total, atol=1e-12)
+    np.testing.assert_allclose(cumulative.solutions['b'], base - _temperature(reductions[['b']]), atol=1e-12)
+
+    # the approximation agrees with the exact Shapley value, from all 8 combinations of 3 solutions
+    shapley = attribution.attribute(reductions, rule='shapley')
+    assert shapley.sectors is None
+    gain = lambda cols, p: _temperature(reductions[cols]) - _temperature(reductions[cols + [p]])
+    exact_a = (2 * gain([], 'a') + gain(['b'], 'a') + gain(['c'], 'a') + 2 * gain(['b', 'c'], 'a')) / 6
+    np.testing.assert_allclose(shapley.solutions['a'], exact_a, atol=1e-4 * total.abs().max())
+
+    with fair_emulator.mode('emulated'):
+        results = [ attribution.attribute(reductions, rule=rule) for rule in attribution.rules ]
+    for r in results[1:]:
+        pd.testing.assert_frame_equal(r.solutions[list(reductions.columns)], results[0].solutions, atol=1e-12)
+
+    with pytest.raises(ValueError):
+        attribution.attribute(reductions, rule='proportional')
+    with pytest.raises(ValueError):
+        attribution.attribute(reductions, sectors={'a': 'X'})
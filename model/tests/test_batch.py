@@ -0,0 +1,61 @@
+"""Tests for batch.py."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from model import batch
+from solution import factory
+
+
+@pytest.fixture(scope='module')
+def solarpvutil():
+    return batch.ScenarioBatch('solarpvutil')
+
+
+def test_key_results_equal_per_scenario(solarpvutil):
+    result = solarpvutil.key_results()
+    assert list(result.index) == factory.list_scenarios('solarpvutil')
+    for name in result.index:
+        expected = factory.load_scenario('solarpvutil', name).get_key_results()
+        assert list(result.columns) == list(expected.keys())
+        for (key, value) in expected.items():
+            assert result.loc[name, key] == pytest.approx(value, rel=1e-12), key
+
+
+def test_world_only(solarpvutil):
+    result = batch.ScenarioBatch('solarpvutil', world_only=True).key_results()
+    pd.testing.assert_frame_equal(result, solarpvutil.key_results())
+
+
+def test_stack(solarpvutil):
+    st = solarpvutil.stack('ht.soln_pds_funits_adopted')
+    assert st.values.shape == (len(solarpvutil), len(st.years), len(st.regions))
+    for (i, name) in enumerate(st.scenarios):
+        expected = solarpvutil[name].ht.soln_pds_funits_adopted()
+        np.testing.assert_array_equal(st.values[i], expected.reindex(index=st.years, columns=st.regions).to_numpy())
+    series = solarpvutil.stack('fc.soln_pds_annual_world_first_cost')
+    assert list(series.regions) == ['soln_pds_annual_world_first_cost']
+
+
+def test_advanced_controls():
+    scenarios = factory._load_module('bikeinfrastructure').scenarios
+    (name, ac) = next(iter(scenarios.items()))
+    b = batch.ScenarioBatch('bikeinfrastructure', [ac])
+    result = b.key_results()
+    expected = factory.load_scenario('bikeinfrastructure', name).get_key_results()
+    assert list(result.index) == [name]
+    assert result.loc[name, 'cumulative_emissions_reduced'] == pytest.approx(expected['cumulative_emissions_reduced'])
+    with pytest.raises(ValueError):
+        batch.ScenarioBatch('bikeinfrastructure', [name, ac])
+
+
+@pytest.mark.parametrize('solution', ['heatpumps', 'airplanes', 'landfillmethane', 'improvedcookstoves',
+                                      'silvopasture', 'afforestation', 'managedgrazing', 'tropicalforests'])
+def test_key_results_solutions(solution):
+    names = factory.list_scenarios(solution)[:2]
+    result = batch.ScenarioBatch(solution, names).key_results()
+    for name in names:
+        expected = factory.load_scenario(solution, name).get_key_results()
+        assert list(result.columns) == list(expected.keys())
+        for (key, value) in expected.items():
+            assert result.loc[name, key] == pytest.approx(value, rel=1e-12, nan_ok=True), key
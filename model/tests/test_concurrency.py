@@ -0,0 +1,90 @@
+"""Tests for concurrency.py."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from model import concurrency
+from model import co2calcs
+from model import datafiles
+from model import metaclass_cache
+from model import operatingcost
+from model import unitadoption
+from solution import factory
+
+
+def test_keyed_locks():
+    locks = concurrency.KeyedLocks()
+    with locks.hold('a'):
+        with locks.hold('a'):   # reentrant
+            assert len(locks) == 1
+        with locks.hold('b'):
+            assert len(locks) == 2
+    assert len(locks) == 0
+
+
+def test_freeze():
+    df = pd.DataFrame({'A': [1.0, 2.0], 'B': [1, 2]})
+    (frozen, arr) = concurrency.freeze((df, np.zeros(3)))
+    assert frozen is df
+    with pytest.raises(ValueError):
+        df.loc[0, 'A'] = 5.0
+    with pytest.raises(ValueError):
+        arr[0] = 1.0
+    copy = df.copy()
+    copy.loc[0, 'A'] = 5.0
+    assert df.loc[0, 'A'] == 1.0
+    assert concurrency.freeze('text') == 'text'
+
+
+def test_shared_cache_single_flight():
+    calls = []
+
+    @concurrency.shared_cache
+    def slow(n):
+        calls.append(n)
+        time.sleep(0.05)
+        return pd.Series([float(n)] * 3)
+
+    barrier = threading.Barrier(8)
+    def call(n):
+        barrier.wait()
+        return slow(n % 2)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(call, range(8)))
+    assert sorted(calls) == [0, 1]
+    assert all(r is results[i % 2] for (i, r) in enumerate(results))
+    with pytest.raises(ValueError):
+        results[0][0] = 1.0
+    assert slow.cache_info().hits == 6
+    slow.cache_clear()
+    slow(0)
+    assert calls[-1] == 0 and len(calls) == 3
+
+
+def _clear_shared_caches():
+    metaclass_cache.clear()
+    datafiles.clear()
+    for f in (co2calcs.co2_ppm_calculator_cached, operatingcost.annual_breakout,
+              unitadoption.cumulative_degraded_land):
+        f.cache_clear()
+
+
+def _key_results(solution_scenario):
+    (solution, scenario) = solution_scenario
+    return factory.load_scenario(solution, scenario).get_key_results()
+
+
+def test_concurrent_scenarios():
+    """Evaluating many scenarios in many threads at once gives the same results as one at a time."""
+    jobs = [ (solution, scenario) for solution in ['solarpvutil', 'airplanes', 'managedgrazing', 'improvedrice']
+             for scenario in factory.list_scenarios(solution)[:3] ]
+    _clear_shared_caches()
+    serial = [ _key_results(job) for job in jobs ]
+    _clear_shared_caches()
+    with ThreadPoolExecutor(8) as pool:
+        concurrent = list(pool.map(_key_results, jobs * 2))
+    for (i, result) in enumerate(concurrent):
+        assert result == serial[i % len(jobs)], jobs[i % len(jobs)]
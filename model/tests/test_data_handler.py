@@ -6,6 +6,7 @@ from model import ch4calcs
 import pytest
 
 from model.data_handler import DataHandler
+from model.decorators import data_func
 
 @pytest.mark.skip(reason="ch4 updates have broken this example")
 def test_ch4_tons_reduced():
@@ -206,3 +207,16 @@ ch4_tons_reduced_list = [
     [2058, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
     [2059, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
     [2060, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]]
+
+
+def test_to_json_does_not_modify_data():
+    class Handler(DataHandler):
+        def __init__(self):
+            self.df = pd.DataFrame({'World': [1.0], 'OECD90': [2.0], 'EU': [3.0]})
+        @data_func
+        def table(self):
+            return self.df
+    h = Handler()
+    json_data = h.to_json(regions=['World', 'EU'])
+    assert list(json_data['table'].columns) == ['World', 'EU']
+    assert list(h.df.columns) == ['World', 'OECD90', 'EU']
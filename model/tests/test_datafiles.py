@@ -0,0 +1,77 @@
+"""Tests for datafiles.py."""
+
+import os
+import pytest
+import pandas as pd
+from model import datafiles
+from model import integration
+from model import metaclass_cache
+from solution import factory
+
+
+@pytest.fixture
+def csv(tmp_path):
+    datafiles.clear()
+    filename = tmp_path / "data.csv"
+    filename.write_text("Year,World,OECD90\n2014,1.0,2.0\n2015,3.0,4.0\n", encoding='utf-8')
+    return filename
+
+
+def test_read_once(csv):
+    df1 = datafiles.read_csv(csv, index_col=0)
+    df2 = datafiles.read_csv(str(csv), index_col=0)
+    pd.testing.assert_frame_equal(df1, df2)
+    assert df1.loc[2015, 'World'] == 3.0
+    stats = datafiles.stats()
+    assert (stats['hits'], stats['misses'], stats['files']) == (1, 1, 1)
+    assert stats['bytes'] > 0
+    # different parsing options are a different entry of the same file
+    datafiles.read_csv(csv, index_col='Year')
+    assert datafiles.stats()['misses'] == 2
+    assert datafiles.stats()['files'] == 1
+
+
+def test_read_only(csv):
+    df = datafiles.read_csv(csv, index_col=0)
+    with pytest.raises(ValueError):
+        df.loc[2014, 'World'] = 10.0
+    # the copy each caller gets may be relabelled without affecting the others
+    df.index = df.index + 1
+    df.name = 'renamed'
+    again = datafiles.read_csv(csv, index_col=0)
+    assert list(again.index) == [2014, 2015]
+    assert not hasattr(again, 'name')
+    assert (df * 2).loc[2015, 'World'] == 2.0
+
+
+def test_changed_file_read_again(csv):
+    assert datafiles.read_csv(csv, index_col=0).loc[2015, 'World'] == 3.0
+    csv.write_text("Year,World,OECD90\n2014,1.0,2.0\n2015,5.0,4.0\n", encoding='utf-8')
+    st = csv.stat()
+    os.utime(csv, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert datafiles.read_csv(csv, index_col=0).loc[2015, 'World'] == 5.0
+    assert datafiles.stats()['misses'] == 2
+    assert datafiles.stats()['files'] == 1
+
+
+def test_overlay_not_cached(csv, monkeypatch):
+    monkeypatch.setenv("DDINTEGRATE", "testint")
+    integration.overlay_start()
+    try:
+        integration.write_text(csv, "Year,World\n2014,7.0\n")
+        assert datafiles.read_csv(csv, index_col=0).loc[2014, 'World'] == 7.0
+    finally:
+        integration.overlay_stop()
+    assert datafiles.read_csv(csv, index_col=0).loc[2014, 'World'] == 1.0
+    assert datafiles.stats()['misses'] == 1
+
+
+def test_scenario_files_read_once():
+    datafiles.clear()
+    metaclass_cache.clear()
+    factory.load_scenario('solarpvutil')
+    misses = datafiles.stats()['misses']
+    metaclass_cache.clear()
+    factory.load_scenario('solarpvutil')
+    assert datafiles.stats()['misses'] == misses
+    assert datafiles.stats()['hits'] >= misses
@@ -1,5 +1,7 @@
 """Tests for emissionsfactors.py."""
 
+import numpy as np
+import pandas as pd
 import pytest
 from model import advanced_controls
 from model import emissionsfactors as ef
@@ -115,3 +117,26 @@ def test_conv_ref_grid_CO2_per_KWh():
     assert table.loc[2041, "India"] == pytest.approx(0.725081980)
     assert table.loc[2020, "EU"] == pytest.approx(0.297016531)
     assert table.loc[2039, "USA"] == pytest.approx(0.594563067)
+
+
+def test_grid_CO2eq_per_KWh_shared():
+    ac = advanced_controls.AdvancedControls(
+            emissions_grid_source="meta-analysis", emissions_grid_range="high")
+    table1 = ef.ElectricityGenOnGrid(ac=ac).conv_ref_grid_CO2eq_per_KWh()
+    table2 = ef.ElectricityGenOnGrid(ac=ac).conv_ref_grid_CO2eq_per_KWh()
+    assert table1 is not table2
+    assert np.shares_memory(table1.values, table2.values)
+    assert (table1.dtypes == np.float64).all()
+    with pytest.raises(ValueError):
+        table1.values[0, 0] = 1.0
+
+
+def test_grid_CO2eq_per_KWh_all_ranges():
+    ac = advanced_controls.AdvancedControls(
+            emissions_grid_source="meta-analysis", emissions_grid_range="mean")
+    eg = ef.ElectricityGenOnGrid(ac=ac, grid_emissions_version=2)
+    tables = eg.conv_ref_grid_CO2eq_per_KWh_all_ranges()
+    assert set(tables.keys()) == set(ef.GRID_RANGE)
+    pd.testing.assert_frame_equal(tables[ef.GRID_RANGE.MEAN], eg.conv_ref_grid_CO2eq_per_KWh())
+    assert tables[ef.GRID_RANGE.LOW].loc[2033, 'World'] == pytest.approx(0.392292329996334)
+    assert tables[ef.GRID_RANGE.HIGH].loc[2033, 'OECD90'] == pytest.approx(0.454068989)
@@ -0,0 +1,85 @@
+"""Tests for export.py"""
+
+import io
+import json
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from model import export
+from model.data_handler import DataHandler
+from model.decorators import data_func
+
+
+class Stage(DataHandler):
+    @lru_cache()
+    @data_func
+    def regional(self):
+        return pd.DataFrame({'World': [1.0, np.nan], 'OECD90': [np.inf, 2.5], 'EU': [3.0, 4.0]},
+                            index=pd.Index([2015, 2016], name='Year'))
+
+    @lru_cache()
+    @data_func
+    def series(self):
+        return pd.Series([1.5, -np.inf], index=[2015, 2016], name='total')
+
+    @data_func
+    def tuple_of_tables(self):
+        return (self.series(), self.regional())
+
+    @data_func
+    def flag(self):
+        return True
+
+
+class Scenario:
+    def __init__(self):
+        self.c2 = Stage()
+
+
+def _lines(obj, **kwargs):
+    f = io.StringIO()
+    export.write_jsonl(obj, f, **kwargs)
+    return { d['table'] : d for d in map(json.loads, f.getvalue().splitlines()) }
+
+
+def test_write_jsonl():
+    lines = _lines(Stage())
+    assert set(lines) == {'regional', 'series', 'tuple_of_tables[0]', 'tuple_of_tables[1]', 'flag'}
+    assert lines['regional'] == {'table': 'regional', 'columns': ['World', 'OECD90', 'EU'],
+                                 'index': [2015, 2016], 'data': [[1.0, 0.0, 3.0], [0.0, 2.5, 4.0]]}
+    assert lines['series'] == {'table': 'series', 'columns': ['total'], 'index': [2015, 2016],
+                               'data': [[1.5], [0.0]]}
+    assert lines['flag'] == {'table': 'flag', 'value': True}
+
+
+def test_write_jsonl_selection():
+    lines = _lines(Scenario(), tables=['c2.regional', 'series'], regions=['World', 'EU'])
+    assert set(lines) == {'c2.regional', 'c2.series'}
+    assert lines['c2.regional']['columns'] == ['World', 'EU']
+    assert lines['c2.regional']['data'] == [[1.0, 3.0], [0.0, 4.0]]
+    assert lines['c2.series']['columns'] == ['total'], "no World: not filtered"
+
+
+def test_write_jsonl_chunks():
+    one = _lines(Stage(), chunk_rows=1)
+    assert one == _lines(Stage())
+
+
+def test_cached_results_not_modified():
+    stage = Stage()
+    expected = stage.regional().copy()
+    _lines(stage, regions=['World'])
+    stage.to_json(regions=['World'])
+    pd.testing.assert_frame_equal(stage.regional(), expected)
+
+
+def test_write_arrow():
+    f = io.BytesIO()
+    assert export.write_arrow(Scenario(), f, tables=['regional', 'flag'], regions=['World', 'OECD90']) == 2
+    table = pa.ipc.open_stream(f.getvalue()).read_all().to_pandas()
+    assert list(table.columns) == export.arrow_columns
+    regional = table[table['table'] == 'c2.regional'].set_index(['row', 'column'])['value']
+    assert regional.to_dict() == {('2015', 'World'): 1.0, ('2015', 'OECD90'): 0.0,
+                                  ('2016', 'World'): 0.0, ('2016', 'OECD90'): 2.5}
+    assert table[table['table'] == 'c2.flag']['value'].tolist() == [1.0]
@@ -0,0 +1,105 @@
+"""Tests for fair_emulator.py."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from model import fair_emulator
+from solution import factory
+
+
+_methods = ['FaIR_CFT_Drawdown_co2eq'] + [f'FaIR_CFT_Drawdown_RCP{r}' for r in ('3', '45', '6', '85')]
+
+
+def test_mode(monkeypatch):
+    monkeypatch.delenv('DDFAIR', raising=False)
+    assert fair_emulator.current_mode() == 'exact'
+    with fair_emulator.mode('emulated'):
+        assert fair_emulator.emulating()
+        with fair_emulator.mode('exact'):
+            assert not fair_emulator.emulating()
+    assert not fair_emulator.emulating()
+    monkeypatch.setenv('DDFAIR', 'emulated')
+    assert fair_emulator.emulating()
+    with pytest.raises(ValueError):
+        with fair_emulator.mode('approximate'):
+            pass
+
+
+def test_emulator_linear():
+    # a linear, time-invariant model (a decaying stock, and its square root) is emulated exactly
+    # where linear, and a change outside the emulated years is run exactly.
+    runs = []
+    def run(emissions):
+        runs.append(emissions)
+        stock = np.zeros(len(emissions))
+        for i in range(1, len(emissions)):
+            stock[i] = 0.9 * stock[i - 1] + emissions[i - 1]
+        return (stock, 2.0 * stock)
+    n = 2501 - fair_emulator.first_year
+    baseline = np.full(n, 1.0)
+    e = fair_emulator.Emulator(run, baseline, {None: -0.5})
+    assert len(runs) == 1 + len(fair_emulator.anchor_years)
+
+    emissions = baseline.copy()
+    emissions[2020 - fair_emulator.first_year] -= 0.3
+    emissions[2045 - fair_emulator.first_year] += 0.7
+    runs.clear()
+    (stock, double) = e(emissions)
+    assert not runs
+    np.testing.assert_allclose(stock, run(emissions)[0])
+    np.testing.assert_allclose(double, 2.0 * stock)
+
+    emissions[2070 - fair_emulator.first_year] += 1.0
+    runs.clear()
+    e(emissions)
+    assert len(runs) == 1
+
+
+def _frames(result):
+    return list(result[:3]) if isinstance(result, tuple) else [result]
+
+
+def _compare(s):
+    """Check the emulated FaIR results of Scenario s against the exact ones."""
+    for method in _methods:
+        f = getattr(s.c2, method).__wrapped__
+        try:
+            exact = _frames(f(s.c2))
+        except ValueError:
+            continue   # the solution cannot compute its reductions
+        with fair_emulator.mode('emulated'):
+            emulated = _frames(f(s.c2))
+        baseline = _frames(getattr(s.c2, method.replace('Drawdown', 'baseline'))())
+        for (b, x, y) in zip(baseline, exact, emulated):
+            for col in x.columns:
+                if x[col].isna().any():
+                    pd.testing.assert_series_equal(x[col], y[col])
+                    continue
+                effect = (x[col] - b[col]).abs().max()
+                error = (x[col] - y[col]).abs().max()
+                bound = 0.06 if col == 'others(Wm-2)' else 0.02
+                assert error <= bound * effect + 1e-12, f'{s.name} {method} {col}'
+                if col in ('T', 'TempAnomaly(C)'):
+                    assert error < 1e-3
+
+
+def test_solarpvutil():
+    _compare(factory.load_scenario('solarpvutil'))
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('name', factory.all_solutions())
+def test_all_solutions(name):
+    _compare(factory.load_scenario(name))
+
+
+def test_batch():
+    e = fair_emulator.emulator('rcp45')
+    emissions = np.repeat(e.emissions[np.newaxis], 3, axis=0)
+    emissions[0, 2030 - fair_emulator.first_year, 1] -= 0.4
+    emissions[1, 2020 - fair_emulator.first_year:2050 - fair_emulator.first_year, 3] -= 5.0
+    emissions[2, 2100 - fair_emulator.first_year, 1] -= 0.1    # run exactly
+    results = e.batch(emissions)
+    for (i, row) in enumerate(emissions):
+        for (batched, single) in zip(results, e(row)):
+            np.testing.assert_allclose(batched[i], single, rtol=1e-12, atol=1e-12)
@@ -0,0 +1,111 @@
+"""Tests for integration.py."""
+
+import os
+import threading
+import pytest
+import pandas as pd
+from model import customadoption
+from model import dd
+from model import integration
+from solution import factory
+
+
+@pytest.fixture
+def overlay(monkeypatch):
+    monkeypatch.setenv("DDINTEGRATE", "testint")
+    integration.overlay_start()
+    yield
+    integration.overlay_stop()
+
+
+def _adoption(value):
+    return pd.DataFrame(value, index=pd.Index(range(2012, 2061), name='Year'), columns=dd.REGIONS)
+
+
+def test_alt_names(monkeypatch):
+    monkeypatch.delenv("DDINTEGRATE", raising=False)
+    assert integration.integration_alt_name("PDS1") == "PDS1"
+    monkeypatch.setenv("DDINTEGRATE", "testint")
+    assert integration.integration_alt_name("PDS1") == "PDS1_testint"
+    assert integration.integration_alt_name("PDS1_testint") == "PDS1_testint"
+    assert integration.integration_alt_file("dir/foo.csv").name == "foo_testint.csv"
+
+
+def test_overlay_read_write(overlay, tmp_path):
+    filename = tmp_path / "adoption.csv"
+    integration.write_csv(_adoption(1.0), filename)
+    assert not filename.is_file(), "overlay writes do not touch the disk"
+    assert integration.file_exists(filename)
+    assert integration.overlay_files(tmp_path, '*.csv') == [filename]
+    df = pd.read_csv(integration.data_source(filename), index_col=0)
+    assert df.loc[2030, 'World'] == 1.0
+    integration.overlay_stop()
+    assert not integration.overlay_active()
+    assert not integration.file_exists(filename)
+
+
+def test_overlay_flush(overlay, tmp_path):
+    filename = tmp_path / "sub" / "adoption.csv"
+    integration.write_text(filename, "Year,World\n2020,3.0\n")
+    integration.overlay_flush()
+    assert filename.read_text(encoding='utf-8') == "Year,World\n2020,3.0\n"
+
+
+def test_overlay_evicts_cached_objects(overlay, tmp_path):
+    filename = tmp_path / "adoption.csv"
+    integration.write_csv(_adoption(1.0), filename)
+    sources = [{'name': 'overlay', 'filename': str(filename), 'include': True}]
+    ca1 = customadoption.CustomAdoption(data_sources=sources, soln_adoption_custom_name='overlay')
+    assert ca1 is customadoption.CustomAdoption(data_sources=sources, soln_adoption_custom_name='overlay')
+
+    integration.write_csv(_adoption(2.0), filename)
+    ca2 = customadoption.CustomAdoption(data_sources=sources, soln_adoption_custom_name='overlay')
+    assert ca2 is not ca1
+    assert ca2.scenarios['overlay']['df'].loc[2030, 'World'] == 2.0
+
+
+def test_update_adoptions_in_memory(overlay):
+    scenario_name = factory.load_scenario('composting', 'PDS1').scenario
+    m = factory._load_module('composting')
+    newadoption = pd.DataFrame({'PDS1': 5.0}, index=pd.Index(range(2012, 2061), name='Year'))
+    m.Scenario.update_adoptions([scenario_name], newadoption)
+    assert not integration.overlay_files(m.Scenario.scenario_path()/"ca_pds_data", '*.csv')[0].is_file()
+
+    updated = factory.load_scenario('composting', 'PDS1')
+    assert updated.scenario == scenario_name + "_testint"
+    assert updated.scenario in factory.list_scenarios('composting')
+    assert updated.ht.soln_pds_funits_adopted().loc[2040, 'World'] == pytest.approx(5.0)
+
+    integration.overlay_stop()
+    assert factory.load_scenario('composting', 'PDS1').scenario == scenario_name
+
+
+def test_mode(monkeypatch, tmp_path):
+    monkeypatch.delenv("DDINTEGRATE", raising=False)
+    filename = tmp_path / "adoption.csv"
+    integration.write_csv(_adoption(1.0), filename)
+    sources = [{'name': 'mode', 'filename': str(filename), 'include': True}]
+    ca1 = customadoption.CustomAdoption(data_sources=sources, soln_adoption_custom_name='mode')
+    seen_outside = []
+
+    def outside():
+        # another thread is not part of the integration
+        seen_outside.append((integration.integration_alt_name("PDS1"), integration.overlay_active(),
+            customadoption.CustomAdoption(data_sources=sources, soln_adoption_custom_name='mode')))
+
+    with integration.mode("testint", in_memory=True):
+        assert integration.integration_alt_name("PDS1") == "PDS1_testint"
+        integration.write_csv(_adoption(2.0), filename)
+        ca2 = customadoption.CustomAdoption(data_sources=sources, soln_adoption_custom_name='mode')
+        assert ca2.scenarios['mode']['df'].loc[2030, 'World'] == 2.0
+        thread = threading.Thread(target=outside)
+        thread.start()
+        thread.join()
+    assert "DDINTEGRATE" not in os.environ
+    assert seen_outside[0][:2] == ("PDS1", False)
+    assert seen_outside[0][2].scenarios['mode']['df'].loc[2030, 'World'] == 1.0
+    assert integration.integration_alt_name("PDS1") == "PDS1"
+    assert not integration.overlay_active()
+    assert filename.read_text(encoding='utf-8') == _adoption(1.0).to_csv()
+    ca3 = customadoption.CustomAdoption(data_sources=sources, soln_adoption_custom_name='mode')
+    assert ca3.scenarios['mode']['df'].loc[2030, 'World'] == 1.0
@@ -1,6 +1,10 @@
 """Tests for metaclass_cache.py"""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from model import metaclass_cache
 from model.metaclass_cache import MetaclassCache
 
 # test_tam.py also exercises metaclass_cache.
@@ -32,3 +36,53 @@ def test_cache():
     a = MemoizedClass(df=df, number=6, number2=6)
     b = MemoizedClass(df=df, number=7, number2=7)
     assert a is not b
+
+
+class KeyedClass(object, metaclass=MetaclassCache):
+    @staticmethod
+    def cache_key_args(pair, number):
+        return ((pair[0], number), {})
+
+    def __init__(self, pair, number):
+        self.pair = pair
+
+
+def test_cache_key_args():
+    a = KeyedClass((1, 'a'), 2)
+    assert KeyedClass((1, 'b'), 2) is a
+    assert a.pair == (1, 'a')
+    assert KeyedClass((2, 'a'), 2) is not a
+    assert KeyedClass((1, 'a'), number=3) is not a
+
+
+class SlowClass(object, metaclass=MetaclassCache):
+    constructed = []
+
+    def __init__(self, number):
+        SlowClass.constructed.append(number)
+        time.sleep(0.05)
+
+
+def test_constructed_once_by_threads():
+    barrier = threading.Barrier(6)
+    def construct(n):
+        barrier.wait()
+        return SlowClass(number=n % 2 + 100)
+    with ThreadPoolExecutor(6) as pool:
+        objects = list(pool.map(construct, range(6)))
+    assert sorted(SlowClass.constructed) == [100, 101]
+    assert all(obj is objects[i % 2] for (i, obj) in enumerate(objects))
+
+
+def test_scope():
+    a = MemoizedClass(df=None, number=8, number2=8)
+    token = metaclass_cache.scope.set('scope1')
+    try:
+        b = MemoizedClass(df=None, number=8, number2=8)
+        assert b is not a
+        assert b is MemoizedClass(df=None, number=8, number2=8)
+    finally:
+        metaclass_cache.scope.reset(token)
+    assert MemoizedClass(df=None, number=8, number2=8) is a
+    assert metaclass_cache.evict_scope('scope1') == 1
+    assert MemoizedClass(df=None, number=8, number2=8) is a
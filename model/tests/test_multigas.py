@@ -0,0 +1,51 @@
+"""Tests for multigas.py."""
+
+import numpy as np
+import pytest
+from model import multigas
+from solution import factory
+
+
+def test_pulses():
+    years = np.arange(2014, 2061)
+    emissions = np.zeros((2, len(years)))
+    emissions[:, years == 2020] = 100.0
+    emissions[:, years == 2014] = 50.0   # not a pulse year
+    result = multigas.pulses('CH4', emissions, years)
+    assert result.shape == (2, len(years), len(multigas.pulse_years))
+    col = list(multigas.pulse_years).index(2020)
+    assert (result[:, years < 2020, :] == 0).all()
+    np.testing.assert_allclose(result[0, years >= 2020, col], 100.0 * np.exp(-np.arange(1, 42) / 12))
+    assert result.sum() == pytest.approx(2 * result[0, :, col].sum())
+    co2 = multigas.pulses('CO2', emissions[0], years)
+    first = 0.217 + 0.259 * np.exp(-1 / 172.9) + 0.338 * np.exp(-1 / 18.51) + 0.186 * np.exp(-1 / 1.186)
+    assert co2[years == 2020, col] == pytest.approx(100.0 * first)
+    assert co2[-1, col] > 0.217 * 100.0
+
+
+def test_forcing():
+    assert multigas.co2_forcing(0.0) == 0.0
+    assert multigas.ch4_forcing(np.zeros(3)) == pytest.approx(np.zeros(3))
+    ppm = np.array([0.0, 1.0, 10.0])
+    np.testing.assert_allclose(multigas.co2eq_ppm(multigas.co2_forcing(ppm)), ppm, atol=1e-12)
+    with pytest.raises(ValueError):
+        multigas.calculate(np.zeros((3, 1, 5)), np.arange(2015, 2020))
+
+
+def test_scenarios_match_tables():
+    scenarios = [ factory.load_scenario(name) for name in ('solarpvutil', 'improvedrice', 'landfillmethane') ]
+    (emissions, years) = multigas.scenario_emissions(scenarios)
+    assert emissions.shape == (2, len(scenarios), len(years))
+    result = multigas.calculate(emissions, years)
+    for (i, s) in enumerate(scenarios):
+        ppm = s.c2.co2eq_ppm_calculator()
+        rows = np.searchsorted(years, ppm.index)
+        co2 = s.c2.co2_ppm_calculator()
+        np.testing.assert_array_equal(result.totals[0, i, rows], co2['Total'])
+        np.testing.assert_array_equal(result.concentrations[0, i, rows], ppm['CO2 PPM'])
+        np.testing.assert_array_equal(result.forcing[0, i, rows], ppm['CO2 RF'])
+        ch4 = s.c4.ch4_ppb_calculator()
+        np.testing.assert_array_equal(result.concentrations[1, i, np.searchsorted(years, ch4.index)], ch4['PPB'])
+        have = ppm['CH4 PPB'].notna().to_numpy()
+        np.testing.assert_array_equal(result.forcing[1, i, rows[have]], ppm['CH4 RF'][have])
+        np.testing.assert_array_equal(result.co2eq_ppm[i, rows[have]], ppm['CO2-eq PPM'][have])
@@ -2019,3 +2019,54 @@ soln_only_single_iunit_cashflow_instreamhydro_nparray = np.array([
     [2053, 308368337737], [2054, 308368337737],
     [2055, 308368337737], [2056, 308368337737],
     [2057, 44052619677], [2058, 0.0], [2059, 0.0], [2060, 0.0]])
+
+
+def _annual_breakout_loop(new_funits_per_year, new_annual_iunits_reqd, lifetime_replacement,
+                          var_oper_cost_per_funit, fuel_cost_per_funit, fixed_oper_cost_per_iunit,
+                          report_end_year, has_var_costs, conversion_factor_vom, conversion_factor_fom):
+    # the original, element by element, calculation of annual_breakout
+    breakout = pd.DataFrame(0, index=np.arange(2015, 2140), columns=np.arange(2015, 2061), dtype='float')
+    for year in range(2015, report_end_year + 1):
+        lifetime = lifetime_replacement
+        while np.ceil(lifetime) < (report_end_year + 1 - year):
+            lifetime += lifetime_replacement
+        cost = var_oper_cost_per_funit + fuel_cost_per_funit if has_var_costs else 0
+        total = new_funits_per_year.loc[year] * cost * conversion_factor_vom
+        total += new_annual_iunits_reqd.loc[year] * fixed_oper_cost_per_iunit * conversion_factor_fom
+        for row in range(year, 2140):
+            val = total * np.clip(lifetime, 0, 1)
+            breakout.loc[row, year] = val if abs(val) > 0.01 else 0.0
+            lifetime -= 1
+            if lifetime <= 0:
+                break
+    return breakout
+
+
+def test_annual_breakout_array():
+    years = np.arange(2015, 2061)
+    funits = pd.Series(np.linspace(10.0, 300.0, len(years)) ** 1.5, index=years)
+    iunits = pd.Series(np.linspace(-2.0, 40.0, len(years)), index=years)
+    iunits.iloc[3] = np.nan
+    scenarios = [(24.000000000000058, 17.0, 7.0, 23.0, True, 33.0, 27.0),
+                 (7.3, 0.5, 0.0, 0.0, True, 1.0, 1.0),
+                 (12.5, None, None, 3.0, False, 10.0, 10.0),
+                 (0.9, 1.0, 2.0, 3.0, True, 1.0, 1.0)]
+    values = list(zip(*scenarios))
+    result = operatingcost.annual_breakout_array(
+            np.stack([funits.loc[2015:2050].to_numpy()] * len(scenarios)),
+            np.stack([iunits.loc[2015:2050].to_numpy()] * len(scenarios)),
+            values[0], values[1], values[2], values[3], 2050, values[4], values[5], values[6])
+    assert result.shape == (len(scenarios), 125, 46)
+    for (i, (lifetime, var, fuel, fixed, has_var, vom, fom)) in enumerate(scenarios):
+        expected = _annual_breakout_loop(funits, iunits, lifetime, var, fuel, fixed, 2050, has_var, vom, fom)
+        np.testing.assert_array_equal(result[i], expected.to_numpy())
+        single = operatingcost.annual_breakout(funits.to_csv(), iunits.to_csv(), lifetime, var, fuel,
+                                               fixed, 2050, has_var, vom, fom)
+        pd.testing.assert_frame_equal(single, expected, check_names=False)
+        assert single.index.name == 'Year'
+
+
+def test_annual_breakout_array_no_costs():
+    result = operatingcost.annual_breakout_array(np.ones((2, 36)), np.ones((2, 36)), 0.0, 1.0, 1.0,
+                                                 0.0, 2050, False, 1.0, 1.0)
+    assert (result == 0.0).all()
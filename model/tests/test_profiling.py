@@ -0,0 +1,93 @@
+"""Tests for profiling.py"""
+
+import json
+from functools import lru_cache
+import pandas as pd
+import pytest
+from model import profiling
+from model import scenario
+from model.decorators import data_func
+
+
+class Stage:
+    @lru_cache()
+    @data_func
+    def cached(self):
+        return pd.DataFrame(0.0, index=range(10), columns=['World'])
+
+    @data_func
+    def uncached(self):
+        return self.cached().sum()
+
+
+class ToyScenario(scenario.Scenario):
+    module_name = 'toy'
+
+    def __init__(self):
+        self.ac = None
+        stage = Stage()
+        stage.uncached()
+        self.ht = stage
+
+
+def test_disabled_is_unwrapped():
+    original = Stage.__dict__['cached']
+    with profiling.profile():
+        assert Stage.__dict__['cached'] is not original
+        assert hasattr(Stage.__dict__['cached'], 'data_func')
+    assert Stage.__dict__['cached'] is original
+    assert profiling._active is None
+
+
+def test_scenario_hooks_only_while_active():
+    init = ToyScenario.__dict__['__init__']
+    assert '__setattr__' not in vars(scenario.Scenario)
+    with profiling.profile() as prof:
+        assert ToyScenario.__dict__['__init__'] is not init
+        class Later(ToyScenario):
+            module_name = 'later'
+            def __init__(self):
+                self.ac = None
+        Later()
+    assert prof.to_frame().loc[('later', 'Scenario.__init__'), 'calls'] == 1
+    assert ToyScenario.__dict__['__init__'] is init
+    assert not hasattr(Later.__dict__['__init__'], '__wrapped__')
+    assert not {'__setattr__', '__init_subclass__'} & set(vars(scenario.Scenario))
+
+
+def test_data_func_stats():
+    stage = Stage()
+    with profiling.profile() as prof:
+        stage.cached()
+        stage.cached()
+        stage.uncached()
+    df = prof.to_frame().loc['']
+    assert df.loc['Stage.cached', 'calls'] == 3
+    assert df.loc['Stage.cached', 'misses'] == 1
+    assert df.loc['Stage.cached', 'hits'] == 2
+    assert df.loc['Stage.cached', 'bytes'] >= 80, "ten float64 values, plus the index"
+    assert df.loc['Stage.uncached', 'misses'] == 1
+    assert df.loc['Stage.uncached', 'self_seconds'] <= df.loc['Stage.uncached', 'seconds']
+
+
+def test_scenario_phases(tmp_path):
+    with profiling.profile() as prof:
+        s = ToyScenario()
+        s.ht.uncached()
+    df = prof.to_frame().loc['toy']
+    assert df.loc['Scenario.__init__', 'calls'] == 1
+    assert {'init:ac', 'init:ht', 'Stage.cached', 'Stage.uncached'} <= set(df.index)
+    assert df.loc['Stage.uncached', 'calls'] == 2, "attributed to toy after construction too"
+    prof.write_trace(tmp_path / 'trace.json')
+    events = json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
+    init = [e for e in events if e['name'] == 'Scenario.__init__'][0]
+    assert all(e['ph'] == 'X' for e in events)
+    assert any(e['name'] == 'Stage.cached' and e['ts'] >= init['ts'] for e in events)
+    assert 'Scenario.__init__' in prof.report()
+
+
+def test_one_profile_at_a_time():
+    with profiling.profile():
+        with pytest.raises(RuntimeError):
+            with profiling.profile():
+                pass
@@ -0,0 +1,74 @@
+"""Tests for regionseries.py."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from model import dd
+from model.regionseries import RegionSeries
+
+
+def _frame():
+    df = pd.DataFrame(np.arange(30, dtype='float').reshape(3, 10), columns=dd.REGIONS,
+                      index=pd.Index([2014, 2015, 2016], name='Year'))
+    df.iloc[1, 2] = np.nan
+    return df
+
+
+def test_frame_round_trip():
+    df = _frame()
+    rs = RegionSeries.from_frame(df)
+    assert rs.values.dtype == np.float64
+    assert rs.shape == (3, 10)
+    result = rs.to_frame(name='test')
+    pd.testing.assert_frame_equal(result, df)
+    assert result.index.name == 'Year'
+    assert result.name == 'test'
+    rs.values[0, 0] = -1.0
+    assert df.iloc[0, 0] == 0.0  # from_frame copies
+
+
+def test_from_frame_object_dtype():
+    df = _frame().astype(object)
+    rs = RegionSeries.from_frame(df)
+    assert rs.values.dtype == np.float64
+    assert rs.row(2016)[0] == 20.0
+
+
+def test_access():
+    rs = RegionSeries.from_frame(_frame())
+    assert list(rs['World']) == [0.0, 10.0, 20.0]
+    assert list(rs.row(2015)[:2]) == [10.0, 11.0]
+    assert rs.position(2016) == 2
+    assert rs.position(2016.0) == 2
+    assert rs.position(2013) is None
+    assert rs.position(2015.5) is None
+    rs['USA'] = 1.0
+    rs.row(2014)[:] = 2.0
+    assert list(rs['USA']) == [2.0, 1.0, 1.0]
+
+
+def test_arithmetic():
+    df = _frame()
+    rs = RegionSeries.from_frame(df)
+    pd.testing.assert_frame_equal((rs + rs).to_frame(), df + df)
+    pd.testing.assert_frame_equal((1.0 - rs * 2).to_frame(), 1.0 - df * 2)
+    pd.testing.assert_frame_equal((rs / 4 - rs).to_frame(), df / 4 - df)
+    pd.testing.assert_frame_equal((-rs).to_frame(), -df)
+    pd.testing.assert_frame_equal(rs.cumsum().to_frame(), df.cumsum(skipna=False))
+    pd.testing.assert_frame_equal(rs.shift(1).to_frame(), df.shift(1))
+    pd.testing.assert_frame_equal(rs.shift(-2).to_frame(), df.shift(-2))
+
+
+def test_arithmetic_requires_same_axes():
+    rs = RegionSeries.from_frame(_frame())
+    other = RegionSeries(rs.values, [2015, 2016, 2017])
+    with pytest.raises(ValueError):
+        rs + other
+    with pytest.raises(TypeError):
+        rs + _frame()
+
+
+def test_shape_mismatch():
+    with pytest.raises(ValueError):
+        RegionSeries(np.zeros((2, 3)), [2014, 2015])
+    assert RegionSeries.zeros(range(2014, 2061)).shape == (47, 10)
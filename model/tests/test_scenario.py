@@ -0,0 +1,34 @@
+"""Tests for scenario.py."""
+
+import pandas as pd
+import pytest
+from solution import factory
+
+
+def test_world_only():
+    full = factory.load_scenario('solarpvutil')
+    wo = factory.load_scenario('solarpvutil', world_only=True)
+    assert wo.tm.world_only and not full.tm.world_only
+    assert wo.get_key_results() == full.get_key_results()
+    assert wo.tm.ref_tam_per_region()['OECD90'].isna().all()
+
+
+def test_world_only_regional_adoption():
+    # the World adoption is the sum of the regions, so everything is computed
+    wo = factory.load_scenario('buildingautomation', 'PDS2', world_only=True)
+    assert wo.ac.soln_pds_adoption_regional_data
+    assert not wo.tm.world_only
+    assert wo.get_key_results() == factory.load_scenario('buildingautomation', 'PDS2').get_key_results()
+
+
+@pytest.mark.parametrize('solution', factory.all_solutions())
+def test_adoption_only(solution):
+    s = factory.load_scenario(solution, adoption_only=True)
+    assert s.ht is not None
+    assert not {'ua', 'fc', 'oc', 'c2'} & set(vars(s)), "the solution returns once ht is set"
+
+
+def test_adoption_only_results():
+    s = factory.load_scenario('afforestation', adoption_only=True)
+    expected = factory.load_scenario('afforestation').ht.soln_pds_funits_adopted()
+    pd.testing.assert_frame_equal(s.ht.soln_pds_funits_adopted(), expected)
@@ -0,0 +1,47 @@
+"""Tests for sensitivity.py."""
+
+import pandas as pd
+import pytest
+from model import advanced_controls
+from model import sensitivity
+from solution import factory
+
+
+def test_vma_fields():
+    ac = factory.load_scenario('solarpvutil', 'PDS2', world_only=True).ac
+    fields = sensitivity.vma_fields(ac)
+    assert fields['soln_lifetime_capacity'] == 'SOLUTION Lifetime Capacity'
+    assert fields['conv_fixed_oper_cost_per_iunit'] == 'CONVENTIONAL Fixed Operating Cost (FOM)'
+    # backed by a VMA which solarpvutil has no data in
+    assert 'soln_energy_efficiency_factor' not in fields
+    assert sensitivity.vma_fields(advanced_controls.AdvancedControls()) == {}
+
+
+def test_tornado():
+    results = ['net_operating_savings', 'cumulative_emissions_reduced']
+    table = sensitivity.tornado('solarpvutil', 'PDS2', results=results)
+    assert list(table.index.get_level_values('result').unique()) == results
+    for result in results:
+        swing = table.loc[result, 'swing']
+        assert swing.is_monotonic_decreasing
+        assert (swing == (table.loc[result, 'high'] - table.loc[result, 'low']).abs()).all()
+    top = table.loc['net_operating_savings'].index[0]
+    assert top in ('soln_fixed_oper_cost_per_iunit', 'conv_fixed_oper_cost_per_iunit')
+
+    base = factory.load_scenario('solarpvutil', 'PDS2')
+    expected = base.get_key_results()
+    assert table.loc[('net_operating_savings', top), 'base'] == pytest.approx(expected['net_operating_savings'])
+    ac = advanced_controls.ac_from_dict(dict(base.ac.as_dict(), name='high', **{top: 'high'}), base.ac.vmas)
+    expected = factory.load_scenario('solarpvutil', ac).get_key_results()
+    assert table.loc[('net_operating_savings', top), 'high'] == pytest.approx(expected['net_operating_savings'])
+    assert table.loc[('net_operating_savings', top), 'input_high'] == pytest.approx(getattr(ac, top))
+
+    with pytest.raises(ValueError):
+        sensitivity.tornado('solarpvutil', 'PDS2', fields=['soln_energy_efficiency_factor'])
+
+
+def test_tornado_workers():
+    fields = ['soln_avg_annual_use', 'conv_avg_annual_use', 'soln_indirect_co2_per_iunit']
+    serial = sensitivity.tornado('solarpvutil', 'PDS2', fields=fields)
+    parallel = sensitivity.tornado('solarpvutil', 'PDS2', fields=fields, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
@@ -98,6 +98,25 @@ def test_forecast_data_world():
     assert forecast.loc[2027, c] == pytest.approx(32564.99176177900)
 
 
+def test_shared_forecast_data():
+    (tamconfig1, tamconfig2) = (g_tamconfig.copy(), g_tamconfig.copy())
+    tamconfig1.loc['growth', 'World'] = 'Low'
+    tamconfig2.loc['growth', 'World'] = 'High'
+    with tam.shared_forecast_data():
+        tm1 = tam.TAM(tamconfig=tamconfig1, tam_ref_data_sources=g_tam_ref_data_sources,
+                tam_pds_data_sources=g_tam_pds_data_sources)
+        tm2 = tam.TAM(tamconfig=tamconfig2, tam_ref_data_sources=g_tam_ref_data_sources,
+                tam_pds_data_sources=g_tam_pds_data_sources)
+        assert tm1 is not tm2
+        assert tm1.forecast_data('World') is tm2.forecast_data('World')
+    tamconfig3 = g_tamconfig.copy()
+    tamconfig3.loc['trend', 'World'] = 'Linear'
+    tm3 = tam.TAM(tamconfig=tamconfig3, tam_ref_data_sources=g_tam_ref_data_sources,
+            tam_pds_data_sources=g_tam_pds_data_sources)
+    assert tm3.forecast_data('World') is not tm1.forecast_data('World')
+    pd.testing.assert_frame_equal(tm3.forecast_data('World'), tm1.forecast_data('World'))
+
+
 def test_forecast_min_max_sd_global():
     tm = tam.TAM(tamconfig=g_tamconfig, tam_ref_data_sources=g_tam_ref_data_sources,
             tam_pds_data_sources=g_tam_pds_data_sources)
@@ -625,6 +644,22 @@ def test_pds_tam_per_region():
     pd.testing.assert_frame_equal(result, expected, check_exact=False)
 
 
+def test_tam_per_region_world_only():
+    tm = tam.TAM(tamconfig=g_tamconfig, tam_ref_data_sources=g_tam_ref_data_sources,
+                 tam_pds_data_sources=g_tam_pds_data_sources)
+    wo = tam.TAM(tamconfig=g_tamconfig, tam_ref_data_sources=g_tam_ref_data_sources,
+                 tam_pds_data_sources=g_tam_pds_data_sources, world_only=True)
+    for (result, expected) in ((wo.ref_tam_per_region(), tm.ref_tam_per_region()),
+                               (wo.pds_tam_per_region(), tm.pds_tam_per_region())):
+        assert list(result.columns) == list(expected.columns)
+        pd.testing.assert_series_equal(result['World'], expected['World'])
+        assert result.drop(columns='World').isna().all().all()
+        assert (result.dtypes == np.float64).all()
+    regional = tam.TAM(tamconfig=g_tamconfig, tam_ref_data_sources=g_tam_ref_data_sources,
+                 tam_pds_data_sources=g_tam_pds_data_sources, main_includes_regional=True, world_only=True)
+    assert not regional.ref_tam_per_region().isna().any().any()
+
+
 def test_pds_tam_per_region_no_pds_sources():
     no_data_sources = {'Ambitious Cases': {}, 'Baseline Cases': {},
                        'Conservative Cases': {}}
@@ -766,6 +766,17 @@ def test_soln_pds_tot_iunits_reqd():
     pd.testing.assert_frame_equal(result, expected, check_exact=False)
 
 
+def test_add_replacement_units():
+    index = pd.Index(range(2015, 2021), name='Year')
+    new_units = pd.DataFrame({'World': [1.0, 2.0, 0.0, 3.0, 1.0, 1.0]}, index=index)
+    funits = pd.DataFrame({'World': [1.0, 2.0, 2.0, 3.0, 3.0, 2.0]}, index=index)
+    result = unitadoption.add_replacement_units(new_units, funits, 2)
+    # 2019 replaces 2017 including its own replacements; funits fell by 2020, so no replacement then
+    assert list(result['World']) == [1.0, 2.0, 1.0, 5.0, 2.0, 1.0]
+    assert result.index.name == 'Year'
+    assert list(new_units['World']) == [1.0, 2.0, 0.0, 3.0, 1.0, 1.0]
+
+
 def test_soln_pds_new_iunits_reqd():
     soln_pds_funits_adopted = pd.DataFrame(soln_pds_funits_adopted_list[1:],
             columns=soln_pds_funits_adopted_list[0]).set_index('Year')
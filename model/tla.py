@@ -6,9 +6,9 @@ Drawdown. The only real function of the TLA tab is to provide a place to input c
 which can be used instead of Drawdown's allocations. Thus, this class is named CustomTLA.
 """
 
-from functools import lru_cache
 import pandas as pd
 from model import dd
+from model.concurrency import shared_cache
 from model.metaclass_cache import MetaclassCache
 
 from model.data_handler import DataHandler
@@ -63,7 +63,7 @@ class CustomTLA(DataHandler, object, metaclass=MetaclassCache):
         # statistical calcs if a solution calls for it.
         return self.df
 
-    @lru_cache()
+    @shared_cache()
     @data_func
     def get_world_values(self):
         return self._avg_high_low()
@@ -7,14 +7,17 @@ import pandas as pd
 import numpy as np
 from io import StringIO
 
+from model import datafiles
 from model import dd
 from model import emissionsfactors
 from model.advanced_controls import SOLUTION_CATEGORY
+from model.concurrency import shared_cache
+from model.regionseries import RegionSeries
 
 from model.data_handler import DataHandler
 from model.decorators import data_func
 
-@lru_cache
+@shared_cache
 def cumulative_degraded_land( 
     total_area_per_region,
     units_adopted,
@@ -33,22 +36,43 @@ def cumulative_degraded_land(
         return df  # passthru a DataFrame of zeros for non protection solutions
 
     delay = 1 if delay_protection_1yr else 0
+    degraded = RegionSeries.from_frame(df)
+    protected = RegionSeries.from_frame(units_adopted)
     if protected_or_unprotected == 'protected':
         # protected table starts with nonzero value
-        df.loc[2014, :] = units_adopted.loc[2014, :] * disturbance_rate
+        degraded.row(2014)[:] = protected.row(2014) * disturbance_rate
+    else:
+        total = RegionSeries.from_frame(total_area_per_region.reindex(columns=df.columns))
 
     for y in list(df.index)[1:]:
-        protected_land = units_adopted.loc[y - delay, :]
-        degraded_land = df.loc[y - 1, :]
+        protected_land = protected.row(y - delay)
+        degraded_land = degraded.row(y - 1)
+        # fmin skips NaN, as DataFrame.min() does
         if protected_or_unprotected == 'protected':
             row = degraded_land + (protected_land - degraded_land) * disturbance_rate
-            row = pd.DataFrame([row, protected_land]).min()
+            row = np.fmin(row, protected_land)
         elif protected_or_unprotected == 'unprotected':
-            tot_area = total_area_per_region.loc[y, :]
+            tot_area = total.row(y)
             row = degraded_land + (tot_area - protected_land - degraded_land) * degradation_rate
-            row = pd.DataFrame([row, tot_area]).min()
-        df.loc[y, :] = row
-    return df
+            row = np.fmin(row, tot_area)
+        degraded.row(y)[:] = row
+    return degraded.to_frame()
+
+
+def add_replacement_units(new_units, funits_adopted, lifetime):
+    """Add replacement units to new_units (a DataFrame of new implementation units per year and
+       region): in each year, the units added lifetime years before now need replacement, unless
+       funits_adopted has fallen since then.  Years are taken in order, so that replacement units
+       are themselves replaced in turn.  Returns a new DataFrame.
+    """
+    result = RegionSeries.from_frame(new_units)
+    fa = RegionSeries.from_frame(funits_adopted.loc[new_units.index, new_units.columns])
+    values = result.values
+    for (i, year) in enumerate(result.years):
+        j = result.position(year - lifetime)
+        if j is not None:
+            values[i] = np.where(fa.values[j] <= fa.values[i], values[i] + values[j], values[i])
+    return result.to_frame()
 
 class UnitAdoption(DataHandler):
     """Implementation for the Unit Adoption module.
@@ -100,8 +124,8 @@ class UnitAdoption(DataHandler):
            SolarPVUtil 'Unit Adoption Calculations'!P16:Z63
         """
         filename = os.path.join(self.datadir, 'population', 'ref_population.csv')
-        result = pd.read_csv(filename, index_col=0, skipinitialspace=True,
-                             skip_blank_lines=True, comment='#')
+        result = datafiles.read_csv(filename, index_col=0, skipinitialspace=True,
+                                    skip_blank_lines=True, comment='#')
         result.index = result.index.astype(int)
         result.name = "ref_population"
         return result
@@ -113,8 +137,8 @@ class UnitAdoption(DataHandler):
            SolarPVUtil 'Unit Adoption Calculations'!AB16:AL63
         """
         filename = os.path.join(self.datadir, 'population', 'ref_gdp.csv')
-        result = pd.read_csv(filename, index_col=0, skipinitialspace=True,
-                             skip_blank_lines=True, comment='#')
+        result = datafiles.read_csv(filename, index_col=0, skipinitialspace=True,
+                                    skip_blank_lines=True, comment='#')
         result.index = result.index.astype(int)
         result.name = "ref_gdp"
         return result
@@ -165,8 +189,8 @@ class UnitAdoption(DataHandler):
            SolarPVUtil 'Unit Adoption Calculations'!P68:Z115
         """
         filename = os.path.join(self.datadir, 'population', 'pds_population.csv')
-        result = pd.read_csv(filename, index_col=0, skipinitialspace=True,
-                             skip_blank_lines=True, comment='#')
+        result = datafiles.read_csv(filename, index_col=0, skipinitialspace=True,
+                                    skip_blank_lines=True, comment='#')
         result.index = result.index.astype(int)
         result.name = "pds_population"
         return result
@@ -177,8 +201,8 @@ class UnitAdoption(DataHandler):
            SolarPVUtil 'Unit Adoption Calculations'!AB68:AL115
         """
         filename = os.path.join(self.datadir, 'population', 'pds_gdp.csv')
-        result = pd.read_csv(filename, index_col=0, skipinitialspace=True,
-                             skip_blank_lines=True, comment='#')
+        result = datafiles.read_csv(filename, index_col=0, skipinitialspace=True,
+                                    skip_blank_lines=True, comment='#')
         result.index = result.index.astype(int)
         result.name = "pds_gdp"
         return result
@@ -420,16 +444,11 @@ class UnitAdoption(DataHandler):
         if self.repeated_cost_for_iunits:
             return self.soln_pds_tot_iunits_reqd().iloc[1:].copy(deep=True).clip(lower=0.0)
         result = self.soln_pds_tot_iunits_reqd().diff().clip(lower=0).iloc[1:]  # [0] nan w/ diff
-        for region, column in result.iteritems():
-            for year, value in column.iteritems():
-                # Add replacement units, if needed by adding the number of units
-                # added N * soln_lifetime_replacement ago, that now need replacement.
-                # replacement_period_offset is a backwards compatibility thing
-                replacement_year = year - (self.ac.soln_lifetime_replacement_rounded + self.replacement_period_offset)
-                fa = self.soln_pds_funits_adopted
-                if replacement_year in result.index:
-                    if fa.loc[replacement_year, region] <= fa.loc[year, region]:
-                        result.at[year, region] += result.at[replacement_year, region]
+        # Add replacement units, if needed by adding the number of units
+        # added N * soln_lifetime_replacement ago, that now need replacement.
+        # replacement_period_offset is a backwards compatibility thing
+        result = add_replacement_units(result, self.soln_pds_funits_adopted,
+                self.ac.soln_lifetime_replacement_rounded + self.replacement_period_offset)
         result.name = "soln_pds_new_iunits_reqd"
         return result
 
@@ -484,19 +503,11 @@ class UnitAdoption(DataHandler):
         result = self.soln_ref_tot_iunits_reqd().diff().clip(lower=0).iloc[1:]  # [0] NaN w/ diff
 
         # NOTE: Excel allows for region-specific replacement periods, but this code does not.
-        # For each region, for each year, add replacement items if appropriate
-        for region, column in result.iteritems():
-            for year, value in column.iteritems():
-                # Add replacement units, if needed by adding the number of units
-                # added N * soln_lifetime_replacement ago, that now need replacement.
-                # replacement_period_offset is a backwards compatibility thing
-                replacement_year = year - (self.ac.soln_lifetime_replacement_rounded + self.replacement_period_offset)
-                fa = self.soln_ref_funits_adopted
-
-                if replacement_year in result.index:
-                    if fa.loc[replacement_year, region] <= fa.loc[year, region]:
-                        result.at[year, region] += result.at[replacement_year, region]
-        return result
+        # Add replacement units, if needed by adding the number of units
+        # added N * soln_lifetime_replacement ago, that now need replacement.
+        # replacement_period_offset is a backwards compatibility thing
+        return add_replacement_units(result, self.soln_ref_funits_adopted,
+                self.ac.soln_lifetime_replacement_rounded + self.replacement_period_offset)
 
 
     def soln_ref_new_iunits_reqd_LAND(self):
@@ -504,16 +515,10 @@ class UnitAdoption(DataHandler):
            Afforestation 'Unit Adoption Calculations'!AG197:AQ244
         """
         result = self.soln_ref_funits_adopted.diff().clip(lower=0).iloc[1:]  # [0] NaN w/ diff
-        for region, column in result.iteritems():
-            for year, value in column.iteritems():
-                # Add replacement units, if needed by adding the number of units
-                # added N * conv_lifetime_replacement ago, that now need replacement.
-                replacement_year = int(year - (self.ac.conv_lifetime_replacement_rounded + self.replacement_period_offset))
-                if replacement_year in result.index:
-                    fa = self.soln_ref_funits_adopted
-                    if fa.at[replacement_year, region] <= fa.at[year, region]:
-                        result.at[year, region] += result.at[replacement_year, region]
-        return result
+        # Add replacement units, if needed by adding the number of units
+        # added N * conv_lifetime_replacement ago, that now need replacement.
+        return add_replacement_units(result, self.soln_ref_funits_adopted,
+                int(self.ac.conv_lifetime_replacement_rounded + self.replacement_period_offset))
 
     @lru_cache()
     def soln_ref_new_iunits_reqd(self):
@@ -281,18 +281,19 @@ class Scenario(scenario.LandScenario):
             total_adoption_limit=self.tla_per_region)
 
         # Manual adjustment made in spreadsheet for Drawdown 2020.
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2014] = [290.462336306692, 98.1783330003811, 44.5558196042818, 113.789076382508,
-                    17.4259450169749, 16.5131623025461, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2015] = [291.336550416405, 98.2542011640878, 44.5812227272287, 114.378174359749,
-                    17.4918608321974, 16.6310913331414, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2016] = [292.240912741787, 98.3317866108997, 44.6073285492058, 114.988603296961,
-                    17.5600505509306, 16.7531437337891, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2017] = [293.175447683892, 98.4110924492030, 44.6341380907823, 115.620380827999,
-                    17.6305154458053, 16.8793208701027, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2018] = [294.140179643776, 98.4921217873836, 44.6616523725276, 116.273524586716,
-                    17.7032567894526, 17.0096241076960, 0.0, 0.0, 0.0, 0.0]
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2014] = [290.462336306692, 98.1783330003811, 44.5558196042818, 113.789076382508,
+                        17.4259450169749, 16.5131623025461, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2015] = [291.336550416405, 98.2542011640878, 44.5812227272287, 114.378174359749,
+                        17.4918608321974, 16.6310913331414, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2016] = [292.240912741787, 98.3317866108997, 44.6073285492058, 114.988603296961,
+                        17.5600505509306, 16.7531437337891, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2017] = [293.175447683892, 98.4110924492030, 44.6341380907823, 115.620380827999,
+                        17.6305154458053, 16.8793208701027, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2018] = [294.140179643776, 98.4921217873836, 44.6616523725276, 116.273524586716,
+                        17.7032567894526, 17.0096241076960, 0.0, 0.0, 0.0, 0.0]
 
         self.initialize_adoption_bases()
 
@@ -339,6 +340,8 @@ class Scenario(scenario.LandScenario):
             copy_ref_datapoint=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -0,0 +1,197 @@
+"""Asynchronous counterparts of the factory functions, for embedding the model in asyncio code.
+
+Evaluating a scenario is CPU work, so these run it in an executor (a thread pool by default, or a
+process pool) and await the result, leaving the event loop free.  Identical requests made while one
+is in progress share it: a request for the same (solution, scenario, advanced controls) as one
+already running waits for the running one instead of doing the work again.
+
+    await load_scenario_async('solarpvutil', 'PDS2')          # a Scenario object
+    await key_results_async('solarpvutil', 'PDS2')            # the key results dict
+    await to_json_async('solarpvutil', 'PDS2', regions=['World'])   # JSON lines text (see model.export)
+
+Each call may be given a timeout in seconds (default: that of the Evaluator), after which it raises
+asyncio.TimeoutError (before Python 3.11, not the builtin TimeoutError).  A call that times out or
+is cancelled stops waiting; the work itself is cancelled only if no other request is waiting for it
+and it has not yet started (work that has started in the executor runs to completion and its result
+is discarded).
+
+The functions use a default Evaluator, which may be replaced with configure(...).  Scenario objects
+cannot be passed between processes, so load_scenario_async always runs in a thread, even when the
+Evaluator has a process pool.  The Scenario it returns is shared by all the requests coalesced with
+it.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from model import export
+from model.advanced_controls import AdvancedControls
+from solution import factory
+
+
+def scenario_key(scenario):
+    """Return the key of scenario (as given to factory.load_scenario) used to recognize identical
+    requests: the name of a scenario, or a hash of the values of advanced controls."""
+    if scenario is None or isinstance(scenario, str):
+        return scenario
+    if isinstance(scenario, AdvancedControls):
+        scenario = scenario.as_dict()
+    return hashlib.sha1(json.dumps(scenario, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _portable(scenario):
+    """scenario in a form that may be sent to another process."""
+    return scenario.as_dict() if isinstance(scenario, AdvancedControls) else scenario
+
+
+# The work, as module-level functions so that they can be run in a process pool.
+
+def _load_scenario(solution, scenario, world_only):
+    return factory.load_scenario(solution, scenario, world_only=world_only)
+
+
+def _key_results(solution, scenario):
+    return factory.load_scenario(solution, scenario, world_only=True).get_key_results()
+
+
+def _to_json(solution, scenario, tables, regions):
+    f = io.StringIO()
+    export.write_jsonl(factory.load_scenario(solution, scenario), f, tables=tables, regions=regions)
+    return f.getvalue()
+
+
+class _Request:
+    """Work in progress, and the number of requests waiting for it."""
+
+    def __init__(self, future):
+        self.future = future
+        self.waiting = 0
+
+
+class Evaluator:
+    """Runs the model for asyncio code.
+         executor: the concurrent.futures executor to run the model in (default: a thread pool of
+           max_workers threads, created when first needed).
+         process: if True (and no executor is given), use a process pool of max_workers instead.
+         timeout: the default timeout of each request, in seconds (None: no timeout).
+    """
+
+    def __init__(self, executor=None, process=False, max_workers=None, timeout=None):
+        self.executor = executor
+        self.process = process
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._owned = []       # the executors created here
+        self._threads = None   # the thread pool for loading scenarios, if executor is a process pool
+        self._requests = {}    # (event loop, request key) : _Request
+
+    def _executor(self):
+        if self.executor is None:
+            pool = ProcessPoolExecutor if self.process else ThreadPoolExecutor
+            self.executor = pool(max_workers=self.max_workers)
+            self._owned.append(self.executor)
+        return self.executor
+
+    def _thread_executor(self):
+        executor = self._executor()
+        if not isinstance(executor, ProcessPoolExecutor):
+            return executor
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.max_workers)
+            self._owned.append(self._threads)
+        return self._threads
+
+    async def _run(self, key, executor, function, args, timeout):
+        """Return the result of function(*args) run in executor, sharing the work with any request
+        for the same key in progress."""
+        loop = asyncio.get_running_loop()
+        k = (loop, key)
+        request = self._requests.get(k)
+        if request is None or request.future.cancelled():
+            request = _Request(asyncio.wrap_future(executor.submit(function, *args), loop=loop))
+            self._requests[k] = request
+
+            def finished(future):
+                if self._requests.get(k) is request:
+                    del self._requests[k]
+                if not future.cancelled():
+                    future.exception()   # retrieved here, in case no request is left to see it
+            request.future.add_done_callback(finished)
+        request.waiting += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(request.future),
+                                          self.timeout if timeout is None else timeout)
+        finally:
+            request.waiting -= 1
+            if request.waiting == 0 and not request.future.done():
+                # no one wants the result any more: cancel the work, if it has not started
+                request.future.cancel()
+                if self._requests.get(k) is request:
+                    del self._requests[k]
+
+    async def load_scenario(self, solution, scenario=None, world_only=False, timeout=None):
+        """Return factory.load_scenario(solution, scenario, world_only=world_only)."""
+        return await self._run(('load_scenario', solution, scenario_key(scenario), world_only),
+                               self._thread_executor(), _load_scenario, (solution, scenario, world_only),
+                               timeout)
+
+    async def key_results(self, solution, scenario=None, timeout=None):
+        """Return the key results of scenario of solution (computed with a World-only scenario)."""
+        return await self._run(('key_results', solution, scenario_key(scenario)), self._executor(),
+                               _key_results, (solution, _portable(scenario)), timeout)
+
+    async def to_json(self, solution, scenario=None, tables=None, regions=None, timeout=None):
+        """Return the data function outputs of scenario of solution as JSON lines text, as written
+        by model.export.write_jsonl with tables and regions."""
+        tables = None if tables is None else tuple(sorted(tables))
+        regions = None if regions is None else tuple(regions)
+        return await self._run(('to_json', solution, scenario_key(scenario), tables, regions),
+                               self._executor(), _to_json, (solution, _portable(scenario), tables, regions),
+                               timeout)
+
+    def shutdown(self, wait=True):
+        """Shut down the executors created by this Evaluator."""
+        for executor in self._owned:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        if self.executor in self._owned:
+            self.executor = None
+        self._owned = []
+        self._threads = None
+
+
+_evaluator = None
+
+
+def configure(executor=None, process=False, max_workers=None, timeout=None):
+    """Replace the default Evaluator with Evaluator(executor, process, max_workers, timeout), shutting
+    down the previous one.  Returns the new Evaluator."""
+    global _evaluator
+    if _evaluator is not None:
+        _evaluator.shutdown(wait=False)
+    _evaluator = Evaluator(executor=executor, process=process, max_workers=max_workers, timeout=timeout)
+    return _evaluator
+
+
+def evaluator():
+    """Return the default Evaluator."""
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = Evaluator()
+    return _evaluator
+
+
+async def load_scenario_async(solution, scenario=None, world_only=False, timeout=None):
+    """As factory.load_scenario (see Evaluator.load_scenario)."""
+    return await evaluator().load_scenario(solution, scenario, world_only=world_only, timeout=timeout)
+
+
+async def key_results_async(solution, scenario=None, timeout=None):
+    """The key results of a scenario (see Evaluator.key_results)."""
+    return await evaluator().key_results(solution, scenario, timeout=timeout)
+
+
+async def to_json_async(solution, scenario=None, tables=None, regions=None, timeout=None):
+    """The outputs of a scenario as JSON lines (see Evaluator.to_json)."""
+    return await evaluator().to_json(solution, scenario, tables=tables, regions=regions, timeout=timeout)
@@ -160,18 +160,19 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
         # Manual adjustment made in spreadsheet for Drawdown 2020.
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2014] = [32.8913636108367000, 0.0, 0.0, 18.0440250214314000, 3.9611495064729000,
-                    10.8861890829324000, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2015] = [33.0453659423780000, 0.0, 0.0, 18.1703910504150000, 3.9772571687142000,
-                    10.8977177232488000, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2016] = [33.2014226143695000, 0.0, 0.0, 18.2979284861039000, 3.9938159101118100,
-                    10.9096782181539000, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2017] = [33.3595689913150000, 0.0, 0.0, 18.4266654288099000, 4.0108468526825300,
-                    10.9220567098226000, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2018] = [33.5198404377181000, 0.0, 0.0, 18.5566299788448000, 4.0283711184431500,
-                    10.9348393404302000, 0.0, 0.0, 0.0, 0.0]
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2014] = [32.8913636108367000, 0.0, 0.0, 18.0440250214314000, 3.9611495064729000,
+                        10.8861890829324000, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2015] = [33.0453659423780000, 0.0, 0.0, 18.1703910504150000, 3.9772571687142000,
+                        10.8977177232488000, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2016] = [33.2014226143695000, 0.0, 0.0, 18.2979284861039000, 3.9938159101118100,
+                        10.9096782181539000, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2017] = [33.3595689913150000, 0.0, 0.0, 18.4266654288099000, 4.0108468526825300,
+                        10.9220567098226000, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2018] = [33.5198404377181000, 0.0, 0.0, 18.5566299788448000, 4.0283711184431500,
+                        10.9348393404302000, 0.0, 0.0, 0.0, 0.0]
 
 
         self.initialize_adoption_bases()
@@ -219,6 +220,8 @@ class Scenario(scenario.LandScenario):
             copy_ref_datapoint=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -180,6 +180,8 @@ class Scenario(scenario.RRSScenario):
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source,
             copy_pds_datapoint=False)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac, grid_emissions_version=3)
 
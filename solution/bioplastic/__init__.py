@@ -167,6 +167,8 @@ class Scenario(scenario.RRSScenario):
                 ref_adoption_limits=ref_tam_per_region, pds_adoption_limits=pds_tam_per_region,
                 pds_adoption_trend_per_region=pds_adoption_trend_per_region,
                 pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
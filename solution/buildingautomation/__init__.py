@@ -232,6 +232,8 @@ class Scenario(scenario.RRSScenario):
                 pds_adoption_trend_per_region=pds_adoption_trend_per_region,
                 pds_adoption_is_single_source=pds_adoption_is_single_source,
                 use_first_ref_datapoint_main=True)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
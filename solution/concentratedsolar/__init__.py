@@ -182,6 +182,8 @@ class Scenario(scenario.RRSScenario):
             adoption_base_year=2018,
             copy_pds_to_ref=True,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac, grid_emissions_version=2)
 
@@ -355,18 +355,19 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
 
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2014] = [108.926170040128000, 43.700575542980000, 9.040960261572450,
-                    8.934730992728910, 1.113417893008100, 46.136485349838400, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2015] = [118.522634649202000, 47.190416175021700, 10.277201842542000,
-                    10.390765035686000, 1.355692262948170, 49.308559333003700, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2016] = [128.231557482326000, 50.685767480789800, 11.580017143547000,
-                    11.936077959964700, 1.613327416836600, 52.416367481188000, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2017] = [138.054065103220000, 54.187020002847500, 12.949707603363100,
-                    13.570892429945200, 1.886419963055470, 55.460025104009000, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2018] = [147.991284075603000, 57.694564283758300, 14.386574660765900,
-                    15.295431110007600, 2.175066509986860, 58.439647511084400, 0.0, 0.0, 0.0, 0.0]
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2014] = [108.926170040128000, 43.700575542980000, 9.040960261572450,
+                        8.934730992728910, 1.113417893008100, 46.136485349838400, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2015] = [118.522634649202000, 47.190416175021700, 10.277201842542000,
+                        10.390765035686000, 1.355692262948170, 49.308559333003700, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2016] = [128.231557482326000, 50.685767480789800, 11.580017143547000,
+                        11.936077959964700, 1.613327416836600, 52.416367481188000, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2017] = [138.054065103220000, 54.187020002847500, 12.949707603363100,
+                        13.570892429945200, 1.886419963055470, 55.460025104009000, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2018] = [147.991284075603000, 57.694564283758300, 14.386574660765900,
+                        15.295431110007600, 2.175066509986860, 58.439647511084400, 0.0, 0.0, 0.0, 0.0]
 
 
         self.initialize_adoption_bases()
@@ -413,6 +414,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=False, copy_ref_datapoint=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -252,6 +252,8 @@ class Scenario(scenario.RRSScenario):
             copy_pds_to_ref=True, copy_ref_datapoint=False, copy_pds_datapoint=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac, grid_emissions_version=3)
 
@@ -2,8 +2,8 @@
 
 import importlib
 from pathlib import Path
-from functools import lru_cache
 from model import advanced_controls as ac
+from model.concurrency import shared_cache
 from model import scenario
 from model import vma
 
@@ -17,28 +17,39 @@ def all_solutions():
     # The above test is sufficient, but to be nice, allow for two more ways to make something not a solution
     return [ name for name in candidates if not name.startswith('_') and not name.startswith('test') ]
 
+def all_solutions_category(category):
+    """Return the solutions in category (an advanced_controls.SOLUTION_CATEGORY)"""
+    return [ name for name in all_solutions() if _load_module(name).solution_category == category ]
+
 def list_scenarios(solution):
     """Return a list of scenarios for this solution"""
     m = _load_module(solution)
-    return list(m.scenarios.keys())
+    return list({**m.scenarios, **m.Scenario.overlay_scenarios()}.keys())
 
-def load_scenario(solution, scenario=None):
+def load_scenario(solution, scenario=None, adoption_only=False, world_only=False):
     """Load a scenario for the requested solution.  Scenario may be one of the following:
      * None (the default): return the PDS2 scenario for this solution
      * `PDS`, `PDS2` or `PDS3`:  get the most recent scenario of the requested type
      * a scenario name:  load the scenario with that name
      * an AdvancedControl object: load a scenario with completely custom values
      * a json dictionary representing an AdvancedControl object:  load a completely custom scenario based on the data in the object
-     * the format should be the same as the sceanrios stored with the solution."""
+     * the format should be the same as the sceanrios stored with the solution.
+    If adoption_only is True, the scenario is only constructed as far as its adoptions (tam and HelperTables);
+    see scenario.Scenario.adoption_only.  If world_only is True, only the World results (such as the key
+    results) are computed correctly; see scenario.Scenario.world_only."""
     m = _load_module(solution)
     if isinstance(scenario, dict):
         scenario = ac.ac_from_dict(scenario, m.VMAs)
     elif scenario in ['PDS1','PDS2','PDS3']:
         md = {'PDS1': m.PDS1, 'PDS2': m.PDS2, 'PDS3': m.PDS3}
         scenario = md[scenario]
+    if adoption_only:
+        return m.Scenario.adoption_only(scenario)
+    if world_only:
+        return m.Scenario.world_only(scenario)
     return m.Scenario(scenario)
 
-@lru_cache()
+@shared_cache()
 def _load_module(solution):
     """Return the Scenario class and list of scenarios."""
     importname = 'solution.' + solution
@@ -188,11 +188,12 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
 
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            for year in range(2012, 2019):
-                df.loc[year] = [20.029602999999, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-            df.sort_index(inplace=True)
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                for year in range(2012, 2019):
+                    df.loc[year] = [20.029602999999, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+                df.sort_index(inplace=True)
 
         self.initialize_adoption_bases()
         ref_adoption_data_per_region = None
@@ -234,6 +235,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -385,9 +385,10 @@ class Scenario(scenario.LandScenario):
             low_sd_mult=self.ac.soln_pds_adoption_custom_low_sd_mult,
             total_adoption_limit=self.tla_per_region)
 
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2014:2018, 'World'] = 651.0
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2014:2018, 'World'] = 651.0
 
         self.initialize_adoption_bases()
         ref_adoption_data_per_region = None
@@ -429,6 +430,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=True,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -234,13 +234,14 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
 
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2014, 'World'] = 132.860079407797
-            df.loc[2015, 'World'] = 139.475887288368
-            df.loc[2016, 'World'] = 146.114200458296
-            df.loc[2017, 'World'] = 152.77501982823
-            df.loc[2018, 'World'] = 159.457782791276
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2014, 'World'] = 132.860079407797
+                df.loc[2015, 'World'] = 139.475887288368
+                df.loc[2016, 'World'] = 146.114200458296
+                df.loc[2017, 'World'] = 152.77501982823
+                df.loc[2018, 'World'] = 159.457782791276
 
 
         self.initialize_adoption_bases()
@@ -287,6 +288,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -18,6 +18,10 @@ SCENARIO_SKIP = None
 # Exponential forecasts.
 TEST_SKIP = ['BT677:BV723','CA677:CD723','CR677:CT723']
 
+# The deep test below is the standard one, which tools/deep_runner.py may run in its place.
+# Remove this if you change the test.
+STANDARD_DEEP_TEST = True
+
 def test_loader():
     """Test that the solution can load the defined scenarios"""
     pds1 = factory.load_scenario(solution_name,"PDS1")
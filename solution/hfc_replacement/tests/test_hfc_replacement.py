@@ -15,6 +15,10 @@ solution_name = thisdir.parents[0].name
 # Someday we'll have a scanner that will check for these
 SCENARIO_SKIP = ['PDS2-82p2050-Median', 1, 'PDS3-97p2050-Upper', 2]
 TEST_SKIP = ['First Cost', 'Operating Cost', 'Net Profit Margin', 'Unit Adoption']
+
+# The deep test below is the standard one, which tools/deep_runner.py may run in its place.
+# Remove this if you change the test.
+STANDARD_DEEP_TEST = True
 # 'S-Curve', 'Unit Adoption Calculations', 
 
 def test_loader():
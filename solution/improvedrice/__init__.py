@@ -251,13 +251,14 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
 
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2014, 'World'] = 31.2753335238409000
-            df.loc[2015, 'World'] = 33.6257358946259000
-            df.loc[2016, 'World'] = 35.9761382654110000
-            df.loc[2017, 'World'] = 38.3265406361960000
-            df.loc[2018, 'World'] = 40.6769430069810000
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2014, 'World'] = 31.2753335238409000
+                df.loc[2015, 'World'] = 33.6257358946259000
+                df.loc[2016, 'World'] = 35.9761382654110000
+                df.loc[2017, 'World'] = 38.3265406361960000
+                df.loc[2018, 'World'] = 40.6769430069810000
 
 
         self.initialize_adoption_bases()
@@ -304,6 +305,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
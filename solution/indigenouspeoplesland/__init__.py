@@ -302,15 +302,16 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
 
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2012, 'World'] = 431.635465343388
-            df.loc[2013, 'World'] = 442.123227592586
-            df.loc[2014, 'World'] = 453.987693921633
-            df.loc[2015, 'World'] = 464.65888472248
-            df.loc[2016, 'World'] = df.loc[2015, 'World']
-            df.loc[2017, 'World'] = 486.074210468988
-            df.loc[2018, 'World'] = 496.809418409265
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2012, 'World'] = 431.635465343388
+                df.loc[2013, 'World'] = 442.123227592586
+                df.loc[2014, 'World'] = 453.987693921633
+                df.loc[2015, 'World'] = 464.65888472248
+                df.loc[2016, 'World'] = df.loc[2015, 'World']
+                df.loc[2017, 'World'] = 486.074210468988
+                df.loc[2018, 'World'] = 496.809418409265
 
 
         self.initialize_adoption_bases()
@@ -357,6 +358,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
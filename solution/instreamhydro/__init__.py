@@ -191,6 +191,8 @@ class Scenario(scenario.RRSScenario):
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source,
             adoption_base_year=2018, copy_pds_to_ref=True)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac, grid_emissions_version=2)
 
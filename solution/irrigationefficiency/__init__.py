@@ -170,6 +170,8 @@ class Scenario(scenario.LandScenario):
                 ref_adoption_limits=self.tla_per_region, pds_adoption_limits=self.tla_per_region,
                 pds_adoption_trend_per_region=pds_adoption_trend_per_region,
                 pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -175,6 +175,8 @@ class Scenario(scenario.RRSScenario):
             use_first_ref_datapoint_main=True, use_first_pds_datapoint_main=True,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
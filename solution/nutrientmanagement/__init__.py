@@ -259,9 +259,10 @@ class Scenario(scenario.LandScenario):
             total_adoption_limit=self.tla_per_region)
 
         # Manual adjustment made in spreadsheet for Drawdown 2020.
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2012:2018, 'World'] = 139.129613374975
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2012:2018, 'World'] = 139.129613374975
 
         self.initialize_adoption_bases()
         ref_adoption_data_per_region = None
@@ -303,6 +304,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -395,18 +395,19 @@ class Scenario(scenario.LandScenario):
 
         # Current adoption values for the year 2012-2017 are taken from the sheet
         # "org adoption by country" in the Excel file for this solution.
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2014] = [10.0425, 6.230983199564, 1.024820758485, 1.495740017536,
-                    0.280348210165, 0.342272547086, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2015] = [10.4821, 6.392187207238, 1.186149025025, 1.609802907785,
-                    0.313522708425, 0.349200927281, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2016] = [10.9217, 6.560831715351, 1.372873741988, 1.732564062959,
-                    0.350622850918, 0.356484379405, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2017] = [11.3613, 6.743428946088, 1.588992842952, 1.864686799696,
-                    0.392113171655, 0.364411206077, 0.0, 0.0, 0.0, 0.0]
-            df.loc[2018] = [11.8009, 6.946491121632, 1.839133620034, 2.006885018162,
-                    0.438513174434, 0.373269709916, 0.0, 0.0, 0.0, 0.0]
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2014] = [10.0425, 6.230983199564, 1.024820758485, 1.495740017536,
+                        0.280348210165, 0.342272547086, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2015] = [10.4821, 6.392187207238, 1.186149025025, 1.609802907785,
+                        0.313522708425, 0.349200927281, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2016] = [10.9217, 6.560831715351, 1.372873741988, 1.732564062959,
+                        0.350622850918, 0.356484379405, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2017] = [11.3613, 6.743428946088, 1.588992842952, 1.864686799696,
+                        0.392113171655, 0.364411206077, 0.0, 0.0, 0.0, 0.0]
+                df.loc[2018] = [11.8009, 6.946491121632, 1.839133620034, 2.006885018162,
+                        0.438513174434, 0.373269709916, 0.0, 0.0, 0.0, 0.0]
 
         self.initialize_adoption_bases()
         if self.ac.soln_ref_adoption_basis == 'Custom':
@@ -453,6 +454,8 @@ class Scenario(scenario.LandScenario):
             copy_ref_datapoint=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -222,15 +222,16 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
 
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2012, 'World'] = 2.86
-            df.loc[2013, 'World'] = 3.5
-            df.loc[2014, 'World'] = 4.15259261268174
-            df.loc[2015, 'World'] = 4.79610333421305
-            df.loc[2016, 'World'] = 5.44024605689438
-            df.loc[2017, 'World'] = 6.08503665221758
-            df.loc[2018, 'World'] = 6.73044601473859
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2012, 'World'] = 2.86
+                df.loc[2013, 'World'] = 3.5
+                df.loc[2014, 'World'] = 4.15259261268174
+                df.loc[2015, 'World'] = 4.79610333421305
+                df.loc[2016, 'World'] = 5.44024605689438
+                df.loc[2017, 'World'] = 6.08503665221758
+                df.loc[2018, 'World'] = 6.73044601473859
 
         self.initialize_adoption_bases()
         if self.ac.soln_ref_adoption_basis == 'Custom':
@@ -278,6 +279,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=copy_pds_to_ref,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
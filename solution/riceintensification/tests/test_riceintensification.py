@@ -15,6 +15,10 @@ solution_name = thisdir.parents[0].name
 SCENARIO_SKIP = None
 TEST_SKIP = None
 
+# The deep test below is the standard one, which tools/deep_runner.py may run in its place.
+# Remove this if you change the test.
+STANDARD_DEEP_TEST = True
+
 def test_loader():
     """Test that the solution can load the defined scenarios"""
     pds1 = factory.load_scenario(solution_name,"PDS1")
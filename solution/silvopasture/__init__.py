@@ -271,20 +271,19 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
         # Manual adjustment made in spreadsheet for Drawdown 2020.
-        for source in ca_pds_data_sources:
-            if 'filename' in source:
-                # only the interpolated sources are adjusted
-                continue
-            name = source['name']
-            s = self.pds_ca.scenarios[name]
-            df = s['df']
-            df.loc[2012, 'World'] = 450.0
-            df.loc[2013, 'World'] = 466.666666666667
-            df.loc[2014, 'World'] = 483.333333333333
-            df.loc[2015, 'World'] = 500.0
-            df.loc[2016, 'World'] = 516.666666666667
-            df.loc[2017, 'World'] = 533.333333333333
-            df.loc[2018, 'World'] = 550.0
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for source in ca_pds_data_sources:
+                if 'filename' in source or source['name'] not in ca_scenarios:
+                    # only the interpolated sources are adjusted
+                    continue
+                df = ca_scenarios[source['name']]['df']
+                df.loc[2012, 'World'] = 450.0
+                df.loc[2013, 'World'] = 466.666666666667
+                df.loc[2014, 'World'] = 483.333333333333
+                df.loc[2015, 'World'] = 500.0
+                df.loc[2016, 'World'] = 516.666666666667
+                df.loc[2017, 'World'] = 533.333333333333
+                df.loc[2018, 'World'] = 550.0
 
         self.initialize_adoption_bases()
         if self.ac.soln_ref_adoption_basis == 'Custom':
@@ -330,6 +329,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
@@ -167,6 +167,8 @@ class Scenario(scenario.RRSScenario):
             use_first_ref_datapoint_main=True,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         # ''' NC/MM 2021-07-25
         # This is a 'solution-specific' hack to try and fix the Assertion Errors we are getting out of the Tests on the First Cost numbers.
@@ -17,6 +17,10 @@ solution_name = thisdir.parents[0].name
 # The net effect on results is small.
 SCENARIO_SKIP = [None]
 TEST_SKIP = ['AT308:BD354','CO2 Calcs']
+
+# The deep test below is the standard one, which tools/deep_runner.py may run in its place.
+# Remove this if you change the test.
+STANDARD_DEEP_TEST = True
 KEY_RESULTS_SKIP = ['cumulative_emissions_reduced',]
 
 def test_loader():
@@ -0,0 +1,105 @@
+"""Tests for async_factory.py."""
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from . import async_factory
+from . import factory
+
+
+@pytest.fixture
+def evaluator():
+    e = async_factory.Evaluator(executor=ThreadPoolExecutor(max_workers=2))
+    yield e
+    e.executor.shutdown(wait=True)
+
+
+def _slow(calls, seconds=0.1):
+    def work(solution, scenario):
+        calls.append((solution, scenario))
+        time.sleep(seconds)
+        return {'solution': solution, 'scenario': scenario}
+    return work
+
+
+def test_identical_requests_coalesced(evaluator, monkeypatch):
+    calls = []
+    monkeypatch.setattr(async_factory, '_key_results', _slow(calls))
+    custom = {'name': 'custom', 'report_end_year': 2050}
+
+    async def main():
+        return await asyncio.gather(*[evaluator.key_results('solarpvutil', 'PDS2') for _ in range(5)],
+                evaluator.key_results('solarpvutil', 'PDS3'),
+                evaluator.key_results('solarpvutil', dict(custom)),
+                evaluator.key_results('solarpvutil', dict(custom)))
+    results = asyncio.run(main())
+    assert sorted(c[1] if isinstance(c[1], str) else 'custom' for c in calls) == ['PDS2', 'PDS3', 'custom']
+    assert all(r == {'solution': 'solarpvutil', 'scenario': 'PDS2'} for r in results[:5])
+    # once finished, a request is made again
+    asyncio.run(evaluator.key_results('solarpvutil', 'PDS2'))
+    assert len(calls) == 4
+
+
+def test_timeout(evaluator, monkeypatch):
+    calls = []
+    monkeypatch.setattr(async_factory, '_key_results', _slow(calls, seconds=0.5))
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(evaluator.key_results('solarpvutil', 'PDS2', timeout=0.05))
+    evaluator.timeout = 0.05
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(evaluator.key_results('solarpvutil', 'PDS1'))
+    assert asyncio.run(evaluator.key_results('solarpvutil', 'PDS1', timeout=5))['scenario'] == 'PDS1'
+
+
+def test_cancelled_before_starting(monkeypatch):
+    release = threading.Event()
+    calls = []
+    def work(solution, scenario):
+        calls.append(scenario)
+        release.wait(5)
+        return scenario
+    monkeypatch.setattr(async_factory, '_key_results', work)
+    e = async_factory.Evaluator(executor=ThreadPoolExecutor(max_workers=1))
+
+    async def main():
+        running = asyncio.create_task(e.key_results('solarpvutil', 'first'))
+        waiting = asyncio.create_task(e.key_results('solarpvutil', 'second'))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release.set()
+        return await running
+    assert asyncio.run(main()) == 'first'
+    e.executor.shutdown(wait=True)
+    assert calls == ['first']
+
+
+def test_key_results_and_json():
+    expected = factory.load_scenario('solarpvutil', 'PDS2', world_only=True).get_key_results()
+    e = async_factory.configure(max_workers=2, timeout=120)
+    try:
+        async def main():
+            return await asyncio.gather(async_factory.key_results_async('solarpvutil', 'PDS2'),
+                    async_factory.to_json_async('solarpvutil', 'PDS2', tables=['c2.co2_mmt_reduced'],
+                                                regions=['World']),
+                    async_factory.load_scenario_async('solarpvutil', 'PDS2'))
+        (results, text, scenario) = asyncio.run(main())
+    finally:
+        e.shutdown()
+    assert results == expected
+    line = json.loads(text)
+    assert line['table'] == 'c2.co2_mmt_reduced' and line['columns'] == ['World']
+    assert scenario.scenario == factory.load_scenario('solarpvutil', 'PDS2').scenario
+
+
+def test_process_pool():
+    ac = factory.load_scenario('solarpvutil', 'PDS2').ac
+    expected = factory.load_scenario('solarpvutil', ac, world_only=True).get_key_results()
+    e = async_factory.Evaluator(process=True, max_workers=1)
+    try:
+        assert asyncio.run(e.key_results('solarpvutil', ac, timeout=300)) == expected
+    finally:
+        e.shutdown()
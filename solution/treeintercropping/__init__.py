@@ -302,15 +302,16 @@ class Scenario(scenario.LandScenario):
             high_sd_mult=1.0, low_sd_mult=1.0,
             total_adoption_limit=self.tla_per_region)
 
-        for s in self.pds_ca.scenarios.values():
-            df = s['df']
-            df.loc[2012, 'World'] = 254.91717271225
-            df.loc[2013, 'World'] = 256.900453733641
-            df.loc[2014, 'World'] = 259.672330723017
-            df.loc[2015, 'World'] = 261.743911973822
-            df.loc[2016, 'World'] = 263.820565911005
-            df.loc[2017, 'World'] = 265.901052727049
-            df.loc[2018, 'World'] = 267.984718062521
+        with self.pds_ca.adjusting() as ca_scenarios:
+            for s in ca_scenarios.values():
+                df = s['df']
+                df.loc[2012, 'World'] = 254.91717271225
+                df.loc[2013, 'World'] = 256.900453733641
+                df.loc[2014, 'World'] = 259.672330723017
+                df.loc[2015, 'World'] = 261.743911973822
+                df.loc[2016, 'World'] = 263.820565911005
+                df.loc[2017, 'World'] = 265.901052727049
+                df.loc[2018, 'World'] = 267.984718062521
 
         self.initialize_adoption_bases()
         if self.ac.soln_ref_adoption_basis == 'Custom':
@@ -361,6 +362,8 @@ class Scenario(scenario.LandScenario):
             copy_pds_to_ref=False, copy_ref_datapoint=False,
             pds_adoption_trend_per_region=pds_adoption_trend_per_region,
             pds_adoption_is_single_source=pds_adoption_is_single_source)
+        if self._adoption_only:
+            return
 
         self.ef = emissionsfactors.ElectricityGenOnGrid(ac=self.ac)
 
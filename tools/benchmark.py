@@ -0,0 +1,315 @@
+"""Performance benchmarks for the solution models.
+
+Measures, for a few representative solutions, the time and peak memory of constructing the default
+scenario from cold caches, computing its key results, and computing all its other outputs.  The same
+runs are broken down by stage of the model (TAM, AdoptionData, CustomAdoption, AEZ, HelperTables,
+UnitAdoption, FirstCost, OperatingCost, CO2Calcs, and the FaIR runs within CO2Calcs), by timing the
+methods of each stage's class wherever they are called from.  Timings are the best of several runs;
+peak memory is measured in a separate run with tracemalloc, which would otherwise distort the timings.
+
+Optionally (--sweep), also times loading the default scenario of every solution in
+factory.all_solutions() and computing its key results, as a warm end-to-end sweep.
+
+Results can be saved as a baseline, and later runs compared against it:
+    python -m tools.benchmark --save                 # store .benchmarks/baseline.json
+    python -m tools.benchmark --compare              # compare with it, flagging regressions
+    python -m tools.benchmark --sweep --repeat 1 solarpvutil
+"""
+
+import argparse
+import datetime
+import functools
+import gc
+import importlib
+import inspect
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+import pandas as pd
+from model import metaclass_cache
+from solution import factory
+
+default_solutions = ['solarpvutil', 'afforestation', 'tropicalforests']
+ocean_solutions = ['seaweedfarming']
+default_baseline = Path(__file__).parents[1] / '.benchmarks' / 'baseline.json'
+
+# (stage name, module, class whose methods make up the stage, filter on the method names)
+stages = [
+    ('tam', 'model.tam', 'TAM', None),
+    ('adoption_data', 'model.adoptiondata', 'AdoptionData', None),
+    ('custom_adoption', 'model.customadoption', 'CustomAdoption', None),
+    ('aez', 'model.aez', 'AEZ', None),
+    ('helper_tables', 'model.helpertables', 'HelperTables', None),
+    ('unit_adoption', 'model.unitadoption', 'UnitAdoption', None),
+    ('first_cost', 'model.firstcost', 'FirstCost', None),
+    ('operating_cost', 'model.operatingcost', 'OperatingCost', None),
+    ('co2_calcs', 'model.co2calcs', 'CO2Calcs', lambda name: not name.startswith('FaIR')),
+    ('fair', 'model.co2calcs', 'CO2Calcs', lambda name: name.startswith('FaIR')),
+]
+
+# scenario attributes holding the stage objects, whose data_func methods are the outputs of a scenario
+_output_attributes = ['tm', 'ad', 'pds_ca', 'ref_ca', 'ae', 'ht', 'ua', 'fc', 'oc', 'c2']
+
+
+def clear_caches():
+    """Empty the caches that are shared between scenarios: the MetaclassCache, and the module-level
+    lru_caches of the model."""
+    metaclass_cache.clear()
+    for (name, module) in list(sys.modules.items()):
+        if name.startswith('model.') and module is not None:
+            for value in list(vars(module).values()):
+                if isinstance(value, functools._lru_cache_wrapper):
+                    value.cache_clear()
+    gc.collect()
+
+
+class _StageTimer:
+    """Attributes time and memory to the stages of the model, by wrapping the methods of the stage
+    classes while installed.  Time is exclusive: time spent in a method of another stage is charged to
+    that stage, so TAM data computed while constructing UnitAdoption counts as 'tam'.  Peak memory is
+    inclusive: the most memory allocated (above the level at entry) while any method of the stage ran."""
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.seconds = {}
+        self.peaks = {}
+        self._stack = []   # [stage (None for a phase), traced memory at entry, peak above that]
+        self._mark = None
+        self._originals = []
+
+    def __enter__(self):
+        for (stage, module, classname, name_filter) in stages:
+            cls = getattr(importlib.import_module(module), classname)
+            for (name, value) in list(vars(cls).items()):
+                if name.startswith('__') and name != '__init__':
+                    continue
+                if not (inspect.isfunction(value) or isinstance(value, functools._lru_cache_wrapper)):
+                    continue
+                if name_filter is not None and not name_filter(name):
+                    continue
+                self._originals.append((cls, name, value))
+                setattr(cls, name, self._wrap(stage, value))
+        return self
+
+    def __exit__(self, *args):
+        for (cls, name, value) in reversed(self._originals):
+            setattr(cls, name, value)
+        self._originals = []
+
+    def _wrap(self, stage, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._enter(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit()
+        return wrapper
+
+    def _charge(self):
+        now = time.perf_counter()
+        if self._stack and self._stack[-1][0] is not None:
+            stage = self._stack[-1][0]
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + now - self._mark
+        self._mark = now
+
+    def _update_peaks(self):
+        (current, peak) = tracemalloc.get_traced_memory()
+        for frame in self._stack:
+            frame[2] = max(frame[2], peak - frame[1])
+        tracemalloc.reset_peak()
+        return current
+
+    def _enter(self, stage):
+        self._charge()
+        current = self._update_peaks() if self.memory else 0
+        self._stack.append([stage, current, 0])
+
+    def _exit(self):
+        self._charge()
+        if self.memory:
+            self._update_peaks()
+        (stage, _, peak) = self._stack.pop()
+        if stage is not None:
+            self.peaks[stage] = max(self.peaks.get(stage, 0), peak)
+        return peak
+
+    def measure(self, func):
+        """Return (seconds, peak MB) for calling func, which is not charged to any stage."""
+        start = time.perf_counter()
+        self._enter(None)
+        try:
+            func()
+        finally:
+            peak = self._exit()
+        return (time.perf_counter() - start, peak / 2**20 if self.memory else None)
+
+
+def _measure(func, memory):
+    """Return (seconds, peak MB) for calling func; peak memory is only measured if memory is True."""
+    if memory:
+        tracemalloc.reset_peak()
+        start_mem = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    peak = (tracemalloc.get_traced_memory()[1] - start_mem) / 2**20 if memory else None
+    return (seconds, peak)
+
+
+def _all_outputs(obj):
+    """Compute every data_func output of the stages of scenario obj.  Some outputs do not apply to
+    every kind of solution (and raise); they are skipped."""
+    for attribute in _output_attributes:
+        stage = getattr(obj, attribute, None)
+        for name in (dir(stage) if stage is not None else []):
+            method = getattr(stage, name)
+            if hasattr(method, 'data_func'):
+                try:
+                    method()
+                except Exception:  # pylint: disable=broad-except
+                    pass
+
+
+def _stages_once(solution, memory):
+    """Construct the default scenario of solution from cold caches, compute its key results, then all
+    its other outputs.  Returns {name : (seconds, peak MB)}, for those three phases and for each stage."""
+    clear_caches()
+    result = {}
+    holder = {}
+    def construct():
+        holder['obj'] = factory.load_scenario(solution)
+    with _StageTimer(memory) as timer:
+        result['construct'] = timer.measure(construct)
+        result['key_results'] = timer.measure(lambda: holder['obj'].get_key_results())
+        result['all_outputs'] = timer.measure(lambda: _all_outputs(holder['obj']))
+    for (stage, _, _, _) in stages:
+        if stage in timer.seconds:
+            result[f"stage/{stage}"] = (timer.seconds[stage],
+                                        timer.peaks[stage] / 2**20 if memory else None)
+    return result
+
+
+def _ocean_once(solution, memory):
+    module = __import__(f'solution.{solution}.{solution}_solution', fromlist=['_'])
+    cls = [v for (k, v) in vars(module).items() if k.endswith('Solution') and k != 'OceanSolution'][0]
+    clear_caches()
+    holder = {}
+    def construct():
+        holder['obj'] = cls()
+        holder['obj'].load_scenario(holder['obj'].get_scenario_names()[0])
+    result = {'construct': _measure(construct, memory)}
+    obj = holder['obj']
+    getters = [getattr(obj, name) for name in dir(obj) if name.startswith('get_') and
+               name not in ('get_scenario_names', 'get_loaded_scenario_name') and
+               getattr(obj, name).__code__.co_argcount == 1]
+    result['results'] = _measure(lambda: [g() for g in getters], memory)
+    return result
+
+
+def benchmark_solution(solution, repeat=3, memory=True):
+    """Return {benchmark name : {'seconds', 'peak_mb'}} for the stages of solution."""
+    once = _ocean_once if solution in ocean_solutions else _stages_once
+    runs = [once(solution, memory=False) for _ in range(repeat)]
+    peaks = {}
+    if memory:
+        tracemalloc.start()
+        try:
+            peaks = once(solution, memory=True)
+        finally:
+            tracemalloc.stop()
+    return { f"{solution}/{stage}" : {'seconds': min(run[stage][0] for run in runs),
+                                      'peak_mb': peaks[stage][1] if stage in peaks else None}
+             for stage in runs[0].keys() }
+
+
+def benchmark_sweep(solutions=None):
+    """Time loading the default scenario and computing the key results of each solution (warm caches).
+    Returns {benchmark name : {'seconds', 'peak_mb'}}; failures are reported and skipped."""
+    results = {}
+    total = 0.0
+    for solution in (solutions or factory.all_solutions()):
+        start = time.perf_counter()
+        try:
+            factory.load_scenario(solution).get_key_results()
+        except Exception as e:  # pylint: disable=broad-except
+            # some solutions are incomplete; they are reported, and don't stop the sweep
+            print(f"sweep: {solution} failed: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+        seconds = time.perf_counter() - start
+        total += seconds
+        results[f"sweep/{solution}"] = {'seconds': seconds, 'peak_mb': None}
+    results["sweep/total"] = {'seconds': total, 'peak_mb': None}
+    return results
+
+
+def run(solutions=None, repeat=3, memory=True, sweep=False):
+    """Run the benchmarks, returning a dict suitable for saving as a baseline."""
+    results = {}
+    for solution in (solutions or default_solutions + ocean_solutions):
+        results.update(benchmark_solution(solution, repeat=repeat, memory=memory))
+    if sweep:
+        results.update(benchmark_sweep())
+    return {'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'pandas': pd.__version__},
+            'results': results}
+
+
+def compare(baseline, current, threshold=1.25, min_seconds=0.05):
+    """Compare two sets of results (as returned by run).  Returns a DataFrame indexed by benchmark
+    name, with the baseline and current seconds and peak memory, their ratios, and a 'regression'
+    column that is True where the current time or memory exceeds the baseline by more than the
+    threshold ratio (times must also differ by at least min_seconds, to ignore noise)."""
+    rows = {}
+    for name in sorted(set(baseline['results']) | set(current['results'])):
+        b = baseline['results'].get(name, {})
+        c = current['results'].get(name, {})
+        row = {'base_s': b.get('seconds'), 'now_s': c.get('seconds'),
+               'base_mb': b.get('peak_mb'), 'now_mb': c.get('peak_mb')}
+        row['time_ratio'] = row['now_s'] / row['base_s'] if row['base_s'] and row['now_s'] is not None else None
+        row['mem_ratio'] = row['now_mb'] / row['base_mb'] if row['base_mb'] and row['now_mb'] is not None else None
+        slower = (row['time_ratio'] is not None and row['time_ratio'] > threshold and
+                  row['now_s'] - row['base_s'] >= min_seconds)
+        bigger = row['mem_ratio'] is not None and row['mem_ratio'] > threshold and row['now_mb'] - row['base_mb'] >= 1.0
+        row['regression'] = bool(slower or bigger)
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient='index',
+            columns=['base_s', 'now_s', 'time_ratio', 'base_mb', 'now_mb', 'mem_ratio', 'regression'])
+
+
+def format_results(results):
+    lines = [f"{'benchmark':40} {'seconds':>10} {'peak MB':>10}"]
+    for (name, r) in results['results'].items():
+        peak = f"{r['peak_mb']:10.1f}" if r['peak_mb'] is not None else f"{'':>10}"
+        lines.append(f"{name:40} {r['seconds']:10.3f} {peak}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark solution construction and model stages.")
+    parser.add_argument('solutions', nargs='*', help=f"solutions to benchmark (default: {default_solutions + ocean_solutions})")
+    parser.add_argument('--repeat', type=int, default=3, help="number of timed runs per solution (the best is kept)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory measurements")
+    parser.add_argument('--sweep', action='store_true', help="also time the default scenario of every solution")
+    parser.add_argument('--save', nargs='?', const=default_baseline, help="save the results as a baseline (default: %(const)s)")
+    parser.add_argument('--compare', nargs='?', const=default_baseline, help="compare with a saved baseline (default: %(const)s)")
+    parser.add_argument('--threshold', type=float, default=1.25, help="ratio above which a benchmark counts as a regression")
+    args = parser.parse_args()
+
+    results = run(args.solutions, repeat=args.repeat, memory=not args.no_memory, sweep=args.sweep)
+    print(format_results(results))
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save).write_text(json.dumps(results, indent=1), encoding='utf-8')
+        print(f"Saved baseline {args.save}")
+    if args.compare:
+        report = compare(json.loads(Path(args.compare).read_text(encoding='utf-8')), results, threshold=args.threshold)
+        with pd.option_context('display.max_rows', None, 'display.width', 200):
+            print(report.to_string(float_format=lambda x: f"{x:.3f}"))
+        regressions = report.index[report['regression']].tolist()
+        print(f"{len(regressions)} regressions" + (": " + ", ".join(regressions) if regressions else ""))
+        raise SystemExit(1 if regressions else 0)
@@ -0,0 +1,73 @@
+"""Benchmark the vectorized expected result comparison against the cell-by-cell one.
+
+Compares every range that the deep tests check for one scenario of a solution, with both
+expected_result_tester.dataframes_differ (vectorized) and dataframes_differ_cellwise, checks
+that they find the same differences, and reports the time taken by each.
+
+    python -m tools.compare_benchmark [solution] [scenario_index]
+
+The solution defaults to electricbikes, and the scenario to the first one.
+"""
+
+import importlib
+import pathlib
+import sys
+import time
+import zipfile
+import pandas as pd
+from model import scenario
+from tools import expected_result_tester as ert
+from tools.util import df_excel_range
+
+
+def benchmark(solution_name='electricbikes', scenario_index=0):
+    """Return a dict with the number of ranges and cells compared, the number of differing cells,
+    and the time in seconds taken by the cellwise and vectorized comparisons."""
+    m = importlib.import_module('solution.' + solution_name)
+    scenario_name = list(m.scenarios.keys())[scenario_index]
+    expected_filename = pathlib.Path(m.__file__).parent/"tests"/"expected.zip"
+    result = {'ranges': 0, 'cells': 0, 'differ': 0, 'cellwise': 0.0, 'vectorized': 0.0}
+    with zipfile.ZipFile(expected_filename) as zf:
+        obj = m.Scenario(scen=scenario_name)
+        if isinstance(obj, scenario.LandScenario):
+            verify = ert.LAND_solution_verify_list(obj, zf)
+        else:
+            verify = ert.RRS_solution_verify_list(obj, zf)
+
+        for sheetname in verify.keys():
+            with zf.open(name=f'{scenario_name}/{sheetname}') as zip_csv_f:
+                sheet_df = pd.read_csv(zip_csv_f, header=None, na_values=['#REF!', '#DIV/0!', '#VALUE!', '(N/A)'])
+            for (cellrange, actual_df, actual_mask, expected_mask) in verify[sheetname]:
+                expected_df = df_excel_range(sheet_df, cellrange)
+                if actual_df.shape != expected_df.shape:
+                    continue
+                (expected_mask, thresh) = ert.expected_mask_for(expected_df, expected_mask)
+                if actual_mask is not None and expected_mask is not None:
+                    mask = actual_mask | expected_mask
+                else:
+                    mask = actual_mask if actual_mask is not None else expected_mask
+
+                start = time.perf_counter()
+                slow = ert.dataframes_differ_cellwise(actual_df, expected_df, mask, thresh=thresh)
+                result['cellwise'] += time.perf_counter() - start
+                start = time.perf_counter()
+                fast = ert.dataframes_differ(actual_df, expected_df, mask, thresh=thresh)
+                result['vectorized'] += time.perf_counter() - start
+
+                slow_cells = [(r, c) for (r, c, _, _) in slow or []]
+                fast_cells = [(r, c) for (r, c, _, _) in fast or []]
+                if slow_cells != fast_cells:
+                    raise AssertionError(f"{sheetname} {cellrange}: comparisons disagree")
+                result['ranges'] += 1
+                result['cells'] += actual_df.size
+                result['differ'] += len(fast_cells)
+    return result
+
+
+if __name__ == "__main__":
+    solution_name = sys.argv[1] if len(sys.argv) > 1 else 'electricbikes'
+    scenario_index = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    r = benchmark(solution_name, scenario_index)
+    print(f"{solution_name}: {r['ranges']} ranges, {r['cells']} cells, {r['differ']} differing")
+    print(f"  cellwise:   {r['cellwise']:8.3f}s")
+    print(f"  vectorized: {r['vectorized']:8.3f}s   ({r['cellwise'] / max(r['vectorized'], 1e-9):.1f}x faster)")
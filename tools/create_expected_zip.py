@@ -7,11 +7,13 @@ import argparse
 import pathlib
 import zipfile
 import pandas as pd
+from tools import expected_store
 
 
-def create_expected_zip(directory):
+def create_expected_zip(directory, store=False):
     """Assemble the csv files created by the export macro into an expected_zip.zip file.
     `directory`: where to find the csv files, and put the result.
+    `store`: if True, also create the binary expected store expected.bin (see tools/expected_store.py)
     """
     directory = pathlib.Path(directory)
     fullname = str(directory.resolve().absolute())
@@ -43,11 +45,15 @@ def create_expected_zip(directory):
     
     zip_f.close()
 
+    if store:
+        expected_store.convert(zipfilename)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description='Combine csv files into expected.zip.')
     parser.add_argument('--directory', default="", required=False, help='Directory where csv files are.  Defaults to current directory.')
+    parser.add_argument('--store', action='store_true', help='Also create the binary expected store expected.bin')
     args = parser.parse_args()
 
-    create_expected_zip(args.directory)
+    create_expected_zip(args.directory, store=args.store)
@@ -0,0 +1,85 @@
+"""pytest plugin to run the solution deep tests in parallel (see deep_runner.py).
+
+With `--deep-workers N`, the deep tests of all the solutions selected for this pytest run are
+started on a pool of N processes as soon as collection finishes.  Each solution's
+`test_deep_results` then just waits for, and reports, the results for its own scenarios, while
+the other tests run in the main process.  A report of the slowest scenarios is printed at the end.
+
+    $ pytest -m deep --deep-workers 8
+
+Without --deep-workers, the deep tests run as usual.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from tools import deep_runner
+
+_run = None
+
+
+class _DeepRun:
+    def __init__(self, solutions, workers, chunk):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.futures = deep_runner.submit(self.executor, solutions, chunk)
+        self.solutions = set(self.futures.values())
+        self.results = []
+
+    def wait(self, solution):
+        results = []
+        for (future, name) in self.futures.items():
+            if name == solution:
+                results.extend(future.result())
+        self.results.extend(results)
+        return sorted(results, key=lambda r: r['index'])
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("deep", "parallel solution deep tests")
+    group.addoption("--deep-workers", type=int, default=0,
+                    help="run solution deep tests on this many worker processes (default: run them serially)")
+    group.addoption("--deep-chunk", type=int, default=4,
+                    help="maximum number of scenarios of a solution per worker job")
+    group.addoption("--deep-slowest", type=int, default=10,
+                    help="number of slowest deep test scenarios to report")
+
+
+def _solution_of(item):
+    """Return the solution name if item is a standard solution deep test, else None."""
+    if item.name != "test_deep_results":
+        return None
+    name = getattr(item.module, "solution_name", None)
+    return name if name and deep_runner.deep_test_settings(name) is not None else None
+
+
+def pytest_collection_finish(session):
+    global _run
+    workers = session.config.getoption("deep_workers")
+    if not workers:
+        return
+    solutions = [s for s in (_solution_of(item) for item in session.items) if s]
+    if solutions:
+        _run = _DeepRun(solutions, workers, session.config.getoption("deep_chunk"))
+
+
+def pytest_pyfunc_call(pyfuncitem):
+    if _run is None:
+        return None
+    solution = _solution_of(pyfuncitem)
+    if solution not in _run.solutions:
+        return None
+    failures = [r for r in _run.wait(solution) if r['error'] is not None]
+    if failures:
+        raise AssertionError("\n".join(r['error'] for r in failures))
+    return True
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if _run is not None and _run.results:
+        terminalreporter.write_sep("=", "deep test timings")
+        terminalreporter.write_line(deep_runner.report(_run.results, config.getoption("deep_slowest")))
+
+
+def pytest_unconfigure(config):
+    global _run
+    if _run is not None:
+        _run.executor.shutdown(cancel_futures=True)
+        _run = None
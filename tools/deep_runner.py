@@ -0,0 +1,141 @@
+"""Run the deep (expected result) tests of many solutions in parallel.
+
+The standard solution test (see solution_test_template.py) checks every scenario of a solution
+one after another.  This runner instead splits the work into batches of scenarios of the same
+solution, and runs the batches across a pool of processes.  Keeping the scenarios of a solution
+together means each worker reuses the TAM, AEZ, VMA etc. objects it has already built (they are
+cached per process), while different solutions run concurrently.
+
+From the command line:
+    python -m tools.deep_runner [-j WORKERS] [--chunk N] [--slowest N] [solution ...]
+runs the deep tests of the named solutions (default: all that have standard deep tests), printing
+each scenario's result and wall time as it finishes, and a report of the slowest scenarios at the end.
+
+The same runner is available from pytest, as the --deep-workers option (see deep_plugin.py).
+"""
+
+import argparse
+import importlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from tools import expected_result_tester
+from tools.expected_store import open_expected
+
+solutiondir = Path(__file__).parents[1] / 'solution'
+
+
+def deep_test_settings(solution_name):
+    """Return the settings of the deep test of solution_name as a dict with keys 'expected_file',
+    'scenario_skip' and 'test_skip', or None if the solution does not have a standard deep test (one
+    marked with STANDARD_DEEP_TEST, see solution_test_template.py)."""
+    try:
+        t = importlib.import_module(f'solution.{solution_name}.tests.test_{solution_name}')
+    except ImportError:
+        return None
+    if not (getattr(t, 'STANDARD_DEEP_TEST', False) and hasattr(t, 'expected_file')):
+        return None
+    if not Path(t.expected_file).is_file():
+        return None
+    return {'expected_file': t.expected_file,
+            'scenario_skip': getattr(t, 'SCENARIO_SKIP', None),
+            'test_skip': getattr(t, 'TEST_SKIP', None)}
+
+
+def all_solutions():
+    """Return the names of all solutions that have a standard deep test."""
+    names = sorted(p.parents[1].name for p in solutiondir.glob('*/tests/expected.zip'))
+    return [name for name in names if deep_test_settings(name) is not None]
+
+
+def make_batches(solutions, chunk=4):
+    """Split the deep tests of solutions into batches of at most chunk scenarios of the same solution.
+    Returns a list of (solution, settings, [(index, scenario name), ...]), largest batches first."""
+    batches = []
+    for name in solutions:
+        settings = deep_test_settings(name)
+        if settings is None:
+            continue
+        m = importlib.import_module('solution.' + name)
+        skip = settings['scenario_skip']
+        scenarios = [ (i, s) for (i, s) in enumerate(m.scenarios.keys()) if not (skip and i in skip) ]
+        for start in range(0, len(scenarios), chunk):
+            batches.append((name, settings, scenarios[start:start+chunk]))
+    batches.sort(key=lambda b: len(b[2]), reverse=True)
+    return batches
+
+
+def run_batch(name, settings, scenarios):
+    """Check the scenarios of solution name against its expected results.  Returns a list of dicts, one
+    per scenario, with keys 'solution', 'index', 'scenario', 'seconds' and 'error' (None if it passed)."""
+    expected_result_tester._verbosity = 0
+    m = importlib.import_module('solution.' + name)
+    results = []
+    with open_expected(settings['expected_file']) as zf:
+        for (i, scenario_name) in scenarios:
+            start = time.perf_counter()
+            error = None
+            try:
+                expected_result_tester.one_scenario_tester(m, zf, i, scenario_name, test_skip=settings['test_skip'])
+            except Exception as e:  # pylint: disable=broad-except
+                # any failure (a mismatch, or an error of the model) is reported against this scenario
+                error = f"{type(e).__name__}: {e}"
+            results.append({'solution': name, 'index': i, 'scenario': scenario_name,
+                            'seconds': time.perf_counter() - start, 'error': error})
+    return results
+
+
+def submit(executor, solutions, chunk=4):
+    """Submit the deep tests of solutions to executor.  Returns a dict of future to solution name."""
+    return { executor.submit(run_batch, *batch) : batch[0] for batch in make_batches(solutions, chunk) }
+
+
+def run(solutions=None, workers=None, chunk=4, progress=print):
+    """Run the deep tests of solutions (default: all) on a pool of workers processes.
+    progress is called with a line of text as each scenario finishes (None for silence).
+    Returns the list of results (see `run_batch`)."""
+    solutions = solutions or all_solutions()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for future in as_completed(submit(executor, solutions, chunk)):
+            for r in future.result():
+                results.append(r)
+                if progress:
+                    progress(format_result(r))
+    return results
+
+
+def format_result(r):
+    status = "PASS" if r['error'] is None else "FAIL"
+    return f"{status} {r['seconds']:7.1f}s  {r['solution']} [{r['index']}] {r['scenario']}"
+
+
+def report(results, slowest=10):
+    """Return a text report on results: the slowest scenarios, the failures, and a summary."""
+    lines = [f"Slowest {min(slowest, len(results))} scenarios:"]
+    for r in sorted(results, key=lambda r: r['seconds'], reverse=True)[:slowest]:
+        lines.append("  " + format_result(r))
+    failures = [r for r in results if r['error'] is not None]
+    if failures:
+        lines.append("Failures:")
+        for r in failures:
+            detail = " ".join(line.strip() for line in r['error'].splitlines()[:3])
+            lines.append(f"  {r['solution']} [{r['index']}] {r['scenario']}: {detail}")
+    total = sum(r['seconds'] for r in results)
+    lines.append(f"{len(results) - len(failures)} passed, {len(failures)} failed, {total:.1f}s of scenario time")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run solution deep tests in parallel.")
+    parser.add_argument('solutions', nargs='*', help="solutions to test (default: all)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="number of worker processes (default: one per cpu)")
+    parser.add_argument('--chunk', type=int, default=4, help="maximum number of scenarios of a solution per job")
+    parser.add_argument('--slowest', type=int, default=10, help="number of slowest scenarios to report")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run(args.solutions, workers=args.workers, chunk=args.chunk)
+    print(report(results, args.slowest))
+    print(f"Wall time {time.perf_counter() - start:.1f}s")
+    raise SystemExit(1 if any(r['error'] for r in results) else 0)
@@ -7,8 +7,10 @@ import zipfile
 import openpyxl
 import argparse
 import csv
+import numpy as np
 from io import StringIO
 from pathlib import Path
+from tools import expected_store
 
 def locate_expected_zip(solution):
     # Walk to the solution's directory from this code directory.  
@@ -45,6 +47,9 @@ def create_ghost(filename, scenario_number):
                 "First Cost", "Operating Cost", "Net Profit Margin", 
                 "Emissions Factors", "CO2 Calcs", "CH4 Calcs"]
     
+    if Path(filename).suffix == '.bin':
+        return create_ghost_from_store(filename, scenario_number, wanted)
+
     # Use zipfile.Path to navigate to the top-level directory of the zip file,
     # which lists all the scenarios.
     zipdir = zipfile.Path(filename)
@@ -70,13 +75,32 @@ def create_ghost(filename, scenario_number):
             wbsheet.append([typeit(x) for x in row])
 
     return wb
-    
+
+
+def create_ghost_from_store(filename, scenario_number, wanted):
+    """As create_ghost, but reading from an expected store (expected.bin) instead of expected.zip"""
+    wb = openpyxl.Workbook()
+    with expected_store.ExpectedResults(filename) as store:
+        ourscenario = store.scenarios()[scenario_number]
+        for name in store.namelist():
+            (scenario, sheetname) = name.rsplit('/', 1)
+            if scenario != ourscenario or sheetname not in wanted:
+                continue
+            wbsheet = wb.create_sheet(sheetname)
+            grid = store.grid(scenario, sheetname).astype(object)
+            grid[np.isnan(grid.astype(float))] = None
+            for (r, c, text) in store.sheet_text(scenario, sheetname):
+                grid[r, c] = text
+            for row in grid:
+                wbsheet.append([int(x) if isinstance(x, float) and x.is_integer() else x for x in row])
+    return wb
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description='Exhume ghost workbook from expected.zip file.  One of the arguments --solution or --file must be provided')
     parser.add_argument('--solution', required=False, help='Name of the solution whose expected.zip we should exhume.')
-    parser.add_argument('--file', required=False, help='Path to an expected.zip file')
+    parser.add_argument('--file', required=False, help='Path to an expected.zip (or expected.bin) file')
     parser.add_argument('--scenario', type=int, default=0, required=False, help='Offset of which scenario to exhume; defaults to 0')
     args = parser.parse_args()
 
@@ -7,12 +7,13 @@ same reasons.
 # pylint: disable=line-too-long
 
 import functools
+import numbers
 import numpy as np
 import pandas as pd
 import pytest
-import zipfile
 import importlib
 from tools.util import df_excel_range, cell_to_offsets
+from tools.expected_store import ExpectedResults, open_expected
 from model import scenario
 
 
@@ -815,6 +816,8 @@ def excel_read_cell_any_scenario(zip_f, sheetname, cell):
     """Find the first instance of sheetname, and return the value of cell."""
     for name in zip_f.namelist():
         if sheetname in name:
+            if isinstance(zip_f, ExpectedResults):
+                return zip_f.cell(*name.rsplit('/', 1), cell)
             with zip_f.open(name=name) as zip_csv_f:
                 df = pd.read_csv(filepath_or_buffer=zip_csv_f, header=None)
                 (row,col) = cell_to_offsets(cell)
@@ -951,6 +954,14 @@ def dataframes_differ(val, expt, mask=None, all_zero=True, thresh=None):
     If the dataframes do differ, return a list of tuples `(row, col, val.value, expt.value)`
     for each cell that differs.  Return False if they do not differ.
     """
+    result = compare_arrays(val, expt, mask=mask, all_zero=all_zero, thresh=thresh)
+    if not result['count']:
+        return False
+    return [ (r, c, val.iloc[r,c], expt.iloc[r,c]) for (r, c) in zip(result['rows'], result['cols']) ]
+
+
+def dataframes_differ_cellwise(val, expt, mask=None, all_zero=True, thresh=None):
+    """Reference implementation of `dataframes_differ`, calling `approx_compare` for each cell."""
     result = []   
     (nrows,ncols) = val.shape
     for r in range(nrows):
@@ -963,14 +974,106 @@ def dataframes_differ(val, expt, mask=None, all_zero=True, thresh=None):
     return result if len(result) else False
 
 
+_is_real = np.frompyfunc(lambda x: isinstance(x, numbers.Real) and not isinstance(x, (bool, np.bool_)), 1, 1)
+_is_str = np.frompyfunc(lambda x: isinstance(x, str), 1, 1)
+
+def _split_values(a):
+    """Split array a into (float values, is_number, is_str, is_none).  Cells that are none of these
+    (e.g. booleans or pd.NA) are compared with `approx_compare` instead."""
+    if a.dtype.kind in 'iuf':
+        return (a.astype(np.float64), np.ones(a.shape, dtype=bool), np.zeros(a.shape, dtype=bool),
+                np.zeros(a.shape, dtype=bool))
+    is_number = _is_real(a).astype(bool)
+    is_str = _is_str(a).astype(bool)
+    is_none = np.equal(a, None)
+    values = np.full(a.shape, np.nan)
+    values[is_number] = a[is_number].astype(np.float64)
+    return (values, is_number, is_str, is_none)
+
+
+def expected_mask_for(expected_df, expected_mask):
+    """Resolve the special expected masks "Excel_NaN" and "Excel_one_cent" against expected_df.
+    Returns (mask, thresh), where thresh overrides the default comparison threshold (or is None)."""
+    if isinstance(expected_mask, str) and expected_mask == "Excel_NaN":
+        return (expected_df.isna(), None)
+    if isinstance(expected_mask, str) and expected_mask == "Excel_one_cent":
+        # Due to floating point precision, sometimes subtracting ~identical values for
+        # unit adoption is not zero it is 0.000000000000007105427357601000 which,
+        # when multiplied by a large unit cost, can result in a First Cost of (say) 2.5e-6
+        # instead of the zero which might otherwise be expected.
+        # Mask off absolute values less than one penny.
+        s = expected_df.abs()
+        return ((s < 0.01) | expected_df.isna(), 0.01)
+    return (expected_mask, None)
+
+
+def compare_arrays(val, expt, mask=None, all_zero=True, thresh=None, expected_mask=None):
+    """Vectorized equivalent of `dataframes_differ`: compare val and expt (DataFrames or arrays of
+    the same shape) by position, with the same rules as `approx_compare`.  Cells where mask is True
+    are skipped.  expected_mask may also be given, either as a mask or as one of the special values
+    "Excel_NaN" or "Excel_one_cent" (see `expected_mask_for`); it is combined with mask.
+    Returns a dict with the positions of the cells that differ ('rows' and 'cols', arrays in row-major
+    order), the number of differing cells ('count'), the number of cells compared ('total') and the
+    largest absolute difference between differing numeric cells ('max_abs_diff', NaN if none).
+    """
+    if expected_mask is not None:
+        (expected_mask, absignore) = expected_mask_for(expt, expected_mask)
+        thresh = thresh or absignore
+        mask = expected_mask if mask is None else (np.asarray(mask, dtype=bool) | np.asarray(expected_mask, dtype=bool))
+    thresh = thresh or 1e-4
+    v = np.asarray(val.to_numpy() if isinstance(val, (pd.DataFrame, pd.Series)) else val)
+    e = np.asarray(expt.to_numpy() if isinstance(expt, (pd.DataFrame, pd.Series)) else expt)
+    v, e = np.atleast_2d(v), np.atleast_2d(e)
+    # Like dataframes_differ, the mask is indexed by position (it may be larger than val, if it was
+    # combined from masks with different labels).
+    skip = np.zeros(v.shape, dtype=bool) if mask is None else np.atleast_2d(np.asarray(mask, dtype=bool))[:v.shape[0], :v.shape[1]]
+
+    (vf, vnum, vstr, vnone) = _split_values(v)
+    (ef, enum, estr, enone) = _split_values(e)
+    with np.errstate(invalid='ignore'):
+        def pseudo_zero(f, num, isstr, isnone, a):
+            empty = np.zeros(a.shape, dtype=bool)
+            empty[isstr] = [x == '' for x in a[isstr]]
+            return isnone | empty | (num & (np.isnan(f) | (np.abs(f) <= thresh)))
+        vzero = pseudo_zero(vf, vnum, vstr, vnone, v)
+        ezero = pseudo_zero(ef, enum, estr, enone, e)
+
+        tolerance = np.maximum(thresh, 1e-6 * np.abs(ef))
+        close = vnum & enum & ((vf == ef) | (np.isfinite(ef) & (np.abs(vf - ef) <= tolerance)))
+        same = np.where(vzero, ezero, close) if all_zero else close
+        strings = vstr & estr
+        same[strings] = (v[strings] == e[strings])
+
+    # Anything not covered above falls back to the scalar comparison
+    other = ~(vnum | vstr | vnone) | ~(enum | estr | enone)
+    if not all_zero:
+        other |= vnone
+    for (r, c) in zip(*np.nonzero(other & ~skip)):
+        same[r, c] = approx_compare(v[r, c], e[r, c], all_zero=all_zero, thresh=thresh)
+
+    differ = ~same & ~skip
+    (rows, cols) = np.nonzero(differ)
+    diffs = np.abs(vf[rows, cols] - ef[rows, cols])
+    diffs = diffs[np.isfinite(diffs)]
+    return {'rows': rows, 'cols': cols, 'count': len(rows), 'total': int((~skip).sum()),
+            'max_abs_diff': float(diffs.max()) if len(diffs) else np.nan}
+
+
+def _expected_ranges(zip_f, scenario, sheetname):
+    """Return a function that extracts an Excel cell range from the expected results of sheetname."""
+    if isinstance(zip_f, ExpectedResults):
+        return lambda cellrange: zip_f.excel_range(scenario, sheetname, cellrange)
+    with zip_f.open(name=f'{scenario}/{sheetname}') as zip_csv_f:
+        sheet_df = pd.read_csv(zip_csv_f, header=None, na_values=['#REF!', '#DIV/0!', '#VALUE!', '(N/A)'])
+    return lambda cellrange: df_excel_range(sheet_df, cellrange)
+
+
 def check_excel_against_object(obj, zip_f, scenario, i, verify, test_skip=None, test_only=None):
     descr_base = f"Solution: {obj.name} Scenario {i}: "
     for sheetname in verify.keys():
         if _verbosity >= 2: print(sheetname)
-        arcname = f'{scenario}/{sheetname}'
-        with zip_f.open(name=arcname) as zip_csv_f:
-            sheet_df = pd.read_csv(zip_csv_f, header=None, na_values=['#REF!', '#DIV/0!', '#VALUE!', '(N/A)'])
-        
+        excel_range = _expected_ranges(zip_f, scenario, sheetname)
+
         skip_count=0
         for (cellrange, actual_df, actual_mask, expected_mask) in verify[sheetname]:
             description = descr_base + "\n" + sheetname + " " + cellrange
@@ -982,24 +1085,14 @@ def check_excel_against_object(obj, zip_f, scenario, i, verify, test_skip=None,
                 skip_count = skip_count + 1
                 continue
 
-            expected_df = df_excel_range(sheet_df, cellrange)
+            expected_df = excel_range(cellrange)
             if actual_df.shape != expected_df.shape:
                 raise AssertionError(description + '\nDataFrames differ in shape: ' +
                         str(actual_df.shape) + " versus " + str(expected_df.shape))
 
             absignore = None
             if expected_mask is not None:
-                if isinstance(expected_mask, str) and expected_mask == "Excel_NaN":
-                    expected_mask = expected_df.isna()
-                elif isinstance(expected_mask, str) and expected_mask == "Excel_one_cent":
-                    # Due to floating point precision, sometimes subtracting ~identical values for
-                    # unit adoption is not zero it is 0.000000000000007105427357601000 which,
-                    # when multiplied by a large unit cost, can result in a First Cost of (say) 2.5e-6
-                    # instead of the zero which might otherwise be expected.
-                    # Mask off absolute values less than one penny.
-                    s = expected_df.abs()
-                    expected_mask = (s < 0.01) | expected_df.isna()
-                    absignore = 0.01
+                (expected_mask, absignore) = expected_mask_for(expected_df, expected_mask)
             if actual_mask is not None and expected_mask is not None:
                 mask = actual_mask | expected_mask
             elif actual_mask is not None:
@@ -1037,27 +1130,32 @@ def one_solution_tester(solution_name, expected_filename,
     importname = 'solution.' + solution_name
     m = importlib.import_module(importname)
 
-    with zipfile.ZipFile(expected_filename) as zf:
+    with open_expected(expected_filename) as zf:
         for (i, scenario_name) in enumerate(m.scenarios.keys()):
             if scenario_skip and i in scenario_skip:
                 if _verbosity >= 1: print(f"**** Skipped scenario {i} '{scenario_name}'")
                 continue
             if _verbosity >= 1: print(f"Checking scenario {i}: {scenario_name}")
+            one_scenario_tester(m, zf, i, scenario_name, test_skip=test_skip, test_only=test_only)
 
-            obj = m.Scenario(scen=scenario_name)
-            if isinstance(obj, scenario.LandScenario):
-                to_verify = LAND_solution_verify_list(obj, zf)
-            else:
-                to_verify = RRS_solution_verify_list(obj, zf)
 
-            check_excel_against_object(obj, zf, scenario_name, i, to_verify, 
-                                       test_skip=test_skip, test_only=test_only)
+def one_scenario_tester(m, zf, i, scenario_name, test_skip=None, test_only=None):
+    """Check scenario i (named scenario_name) of solution module m against the opened expected
+    results zf.  See `one_solution_tester` for test_skip and test_only."""
+    obj = m.Scenario(scen=scenario_name)
+    if isinstance(obj, scenario.LandScenario):
+        to_verify = LAND_solution_verify_list(obj, zf)
+    else:
+        to_verify = RRS_solution_verify_list(obj, zf)
+
+    check_excel_against_object(obj, zf, scenario_name, i, to_verify, 
+                               test_skip=test_skip, test_only=test_only)
 
 
 def key_results_tester(solution_name, expected_filename, scenario_skip=None, key_results_skip=[]):
     importname = 'solution.' + solution_name
     m = importlib.import_module(importname)
-    with zipfile.ZipFile(expected_filename) as zf:
+    with open_expected(expected_filename) as zf:
         for (i, scenario_name) in enumerate(m.scenarios.keys()):
             if scenario_skip and i in scenario_skip:
                 if _verbosity >= 1: print(f"**** Skipped scenario {i} '{scenario_name}'")
@@ -1065,8 +1163,11 @@ def key_results_tester(solution_name, expected_filename, scenario_skip=None, key
             if _verbosity >= 1: print(f"Checking scenario {i}: {scenario_name}")
 
             obj = m.Scenario(scen=scenario_name)
-            ac_file = zf.open(scenario_name + "/" + 'Advanced Controls')
-            df_expected = pd.read_csv(ac_file, header=None, na_values=['#REF!', '#DIV/0!', '#VALUE!', '(N/A)'])
+            if isinstance(zf, ExpectedResults):
+                df_expected = zf.sheet(scenario_name, 'Advanced Controls')
+            else:
+                ac_file = zf.open(scenario_name + "/" + 'Advanced Controls')
+                df_expected = pd.read_csv(ac_file, header=None, na_values=['#REF!', '#DIV/0!', '#VALUE!', '(N/A)'])
             key_results = obj.get_key_results()
             row_expected_values = 3
             cols_expected_values = range(0,6)
@@ -0,0 +1,209 @@
+"""Binary, memory-mappable form of the expected.zip result sets.
+
+expected.zip holds one csv file per (scenario, sheet); the expected result tests re-open and parse
+whole sheets to extract a few small ranges from each.  An expected store holds the same data in a
+single file: every sheet is a typed float64 grid (NaN for empty and error cells, 1 and 0 for
+booleans), plus a short list of the cells that hold text.  The file is memory-mapped, so extracting a numeric cell range is a
+zero-copy slice of the grid.
+
+File layout (all integers little-endian):
+    magic          8 bytes, b'DDEXPCT1'
+    header length  8 bytes
+    header         json: {'sheets': [{'scenario', 'sheet', 'offset', 'rows', 'cols', 'text'}, ...]}
+                   where text is a list of [row, col, text] and offset is the position of the grid
+    grids          float64, row-major, each aligned to 64 bytes
+
+Convert an expected.zip from the command line with
+    python -m tools.expected_store [solution ...]
+which writes expected.bin next to the expected.zip of each named solution (default: all of them).
+"""
+
+import argparse
+import json
+import pathlib
+import zipfile
+import numpy as np
+import pandas as pd
+import openpyxl
+from tools.util import cell_to_offsets
+
+MAGIC = b'DDEXPCT1'
+_ALIGN = 64
+
+# Values that read_csv (as called by the expected result tester) turns into NaN: its default
+# na_values, and the extra na_values of the tester.
+_NA_VALUES = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+              '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'n/a', 'nan', 'null',
+              '#REF!', '#DIV/0!', '#VALUE!', '(N/A)'}
+
+
+def store_filename(expected_filename):
+    """Return the name of the expected store corresponding to an expected.zip file."""
+    return pathlib.Path(expected_filename).with_suffix('.bin')
+
+
+def _sheet_grid(csv_f):
+    """Parse a csv sheet into (float64 grid, list of [row, col, text])."""
+    try:
+        raw = pd.read_csv(csv_f, header=None, dtype=str, keep_default_na=False).to_numpy(dtype=object)
+    except pd.errors.EmptyDataError:
+        raw = np.empty((0, 0), dtype=object)
+    grid = np.full(raw.shape, np.nan)
+    text = []
+    for (r, c) in zip(*np.nonzero(raw != '')):
+        value = raw[r, c]
+        try:
+            grid[r, c] = float(value)
+        except ValueError:
+            upper = value.upper()
+            if upper in ('TRUE', 'FALSE'):
+                grid[r, c] = 1.0 if upper == 'TRUE' else 0.0
+            text.append([int(r), int(c), value])
+    return (grid, text)
+
+
+def write_store(filename, sheets):
+    """Write an expected store to filename.  sheets is an iterable of (scenario, sheet, csv file)."""
+    header = {'sheets': []}
+    grids = []
+    offset = 0
+    for (scenario, sheet, csv_f) in sheets:
+        (grid, text) = _sheet_grid(csv_f)
+        header['sheets'].append({'scenario': scenario, 'sheet': sheet, 'offset': offset,
+                                 'rows': grid.shape[0], 'cols': grid.shape[1], 'text': text})
+        grids.append(grid)
+        offset += -(-grid.nbytes // _ALIGN) * _ALIGN
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    start = -(-(len(MAGIC) + 8 + len(header_bytes)) // _ALIGN) * _ALIGN
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, 'little'))
+        f.write(header_bytes)
+        for (entry, grid) in zip(header['sheets'], grids):
+            f.write(b'\0' * (start + entry['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(grid, dtype='<f8').tobytes())
+
+
+def convert(expected_filename, filename=None):
+    """Convert an expected.zip file into an expected store (by default, expected.bin alongside it).
+    Returns the name of the store."""
+    filename = filename or store_filename(expected_filename)
+    with zipfile.ZipFile(expected_filename) as zf:
+        def sheets():
+            for name in zf.namelist():
+                if name.endswith('/'):
+                    continue
+                (scenario, sheet) = name.rsplit('/', 1)
+                with zf.open(name) as csv_f:
+                    yield (scenario, sheet, csv_f)
+        write_store(filename, sheets())
+    return filename
+
+
+class ExpectedResults:
+    """Read-only access to an expected store."""
+
+    def __init__(self, filename):
+        self.filename = pathlib.Path(filename)
+        self._map = np.memmap(self.filename, dtype=np.uint8, mode='r')
+        if bytes(self._map[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.filename} is not an expected store")
+        header_len = int.from_bytes(bytes(self._map[len(MAGIC):len(MAGIC)+8]), 'little')
+        header_end = len(MAGIC) + 8 + header_len
+        header = json.loads(bytes(self._map[len(MAGIC)+8:header_end]).decode('utf-8'))
+        self._start = -(-header_end // _ALIGN) * _ALIGN
+        self._sheets = { (e['scenario'], e['sheet']) : e for e in header['sheets'] }
+        self._text = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._map = None
+
+    def namelist(self):
+        """Return the names of all sheets, as 'scenario/sheet' (as in expected.zip)."""
+        return [ f"{scenario}/{sheet}" for (scenario, sheet) in self._sheets.keys() ]
+
+    def scenarios(self):
+        return list(dict.fromkeys(scenario for (scenario, _) in self._sheets.keys()))
+
+    def grid(self, scenario, sheet):
+        """Return the numeric grid of sheet as a read-only float64 array backed by the file."""
+        e = self._sheets[(scenario, sheet)]
+        count = e['rows'] * e['cols']
+        return np.frombuffer(self._map, dtype='<f8', count=count,
+                             offset=self._start + e['offset']).reshape(e['rows'], e['cols'])
+
+    def _text_cells(self, scenario, sheet):
+        """Return arrays (rows, cols, text) of the text cells of sheet, other than error values and booleans."""
+        if (scenario, sheet) not in self._text:
+            cells = [ x for x in self._sheets[(scenario, sheet)]['text']
+                      if x[2] not in _NA_VALUES and x[2].upper() not in ('TRUE', 'FALSE') ]
+            self._text[(scenario, sheet)] = (np.array([x[0] for x in cells], dtype=np.int64),
+                                             np.array([x[1] for x in cells], dtype=np.int64),
+                                             np.array([x[2] for x in cells], dtype=object))
+        return self._text[(scenario, sheet)]
+
+    def _range(self, scenario, sheet, firstrow, lastrow, firstcol, lastcol):
+        grid = self.grid(scenario, sheet)[firstrow:lastrow, firstcol:lastcol]
+        index = pd.RangeIndex(firstrow, firstrow + grid.shape[0])
+        columns = pd.RangeIndex(firstcol, firstcol + grid.shape[1])
+        result = pd.DataFrame(grid, index=index, columns=columns, copy=False)
+        (rows, cols, text) = self._text_cells(scenario, sheet)
+        inside = (rows >= firstrow) & (rows < index.stop) & (cols >= firstcol) & (cols < columns.stop)
+        if inside.any():
+            values = grid.astype(object)
+            values[rows[inside] - firstrow, cols[inside] - firstcol] = text[inside]
+            result = pd.DataFrame(values, index=index, columns=columns).apply(pd.to_numeric, errors='ignore')
+        return result
+
+    def sheet(self, scenario, sheet):
+        """Return the whole sheet as a DataFrame.  Error values ('#REF!' etc.) are NaN."""
+        e = self._sheets[(scenario, sheet)]
+        return self._range(scenario, sheet, 0, e['rows'], 0, e['cols'])
+
+    def excel_range(self, scenario, sheet, rangeref):
+        """Return the cells of sheet in the Excel range rangeref (e.g. 'B45:L94') as a DataFrame,
+        as `tools.util.df_excel_range` would.  Numeric ranges are views of the file, not copies."""
+        (firstcol, firstrow, lastcol, lastrow) = openpyxl.utils.cell.range_boundaries(rangeref)
+        return self._range(scenario, sheet, firstrow - 1, lastrow, firstcol - 1, lastcol)
+
+    def sheet_text(self, scenario, sheet):
+        """Return the text cells of sheet (including error values) as a list of (row, col, text)."""
+        return [ tuple(x) for x in self._sheets[(scenario, sheet)]['text'] ]
+
+    def cell(self, scenario, sheet, cell):
+        """Return the raw value of cell (e.g. 'A47'): a number, text (including error values), or NaN."""
+        (row, col) = cell_to_offsets(cell)
+        for (r, c, t) in self._sheets[(scenario, sheet)]['text']:
+            if (r, c) == (row, col):
+                return t
+        grid = self.grid(scenario, sheet)
+        return grid[row, col] if row < grid.shape[0] and col < grid.shape[1] else np.nan
+
+
+def open_expected(expected_filename):
+    """Open expected results for reading: the expected store if expected_filename is one, or if there
+    is an up-to-date store next to it; otherwise the expected.zip file itself."""
+    expected_filename = pathlib.Path(expected_filename)
+    if expected_filename.suffix == '.bin':
+        return ExpectedResults(expected_filename)
+    store = store_filename(expected_filename)
+    if store.is_file() and store.stat().st_mtime >= expected_filename.stat().st_mtime:
+        return ExpectedResults(store)
+    return zipfile.ZipFile(expected_filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert expected.zip files into expected stores.')
+    parser.add_argument('solutions', nargs='*', help='Solutions to convert (default: all with an expected.zip)')
+    args = parser.parse_args()
+    solutiondir = pathlib.Path(__file__).parents[1] / 'solution'
+    names = args.solutions or sorted(p.parents[1].name for p in solutiondir.glob('*/tests/expected.zip'))
+    for name in names:
+        print(convert(solutiondir / name / 'tests' / 'expected.zip'))
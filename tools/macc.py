@@ -0,0 +1,209 @@
+"""A marginal abatement cost curve (MACC) of the solutions.
+
+For one scenario of each solution (by default its PDS2 scenario), the cost per tonne of CO2-eq abated
+over a window of years is minus the net present value of the solution's net cash flow in the window
+(Operating Cost's soln_net_cash_flow: the marginal first cost plus the marginal operating cost
+savings), divided by its abatement in the window (the World CO2-eq MMT reduced of CO2 Calcs, plus
+the CO2-eq sequestered, for land and ocean solutions).  The curve has the solutions in order of their cost
+per tonne, with the cumulative abatement:
+
+    m = Macc()
+    m.curve()                                           # PDS2, each scenario's report years and discount rate
+    m.curve(years=(2020, 2050), discount_rate=0.04, scenarios={'solarpvutil': 'PDS3', 'afforestation': ac})
+    python -m tools.macc [-j WORKERS] [--start 2020 --end 2050] [--discount-rate 0.04] [--scenario PDS2]
+
+The cash flow is discounted to the year before the window, as soln_net_present_value discounts it
+to the year before its first year.  Solutions with no abatement in the window are left out of the
+curve, and those whose scenario cannot be found or fails to evaluate are reported in Macc.failures
+(failures are not cached, so they are retried each time).
+
+The scenarios are evaluated in parallel by a pool of processes (World only, see
+Scenario.world_only), and the annual cash flow and abatement of each are kept in a cache in
+directory (default: .macc at the top of the repository), keyed by the solution and a hash of the
+scenario's advanced controls.  The curve is computed from the cache for any window and discount rate,
+and regenerating it after a change to the advanced controls of one solution evaluates only that
+one.  Scenario names are looked up in the scenario catalog (see tools.scenario_catalog), so that no
+solution is imported when the cache is up to date.  Changes to solution code or data other than
+the advanced controls are not detected: use force to evaluate the scenarios again.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import pandas as pd
+from model.advanced_controls import AdvancedControls, SOLUTION_CATEGORY
+from solution import factory
+from solution.async_factory import scenario_key
+from tools.scenario_catalog import Catalog
+
+default_directory = Path(__file__).parents[1] / '.macc'
+
+
+def evaluate(solution, ac):
+    """Return the cache entry of the scenario of solution with advanced controls ac (a dict): its
+    annual net cash flow in dollars and abatement in MMT CO2-eq, as dicts of year : value, and the
+    discount rate and report years of the scenario."""
+    s = factory.load_scenario(solution, ac, world_only=True)
+    if s.ac.soln_lifetime_replacement == 0.0 or s.ac.conv_lifetime_replacement == 0.0:
+        # the key results have no costs for these, either
+        cash_flow = pd.Series(dtype='float64')
+    else:
+        cash_flow = s.oc.soln_net_cash_flow().fillna(0.0)
+    abatement = s.c2.co2eq_mmt_reduced()['World'].fillna(0.0)
+    if s.ac.solution_category in (SOLUTION_CATEGORY.LAND, SOLUTION_CATEGORY.OCEAN):
+        # as CO2Calcs.co2_ppm_emissions
+        sequestered = s.c2.co2_sequestered_global()['All'].fillna(0.0)
+        abatement = abatement.add(sequestered, fill_value=0.0)
+    return {'solution': solution, 'scenario': s.ac.name,
+            'category': s.ac.solution_category.name if s.ac.solution_category else None,
+            'discount_rate': s.ac.npv_discount_rate,
+            'report_years': [s.ac.report_start_year, s.ac.report_end_year],
+            'cash_flow': { int(y) : float(v) for (y, v) in cash_flow.items() },
+            'abatement': { int(y) : float(v) for (y, v) in abatement.items() }}
+
+
+def _cost(entry, years, discount_rate):
+    """Return (net present value in dollars, abatement in MMT) of entry in years (start, end; default
+    the report years) at discount_rate (default that of the scenario)."""
+    (start, end) = years or entry['report_years']
+    rate = entry['discount_rate'] if discount_rate is None else discount_rate
+    npv = sum(v / (1 + rate) ** (int(y) - start + 1) for (y, v) in entry['cash_flow'].items()
+              if start <= int(y) <= end)
+    abatement = sum(v for (y, v) in entry['abatement'].items() if start <= int(y) <= end)
+    return (npv, abatement)
+
+
+class Macc:
+    """The marginal abatement cost curve of the solutions, with its cache in directory."""
+
+    def __init__(self, directory=None, catalog=None):
+        self.directory = Path(directory or default_directory)
+        self.catalog = catalog or Catalog()
+        self.failures = {}
+
+    def _path(self, solution, ac):
+        return self.directory / f"{solution}-{scenario_key(ac)}.json"
+
+    def _resolve(self, solution, scenario):
+        """Return the advanced controls of scenario (a name, 'PDS1', 'PDS2' or 'PDS3', an
+        AdvancedControls or a dict of its values) of solution, as a dict."""
+        if isinstance(scenario, AdvancedControls):
+            return scenario.as_dict()
+        if isinstance(scenario, dict):
+            return scenario
+        return self.catalog.scenario(solution, scenario)
+
+    def entries(self, scenarios='PDS2', solutions=None, workers=None, force=False, progress=None):
+        """Return {solution: cache entry (see evaluate)} of scenarios, evaluating those not in the cache
+        (or all of them, if force).  scenarios is either a scenario of every solution (a name, or
+        'PDS1', 'PDS2' or 'PDS3'), or a dict of solution : scenario (a name, AdvancedControls or dict).
+        solutions limits the solutions (default: those of the scenarios dict, or all of them)."""
+        if not isinstance(scenarios, dict):
+            scenarios = { s : scenarios for s in (solutions or self.catalog.solutions()) }
+        elif solutions is not None:
+            scenarios = { s : scenarios[s] for s in solutions }
+        self.failures = {}
+        (result, todo) = ({}, {})
+        for (solution, scenario) in scenarios.items():
+            try:
+                ac = self._resolve(solution, scenario)
+            except KeyError as e:
+                self.failures[solution] = f"{type(e).__name__}: {e}"
+                continue
+            path = self._path(solution, ac)
+            if path.is_file() and not force:
+                result[solution] = json.loads(path.read_text(encoding='utf-8'))
+            else:
+                todo[solution] = ac
+
+        def done(solution, entry):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(solution, todo[solution])
+            tmp = path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(entry), encoding='utf-8')
+            tmp.replace(path)
+            result[solution] = entry
+            if progress:
+                progress(f"{solution}: {entry['scenario']}")
+
+        def failed(solution, e):
+            # not cached: the failure may be transient (such as a worker process dying)
+            self.failures[solution] = f"{type(e).__name__}: {e}"
+            if progress:
+                progress(f"{solution}: {self.failures[solution]}")
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(todo) <= 1:
+            for (solution, ac) in todo.items():
+                try:
+                    entry = evaluate(solution, ac)
+                except Exception as e:  # pylint: disable=broad-except
+                    # any error of a solution's model is recorded, and the other solutions carry on
+                    failed(solution, e)
+                    continue
+                done(solution, entry)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as executor:
+                futures = { executor.submit(evaluate, s, ac) : s for (s, ac) in todo.items() }
+                for future in as_completed(futures):
+                    try:
+                        entry = future.result()
+                    except Exception as e:  # pylint: disable=broad-except
+                        # as above; BrokenProcessPool too, if a worker process dies
+                        failed(futures[future], e)
+                        continue
+                    done(futures[future], entry)
+        return { s : result[s] for s in scenarios if s in result }
+
+    def curve(self, years=None, discount_rate=None, scenarios='PDS2', solutions=None, workers=None,
+              force=False, progress=None):
+        """Return the curve of scenarios (see entries) over years (start, end, inclusive; default the
+        report years of each scenario) at discount_rate (default that of each scenario), as a
+        DataFrame indexed by solution, in order of cost per tonne, with columns:
+            scenario, category: of the solution's scenario.
+            npv: the net present value of its net cash flow, in billions of dollars.
+            abatement: its abatement, in Gt CO2-eq.
+            cost_per_tonne: minus npv divided by abatement, in dollars per tonne of CO2-eq.
+            cumulative_abatement: the abatement of the solution and of all those before it, in Gt CO2-eq.
+        """
+        entries = self.entries(scenarios, solutions=solutions, workers=workers, force=force,
+                               progress=progress)
+        rows = []
+        for (solution, entry) in entries.items():
+            (npv, abatement) = _cost(entry, years, discount_rate)
+            if abatement <= 0.0:
+                continue
+            rows.append({'solution': solution, 'scenario': entry['scenario'], 'category': entry['category'],
+                         'npv': npv / 1e9, 'abatement': abatement / 1e3,
+                         'cost_per_tonne': 0.0 - npv / (abatement * 1e6)})
+        df = pd.DataFrame(rows, columns=['solution', 'scenario', 'category', 'npv', 'abatement',
+                                         'cost_per_tonne'])
+        df = df.sort_values(['cost_per_tonne', 'solution']).set_index('solution')
+        df['cumulative_abatement'] = df['abatement'].cumsum()
+        return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the marginal abatement cost curve of the solutions.")
+    parser.add_argument('solutions', nargs='*', help="solutions to include (default: all)")
+    parser.add_argument('--directory', default=default_directory, help="cache directory (default: %(default)s)")
+    parser.add_argument('--scenario', default='PDS2', help="PDS1, PDS2, PDS3 or a scenario name (default: %(default)s)")
+    parser.add_argument('--start', type=int, help="first year of the window (default: the report start year)")
+    parser.add_argument('--end', type=int, help="last year of the window (default: the report end year)")
+    parser.add_argument('--discount-rate', type=float, help="discount rate (default: that of each scenario)")
+    parser.add_argument('-j', '--workers', type=int, help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="evaluate the scenarios even if cached")
+    args = parser.parse_args()
+    if (args.start is None) != (args.end is None):
+        parser.error("--start and --end must be given together")
+
+    m = Macc(args.directory)
+    years = (args.start, args.end) if args.start is not None else None
+    df = m.curve(years=years, discount_rate=args.discount_rate, scenarios=args.scenario,
+                 solutions=args.solutions or None, workers=args.workers, force=args.force, progress=print)
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(df)
+    for (solution, failure) in m.failures.items():
+        print(f"{solution}: {failure}")
@@ -0,0 +1,415 @@
+"""A local HTTP server of model results, kept warm for low latency.
+
+Importing the model, loading a solution (its VMAs, scenarios and TAM, adoption and AEZ data) and
+constructing its first Scenario take seconds.  The server pays that once, at startup: it starts a
+number of worker processes, each of which loads the solutions assigned to it and constructs and
+evaluates their PDS2 scenario, so that the data files, shared model objects and caches are warm.
+Each request is sent to the worker its solution is assigned to, so that it finds that solution's
+data already loaded.  Workers also keep the scenarios most recently asked for.
+
+Requests (scenario is a scenario name, or PDS1, PDS2 (the default) or PDS3; regions is a comma
+separated list of the region columns to return):
+    GET /health                                      workers and the solutions they have loaded
+    GET /metrics                                     request counts and latencies, by endpoint
+    GET /solutions/<solution>/key_results?scenario=...
+    GET /solutions/<solution>/tables/<table>?scenario=...&regions=...
+    GET /solutions/<solution>/json?scenario=...&regions=...
+Tables are named as by model.export (e.g. c2.co2eq_mmt_reduced, or just co2eq_mmt_reduced), and
+tables and json return the outputs as JSON lines (see model.export.write_jsonl).  The same requests
+may be POSTed, with a JSON body of {"scenario": ..., "ac": {...}, "regions": [...]}, to evaluate a
+scenario with some of its advanced controls overridden by the values in ac.
+
+    python -m tools.model_server [--port 8765] [--workers 4] [solution ...]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+import zlib
+from collections import OrderedDict, deque
+import concurrent.futures
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+default_port = 8765
+
+
+# #######################################################################################################
+#
+# Workers
+
+class _Worker:
+    """The state of a worker process: its solutions, and its most recently used scenarios."""
+
+    def __init__(self, cache_size):
+        self.cache_size = cache_size
+        self.scenarios = OrderedDict()   # (solution, scenario key, world_only) : Scenario
+
+    def warm(self, solution):
+        self.scenario(solution, None, None)
+        self.scenario(solution, None, None, world_only=True).get_key_results()
+
+    def scenario(self, solution, scenario, ac, world_only=False):
+        from solution import factory
+        from solution.async_factory import scenario_key
+        if ac:
+            scenario = self.ac_dict(solution, scenario, ac)
+        key = (solution, scenario_key(scenario or 'PDS2'), world_only)
+        s = self.scenarios.get(key)
+        if s is None:
+            s = factory.load_scenario(solution, scenario, world_only=world_only)
+            self.scenarios[key] = s
+            while len(self.scenarios) > self.cache_size:
+                self.scenarios.popitem(last=False)
+        else:
+            self.scenarios.move_to_end(key)
+        return s
+
+    def ac_dict(self, solution, scenario, overrides):
+        """The advanced controls of scenario with overrides, as a dict."""
+        from solution import factory
+        m = factory._load_module(solution)
+        name = {'PDS1': m.PDS1, 'PDS2': m.PDS2, 'PDS3': m.PDS3}.get(scenario or 'PDS2', scenario)
+        if name not in m.scenarios:
+            raise KeyError(f"No scenario {name} of {solution}")
+        return {**m.scenarios[name].as_dict(), **overrides}
+
+    def handle(self, request):
+        """Return the result of request, a dict of 'kind' ('key_results', 'tables' or 'json'),
+        'solution', and 'scenario', 'ac', 'table' and 'regions' (each may be None)."""
+        import io
+        from model import export
+        (solution, kind) = (request['solution'], request['kind'])
+        if kind == 'key_results':
+            return self.scenario(solution, request['scenario'], request['ac'], world_only=True).get_key_results()
+        s = self.scenario(solution, request['scenario'], request['ac'])
+        f = io.StringIO()
+        tables = None if kind == 'json' else [request['table']]
+        if export.write_jsonl(s, f, tables=tables, regions=request['regions']) == 0:
+            raise KeyError(f"No table {request['table']} of {solution}")
+        return f.getvalue()
+
+
+def _status(e):
+    if isinstance(e, (KeyError, ModuleNotFoundError)):
+        return 404
+    if isinstance(e, (ValueError, TypeError)):
+        return 400
+    return 500
+
+
+def _worker_main(solutions, requests, responses, cache_size):
+    """The main loop of a worker process: loads solutions, then answers requests until it gets None.
+    Responses are (request id, status, result, seconds); the worker first sends ('ready', solution,
+    seconds) for each solution it loads."""
+    import warnings
+    warnings.simplefilter('ignore')
+    worker = _Worker(cache_size)
+    for solution in solutions:
+        start = time.perf_counter()
+        try:
+            worker.warm(solution)
+            responses.put(('ready', solution, time.perf_counter() - start))
+        except Exception as e:  # pylint: disable=broad-except
+            # reported in /health, and the other solutions are still loaded
+            responses.put(('failed', solution, f"{type(e).__name__}: {e}"))
+    responses.put(('started', None, None))
+    while True:
+        item = requests.get()
+        if item is None:
+            return
+        (request_id, request) = item
+        start = time.perf_counter()
+        try:
+            (status, result) = (200, worker.handle(request))
+        except Exception as e:  # pylint: disable=broad-except
+            # answered with the status of the error (500 if unexpected), and the worker carries on
+            (status, result) = (_status(e), f"{type(e).__name__}: {e}")
+            if status == 500:
+                traceback.print_exc()
+        responses.put((request_id, status, result, time.perf_counter() - start))
+
+
+class _WorkerHandle:
+    """The server's end of a worker process."""
+
+    def __init__(self, index, solutions, cache_size, context):
+        self.index = index
+        self.solutions = list(solutions)
+        self.ready = {}       # solution : seconds it took to load
+        self.failed = {}      # solution : error
+        self.started = threading.Event()
+        self.requests = context.Queue()
+        self.responses = context.Queue()
+        self.pending = {}     # request id : Future
+        self.lock = threading.Lock()
+        self.process = context.Process(target=_worker_main, name=f"model-worker-{index}", daemon=True,
+                args=(self.solutions, self.requests, self.responses, cache_size))
+        self.process.start()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        while True:
+            try:
+                item = self.responses.get(timeout=1.0)
+            except (queue.Empty, EOFError, OSError):
+                if not self.process.is_alive():
+                    self._fail_pending()
+                    return
+                continue
+            if item[0] == 'ready':
+                self.ready[item[1]] = item[2]
+            elif item[0] == 'failed':
+                self.failed[item[1]] = item[2]
+            elif item[0] == 'started':
+                self.started.set()
+            else:
+                (request_id, status, result, seconds) = item
+                with self.lock:
+                    future = self.pending.pop(request_id, None)
+                if future is not None:
+                    future.set_result((status, result, seconds))
+
+    def _fail_pending(self):
+        self.started.set()
+        with self.lock:
+            (pending, self.pending) = (self.pending, {})
+        for future in pending.values():
+            future.set_result((503, "worker process exited", 0.0))
+
+    def submit(self, request_id, request):
+        future = Future()
+        if not self.process.is_alive():
+            future.set_result((503, "worker process exited", 0.0))
+            return future
+        with self.lock:
+            self.pending[request_id] = future
+        self.requests.put((request_id, request))
+        return future
+
+    def stop(self):
+        if self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(timeout=10)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+# #######################################################################################################
+#
+# Metrics
+
+class Metrics:
+    """Counts and latencies of requests, by endpoint, over the last window requests of each."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}   # endpoint : {'count', 'errors', 'latencies', 'compute'}
+
+    def record(self, endpoint, status, seconds, compute=None):
+        with self.lock:
+            e = self.endpoints.setdefault(endpoint, {'count': 0, 'errors': 0,
+                    'latencies': deque(maxlen=self.window), 'compute': deque(maxlen=self.window)})
+            e['count'] += 1
+            e['errors'] += status >= 400
+            e['latencies'].append(seconds)
+            if compute is not None:
+                e['compute'].append(compute)
+
+    @staticmethod
+    def _summary(values):
+        if not values:
+            return None
+        values = sorted(values)
+        def percentile(p):
+            return values[min(len(values) - 1, int(p * len(values)))]
+        return {'mean': sum(values) / len(values), 'p50': percentile(0.5), 'p95': percentile(0.95),
+                'p99': percentile(0.99), 'max': values[-1]}
+
+    def snapshot(self):
+        """Return the metrics as a dict (latencies in seconds)."""
+        with self.lock:
+            return {'uptime': time.time() - self.started,
+                    'endpoints': { name : {'count': e['count'], 'errors': e['errors'],
+                                           'latency': self._summary(e['latencies']),
+                                           'compute': self._summary(e['compute'])}
+                                   for (name, e) in self.endpoints.items() }}
+
+
+# #######################################################################################################
+#
+# Server
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "DrawdownModelServer/1"
+
+    def log_message(self, format, *args):
+        if self.server.model_server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({'error': message}))
+
+    def do_GET(self):
+        self._dispatch(None)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(body, dict):
+                raise ValueError("the body must be a JSON object")
+        except ValueError as e:
+            self._error(400, f"Invalid JSON body: {e}")
+            return
+        self._dispatch(body)
+
+    def _dispatch(self, body):
+        start = time.perf_counter()
+        server = self.server.model_server
+        url = urlparse(self.path)
+        parts = [ p for p in url.path.split('/') if p ]
+        if parts == ['health']:
+            self._send(200, json.dumps(server.health()))
+            return
+        if parts == ['metrics']:
+            self._send(200, json.dumps(server.metrics.snapshot()))
+            return
+        if len(parts) < 3 or parts[0] != 'solutions' or parts[2] not in ('key_results', 'tables', 'json') or \
+                (parts[2] == 'tables') != (len(parts) == 4) or len(parts) > 4:
+            self._error(404, f"Unknown path {url.path}")
+            return
+        query = { k : v[-1] for (k, v) in parse_qs(url.query).items() }
+        body = body or {}
+        regions = body.get('regions', query['regions'].split(',') if 'regions' in query else None)
+        request = {'kind': parts[2], 'solution': parts[1], 'table': parts[3] if len(parts) == 4 else None,
+                   'scenario': body.get('scenario', query.get('scenario')), 'ac': body.get('ac'),
+                   'regions': regions}
+        (status, result, compute) = server.evaluate(request)
+        if status != 200:
+            self._error(status, result)
+        elif parts[2] == 'key_results':
+            self._send(status, json.dumps(result))
+        else:
+            self._send(status, result, 'application/x-ndjson')
+        server.metrics.record(parts[2], status, time.perf_counter() - start, compute)
+
+
+class ModelServer:
+    """A local HTTP server of model results, served by worker processes.
+         solutions: the solutions to load at startup (default: all of them).  Requests for other
+           solutions are also answered, after loading them.
+         workers: the number of worker processes (default: the number of CPUs, at most the number
+           of solutions).
+         host, port: the address to serve on (port 0 chooses a free port; see address).
+         timeout: the seconds to wait for a result before answering 504.
+         cache_size: the number of scenarios each worker keeps.
+    """
+
+    def __init__(self, solutions=None, workers=None, host='127.0.0.1', port=default_port, timeout=300,
+                 cache_size=8, verbose=False):
+        from tools import scenario_catalog
+        self.solutions = list(solutions) if solutions is not None else scenario_catalog.all_solutions()
+        self.n_workers = max(1, min(workers or os.cpu_count() or 1, len(self.solutions) or 1))
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.verbose = verbose
+        self.metrics = Metrics()
+        self.workers = []
+        self._next_id = 0
+        self._id_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.model_server = self
+        self._thread = None
+
+    @property
+    def address(self):
+        (host, port) = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, solution):
+        """Return the worker that answers requests for solution."""
+        if solution in self.solutions:
+            return self.workers[self.solutions.index(solution) % len(self.workers)]
+        return self.workers[zlib.crc32(solution.encode('utf-8')) % len(self.workers)]
+
+    def start(self, wait=True):
+        """Start the workers and serve requests in a background thread.  If wait, return once the
+        workers have loaded their solutions."""
+        context = multiprocessing.get_context()
+        self.workers = [ _WorkerHandle(i, self.solutions[i::self.n_workers], self.cache_size, context)
+                         for i in range(self.n_workers) ]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        if wait:
+            for w in self.workers:
+                w.started.wait()
+        return self
+
+    def serve_forever(self):
+        self.start(wait=False)
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for w in self.workers:
+            w.stop()
+
+    def evaluate(self, request):
+        """Return (status, result, compute seconds) of request (see _Worker.handle)."""
+        with self._id_lock:
+            self._next_id += 1
+            request_id = self._next_id
+        future = self.route(request['solution']).submit(request_id, request)
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:   # not the builtin TimeoutError before Python 3.11
+            return (504, f"No result within {self.timeout} seconds", None)
+
+    def health(self):
+        workers = [ {'pid': w.process.pid, 'alive': w.process.is_alive(), 'started': w.started.is_set(),
+                     'solutions': w.solutions, 'ready': w.ready, 'failed': w.failed,
+                     'pending': len(w.pending)} for w in self.workers ]
+        ok = all(w['alive'] and w['started'] for w in workers)
+        return {'status': 'ok' if ok else ('starting' if all(w['alive'] for w in workers) else 'degraded'),
+                'uptime': time.time() - self.metrics.started, 'workers': workers}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve model results over HTTP from warm worker processes.")
+    parser.add_argument('solutions', nargs='*', help="solutions to load at startup (default: all)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=default_port, help="(default: %(default)s)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="number of worker processes (default: CPUs)")
+    parser.add_argument('--timeout', type=float, default=300, help="seconds to wait for a result (default: %(default)s)")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+
+    server = ModelServer(args.solutions or None, workers=args.workers, host=args.host, port=args.port,
+                         timeout=args.timeout, verbose=args.verbose)
+    print(f"Serving on {server.address}")
+    server.serve_forever()
@@ -0,0 +1,253 @@
+"""A local warehouse of the results of every solution and scenario.
+
+Materializes the @data_func outputs (see model/export.py) of every scenario of every solution into
+Parquet files partitioned by solution, with one row per value:
+    solution, scenario, table, year, row, region, value
+where table is named as by model.export (e.g. 'c2.co2eq_mmt_reduced'), year is the row label for
+the usual year-indexed tables (otherwise null, and the label is in row), and region is the column
+label (or the index label, for Series indexed by region; null for other Series).  Non-finite values
+are stored as 0, as DataHandler.to_json does.
+
+Building is incremental: each solution is rebuilt only if the contents of its directory (its ac, ad,
+ca, vma data and code) have changed since it was last built, or the selection of tables differs.
+A change to the model code or to the shared data (the model and data directories) rebuilds all of
+them.
+    python -m tools.results_warehouse build [-j WORKERS] [--table NAME ...] [--force] [solution ...]
+    python -m tools.results_warehouse totals c2.co2eq_mmt_reduced [--scenario PDS2]
+
+Queries read only the Parquet files; no Scenario is constructed:
+    w = Warehouse()
+    w.query(tables=['ht.soln_pds_funits_adopted'], solutions=['solarpvutil'], regions=['World'])
+    w.totals('c2.co2eq_mmt_reduced', scenario='PDS2')     # by solution category
+"""
+
+import argparse
+import datetime
+import functools
+import hashlib
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from model import export
+from solution import factory
+
+default_directory = Path(__file__).parents[1] / '.warehouse'
+_manifest_name = '_manifest.json'   # the leading _ keeps it out of the dataset
+shared_directories = [Path(__file__).parents[1] / 'model', Path(__file__).parents[1] / 'data']
+"""The model code and the data shared by the solutions (TAM, population, emissions factors, ...)."""
+
+schema = pa.schema([('scenario', pa.string()), ('table', pa.string()), ('year', pa.int32()),
+                    ('row', pa.string()), ('region', pa.string()), ('value', pa.float64())])
+
+
+def _hash_directory(h, root, exclude=('tests', '__pycache__')):
+    """Add the names and contents of the files under root (other than those in exclude) to h."""
+    for path in sorted(root.rglob('*')):
+        rel = path.relative_to(root)
+        if path.is_file() and not set(rel.parts[:-1]) & set(exclude) and path.suffix != '.pyc':
+            h.update(rel.as_posix().encode('utf-8'))
+            h.update(path.read_bytes())
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_fingerprint():
+    """Return a hash of the code and data shared by all the solutions (computed once per process)."""
+    h = hashlib.sha1()
+    for root in shared_directories:
+        h.update(root.name.encode('utf-8'))
+        _hash_directory(h, root)
+    return h.hexdigest()
+
+
+def fingerprint(solution, tables=None):
+    """Return a hash of the contents of the solution's directory (other than its tests), of the model
+    code and shared data (see shared_directories), and of the selection of tables, which changes
+    whenever the solution needs to be rebuilt."""
+    h = hashlib.sha1()
+    _hash_directory(h, factory.solution_path(solution))
+    h.update(_shared_fingerprint().encode('utf-8'))
+    h.update(json.dumps(sorted(tables) if tables else None).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _scenario_table(scenario, obj, tables, failures):
+    """Return the outputs of scenario object obj as a pyarrow Table in the warehouse schema."""
+    parts = []
+    def on_error(name, e):
+        failures[f"{scenario}/{name}"] = f"{type(e).__name__}: {e}"
+    for (name, data) in export.iter_tables(obj, tables, on_error=on_error):
+        for p in export.long_form(name, data):
+            if isinstance(data, pd.Series):
+                # a Series has regions as its index, or none at all
+                p['column'] = p['row'] if 'World' in data.index else np.full(len(p['row']), None, dtype=object)
+                p['row'] = p['row'] if 'World' not in data.index else np.full(len(p['row']), None, dtype=object)
+            parts.append(p)
+    if not parts:
+        return schema.empty_table()
+    rows = np.concatenate([ np.asarray(p['row'], dtype=object) for p in parts ])
+    years = pd.to_numeric(pd.Series(rows), errors='coerce')
+    is_year = years.notna().to_numpy() & (years.fillna(0) % 1 == 0).to_numpy()
+    return pa.table({
+        'scenario': pa.array(np.full(len(rows), scenario, dtype=object), pa.string()),
+        'table': pa.array(np.concatenate([ np.asarray(p['table'], dtype=object) for p in parts ]), pa.string()),
+        'year': pa.array(np.where(is_year, years.fillna(0), 0).astype(np.int32), pa.int32(), mask=~is_year),
+        'row': pa.array(np.where(is_year, None, rows), pa.string()),
+        'region': pa.array(np.concatenate([ np.asarray(p['column'], dtype=object) for p in parts ]), pa.string()),
+        'value': pa.array(np.concatenate([ np.asarray(p['value'], dtype=np.float64) for p in parts ]), pa.float64()),
+    }, schema=schema)
+
+
+def build_solution(directory, solution, tables=None):
+    """Compute the outputs of every scenario of solution and write them to the solution's partition
+    of the warehouse in directory.  Returns the solution's manifest entry."""
+    partition = Path(directory) / f"solution={solution}"
+    partition.mkdir(parents=True, exist_ok=True)
+    tmp = partition / '.part.parquet.tmp'
+    failures = {}
+    scenarios = []
+    try:
+        m = factory._load_module(solution)
+        names = factory.list_scenarios(solution)
+    except Exception as e:  # pylint: disable=broad-except
+        # a broken solution gets an empty partition, and is retried when it changes
+        (m, names) = (None, [])
+        failures['*'] = f"{type(e).__name__}: {e}"
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for scenario in names:
+            try:
+                obj = factory.load_scenario(solution, scenario)
+            except Exception as e:  # pylint: disable=broad-except
+                # record the failure (in the manifest) and carry on with the other scenarios
+                failures[scenario] = f"{type(e).__name__}: {e}"
+                continue
+            writer.write_table(_scenario_table(scenario, obj, tables, failures))
+            scenarios.append(scenario)
+    tmp.replace(partition / 'part.parquet')
+    return {'fingerprint': fingerprint(solution, tables), 'tables': tables,
+            'built': datetime.datetime.now().isoformat(timespec='seconds'),
+            'category': m.solution_category.name if getattr(m, 'solution_category', None) else None,
+            'pds': {p: getattr(m, p, None) for p in ('PDS1', 'PDS2', 'PDS3')},
+            'scenarios': scenarios, 'failures': failures}
+
+
+class Warehouse:
+    """The results warehouse in directory (default: .warehouse at the top of the repository)."""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or default_directory)
+
+    @property
+    def manifest(self):
+        path = self.directory / _manifest_name
+        return json.loads(path.read_text(encoding='utf-8')) if path.is_file() else {}
+
+    def _write_manifest(self, manifest):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / (_manifest_name + '.tmp')
+        tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding='utf-8')
+        tmp.replace(self.directory / _manifest_name)
+
+    def stale(self, solutions=None, tables=None):
+        """Return the solutions (default: all) whose warehouse partitions are missing or out of date."""
+        manifest = self.manifest
+        return [ s for s in (solutions or factory.all_solutions())
+                 if s not in manifest or manifest[s]['fingerprint'] != fingerprint(s, tables) ]
+
+    def build(self, solutions=None, tables=None, workers=1, force=False, progress=print):
+        """Bring the warehouse up to date for solutions (default: all), rebuilding only those that are
+        stale (or all of them, if force).  tables selects the outputs to store (default all).  Returns
+        the list of solutions rebuilt."""
+        all_requested = solutions is None
+        solutions = solutions or factory.all_solutions()
+        todo = solutions if force else self.stale(solutions, tables)
+        manifest = self.manifest
+        if all_requested:
+            for gone in set(manifest) - set(solutions):
+                shutil.rmtree(self.directory / f"solution={gone}", ignore_errors=True)
+                del manifest[gone]
+        def done(solution, entry):
+            manifest[solution] = entry
+            self._write_manifest(manifest)
+            if progress:
+                progress(f"{solution}: {len(entry['scenarios'])} scenarios, {len(entry['failures'])} failures")
+        if workers == 1:
+            for solution in todo:
+                done(solution, build_solution(self.directory, solution, tables))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = { executor.submit(build_solution, self.directory, s, tables) : s for s in todo }
+                for future in as_completed(futures):
+                    done(futures[future], future.result())
+        return todo
+
+    def dataset(self):
+        return ds.dataset(self.directory, format='parquet', partitioning='hive', schema=schema.append(
+            pa.field('solution', pa.string())))
+
+    def query(self, tables=None, solutions=None, scenarios=None, years=None, regions=None, columns=None):
+        """Return the values matching all of the given selections (each a list, or None for all; years
+        may also be a range) as a DataFrame with the warehouse columns, or the given columns."""
+        conditions = []
+        for (field, values) in (('table', tables), ('solution', solutions), ('scenario', scenarios),
+                                ('year', years), ('region', regions)):
+            if values is not None:
+                conditions.append(ds.field(field).isin(list(values)))
+        condition = None
+        for c in conditions:
+            condition = c if condition is None else condition & c
+        if not (self.directory / _manifest_name).is_file():
+            return schema.empty_table().to_pandas()
+        return self.dataset().to_table(filter=condition, columns=columns).to_pandas()
+
+    def scenario_names(self, scenario):
+        """Return {solution: scenario name} for scenario, which is either 'PDS1', 'PDS2' or 'PDS3' (the
+        solution's scenario of that type) or the name of a scenario."""
+        if scenario in ('PDS1', 'PDS2', 'PDS3'):
+            return { s : e['pds'][scenario] for (s, e) in self.manifest.items() if e['pds'].get(scenario) }
+        return { s : scenario for (s, e) in self.manifest.items() if scenario in e['scenarios'] }
+
+    def totals(self, table, scenario='PDS2', sectors=None, region='World', years=None):
+        """Return the sum of table over the solutions of each sector, for scenario (see scenario_names),
+        as a DataFrame indexed by year with a column per sector.  sectors maps solution names to sectors;
+        by default solutions are grouped by their solution category."""
+        names = self.scenario_names(scenario)
+        df = self.query(tables=[table], solutions=list(names), years=years, regions=[region],
+                        columns=['solution', 'scenario', 'year', 'value'])
+        df = df[df['scenario'] == df['solution'].map(names)]
+        if sectors is None:
+            sectors = { s : e['category'] for (s, e) in self.manifest.items() }
+        df = df.assign(sector=df['solution'].map(sectors)).dropna(subset=['sector', 'year'])
+        result = df.pivot_table(index='year', columns='sector', values='value', aggfunc='sum', fill_value=0.0)
+        result.index = result.index.astype(int)
+        result.columns.name = None
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the solution results warehouse.")
+    parser.add_argument('--directory', default=default_directory, help="warehouse directory (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="bring the warehouse up to date")
+    build.add_argument('solutions', nargs='*', help="solutions to build (default: all)")
+    build.add_argument('-j', '--workers', type=int, default=1, help="number of worker processes")
+    build.add_argument('--table', action='append', dest='tables', help="store only this output (repeatable; default all)")
+    build.add_argument('--force', action='store_true', help="rebuild even if up to date")
+    totals = commands.add_parser('totals', help="print the sum of a table by sector")
+    totals.add_argument('table', help="output name, e.g. c2.co2eq_mmt_reduced")
+    totals.add_argument('--scenario', default='PDS2', help="PDS1, PDS2, PDS3 or a scenario name (default: %(default)s)")
+    totals.add_argument('--region', default='World')
+    args = parser.parse_args()
+
+    warehouse = Warehouse(args.directory)
+    if args.command == 'build':
+        rebuilt = warehouse.build(args.solutions or None, tables=args.tables, workers=args.workers, force=args.force)
+        print(f"{len(rebuilt)} solutions rebuilt")
+    else:
+        with pd.option_context('display.max_rows', None, 'display.width', 200):
+            print(warehouse.totals(args.table, scenario=args.scenario, region=args.region))
@@ -0,0 +1,252 @@
+"""A compiled catalog of the scenarios of every solution.
+
+Listing the scenarios of a solution with solution.factory imports the solution module (and so the
+model), and finding the scenarios with a given setting means loading all of them.  The catalog
+compiles every solution's ac/*.json files into a single SQLite file, with one row per scenario:
+    solution, scenario, file, sha1, ac_json, <one column per scalar AdvancedControls field>
+where sha1 is the hash of the scenario's file and ac_json holds the whole of the file.  Fields whose
+values are {'value': ..., 'statistic': ...} (those that may come from a VMA) are stored as their
+value.  The pds table gives each solution's PDS1, PDS2 and PDS3 scenarios.
+
+Reading the catalog needs only the standard library; no solution or model code is imported.  The
+catalog is rebuilt automatically whenever an ac file or solution __init__.py has been added, removed
+or changed since it was built.  Scenarios added by an in-memory integration (see model.integration)
+are not included.
+
+    c = Catalog()
+    c.list_scenarios('solarpvutil')
+    c.search(soln_pds_adoption_basis='Existing Adoption Prognostications', report_end_year=2050)
+    python -m tools.scenario_catalog search report_end_year=2050 solution_category=land
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+default_root = Path(__file__).parents[1] / 'solution'
+default_filename = Path(__file__).parents[1] / '.catalog.sqlite'
+
+_version = 1   # of the catalog's tables, kept in its user_version
+_columns = ['solution', 'scenario', 'file', 'sha1', 'ac_json']
+_pds_pattern = re.compile(r'^(PDS[123])\s*=\s*(["\'])(.*?)\2', re.MULTILINE)
+
+
+def all_solutions(root=default_root):
+    """Return the names of the solutions in root, as solution.factory.all_solutions does."""
+    return sorted(d.name for d in Path(root).iterdir() if d.is_dir() and (d / '__init__.py').is_file()
+                  and not d.name.startswith('_') and not d.name.startswith('test'))
+
+
+def _sources(root):
+    """Return the files the catalog is compiled from, as {relative path: (mtime_ns, size)}."""
+    root = Path(root)
+    result = {}
+    for solution in all_solutions(root):
+        for path in [root / solution / '__init__.py'] + sorted((root / solution / 'ac').glob('*.json')):
+            st = path.stat()
+            result[path.relative_to(root).as_posix()] = (st.st_mtime_ns, st.st_size)
+    return result
+
+
+def _scalar(value):
+    """Return the value of a scalar field, or raise TypeError if value is not scalar."""
+    if isinstance(value, dict) and 'value' in value and set(value) <= {'value', 'statistic'}:
+        value = value['value']
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(value)
+
+
+class Catalog:
+    """The scenario catalog of the solutions in root (default: the solution directory of this
+    repository), stored in filename (default: .catalog.sqlite at the top of the repository)."""
+
+    def __init__(self, filename=None, root=None):
+        self.filename = Path(filename or default_filename)
+        self.root = Path(root or default_root)
+
+    # Building
+
+    def stale(self):
+        """Return True if the catalog is missing or out of date."""
+        if not self.filename.is_file():
+            return True
+        try:
+            with self._reading(check=False) as db:
+                if db.execute('PRAGMA user_version').fetchone()[0] != _version:
+                    return True
+                built = { path : (mtime, size) for (path, mtime, size) in
+                          db.execute('SELECT path, mtime_ns, size FROM files') }
+        except sqlite3.DatabaseError:
+            return True
+        return built != _sources(self.root)
+
+    def build(self):
+        """Compile the catalog from the ac files.  Returns the number of scenarios."""
+        sources = _sources(self.root)
+        rows = []
+        fields = {}   # the scalar fields, in order of first appearance
+        errors = []
+        pds = []
+        for solution in all_solutions(self.root):
+            text = (self.root / solution / '__init__.py').read_text(encoding='utf-8')
+            pds.extend((solution, kind, name) for (kind, _, name) in _pds_pattern.findall(text))
+            for path in sorted((self.root / solution / 'ac').glob('*.json')):
+                content = path.read_bytes()
+                try:
+                    ac = json.loads(content)
+                    name = ac['name']
+                except (ValueError, KeyError) as e:
+                    errors.append((path.relative_to(self.root).as_posix(), f"{type(e).__name__}: {e}"))
+                    continue
+                values = {}
+                for (key, value) in ac.items():
+                    if key in _columns or key == 'name':
+                        continue
+                    try:
+                        values[key] = _scalar(value)
+                    except TypeError:
+                        continue
+                    fields.setdefault(key, None)
+                rows.append(([solution, name, path.relative_to(self.root).as_posix(),
+                              hashlib.sha1(content).hexdigest(),
+                              content.decode('utf-8')], values))
+
+        tmp = self.filename.with_name(self.filename.name + '.tmp')
+        tmp.unlink(missing_ok=True)
+        db = sqlite3.connect(tmp)
+        try:
+            columns = _columns + list(fields)
+            db.execute('CREATE TABLE scenarios (' + ', '.join(f'"{c}"' for c in columns) +
+                       ', PRIMARY KEY (solution, scenario))')
+            db.executemany('INSERT INTO scenarios VALUES (' + ', '.join('?' * len(columns)) + ')',
+                           [ fixed + [values.get(f) for f in fields] for (fixed, values) in rows ])
+            for field in ['solution_category', 'soln_pds_adoption_basis', 'report_end_year']:
+                if field in columns:
+                    db.execute(f'CREATE INDEX "ix_{field}" ON scenarios ("{field}")')
+            db.execute('CREATE TABLE pds (solution TEXT, pds TEXT, scenario TEXT, PRIMARY KEY (solution, pds))')
+            db.executemany('INSERT OR REPLACE INTO pds VALUES (?, ?, ?)', pds)
+            db.execute('CREATE TABLE files (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER)')
+            db.executemany('INSERT INTO files VALUES (?, ?, ?)',
+                           [ (path, mtime, size) for (path, (mtime, size)) in sources.items() ])
+            db.execute('CREATE TABLE errors (path TEXT, message TEXT)')
+            db.executemany('INSERT INTO errors VALUES (?, ?)', errors)
+            db.execute(f'PRAGMA user_version = {_version}')
+            db.commit()
+        finally:
+            db.close()
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, self.filename)
+        return len(rows)
+
+    @contextmanager
+    def _reading(self, check=True):
+        """A read-only connection to the catalog, which is first rebuilt if check and it is stale."""
+        if check and self.stale():
+            self.build()
+        db = sqlite3.connect(f"file:{self.filename}?mode=ro", uri=True)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Queries
+
+    def fields(self):
+        """Return the names of the columns of the scenarios table."""
+        with self._reading() as db:
+            return [ row[1] for row in db.execute('PRAGMA table_info(scenarios)') ]
+
+    def solutions(self):
+        with self._reading() as db:
+            return [ s for (s,) in db.execute('SELECT DISTINCT solution FROM scenarios ORDER BY solution') ]
+
+    def list_scenarios(self, solution):
+        """Return the names of the scenarios of solution."""
+        with self._reading() as db:
+            return [ s for (s,) in db.execute(
+                'SELECT scenario FROM scenarios WHERE solution = ? ORDER BY scenario', (solution,)) ]
+
+    def all_solutions_scenarios(self):
+        """Return {solution: [scenario names]} for every solution with scenarios."""
+        result = {}
+        with self._reading() as db:
+            for (solution, scenario) in db.execute('SELECT solution, scenario FROM scenarios ORDER BY solution, scenario'):
+                result.setdefault(solution, []).append(scenario)
+        return result
+
+    def scenario(self, solution, scenario):
+        """Return the contents of the ac file of scenario of solution (either a name or 'PDS1',
+        'PDS2' or 'PDS3'), as a dict."""
+        with self._reading() as db:
+            if scenario in ('PDS1', 'PDS2', 'PDS3'):
+                row = db.execute('SELECT ac_json FROM scenarios JOIN pds USING (solution, scenario) '
+                                 'WHERE solution = ? AND pds = ?', (solution, scenario)).fetchone()
+            else:
+                row = db.execute('SELECT ac_json FROM scenarios WHERE solution = ? AND scenario = ?',
+                                 (solution, scenario)).fetchone()
+        if row is None:
+            raise KeyError(f"No scenario {scenario} of {solution}")
+        return json.loads(row[0])
+
+    def pds_scenarios(self, pds):
+        """Return {solution: scenario name} of the solutions' pds ('PDS1', 'PDS2' or 'PDS3') scenarios."""
+        with self._reading() as db:
+            return dict(db.execute('SELECT solution, scenario FROM pds WHERE pds = ? ORDER BY solution', (pds,)))
+
+    def search(self, **criteria):
+        """Return (solution, scenario) for each scenario whose fields have the given values.  A
+        value may be a list or tuple of acceptable values, or None to match a missing value."""
+        fields = set(self.fields())
+        conditions = []
+        params = []
+        for (field, value) in criteria.items():
+            if field not in fields:
+                raise ValueError(f"Unknown field {field}")
+            if value is None:
+                conditions.append(f'"{field}" IS NULL')
+            elif isinstance(value, (list, tuple, set)):
+                conditions.append(f'"{field}" IN (' + ', '.join('?' * len(value)) + ')')
+                params.extend(value)
+            else:
+                conditions.append(f'"{field}" = ?')
+                params.append(value)
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        with self._reading() as db:
+            return [ tuple(row) for row in db.execute(
+                f'SELECT solution, scenario FROM scenarios{where} ORDER BY solution, scenario', params) ]
+
+    def query(self, sql, params=()):
+        """Return the rows of an SQL query of the catalog (tables scenarios, pds, files and errors)."""
+        with self._reading() as db:
+            return db.execute(sql, params).fetchall()
+
+
+def _criterion(text):
+    (field, _, value) = text.partition('=')
+    try:
+        return (field, json.loads(value))
+    except ValueError:
+        return (field, value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or search the scenario catalog.")
+    parser.add_argument('--filename', default=default_filename, help="catalog file (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('build', help="compile the catalog from the ac files")
+    search = commands.add_parser('search', help="list the scenarios with the given field values")
+    search.add_argument('criteria', nargs='*', help="field=value (values are parsed as JSON if possible)")
+    args = parser.parse_args()
+
+    catalog = Catalog(args.filename)
+    if args.command == 'build':
+        print(f"{catalog.build()} scenarios")
+    else:
+        for (solution, scenario) in catalog.search(**dict(_criterion(c) for c in args.criteria)):
+            print(f"{solution}\t{scenario}")
@@ -1096,6 +1096,8 @@ def write_ht(f, wb, has_custom_ref_ad, is_land):
 
     f.write("            pds_adoption_trend_per_region=pds_adoption_trend_per_region,\n")
     f.write("            pds_adoption_is_single_source=pds_adoption_is_single_source)\n")
+    f.write("        if self._adoption_only:\n")
+    f.write("            return\n")
     f.write("\n")
 
 
@@ -0,0 +1,32 @@
+import pandas as pd
+from model.tam import TAM
+from tools import benchmark
+
+
+def _results(**values):
+    return {'results': { name : {'seconds': s, 'peak_mb': m} for (name, (s, m)) in values.items() }}
+
+
+def test_compare():
+    baseline = _results(a=(1.0, 10.0), b=(1.0, 10.0), c=(0.01, None), d=(1.0, 10.0))
+    current = _results(a=(1.1, 10.0), b=(2.0, 10.0), c=(0.03, None), e=(1.0, None))
+    report = benchmark.compare(baseline, current, threshold=1.25)
+    assert report.loc['a', 'regression'] == False
+    assert report.loc['b', 'regression'] == True
+    assert report.loc['b', 'time_ratio'] == 2.0
+    assert report.loc['c', 'regression'] == False, "too small a difference to count"
+    assert pd.isna(report.loc['d', 'now_s'])
+    assert pd.isna(report.loc['e', 'base_s'])
+
+
+def test_compare_memory():
+    report = benchmark.compare(_results(a=(1.0, 10.0)), _results(a=(1.0, 20.0)))
+    assert report.loc['a', 'mem_ratio'] == 2.0
+    assert report.loc['a', 'regression'] == True
+
+
+def test_stage_timer_restores_methods():
+    original = TAM.__dict__['__init__']
+    with benchmark._StageTimer(memory=False):
+        assert TAM.__dict__['__init__'] is not original
+    assert TAM.__dict__['__init__'] is original
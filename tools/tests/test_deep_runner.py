@@ -0,0 +1,11 @@
+import importlib
+from tools import deep_runner
+
+
+def test_deep_test_settings(monkeypatch):
+    settings = deep_runner.deep_test_settings('airplanes')
+    assert settings['expected_file'].name == 'expected.zip'
+    t = importlib.import_module('solution.airplanes.tests.test_airplanes')
+    monkeypatch.setattr(t, 'STANDARD_DEEP_TEST', False)
+    assert deep_runner.deep_test_settings('airplanes') is None
+    assert deep_runner.deep_test_settings('nosuchsolution') is None
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from tools import expected_result_tester as ert
+
+
+def test_dataframes_differ_matches_cellwise():
+    val = pd.DataFrame([[1.0, 0.0, np.nan, 'abc'], [1e9, 5e-5, 2.0, ''], [None, np.inf, 3.0, 1.0]])
+    expt = pd.DataFrame([[1.0000001, np.nan, 0.0, 'abc'], [1e9 + 500, 0.0, 2.1, 0.0], [0.0, np.inf, 'x', 'abc']])
+    mask = pd.DataFrame([[False, False, False, False], [False, False, True, False], [False, False, False, False]])
+    for m in (None, mask):
+        for all_zero in (True, False):
+            expected = ert.dataframes_differ_cellwise(val, expt, m, all_zero=all_zero)
+            result = ert.dataframes_differ(val, expt, m, all_zero=all_zero)
+            assert [x[:2] for x in result] == [x[:2] for x in expected]
+
+
+def test_compare_arrays_summary():
+    val = pd.DataFrame(np.ones((3, 4)))
+    expt = val.copy()
+    expt.iloc[1, 2] = 1.5
+    expt.iloc[2, 3] = np.nan
+    result = ert.compare_arrays(val, expt)
+    assert list(zip(result['rows'], result['cols'])) == [(1, 2), (2, 3)]
+    assert result['count'] == 2
+    assert result['total'] == 12
+    assert result['max_abs_diff'] == pytest.approx(0.5)
+
+    result = ert.compare_arrays(val, expt, expected_mask="Excel_NaN")
+    assert list(zip(result['rows'], result['cols'])) == [(1, 2)]
+    assert result['total'] == 11
+
+
+def test_compare_arrays_one_cent():
+    val = pd.DataFrame([[0.0, 100.0], [0.004, 100.005]])
+    expt = pd.DataFrame([[0.009, 100.0], [0.0, 100.0]])
+    assert ert.compare_arrays(val, expt)['count'] == 3
+    assert ert.compare_arrays(val, expt, expected_mask="Excel_one_cent")['count'] == 0
@@ -0,0 +1,58 @@
+import io
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+import pytest
+from tools import expected_store
+from tools.util import df_excel_range
+
+sheet_csv = ("Title,,,\n"
+             "Year,World,OECD90,Note\n"
+             "2015,1.5,2,ok\n"
+             "2016,#REF!,3.25,\n"
+             "2017,4,TRUE,x\n")
+
+
+@pytest.fixture
+def expected_zip(tmp_path):
+    filename = tmp_path / "expected.zip"
+    with zipfile.ZipFile(filename, mode='w') as zf:
+        zf.writestr("PDS1/Sheet", sheet_csv)
+        zf.writestr("PDS2/Sheet", sheet_csv.replace("1.5", "7.5"))
+        zf.writestr("PDS2/Empty", "")
+    return filename
+
+
+def test_excel_range_matches_csv(expected_zip):
+    sheet_df = pd.read_csv(io.StringIO(sheet_csv), header=None, na_values=['#REF!', '#DIV/0!', '#VALUE!', '(N/A)'])
+    with expected_store.ExpectedResults(expected_store.convert(expected_zip)) as store:
+        assert store.scenarios() == ["PDS1", "PDS2"]
+        for rangeref in ["B3:C4", "B3:B5", "D3:D5"]:
+            expected = df_excel_range(sheet_df, rangeref)
+            result = store.excel_range("PDS1", "Sheet", rangeref)
+            pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False,
+                                          check_column_type=False)
+        # read_csv leaves numbers as text in columns that also hold text; the store does not.
+        assert store.excel_range("PDS1", "Sheet", "A2:A3").iloc[:, 0].tolist() == ["Year", 2015]
+        assert store.excel_range("PDS2", "Sheet", "B3:B3").iloc[0, 0] == 7.5
+
+
+def test_numeric_ranges_are_views(expected_zip):
+    with expected_store.ExpectedResults(expected_store.convert(expected_zip)) as store:
+        result = store.excel_range("PDS1", "Sheet", "B3:C4")
+        assert np.shares_memory(result.values, store.grid("PDS1", "Sheet"))
+        assert store.cell("PDS1", "Sheet", "B4") == "#REF!"
+        assert store.cell("PDS1", "Sheet", "C3") == 2.0
+        assert store.grid("PDS2", "Empty").shape == (0, 0)
+
+
+def test_open_expected(expected_zip):
+    with expected_store.open_expected(expected_zip) as f:
+        assert isinstance(f, zipfile.ZipFile), "no store yet"
+    store = expected_store.convert(expected_zip)
+    with expected_store.open_expected(expected_zip) as f:
+        assert isinstance(f, expected_store.ExpectedResults)
+    os.utime(store, (0, 0))
+    with expected_store.open_expected(expected_zip) as f:
+        assert isinstance(f, zipfile.ZipFile), "store is older than expected.zip"
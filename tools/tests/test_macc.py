@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+from tools import macc
+from tools.scenario_catalog import Catalog
+from solution import factory
+
+
+def test_cost():
+    entry = {'discount_rate': 0.1, 'report_years': [2020, 2022],
+             'cash_flow': {'2019': 5.0, '2020': 11.0, '2021': 12.1, '2022': 13.31, '2023': 1.0},
+             'abatement': {'2019': 1.0, '2020': 2.0, '2022': 3.0, '2023': 4.0}}
+    assert macc._cost(entry, None, None) == pytest.approx((30.0, 5.0))
+    assert macc._cost(entry, (2021, 2023), 0.0) == pytest.approx((26.41, 7.0))
+
+
+def test_curve(tmp_path, monkeypatch):
+    m = macc.Macc(tmp_path / 'macc', catalog=Catalog(tmp_path / 'catalog.sqlite'))
+    solutions = ['heatpumps', 'solarpvutil']
+    df = m.curve(solutions=solutions + ['nosuchsolution'], workers=1)
+    assert list(m.failures) == ['nosuchsolution']
+    assert sorted(df.index) == solutions
+    assert df['cost_per_tonne'].is_monotonic_increasing
+    assert df['cumulative_abatement'].iloc[-1] == pytest.approx(df['abatement'].sum())
+
+    s = factory.load_scenario('solarpvutil', 'PDS2')
+    row = df.loc['solarpvutil']
+    assert row['scenario'] == s.ac.name
+    assert row['abatement'] == pytest.approx(s.get_key_results()['cumulative_emissions_reduced'])
+    cash_flow = s.oc.soln_net_cash_flow().loc[2020:2050]
+    npv = sum(v / (1 + s.ac.npv_discount_rate) ** (y - 2019) for (y, v) in cash_flow.items())
+    assert row['npv'] == pytest.approx(npv / 1e9)
+    assert row['cost_per_tonne'] == pytest.approx(-npv / (row['abatement'] * 1e9))
+
+    # from the cache, for another window, and evaluating only the scenario which changed
+    evaluated = []
+    evaluate = macc.evaluate
+    def counting(solution, ac):
+        evaluated.append(solution)
+        return evaluate(solution, ac)
+    monkeypatch.setattr(macc, 'evaluate', counting)
+    cached = m.curve(solutions=solutions, workers=1)
+    pd.testing.assert_frame_equal(cached, df)
+    assert evaluated == []
+    assert m.curve(years=(2020, 2030), solutions=solutions, workers=1).loc['solarpvutil', 'abatement'] < row['abatement']
+    changed = dict(s.ac.as_dict(), name='changed', npv_discount_rate=0.0)
+    df = m.curve(scenarios={'solarpvutil': changed, 'heatpumps': 'PDS2'}, workers=1)
+    assert evaluated == ['solarpvutil']
+    assert df.loc['solarpvutil', 'scenario'] == 'changed'
+    assert df.loc['solarpvutil', 'npv'] == pytest.approx(cash_flow.sum() / 1e9)
+
+
+def test_failures_not_cached(tmp_path, monkeypatch):
+    m = macc.Macc(tmp_path / 'macc', catalog=Catalog(tmp_path / 'catalog.sqlite'))
+    evaluate = macc.evaluate
+    def failing(solution, ac):
+        raise MemoryError("transient")
+    monkeypatch.setattr(macc, 'evaluate', failing)
+    assert m.curve(solutions=['solarpvutil'], workers=1).empty
+    assert m.failures == {'solarpvutil': 'MemoryError: transient'}
+    monkeypatch.setattr(macc, 'evaluate', evaluate)
+    assert list(m.curve(solutions=['solarpvutil'], workers=1).index) == ['solarpvutil']
+    assert m.failures == {}
@@ -0,0 +1,77 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+from tools import model_server
+from solution import factory
+
+
+@pytest.fixture(scope='module')
+def server():
+    s = model_server.ModelServer(['solarpvutil', 'airplanes'], workers=2, port=0).start()
+    yield s
+    s.shutdown()
+
+
+def _request(server, path, body=None):
+    data = None if body is None else json.dumps(body).encode('utf-8')
+    try:
+        with urllib.request.urlopen(urllib.request.Request(server.address + path, data=data)) as r:
+            return (r.status, r.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        return (e.code, e.read().decode('utf-8'))
+
+
+def test_health(server):
+    (status, body) = _request(server, '/health')
+    health = json.loads(body)
+    assert status == 200 and health['status'] == 'ok'
+    assert sorted(s for w in health['workers'] for s in w['ready']) == ['airplanes', 'solarpvutil']
+    assert server.route('solarpvutil') is not server.route('airplanes')
+    assert server.route('solarpvutil') is server.route('solarpvutil')
+
+
+def test_results(server):
+    (status, body) = _request(server, '/solutions/solarpvutil/key_results?scenario=PDS1')
+    assert status == 200
+    expected = factory.load_scenario('solarpvutil', 'PDS1', world_only=True).get_key_results()
+    assert json.loads(body) == pytest.approx(expected)
+
+    (status, body) = _request(server, '/solutions/airplanes/tables/c2.co2_mmt_reduced?regions=World,EU')
+    table = json.loads(body)
+    assert (table['table'], table['columns']) == ('c2.co2_mmt_reduced', ['World', 'EU'])
+    expected = factory.load_scenario('airplanes').c2.co2_mmt_reduced()
+    assert table['data'][table['index'].index(2050)][0] == pytest.approx(expected.loc[2050, 'World'])
+
+    (status, body) = _request(server, '/solutions/airplanes/json', {'scenario': 'PDS3', 'regions': ['World']})
+    lines = [ json.loads(line) for line in body.splitlines() ]
+    assert status == 200 and 'c2.co2_mmt_reduced' in [line['table'] for line in lines]
+
+
+def test_ac_overrides(server):
+    ac = factory.load_scenario('solarpvutil', 'PDS2').ac.as_dict()
+    ac['soln_lifetime_capacity'] = 10000.0
+    expected = factory.load_scenario('solarpvutil', ac, world_only=True).get_key_results()
+    (status, body) = _request(server, '/solutions/solarpvutil/key_results',
+                              {'scenario': 'PDS2', 'ac': {'soln_lifetime_capacity': 10000.0}})
+    assert status == 200
+    assert json.loads(body) == pytest.approx(expected)
+
+
+def test_errors_and_metrics(server):
+    assert _request(server, '/solutions/nosuchsolution/key_results')[0] == 404
+    assert _request(server, '/solutions/solarpvutil/tables/nosuchtable')[0] == 404
+    assert _request(server, '/solutions/solarpvutil/key_results?scenario=nosuchscenario')[0] == 404
+    assert _request(server, '/nosuchpath')[0] == 404
+    assert _request(server, '/solutions/solarpvutil/key_results', [1])[0] == 400
+    metrics = json.loads(_request(server, '/metrics')[1])
+    key_results = metrics['endpoints']['key_results']
+    assert key_results['count'] >= 2 and key_results['errors'] >= 2
+    assert key_results['latency']['max'] >= key_results['latency']['p50'] > 0
+
+
+def test_timeout(server, monkeypatch):
+    monkeypatch.setattr(server, 'timeout', 1e-6)
+    (status, body) = _request(server, '/solutions/airplanes/tables/c2.co2_mmt_reduced?scenario=PDS1')
+    assert status == 504 and 'No result within' in json.loads(body)['error']
+    assert json.loads(_request(server, '/metrics')[1])['endpoints']['tables']['errors'] >= 1
@@ -0,0 +1,50 @@
+import pytest
+from tools import results_warehouse
+
+
+def test_fingerprint(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_warehouse.factory, 'solution_path', lambda solution: tmp_path)
+    (tmp_path / 'ac').mkdir()
+    (tmp_path / 'tests').mkdir()
+    (tmp_path / 'ac' / 'scenario.json').write_text('{"a": 1}')
+    first = results_warehouse.fingerprint('x')
+    (tmp_path / 'tests' / 'expected.zip').write_text('changed')
+    assert results_warehouse.fingerprint('x') == first, "tests don't affect results"
+    assert results_warehouse.fingerprint('x', tables=['c2.co2eq_mmt_reduced']) != first
+    (tmp_path / 'ac' / 'scenario.json').write_text('{"a": 2}')
+    assert results_warehouse.fingerprint('x') != first
+
+
+def test_fingerprint_shared(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_warehouse.factory, 'solution_path', lambda solution: tmp_path / 'x')
+    monkeypatch.setattr(results_warehouse, 'shared_directories', [tmp_path / 'model', tmp_path / 'data'])
+    for d in ('x', 'model', 'data'):
+        (tmp_path / d).mkdir()
+    (tmp_path / 'data' / 'tam.csv').write_text('1')
+    results_warehouse._shared_fingerprint.cache_clear()
+    first = results_warehouse.fingerprint('x')
+    (tmp_path / 'data' / 'tam.csv').write_text('2')
+    results_warehouse._shared_fingerprint.cache_clear()
+    assert results_warehouse.fingerprint('x') != first, "shared data affects every solution"
+    results_warehouse._shared_fingerprint.cache_clear()
+
+
+@pytest.mark.slow
+def test_build_and_query(tmp_path):
+    w = results_warehouse.Warehouse(tmp_path)
+    tables = ['c2.co2eq_mmt_reduced', 'fc.soln_pds_annual_world_first_cost']
+    assert w.build(['solarpvutil'], tables=tables, progress=None) == ['solarpvutil']
+    assert w.build(['solarpvutil'], tables=tables, progress=None) == [], "up to date"
+
+    pds2 = w.manifest['solarpvutil']['pds']['PDS2']
+    df = w.query(tables=['c2.co2eq_mmt_reduced'], scenarios=[pds2], years=[2050], regions=['World'])
+    assert len(df) == 1
+    assert df['solution'].iloc[0] == 'solarpvutil'
+    cost = w.query(tables=['fc.soln_pds_annual_world_first_cost'], scenarios=[pds2], years=[2030])
+    assert cost['region'].isna().all()
+
+    totals = w.totals('c2.co2eq_mmt_reduced', scenario='PDS2', years=range(2049, 2051))
+    assert list(totals.columns) == ['REPLACEMENT']
+    assert totals.loc[2050, 'REPLACEMENT'] == pytest.approx(df['value'].iloc[0])
+    by_sector = w.totals('c2.co2eq_mmt_reduced', sectors={'solarpvutil': 'Electricity'}, years=[2050])
+    assert list(by_sector.columns) == ['Electricity']
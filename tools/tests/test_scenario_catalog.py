@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from tools import scenario_catalog
+
+
+def _solution(root, name, scenarios, pds2=None):
+    (root / name / 'ac').mkdir(parents=True)
+    (root / name / '__init__.py').write_text(f'PDS2 = "{pds2}"\nPDS3 = "{pds2}"\n' if pds2 else '')
+    for (i, ac) in enumerate(scenarios):
+        (root / name / 'ac' / f'{i}.json').write_text(json.dumps(ac))
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    root = tmp_path / 'solution'
+    _solution(root, 'sola', [
+        {'name': 'A1', 'report_end_year': 2050, 'solution_category': 'replacement',
+         'soln_lifetime_capacity': {'value': 1000.0, 'statistic': 'mean'},
+         'ref_base_adoption': {'World': 1.0}},
+        {'name': 'A2', 'report_end_year': 2060, 'solution_category': 'replacement',
+         'soln_first_cost_below_conv': True}], pds2='A2')
+    _solution(root, 'solb', [{'name': 'B1', 'report_end_year': 2050, 'solution_category': 'land'}])
+    _solution(root, '_template', [{'name': 'T', 'report_end_year': 2050}])
+    return scenario_catalog.Catalog(tmp_path / 'catalog.sqlite', root)
+
+
+def test_list(catalog):
+    assert catalog.stale()
+    assert catalog.solutions() == ['sola', 'solb']
+    assert not catalog.stale()
+    assert catalog.list_scenarios('sola') == ['A1', 'A2']
+    assert catalog.all_solutions_scenarios() == {'sola': ['A1', 'A2'], 'solb': ['B1']}
+    assert catalog.pds_scenarios('PDS2') == {'sola': 'A2'}
+    assert catalog.scenario('sola', 'PDS3')['name'] == 'A2'
+    assert catalog.scenario('sola', 'A1')['ref_base_adoption'] == {'World': 1.0}
+    with pytest.raises(KeyError):
+        catalog.scenario('solb', 'PDS2')
+
+
+def test_search(catalog):
+    assert catalog.search(report_end_year=2050) == [('sola', 'A1'), ('solb', 'B1')]
+    assert catalog.search(report_end_year=2050, solution_category='land') == [('solb', 'B1')]
+    assert catalog.search(solution_category=['land', 'replacement'], report_end_year=2060) == [('sola', 'A2')]
+    assert catalog.search(soln_lifetime_capacity=1000.0) == [('sola', 'A1')]
+    assert catalog.search(soln_first_cost_below_conv=True) == [('sola', 'A2')]
+    assert catalog.search(soln_first_cost_below_conv=None) == [('sola', 'A1'), ('solb', 'B1')]
+    assert 'ref_base_adoption' not in catalog.fields()
+    with pytest.raises(ValueError):
+        catalog.search(no_such_field=1)
+    sha1 = catalog.query('SELECT sha1 FROM scenarios WHERE scenario = ?', ('B1',))[0][0]
+    assert len(sha1) == 40
+
+
+def test_rebuilt_when_changed(catalog):
+    assert catalog.list_scenarios('solb') == ['B1']
+    ac = catalog.root / 'solb' / 'ac'
+    (ac / '1.json').write_text(json.dumps({'name': 'B2', 'report_end_year': 2040}))
+    assert catalog.stale()
+    assert catalog.list_scenarios('solb') == ['B1', 'B2']
+    (ac / '0.json').unlink()
+    assert catalog.list_scenarios('solb') == ['B2']
+    (ac / '2.json').write_text('{not json')
+    assert catalog.list_scenarios('solb') == ['B2']
+    assert catalog.query('SELECT path FROM errors') == [('solb/ac/2.json',)]
+
+
+def test_real_solutions_without_model(tmp_path):
+    # listing needs neither the solution modules nor the model
+    code = ("import sys\n"
+            "from tools import scenario_catalog\n"
+            f"c = scenario_catalog.Catalog({str(tmp_path / 'catalog.sqlite')!r})\n"
+            "print(len(c.list_scenarios('solarpvutil')), c.pds_scenarios('PDS2')['solarpvutil'])\n"
+            "assert not [m for m in sys.modules if m.split('.')[0] in ('model', 'solution', 'pandas')]\n")
+    top = Path(scenario_catalog.__file__).parents[1]
+    env = dict(os.environ, PYTHONPATH=str(top))
+    out = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env, capture_output=True,
+                         text=True, check=True).stdout.split()
+    from solution import factory
+    assert int(out[0]) == len(factory.list_scenarios('solarpvutil'))
+    assert out[1] == factory._load_module('solarpvutil').PDS2